@@ -0,0 +1,76 @@
+"""
+Benchmark - ATS keyword scoring of one resume against many jobs
+
+Measures building the per-job keyword indexes (cold) and ranking a resume
+against all of them once the indexes are cached (warm).
+
+Usage:
+    python benchmarks/bench_ats.py [--jobs 500] [--rounds 20]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from app.services.ats_analyzer import ATSAnalyzer  # noqa: E402
+from app.services.skill_extraction import DEFAULT_TAXONOMY  # noqa: E402
+
+
+FILLER = ("We are a fast-growing fintech building reliable payment infrastructure for millions of "
+          "merchants. You will design services, mentor engineers and own production quality. ")
+
+
+def make_jobs(n: int, seed: int = 5):
+    rng = random.Random(seed)
+    skills = sorted(DEFAULT_TAXONOMY)
+    return [
+        {
+            "id": i,
+            "updated_at": 0,
+            "required_skills": rng.sample(skills, 6),
+            "nice_to_have_skills": rng.sample(skills, 3),
+            "description": FILLER * rng.randint(2, 8) + " ".join(rng.sample(skills, 10)),
+        }
+        for i in range(n)
+    ]
+
+
+RESUME = {
+    "personalInfo": {"summary": "Backend engineer working on payments with Python, Go and PostgreSQL."},
+    "experiences": [
+        {"position": "Engineer", "company": f"Co {i}", "description": FILLER,
+         "highlights": ["Shipped Kafka pipelines on AWS", "Scaled Redis caching", "Led Docker migration"]}
+        for i in range(4)
+    ],
+    "skills": ["Python", "Go", "PostgreSQL", "Kafka", "AWS", "Docker", "Redis", "Kubernetes"],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    jobs = make_jobs(args.jobs)
+    analyzer = ATSAnalyzer(max_cached_jobs=args.jobs)
+
+    start = time.perf_counter()
+    analyzer.rank_jobs(RESUME, jobs)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        ranked = analyzer.rank_jobs(RESUME, jobs, limit=10)
+    warm = (time.perf_counter() - start) / args.rounds
+
+    print(f"cold (index build + rank) {cold * 1000:8.1f} ms for {args.jobs} jobs")
+    print(f"warm (cached indexes)     {warm * 1000:8.1f} ms for {args.jobs} jobs  best={ranked[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark - Storage and read latency of compressed email/job columns
+
+Generates recruiter-style HTML emails (50-200 KB), scraped job payloads
+and short plain-text replies, then reports for each codec the stored
+size and the per-value cost of writing (bind) and reading (result) a
+value through CompressedText/CompressedJSON. Short values stay under the
+threshold and are compared against reading an uncompressed column.
+
+Usage:
+    python benchmarks/bench_compression.py [--values 200] [--threshold 1024]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from app.core import compression  # noqa: E402
+from app.core.compression import CompressedText, CompressedJSON, ZLIB, ZSTD  # noqa: E402
+
+COMPANIES = ["Acme", "Globex", "Initech", "Hooli", "Umbrella", "Stark", "Wayne", "Wonka"]
+ROLES = ["Backend Engineer", "Data Scientist", "Frontend Developer", "DevOps Engineer", "Product Manager"]
+PARAGRAPHS = [
+    "Thank you for your interest in the {role} position at {company}. Our team has reviewed your profile.",
+    "We would like to invite you to a technical interview with the hiring manager next week.",
+    "Please find below a summary of the role, the interview process and the benefits we offer.",
+    "Compensation includes a competitive base salary, equity and an annual performance bonus.",
+    "Kubernetes, Terraform and AWS experience is a strong plus for this role.",
+]
+
+
+def recruiter_html(rng: random.Random, size: int) -> str:
+    company, role = rng.choice(COMPANIES), rng.choice(ROLES)
+    parts = ['<html><head><style>td{font-family:Arial;color:#333}</style></head><body><table width="600">']
+    while sum(map(len, parts)) < size:
+        text = rng.choice(PARAGRAPHS).format(role=role, company=company)
+        parts.append(
+            f'<tr><td style="padding:12px 24px;line-height:1.5" data-id="{rng.getrandbits(48):x}">'
+            f'{text}</td></tr>'
+        )
+    parts.append("</table></body></html>")
+    return "".join(parts)
+
+
+def job_payload(rng: random.Random, size: int) -> dict:
+    html = recruiter_html(rng, size)
+    return {"title": rng.choice(ROLES), "company": rng.choice(COMPANIES), "page_html": html,
+            "apply_url": f"https://jobs.example/{rng.getrandbits(32):x}", "scraped_at": "2024-05-01T10:00:00"}
+
+
+def timed(fn, values, repeat=3):
+    """Median per-value milliseconds over `repeat` passes"""
+    passes = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for value in values:
+            fn(value)
+        passes.append((time.perf_counter() - start) * 1000 / len(values))
+    return statistics.median(passes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--values", type=int, default=200)
+    parser.add_argument("--threshold", type=int, default=1024)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    datasets = {
+        "email html": (CompressedText, [recruiter_html(rng, rng.randint(50_000, 200_000)) for _ in range(args.values)]),
+        "job raw_data": (CompressedJSON, [job_payload(rng, rng.randint(20_000, 120_000)) for _ in range(args.values)]),
+        "short reply": (CompressedText, ["Thanks, Tuesday at 3pm works for me."] * args.values),
+    }
+    codecs = [("zlib", ZLIB)] + ([("zstd", ZSTD)] if compression.ZSTD_AVAILABLE else [])
+    if not compression.ZSTD_AVAILABLE:
+        print("zstandard not installed; reporting zlib only\n")
+
+    print(f"{'data':<14} {'codec':<6} {'raw KB':>10} {'stored KB':>10} {'ratio':>6} {'write ms':>9} {'read ms':>8}")
+    for name, (column_type, values) in datasets.items():
+        column = column_type(threshold=args.threshold)
+        raw_sizes = [len(column.serialize(value).encode()) for value in values]
+        # Baseline: what an uncompressed column costs to read back
+        plain = [column.serialize(value).encode() for value in values]
+        plain_read = timed(lambda blob: column.deserialize(blob.decode()), plain)
+        print(f"{name:<14} {'none':<6} {sum(raw_sizes) / 1024:10.0f} {sum(raw_sizes) / 1024:10.0f} "
+              f"{1:6.0%} {'':>9} {plain_read:8.3f}")
+        for codec_name, codec in codecs:
+            compression.default_codec = lambda codec=codec: codec
+            stored = [column.process_bind_param(value, None) for value in values]
+            write = timed(lambda value: column.process_bind_param(value, None), values)
+            read = timed(lambda blob: column.process_result_value(blob, None), stored)
+            stored_size = sum(map(len, stored))
+            print(f"{'':<14} {codec_name:<6} {'':>10} {stored_size / 1024:10.0f} "
+                  f"{stored_size / sum(raw_sizes):6.0%} {write:9.3f} {read:8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark - Linking a mailbox to applications with per-user indexes
+
+Builds a user with many applications (default 2000 across 500 companies)
+and a mailbox of recruiter, ATS and unrelated emails (default 100k), then
+times index construction and matching, next to a naive scan that checks
+every application for every email on a sample of the mailbox.
+
+Usage:
+    python benchmarks/bench_email_linker.py [--applications 2000] [--emails 100000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from app.services.email_linker import (  # noqa: E402
+    LinkCandidate, UserLinkIndex, address_parts, normalize_company,
+)
+
+ROLES = ["Backend Engineer", "Data Scientist", "Frontend Developer", "DevOps Engineer", "Product Manager"]
+SUBJECTS = ["Your application for {role}", "Interview invitation: {role} at {company}", "Next steps",
+            "Thank you for applying to {company}", "Update on your {role} application"]
+
+
+def make_applications(count: int, companies: int, rng: random.Random):
+    names = [f"Company{i} Labs" for i in range(companies)]
+    start = datetime(2024, 1, 1)
+    apps = []
+    for i in range(1, count + 1):
+        company = rng.choice(names)
+        slug = company.split()[0].lower()
+        apps.append({
+            "id": i, "job_id": 10_000 + i, "company": company, "title": rng.choice(ROLES),
+            "url": f"https://careers.{slug}.com/jobs/{i}",
+            "confirmation_email": "no-reply@greenhouse.io" if i % 3 == 0 else None,
+            "submitted_at": start + timedelta(hours=i),
+        })
+    return apps
+
+
+def make_emails(count: int, apps, rng: random.Random):
+    for i in range(count):
+        app = rng.choice(apps)
+        slug = app["company"].split()[0].lower()
+        kind = rng.random()
+        if kind < 0.4:
+            sender = f"recruiter{i % 50}@{slug}.com"
+        elif kind < 0.6:
+            sender = f"{slug}@hire.lever.co"
+        elif kind < 0.7:
+            sender = "no-reply@greenhouse.io"
+        else:
+            sender = f"news{i % 100}@newsletter{i % 37}.example"
+        subject = rng.choice(SUBJECTS).format(role=app["title"], company=app["company"])
+        yield sender, subject
+
+
+def naive_match(apps, sender, subject):
+    """What linking looks like without indexes: every application, every email"""
+    _, host, domain = address_parts(sender)
+    subject_text = f" {normalize_company(subject)} "
+    best = None
+    for app in apps:
+        slug = app["company"].split()[0].lower()
+        if (app["confirmation_email"] == sender or domain == f"{slug}.com" or slug in host
+                or f" {normalize_company(app['company'])} " in subject_text):
+            if best is None or app["submitted_at"] > best["submitted_at"]:
+                best = app
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applications", type=int, default=2000)
+    parser.add_argument("--companies", type=int, default=500)
+    parser.add_argument("--emails", type=int, default=100_000)
+    parser.add_argument("--naive-sample", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    apps = make_applications(args.applications, args.companies, rng)
+    emails = list(make_emails(args.emails, apps, rng))
+
+    t0 = time.perf_counter()
+    index = UserLinkIndex()
+    for app in apps:
+        candidate = LinkCandidate(app["id"], app["job_id"], normalize_company(app["title"]), app["submitted_at"])
+        index.add(candidate, app["company"], [app["url"]], app["confirmation_email"])
+    build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    linked = sum(1 for sender, subject in emails if index.match(sender, subject) is not None)
+    indexed = time.perf_counter() - t0
+
+    sample = emails[:args.naive_sample]
+    t0 = time.perf_counter()
+    for sender, subject in sample:
+        naive_match(apps, sender, subject)
+    naive = (time.perf_counter() - t0) / len(sample) * len(emails)
+
+    print(f"{len(apps)} applications, {len(emails)} emails")
+    print(f"index build      {build * 1000:8.1f} ms")
+    print(f"indexed matching {indexed:8.2f} s  ({indexed / len(emails) * 1e6:.1f} us/email, {linked} linked)")
+    print(f"naive scan       {naive:8.2f} s  (extrapolated from {len(sample)} emails)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark - Inbox search latency over a synthetic mailbox
+
+Builds a mailbox of recruiter-style emails (default 100k) in the
+in-memory index and times term, phrase, prefix, exclusion and filtered
+queries, including snippet generation for the returned page. The same
+queries are printed as to_tsquery text so they can be replayed against a
+Postgres database with the GIN index via EXPLAIN ANALYZE.
+
+Usage:
+    python benchmarks/bench_email_search.py [--emails 100000] [--repeat 20] [--limit 20]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from app.services.email_search import (  # noqa: E402
+    InMemoryEmailIndex, make_snippet, parse_query, plain_text, to_tsquery_text,
+)
+
+COMPANIES = ["Acme", "Globex", "Initech", "Hooli", "Umbrella", "Stark", "Wayne", "Wonka", "Tyrell", "Cyberdyne"]
+ROLES = ["Backend Engineer", "Data Scientist", "Frontend Developer", "DevOps Engineer", "Product Manager",
+         "ML Engineer", "Site Reliability Engineer", "Mobile Developer"]
+SUBJECTS = ["Interview invitation: {role}", "Your application for {role}", "Re: {role} at {company}",
+            "Offer letter - {role}", "Update on your {role} application", "Weekly jobs digest"]
+SENTENCES = [
+    "Thank you for your interest in the {role} position at {company}.",
+    "We would like to schedule a technical interview next week.",
+    "The team reviewed your resume and was impressed by your Python and PostgreSQL experience.",
+    "Unfortunately we have decided to move forward with other candidates.",
+    "Please share your availability for a thirty minute call with the hiring manager.",
+    "Attached is the offer letter with compensation details and the start date.",
+    "Here are this week's top openings matching your saved search.",
+    "Kubernetes, Terraform and AWS experience is a strong plus for this role.",
+    "Unsubscribe at any time from these notifications.",
+]
+CATEGORIES = ["job_application", "interview_scheduling", "rejection", "offer_negotiation", "other"]
+QUERIES = [
+    ("term", "interview", {}),
+    ("two terms", "python postgresql", {}),
+    ("phrase", '"backend engineer"', {}),
+    ("prefix", "kube*", {}),
+    ("exclusion", "engineer -unsubscribe", {}),
+    ("category filter", "offer", {"category": "offer_negotiation"}),
+    ("job filter", "interview", {"job_id": 42}),
+    ("rare phrase", '"site reliability engineer" terraform', {}),
+]
+
+
+def make_mailbox(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    for i in range(1, count + 1):
+        company, role = rng.choice(COMPANIES), rng.choice(ROLES)
+        body = " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(3, 8))).format(role=role, company=company)
+        yield SimpleNamespace(
+            id=i, user_id=1, email_type="received", category=rng.choice(CATEGORIES),
+            job_id=rng.randint(1, 500), subject=rng.choice(SUBJECTS).format(role=role, company=company),
+            body_text=body, body_html=None, from_address=f"talent@{company.lower()}.example",
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emails", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    index = InMemoryEmailIndex()
+    emails = {}
+    start = time.perf_counter()
+    for email in make_mailbox(args.emails):
+        index.add(email)
+        emails[email.id] = email
+    print(f"indexed {len(index)} emails in {time.perf_counter() - start:.1f}s\n")
+
+    print(f"{'query':<18} {'hits':>6} {'p50 ms':>8} {'p95 ms':>8}  tsquery")
+    for name, q, filters in QUERIES:
+        parsed = parse_query(q)
+        times = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            hits = index.search(1, parsed, filters, limit=args.limit)
+            for email_id, _ in hits:
+                email = emails[email_id]
+                make_snippet(plain_text(email.body_text, email.body_html), parsed)
+            times.append((time.perf_counter() - t0) * 1000)
+        times.sort()
+        p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+        print(f"{name:<18} {len(hits):6d} {statistics.median(times):8.2f} {p95:8.2f}  {to_tsquery_text(parsed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark - Per-sender parse throughput on saved job-alert emails
+
+Loads the sample alerts in tests/fixtures/job_alerts and times each
+sender's compiled parser (HTML parse, listing links, field split) and the
+full extraction path with enrichment and fingerprints. Next to it, the
+same listings pulled out with BeautifulSoup selectors on a fresh parse,
+the way the scrapers read search pages.
+
+Usage:
+    python benchmarks/bench_job_alerts.py [--repeat 200]
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND, "src"))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from app.services.imap_sync import body_fields, header_row  # noqa: E402
+from app.services.job_alert_extractor import job_alert_extractor  # noqa: E402
+
+FIXTURES = os.path.join(BACKEND, "tests", "fixtures", "job_alerts")
+
+
+def load_samples():
+    samples = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.eml"))):
+        with open(path, "rb") as f:
+            raw = f.read()
+        headers = header_row(1, {"uid": 1, "internaldate": None, "literal": raw}, "<sample>")
+        body = body_fields(raw)
+        samples.append((os.path.basename(path), headers, body))
+    return samples
+
+
+def soup_listings(body_html: str, needle: str):
+    """Baseline: BeautifulSoup selectors over a fresh parse"""
+    soup = BeautifulSoup(body_html, "lxml")
+    listings = {}
+    for anchor in soup.select(f'a[href*="{needle}"]'):
+        title = anchor.get_text(" ", strip=True)
+        if title and anchor["href"] not in listings:
+            listings[anchor["href"]] = [title] + [s.get_text(" ", strip=True) for s in anchor.find_next_siblings()]
+    return listings
+
+
+def timed(fn, repeat):
+    """Median milliseconds per call over `repeat` calls"""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - start) * 1000)
+    return statistics.median(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    needles = {"linkedin": "/jobs/view/", "naukri": "job-listings-"}
+    print(f"{'sample':<30} {'parser':<9} {'KB':>5} {'jobs':>5} {'parse ms':>9} {'extract ms':>11} "
+          f"{'soup ms':>8} {'jobs/s':>8}")
+    for name, headers, body in load_samples():
+        html = body["body_html"]
+        alert = job_alert_extractor.parser_for(headers["from_address"], headers["subject"], body["body_text"], html)
+        if alert is None:
+            print(f"{name:<30} not an alert")
+            continue
+        jobs = alert.parse(html)
+        parse = timed(lambda: alert.parse(html), args.repeat)
+        extract = timed(lambda: job_alert_extractor.extract(
+            1, headers["from_address"], headers["subject"], body["body_text"], html, headers["received_at"]
+        ), args.repeat)
+        soup = timed(lambda: soup_listings(html, needles[alert.name]), args.repeat)
+        print(f"{name:<30} {alert.name:<9} {len(html) / 1024:5.1f} {len(jobs):5d} {parse:9.3f} {extract:11.3f} "
+              f"{soup:8.3f} {len(jobs) / extract * 1000:8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark - Job enrichment throughput
+
+Runs the enrichment pipeline over a synthetic batch of scraped listings,
+sequentially and through enrich_batch in backfill-sized batches, once in a
+thread and once across the warm process pool.
+
+Usage:
+    python benchmarks/bench_job_enrichment.py [--jobs 50000] [--processes 4] [--batch-size 1000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from app.services.job_enrichment import JobEnrichmentPipeline  # noqa: E402
+
+
+LOCATIONS = [
+    "Bengaluru/Bangalore", "Hyderabad, Telangana, India", "Remote", "Pune (Hybrid)",
+    "London, United Kingdom", "New York, NY, USA", "Mumbai, Navi Mumbai", "Dublin, Ireland",
+    "Work from home", "Gurgaon/Gurugram, Delhi NCR",
+]
+EXPERIENCE = ["3-5 Yrs", "0-1 Yrs", "5+ years", "Fresher", "Minimum 2 years", "8 to 12 years", ""]
+SALARY = ["10-15 Lacs PA", "₹6-9 LPA", "$120k - $150k", "Not disclosed", "USD 90,000 - 110,000 per year", ""]
+TITLES = ["Backend Engineer", "Data Scientist", "SRE (Remote)", "Frontend Developer", "ML Engineer"]
+
+
+def make_jobs(n: int, seed: int = 11):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "title": rng.choice(TITLES),
+            "location": rng.choice(LOCATIONS),
+            "experience_required": rng.choice(EXPERIENCE),
+            "salary_text": rng.choice(SALARY),
+            "description": "We build delightful products. " * rng.randint(5, 40),
+        }
+        for i in range(n)
+    ]
+
+
+def report(name, elapsed, jobs, results):
+    filled = sum(len(r) for r in results)
+    print(f"{name:<24} {elapsed:7.2f} s  {len(jobs) / elapsed:9.0f} jobs/s  fields filled={filled}")
+
+
+async def run_batches(pipeline, jobs, batch_size):
+    """(seconds for the first batch, seconds for all, results)"""
+    results = []
+    first = None
+    start = time.perf_counter()
+    for i in range(0, len(jobs), batch_size):
+        results += await pipeline.enrich_batch(jobs[i:i + batch_size])
+        if first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=50000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=1000, help="jobs per enrich_batch call, as in the backfill")
+    args = parser.parse_args()
+
+    jobs = make_jobs(args.jobs)
+
+    start = time.perf_counter()
+    results = JobEnrichmentPipeline(processes=0).enrich_many(jobs)
+    report("sequential", time.perf_counter() - start, jobs, results)
+
+    runs = [("thread", 0)]
+    if args.processes > 1:
+        runs.append((f"process pool x{args.processes}", args.processes))
+    for name, processes in runs:
+        pipeline = JobEnrichmentPipeline(processes=processes)
+        try:
+            first, elapsed, results = asyncio.run(run_batches(pipeline, jobs, args.batch_size))
+        finally:
+            pipeline.shutdown()
+        report(name, elapsed, jobs, results)
+        if processes:
+            print(f"{'':<24} first batch {first * 1000:.0f} ms, spawning the pool; later batches reuse it")
+
+
+if __name__ == "__main__":
+    main()
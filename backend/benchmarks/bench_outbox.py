@@ -0,0 +1,104 @@
+"""
+Benchmark - Outbox send throughput by concurrency
+
+Pushes claimed outbox rows through EmailOutbox.send_batch against a local
+aiosmtpd server and reports messages/s per concurrency level, checking
+that every Message-ID arrives exactly once. As in bench_smtp_pool,
+--handshake-ms delays EHLO and --latency-ms delays DATA to stand in for a
+remote provider. The database claim/record round trips are not included.
+
+Usage:
+    python benchmarks/bench_outbox.py [--emails 500] [--batch-size 50] [--concurrency 1,5,10,20] [--latency-ms 20]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from aiosmtpd.controller import Controller  # noqa: E402
+
+from app.models.email import Email, EmailStatus  # noqa: E402
+from app.services.email_outbox import EmailOutbox  # noqa: E402
+from app.services.email_service import EmailService, SMTPConnectionPool  # noqa: E402
+
+
+class Handler:
+    def __init__(self, handshake: float, latency: float):
+        self.handshake = handshake
+        self.latency = latency
+        self.message_ids = Counter()
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        session.host_name = hostname
+        await asyncio.sleep(self.handshake)
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.latency)
+        for line in envelope.content.decode().splitlines():
+            if line.startswith("Message-ID: "):
+                self.message_ids[line.split(": ", 1)[1]] += 1
+        return "250 OK"
+
+
+def make_emails(run: int, count: int):
+    return [
+        Email(
+            id=i, user_id=1, message_id=f"<bench-{run}-{i}@example.com>", from_address="jarvis@example.com",
+            to_addresses=[f"recruiter{i}@example.com"], cc_addresses=[], bcc_addresses=[],
+            subject=f"Application {i}", body_text=f"Hello {i}\n" + "Body line.\n" * 40,
+            status=EmailStatus.SENDING.value, retry_count=0,
+        )
+        for i in range(count)
+    ]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emails", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--concurrency", default="1,5,10,20")
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--handshake-ms", type=float, default=50.0)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    handler = Handler(args.handshake_ms / 1000, args.latency_ms / 1000)
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+
+    try:
+        for run, concurrency in enumerate(int(c) for c in args.concurrency.split(",")):
+            pool = SMTPConnectionPool("127.0.0.1", port, start_tls=False, size=min(args.pool_size, concurrency))
+            outbox = EmailOutbox(service=EmailService(smtp_pool=pool), batch_size=args.batch_size,
+                                 concurrency=concurrency)
+            emails = make_emails(run, args.emails)
+            sent = 0
+            start = time.perf_counter()
+            for offset in range(0, len(emails), args.batch_size):
+                outcomes = await outbox.send_batch(emails[offset:offset + args.batch_size])
+                sent += len(outcomes["sent"])
+            elapsed = time.perf_counter() - start
+            await pool.close()
+            print(f"concurrency {concurrency:<3} {sent / elapsed:8.1f} msg/s  "
+                  f"({pool.stats()['connections_opened']} connections)")
+            assert sent == args.emails
+    finally:
+        controller.stop()
+
+    duplicates = [message_id for message_id, seen in handler.message_ids.items() if seen > 1]
+    print(f"\n{sum(handler.message_ids.values())} messages received, {len(duplicates)} duplicated")
+    assert not duplicates
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+"""
+Benchmark - Standard vs compact resume PDFs as email attachments
+
+Renders the bench_resume_builder corpus (every shape and theme) both ways
+and reports PDF size, the base64 MIME part actually sent over SMTP, and
+render time, plus the weekly volume at a given send rate.
+
+Usage:
+    python benchmarks/bench_pdf_size.py [--repeat 3] [--per-week 5000]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from email.mime.application import MIMEApplication
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from app.services.resume_builder import ResumeBuilder  # noqa: E402
+from bench_resume_builder import SHAPES, THEMES, make_resume  # noqa: E402
+
+
+def mime_size(pdf: bytes) -> int:
+    part = MIMEApplication(pdf, Name="resume.pdf")
+    part["Content-Disposition"] = 'attachment; filename="resume.pdf"'
+    return len(part.as_bytes())
+
+
+def measure(builder: ResumeBuilder, content, theme: str, compact: bool, repeat: int):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pdf = builder.generate_pdf(content, theme, compact=compact)
+        times.append(time.perf_counter() - start)
+    return len(pdf), mime_size(pdf), statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--per-week", type=int, default=5000, help="Application emails sent per week")
+    args = parser.parse_args()
+
+    builder = ResumeBuilder()
+    totals = {False: [0, 0], True: [0, 0]}
+    print(f"{'case':<24} {'standard':>10} {'compact':>10} {'saved':>7} {'mime std':>10} {'mime cmp':>10} "
+          f"{'ms std':>8} {'ms cmp':>8}")
+    for shape, spec in SHAPES.items():
+        content = make_resume(**spec)
+        for theme_name, theme in THEMES.items():
+            results = {compact: measure(builder, content, theme, compact, args.repeat) for compact in (False, True)}
+            for compact, (size, mime, _) in results.items():
+                totals[compact][0] += size
+                totals[compact][1] += mime
+            (std, std_mime, std_t), (cmp, cmp_mime, cmp_t) = results[False], results[True]
+            print(f"{shape + '/' + theme_name:<24} {std:10d} {cmp:10d} {(std - cmp) / std:6.1%} "
+                  f"{std_mime:10d} {cmp_mime:10d} {std_t * 1000:8.2f} {cmp_t * 1000:8.2f}")
+
+    cases = len(SHAPES) * len(THEMES)
+    std_mime, cmp_mime = totals[False][1] / cases, totals[True][1] / cases
+    print(f"\ncorpus PDF bytes   {totals[False][0]:8d} -> {totals[True][0]:8d} "
+          f"({1 - totals[True][0] / totals[False][0]:.1%} smaller)")
+    print(f"avg MIME part      {std_mime:8.0f} -> {cmp_mime:8.0f} bytes")
+    print(f"per week ({args.per_week} sends) {std_mime * args.per_week / 2**20:6.1f} -> "
+          f"{cmp_mime * args.per_week / 2**20:6.1f} MiB over SMTP")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Benchmark - ResumeBuilder rendering and ATS analysis across a resume matrix
+
+Renders synthetic resumes of different shapes (small, large, many roles,
+long bullets) under every template theme colour through generate_pdf,
+generate_docx and analyze_ats_compatibility. Records median time, the
+tracemalloc allocation peak and output size per case, and compares them
+with the stored baseline in bench_resume_builder_baseline.json.
+
+Usage:
+    python benchmarks/bench_resume_builder.py [--repeat 5] [--only pdf] [--shape large]
+    python benchmarks/bench_resume_builder.py --update-baseline
+    python benchmarks/bench_resume_builder.py --check          # exit 1 on regressions
+    python benchmarks/bench_resume_builder.py --profile /tmp/prof --only pdf --shape large
+"""
+
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from app.services.resume_builder import ResumeBuilder  # noqa: E402
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_resume_builder_baseline.json")
+
+# Primary colour of each template in the frontend's TemplateSelector
+THEMES = {"modern": "#3B82F6", "classic": "#1F2937", "creative": "#EC4899", "minimal": "#18181B"}
+
+SENTENCE = "Designed and operated payment services handling millions of requests with Python and PostgreSQL."
+
+
+def make_resume(experiences: int, highlights: int, bullet_words: int, skills: int):
+    bullet = " ".join((SENTENCE.split() * (bullet_words // 14 + 1))[:bullet_words])
+    return {
+        "personalInfo": {
+            "fullName": "Ada Lovelace",
+            "email": "ada@example.com",
+            "phone": "+44 20 7946 0000",
+            "location": "London",
+            "linkedin": "linkedin.com/in/ada",
+            "summary": SENTENCE * 2,
+        },
+        "experiences": [
+            {
+                "position": f"Senior Engineer {i}",
+                "company": f"Company {i}",
+                "startDate": "2018-01",
+                "endDate": "2021-06",
+                "description": bullet,
+                "highlights": [f"{bullet} ({j})" for j in range(highlights)],
+            }
+            for i in range(experiences)
+        ],
+        "education": [
+            {"institution": "University of London", "degree": "BSc", "field": "Mathematics",
+             "startDate": "2010-09", "endDate": "2013-06"},
+        ],
+        "skills": [f"Skill {i}" for i in range(skills)],
+    }
+
+
+SHAPES = {
+    "small": dict(experiences=1, highlights=2, bullet_words=15, skills=5),
+    "large": dict(experiences=5, highlights=5, bullet_words=40, skills=30),
+    "many_roles": dict(experiences=25, highlights=4, bullet_words=20, skills=15),
+    "long_bullets": dict(experiences=4, highlights=3, bullet_words=250, skills=10),
+}
+
+
+def operations(builder: ResumeBuilder):
+    return {
+        "pdf": lambda content, theme: len(builder.generate_pdf(content, theme)),
+        "docx": lambda content, theme: len(builder.generate_docx(content, theme)),
+        "ats": lambda content, theme: len(json.dumps(builder.analyze_ats_compatibility(content))),
+    }
+
+
+def run_case(fn, content, theme, repeat: int, profile_path: str = None):
+    fn(content, theme)  # warm the theme stylesheet and font caches
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = fn(content, theme)
+        times.append(time.perf_counter() - start)
+
+    # Allocation peak from a separate run; tracemalloc skews timings
+    tracemalloc.start()
+    fn(content, theme)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    if profile_path:
+        profiler = cProfile.Profile()
+        profiler.runcall(fn, content, theme)
+        profiler.dump_stats(profile_path)
+
+    return {"ms": round(statistics.median(times) * 1000, 3), "peak_kib": round(peak / 1024, 1), "bytes": size}
+
+
+def print_hotspots(profile_path: str, limit: int = 8) -> None:
+    """Top ReportLab functions by cumulative time, usually flowable wrap/split"""
+    stats = pstats.Stats(profile_path)
+    rows = [
+        (cumtime, f"{os.path.basename(func[0])}:{func[1]} {func[2]}")
+        for func, (_, _, _, cumtime, _) in stats.stats.items()
+        if "reportlab" in func[0] or "docx" in func[0]
+    ]
+    for cumtime, name in sorted(rows, reverse=True)[:limit]:
+        print(f"      {cumtime * 1000:8.1f} ms  {name}")
+
+
+def compare(results, baseline, time_tolerance: float, size_tolerance: float, min_ms: float = 0.5):
+    """Case keys that got slower/bigger than the baseline allows.
+
+    Sub-millisecond cases only count as slower past min_ms, so timer noise
+    on the ATS checks doesn't fail a run.
+    """
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        if result["ms"] > max(base["ms"] * (1 + time_tolerance), base["ms"] + min_ms):
+            regressions.append(f"{key}: {base['ms']} -> {result['ms']} ms")
+        if result["bytes"] > base["bytes"] * (1 + size_tolerance):
+            regressions.append(f"{key}: {base['bytes']} -> {result['bytes']} bytes")
+        if result["peak_kib"] > base["peak_kib"] * (1 + size_tolerance):
+            regressions.append(f"{key}: {base['peak_kib']} -> {result['peak_kib']} KiB peak")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", choices=["pdf", "docx", "ats"], action="append")
+    parser.add_argument("--shape", choices=sorted(SHAPES), action="append")
+    parser.add_argument("--theme", choices=sorted(THEMES), action="append")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="Write these results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero if any case regressed")
+    parser.add_argument("--time-tolerance", type=float, default=0.25)
+    parser.add_argument("--size-tolerance", type=float, default=0.10)
+    parser.add_argument("--profile", metavar="DIR", help="Dump a cProfile .prof per case into DIR")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f).get("cases", {})
+    if args.profile:
+        os.makedirs(args.profile, exist_ok=True)
+
+    ops = operations(ResumeBuilder())
+    results = {}
+    print(f"{'case':<32} {'median':>10} {'peak':>12} {'output':>10}  vs baseline")
+    for shape in args.shape or SHAPES:
+        content = make_resume(**SHAPES[shape])
+        for theme_name in args.theme or THEMES:
+            for op in args.only or ops:
+                key = f"{op}/{shape}/{theme_name}"
+                profile_path = os.path.join(args.profile, key.replace("/", "-") + ".prof") if args.profile else None
+                result = run_case(ops[op], content, THEMES[theme_name], args.repeat, profile_path)
+                results[key] = result
+
+                base = baseline.get(key)
+                delta = f"{(result['ms'] / base['ms'] - 1) * 100:+6.1f}% time" if base and base["ms"] else "      (new)"
+                print(f"{key:<32} {result['ms']:8.2f}ms {result['peak_kib']:9.1f}KiB "
+                      f"{result['bytes'] / 1024:8.1f}KiB  {delta}")
+                if profile_path:
+                    print_hotspots(profile_path)
+
+    if args.update_baseline:
+        merged = {**baseline, **results}
+        with open(args.baseline, "w") as f:
+            json.dump({"python": sys.version.split()[0], "repeat": args.repeat, "cases": merged}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nbaseline updated: {args.baseline} ({len(results)} cases)")
+        return
+
+    regressions = compare(results, baseline, args.time_tolerance, args.size_tolerance)
+    if regressions:
+        print("\nregressions:")
+        for line in regressions:
+            print(f"  {line}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
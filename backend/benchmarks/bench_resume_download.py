@@ -0,0 +1,138 @@
+"""
+Benchmark - Memory per resume download
+
+Serves N concurrent downloads through the ASGI response objects and
+records the tracemalloc peak for each path:
+
+  render + BytesIO   the old handler: render, read() into bytes, wrap in a
+                     second BytesIO for StreamingResponse
+  cached + BytesIO   cached bytes still copied into a BytesIO
+  cached file        cached_file_response streaming from the blob file
+
+The cached file is padded (--pad-kb) so copies of the body stand out from
+per-request overhead; the render path is unpadded and shown for scale.
+
+Usage:
+    python benchmarks/bench_resume_download.py [--downloads 20] [--words 150] [--pad-kb 512]
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from fastapi import Request  # noqa: E402
+from starlette.responses import StreamingResponse  # noqa: E402
+
+from app.core.file_responses import cached_file_response  # noqa: E402
+from app.services.render_cache import RenderCache, render_cache_key  # noqa: E402
+from app.services.render_pool import RenderPool  # noqa: E402
+from app.services.resume_builder import resume_builder  # noqa: E402
+
+
+THEME = "#3B82F6"
+
+
+def make_resume(experiences: int, words: int):
+    return {
+        "personalInfo": {"fullName": "Bench Candidate", "email": "bench@example.com",
+                         "summary": "Engineer who ships. " * 40},
+        "experiences": [
+            {"position": f"Engineer {i}", "company": f"Company {i}", "startDate": "2018-01",
+             "description": "Owned services end to end. " * words,
+             "highlights": ["Did a thing " * 10] * 3}
+            for i in range(experiences)
+        ],
+        "skills": ["Python", "SQL", "Kubernetes"] * 5,
+    }
+
+
+SCOPE = {"type": "http", "method": "GET", "path": "/download", "headers": [], "query_string": b""}
+
+
+async def _receive():
+    # Never disconnects; the response's disconnect listener is cancelled when done
+    await asyncio.Event().wait()
+
+
+async def serve(response) -> int:
+    sent = 0
+
+    async def send(message):
+        nonlocal sent
+        sent += len(message.get("body", b""))
+
+    await response(SCOPE, _receive, send)
+    return sent
+
+
+async def legacy(content, _path, _key):
+    file_bytes = resume_builder.generate_pdf(content, THEME)
+    return StreamingResponse(io.BytesIO(file_bytes), media_type="application/pdf")
+
+
+async def cached_bytes(_content, path, _key):
+    with open(path, "rb") as f:
+        file_bytes = f.read()
+    return StreamingResponse(io.BytesIO(file_bytes), media_type="application/pdf")
+
+
+async def cached_file(_content, path, key):
+    return cached_file_response(Request(SCOPE), path, "application/pdf", "resume.pdf", key)
+
+
+async def measure(name, make_response, content, path, key, downloads):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+
+    async def download():
+        return await serve(await make_response(content, path, key))
+
+    sizes = await asyncio.gather(*(download() for _ in range(downloads)))
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    print(
+        f"{name:<18} peak={peak / 1024:9.1f} KiB  per download={peak / downloads / 1024:7.1f} KiB  "
+        f"file={sizes[0] / 1024:6.1f} KiB  {downloads / elapsed:7.1f} downloads/s"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--downloads", type=int, default=20)
+    parser.add_argument("--experiences", type=int, default=5)
+    parser.add_argument("--words", type=int, default=150, help="Description repeats per role")
+    parser.add_argument("--pad-kb", type=int, default=512,
+                        help="Pad the cached file to stand in for larger artifacts (fonts, images)")
+    args = parser.parse_args()
+
+    content = make_resume(args.experiences, args.words)
+    with tempfile.TemporaryDirectory() as blob_dir:
+        cache = RenderCache(blob_dir=blob_dir, pool=RenderPool(processes=0))
+        key = render_cache_key(content, THEME, "pdf")
+        path = cache.blob_path(key, "pdf")
+        await cache.pool.render_to_file(content, "pdf", THEME, path)
+        if args.pad_kb:
+            # Trailing PDF comment lines keep the file a valid PDF
+            with open(path, "ab") as f:
+                f.write((b"%" + b"0" * 1022 + b"\n") * args.pad_kb)
+
+        for name, make_response in [
+            ("render + BytesIO", legacy),
+            ("cached + BytesIO", cached_bytes),
+            ("cached file", cached_file),
+        ]:
+            await measure(name, make_response, content, path, key, args.downloads)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
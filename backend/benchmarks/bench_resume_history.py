@@ -0,0 +1,109 @@
+"""
+Benchmark - Resume version history: full copies vs deltas + snapshots
+
+Replays a realistic edit history (small wording tweaks, added bullets and
+skills, the odd section rewrite) and compares the bytes stored by full
+per-version copies against JSON-patch deltas with periodic snapshots, plus
+the cost of rebuilding an arbitrary version from the delta chain.
+
+Usage:
+    python benchmarks/bench_resume_history.py [--edits 200] [--snapshot-every 10]
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from app.services.resume_history import ResumeHistory, reconstruct  # noqa: E402
+
+
+WORDS = ("built scaled owned migrated designed reduced latency payments pipeline service platform "
+         "customers reliability kafka postgres python team launched improved cost throughput").split()
+
+
+def sentence(rng: random.Random, n: int = 14) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def base_resume(rng: random.Random):
+    return {
+        "personalInfo": {"name": "Ada Lovelace", "email": "ada@example.com", "summary": sentence(rng, 40)},
+        "experiences": [
+            {"company": f"Company {i}", "position": "Engineer", "startDate": "2020-01",
+             "description": sentence(rng, 30), "highlights": [sentence(rng) for _ in range(5)]}
+            for i in range(5)
+        ],
+        "education": [{"institution": "University", "degree": "BSc", "field": "Mathematics"}],
+        "skills": ["Python", "Go", "PostgreSQL", "Kafka", "AWS", "Docker"],
+    }
+
+
+def edit(content, rng: random.Random) -> None:
+    roll = rng.random()
+    exp = rng.choice(content["experiences"])
+    if roll < 0.5:
+        bullets = exp["highlights"]
+        bullets[rng.randrange(len(bullets))] = sentence(rng)
+    elif roll < 0.7:
+        exp["highlights"].append(sentence(rng))
+    elif roll < 0.85:
+        content["skills"].append(rng.choice(WORDS).title())
+    elif roll < 0.95:
+        content["personalInfo"]["summary"] = sentence(rng, 40)
+    else:
+        # Occasional rewrite of a whole section
+        exp["description"] = sentence(rng, 30)
+        exp["highlights"] = [sentence(rng) for _ in range(5)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--edits", type=int, default=200)
+    parser.add_argument("--snapshot-every", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(37)
+    history = ResumeHistory(snapshot_every=args.snapshot_every)
+    versions = [base_resume(rng)]
+    for _ in range(args.edits):
+        content = copy.deepcopy(versions[-1])
+        edit(content, rng)
+        versions.append(content)
+
+    start = time.perf_counter()
+    revisions = [history.build_revision(1, 1, None, versions[0])]
+    for version in range(2, len(versions) + 1):
+        revisions.append(history.build_revision(1, version, versions[version - 2], versions[version - 1]))
+    record_ms = (time.perf_counter() - start) / len(versions) * 1000
+
+    full_bytes = sum(len(json.dumps(v, separators=(",", ":"))) for v in versions)
+    delta_bytes = sum(r.size_bytes for r in revisions)
+    snapshots = sum(r.kind == "snapshot" for r in revisions)
+
+    # Worst case is the version just before the next snapshot
+    timings = []
+    for version in range(1, len(versions) + 1):
+        chain = [r for r in revisions if r.version <= version]
+        base = max(r.version for r in chain if r.kind == "snapshot")
+        chain = [r for r in chain if r.version >= base]
+        start = time.perf_counter()
+        rebuilt = reconstruct(chain, version)
+        timings.append(time.perf_counter() - start)
+        assert rebuilt == versions[version - 1], version
+
+    timings.sort()
+    print(f"versions {len(versions)}  snapshots {snapshots}  (every {args.snapshot_every})")
+    print(f"full copies      {full_bytes / 1024:8.1f} KiB")
+    print(f"deltas+snapshots {delta_bytes / 1024:8.1f} KiB  ({delta_bytes / full_bytes:.1%} of full)")
+    print(f"record           {record_ms:8.3f} ms/version (diff + sizing)")
+    print(f"reconstruct      p50 {timings[len(timings) // 2] * 1000:.3f} ms  max {timings[-1] * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark - Resume rendering under concurrent downloads
+
+Compares rendering inline on the event loop (the old download path) with
+the process-pool RenderPool. Reports renders/sec, p50/p99 download latency
+and the worst event-loop stall seen by a heartbeat task, which is what
+every other request on the worker would have waited.
+
+Usage:
+    python benchmarks/bench_resume_rendering.py [--renders 200] [--concurrency 16] [--processes 4]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from app.services.render_pool import RenderPool, RenderPoolSaturated  # noqa: E402
+from app.services.resume_builder import resume_builder  # noqa: E402
+
+
+THEMES = ["#3B82F6", "#10B981", "#EF4444", "#8B5CF6"]
+
+
+def make_resume(i: int):
+    return {
+        "personalInfo": {
+            "fullName": f"Candidate {i}",
+            "email": f"candidate{i}@example.com",
+            "summary": "Backend engineer focused on data-heavy services. " * 4,
+        },
+        "experiences": [
+            {
+                "position": f"Engineer {j}",
+                "company": f"Company {j}",
+                "startDate": "2019-01",
+                "endDate": "2021-06",
+                "description": "Built and operated services handling millions of requests. " * 2,
+                "highlights": ["Cut p99 latency by 40%", "Led migration to Postgres", "Mentored 4 engineers"],
+            }
+            for j in range(5)
+        ],
+        "education": [{"degree": "BSc", "field": "Computer Science", "institution": "State University"}],
+        "skills": ["Python", "FastAPI", "PostgreSQL", "Redis", "Docker", "Kubernetes", "AWS"],
+    }
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def heartbeat(stop: asyncio.Event, interval: float = 0.01):
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run(render, renders: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    rejected = 0
+
+    async def download(i: int):
+        nonlocal rejected
+        # Latency includes time queued behind other downloads
+        start = time.perf_counter()
+        async with semaphore:
+            try:
+                await render(make_resume(i), "pdf", THEMES[i % len(THEMES)])
+            except RenderPoolSaturated:
+                rejected += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(download(i) for i in range(renders)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    stall = await beat
+    return elapsed, latencies, rejected, stall
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--renders", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    async def inline(content, fmt, theme_color):
+        return resume_builder.generate_pdf(content, theme_color)
+
+    pool = RenderPool(processes=args.processes, max_pending=args.concurrency)
+    pool.start()
+
+    try:
+        for name, render in [("inline (event loop)", inline), (f"pool x{args.processes}", pool.render)]:
+            elapsed, latencies, rejected, stall = await run(render, args.renders, args.concurrency)
+            print(
+                f"{name:<22} {len(latencies) / elapsed:7.1f} renders/s  "
+                f"p50={percentile(latencies, 0.50) * 1000:7.1f} ms  "
+                f"p99={percentile(latencies, 0.99) * 1000:7.1f} ms  "
+                f"loop stall={stall * 1000:7.1f} ms  rejected={rejected}"
+            )
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,150 @@
+"""
+Benchmark - Skill extraction speed and precision
+
+Compares the taxonomy/Aho-Corasick SkillExtractor against the original
+substring-scan implementation on a synthetic, labeled corpus, both for
+detection alone and with required / nice-to-have classification.
+
+Usage:
+    python benchmarks/bench_skill_extraction.py [--docs 5000] [--processes 4] [--taxonomy-size 1000] [--repeat 3]
+
+--taxonomy-size pads both implementations with synthetic skills to show how
+each scales with the size of the skill list.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from app.services.skill_extraction import SkillExtractor, SkillTaxonomy, DEFAULT_TAXONOMY  # noqa: E402
+
+
+LEGACY_SKILLS = [
+    "python", "javascript", "typescript", "java", "c++", "c#", "go", "rust",
+    "react", "angular", "vue", "node.js", "django", "flask", "fastapi",
+    "aws", "azure", "gcp", "docker", "kubernetes", "terraform",
+    "sql", "postgresql", "mysql", "mongodb", "redis",
+    "git", "ci/cd", "jenkins", "github actions",
+    "machine learning", "deep learning", "nlp", "computer vision",
+    "agile", "scrum", "jira"
+]
+
+# How postings write skills whose lowercase name is an everyday word
+DISPLAY_NAMES = {"go": "Go"}
+
+# Words that contain skill names as substrings and used to trip the old scan
+DISTRACTORS = [
+    "good communication", "going forward", "a rusty process", "javanese cuisine",
+    "a gitlab-free setup", "sqlite-free", "reactive mindset", "gcpx",
+    "awesome team", "agility", "scrummage", "flaskware",
+]
+
+FILLER = [
+    "We are a fast-growing team building products for millions of users.",
+    "You will collaborate with design and product on ambitious roadmaps.",
+    "Our culture values ownership, curiosity and kindness.",
+    "Competitive salary and flexible working hours.",
+]
+
+
+def legacy_extract(description: str, skills=LEGACY_SKILLS):
+    """Original JobDiscoveryService.extract_skills_from_description"""
+    description_lower = description.lower()
+    required = []
+    nice_to_have = []
+    for skill in skills:
+        if skill in description_lower:
+            if any(phrase in description_lower for phrase in ["nice to have", "preferred", "bonus"]):
+                nice_to_have.append(skill)
+            else:
+                required.append(skill)
+    return {"required": required, "nice_to_have": nice_to_have}
+
+
+def make_corpus(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n):
+        skills = rng.sample(LEGACY_SKILLS, 8)
+        required, nice = skills[:5], skills[5:]
+        lines = [rng.choice(FILLER) for _ in range(3)]
+        lines.append("Requirements:")
+        lines += [f"- Strong experience with {DISPLAY_NAMES.get(s, s)}" for s in required]
+        lines.append(f"- {rng.choice(DISTRACTORS).capitalize()} and {rng.choice(DISTRACTORS)}")
+        if rng.random() < 0.7:
+            lines.append("Nice to have:")
+            lines += [f"- Exposure to {DISPLAY_NAMES.get(s, s)}" for s in nice]
+        else:
+            nice = []
+        lines += [rng.choice(FILLER) for _ in range(3)]
+        corpus.append(("\n".join(lines), set(required), set(nice)))
+    return corpus
+
+
+def score(results, corpus):
+    tp = fp = fn = misclassified = 0
+    for result, (_, required, nice) in zip(results, corpus):
+        expected = required | nice
+        found = set(result["required"]) | set(result["nice_to_have"])
+        tp += len(found & expected)
+        fp += len(found - expected)
+        fn += len(expected - found)
+        misclassified += len(set(result["required"]) & nice) + len(set(result["nice_to_have"]) & required)
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return precision, recall, misclassified
+
+
+def run(name, fn, corpus, repeat=1, classified=True):
+    docs = [doc for doc, _, _ in corpus]
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = fn(docs)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    precision, recall, misclassified = score(results, corpus)
+    print(
+        f"{name:<26} {elapsed * 1000:9.1f} ms  {len(corpus) / elapsed:9.0f} docs/s  "
+        f"precision={precision:.3f} recall={recall:.3f}"
+        + (f" misclassified={misclassified}" if classified else "")
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--processes", type=int, default=0)
+    parser.add_argument("--taxonomy-size", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="report the best of this many passes")
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.docs)
+    padding = [f"synthskill{i:05d}" for i in range(max(0, args.taxonomy_size - len(LEGACY_SKILLS)))]
+    legacy_skills = LEGACY_SKILLS + padding
+    taxonomy = dict(DEFAULT_TAXONOMY)
+    taxonomy.update({skill: [] for skill in padding})
+    extractor = SkillExtractor(SkillTaxonomy(taxonomy))
+    print(f"{args.docs} docs, {len(legacy_skills)} skills")
+
+    run("legacy substring scan", lambda docs: [legacy_extract(d, legacy_skills) for d in docs], corpus, args.repeat)
+    # Detection alone, without sorting skills into required / nice-to-have
+    run(
+        "skill extractor (detect)",
+        lambda docs: [{"required": extractor.find_skills(d), "nice_to_have": []} for d in docs],
+        corpus, args.repeat, classified=False,
+    )
+    run("skill extractor", lambda docs: extractor.extract_batch(docs), corpus, args.repeat)
+    if args.processes > 1:
+        run(
+            f"skill extractor x{args.processes}",
+            lambda docs: extractor.extract_batch(docs, processes=args.processes),
+            corpus,
+        )
+
+
+if __name__ == "__main__":
+    main()
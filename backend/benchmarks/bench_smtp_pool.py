@@ -0,0 +1,102 @@
+"""
+Benchmark - Per-message SMTP connections vs the pooled SMTPConnectionPool
+
+Sends messages to a local aiosmtpd server the old way (aiosmtplib.send,
+one connection + EHLO per message) and through the pool. Locally there is
+no TLS or AUTH, so --handshake-ms delays EHLO to stand in for the
+STARTTLS/AUTH round trips a real provider costs on every new connection.
+
+Usage:
+    python benchmarks/bench_smtp_pool.py [--messages 500] [--concurrency 10] [--pool-size 3] [--handshake-ms 50]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import time
+from email.mime.text import MIMEText
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import aiosmtplib  # noqa: E402
+from aiosmtpd.controller import Controller  # noqa: E402
+
+from app.services.email_service import SMTPConnectionPool  # noqa: E402
+
+
+class Handler:
+    def __init__(self, handshake: float):
+        self.handshake = handshake
+        self.received = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        session.host_name = hostname
+        await asyncio.sleep(self.handshake)
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def make_message(i: int) -> MIMEText:
+    message = MIMEText(f"Hello {i}\n" + "Body line.\n" * 40)
+    message["From"] = "jarvis@example.com"
+    message["To"] = f"recruiter{i}@example.com"
+    message["Subject"] = f"Application {i}"
+    return message
+
+
+async def run(send, messages: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            await send(make_message(i))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(messages)))
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--pool-size", type=int, default=3)
+    parser.add_argument("--max-messages", type=int, default=100)
+    parser.add_argument("--handshake-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    handler = Handler(args.handshake_ms / 1000)
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    local_hostname = socket.getfqdn()
+
+    try:
+        async def per_message(message):
+            await aiosmtplib.send(message, hostname="127.0.0.1", port=port, start_tls=False,
+                                  local_hostname=local_hostname)
+
+        elapsed = await run(per_message, args.messages, args.concurrency)
+        print(f"connection per message  {args.messages / elapsed:8.1f} msg/s  ({args.messages} connections)")
+
+        pool = SMTPConnectionPool("127.0.0.1", port, start_tls=False, size=args.pool_size,
+                                  max_messages=args.max_messages)
+        elapsed = await run(pool.send, args.messages, args.concurrency)
+        await pool.close()
+        print(f"pool of {args.pool_size:<2}              {args.messages / elapsed:8.1f} msg/s  "
+              f"({pool.stats()['connections_opened']} connections)")
+    finally:
+        controller.stop()
+
+    assert handler.received == 2 * args.messages
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
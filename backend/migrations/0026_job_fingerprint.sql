@@ -0,0 +1,5 @@
+-- Dedup key for the bulk job upsert: normalized source URL or a
+-- title/company/location hash. Rows stored before it stay NULL and are
+-- never matched by ON CONFLICT.
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS fingerprint VARCHAR(40);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_jobs_fingerprint ON jobs (fingerprint);
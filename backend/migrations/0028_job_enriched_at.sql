@@ -0,0 +1,4 @@
+-- When the enrichment pipeline last ran on a job; NULL rows are what the
+-- backfill reads, so every existing job is enriched once more
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS enriched_at TIMESTAMP WITHOUT TIME ZONE;
+CREATE INDEX IF NOT EXISTS ix_jobs_enriched_at ON jobs (enriched_at);
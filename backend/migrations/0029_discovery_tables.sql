@@ -0,0 +1,56 @@
+-- Saved searches, per-source high-water marks and the coalesced run history
+CREATE TABLE IF NOT EXISTS discovery_runs (
+    id SERIAL PRIMARY KEY,
+    query_key VARCHAR(40) NOT NULL,
+    keywords JSON,
+    countries JSON,
+    sources JSON,
+    saved_search_ids JSON,
+    user_ids JSON,
+    trigger VARCHAR(20),
+    jobs_found INTEGER,
+    jobs_new INTEGER,
+    jobs_updated INTEGER,
+    jobs_duplicate INTEGER,
+    jobs_skipped INTEGER,
+    status VARCHAR(20),
+    error_message TEXT,
+    started_at TIMESTAMP WITHOUT TIME ZONE,
+    finished_at TIMESTAMP WITHOUT TIME ZONE,
+    duration_ms INTEGER
+);
+CREATE INDEX IF NOT EXISTS ix_discovery_runs_id ON discovery_runs (id);
+CREATE INDEX IF NOT EXISTS ix_discovery_runs_query_key ON discovery_runs (query_key);
+CREATE INDEX IF NOT EXISTS ix_discovery_runs_started_at ON discovery_runs (started_at);
+
+CREATE TABLE IF NOT EXISTS saved_searches (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    name VARCHAR(255) NOT NULL,
+    keywords JSON,
+    countries JSON,
+    sources JSON,
+    query_key VARCHAR(40) NOT NULL,
+    interval_minutes INTEGER,
+    is_active BOOLEAN,
+    last_run_at TIMESTAMP WITHOUT TIME ZONE,
+    next_run_at TIMESTAMP WITHOUT TIME ZONE,
+    last_run_id INTEGER REFERENCES discovery_runs (id) ON DELETE SET NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE,
+    updated_at TIMESTAMP WITHOUT TIME ZONE
+);
+CREATE INDEX IF NOT EXISTS ix_saved_searches_id ON saved_searches (id);
+CREATE INDEX IF NOT EXISTS ix_saved_searches_user_id ON saved_searches (user_id);
+CREATE INDEX IF NOT EXISTS ix_saved_searches_query_key ON saved_searches (query_key);
+CREATE INDEX IF NOT EXISTS ix_saved_searches_next_run_at ON saved_searches (next_run_at);
+
+CREATE TABLE IF NOT EXISTS source_cursors (
+    id SERIAL PRIMARY KEY,
+    source VARCHAR(50) NOT NULL,
+    query_key VARCHAR(40) NOT NULL,
+    last_posted_date TIMESTAMP WITHOUT TIME ZONE,
+    last_external_id VARCHAR(100),
+    updated_at TIMESTAMP WITHOUT TIME ZONE,
+    CONSTRAINT uq_source_cursor UNIQUE (source, query_key)
+);
+CREATE INDEX IF NOT EXISTS ix_source_cursors_id ON source_cursors (id);
@@ -0,0 +1,2 @@
+-- Content hash of what resumes.pdf_content holds; NULL means render again
+ALTER TABLE resumes ADD COLUMN IF NOT EXISTS pdf_cache_key VARCHAR(64);
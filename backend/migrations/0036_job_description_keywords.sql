@@ -0,0 +1,3 @@
+-- Salient description terms for ATS/compatibility scoring; the enrichment
+-- backfill fills rows that are still NULL
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS description_keywords JSON;
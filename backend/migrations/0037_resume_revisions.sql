@@ -0,0 +1,15 @@
+-- Resume version history: periodic snapshots plus JSON-patch deltas.
+-- Resumes that predate it get their base snapshot on their next edit.
+CREATE TABLE IF NOT EXISTS resume_revisions (
+    id SERIAL PRIMARY KEY,
+    resume_id INTEGER NOT NULL REFERENCES resumes (id) ON DELETE CASCADE,
+    version INTEGER NOT NULL,
+    kind VARCHAR(10) NOT NULL,
+    content JSON,
+    patch JSON,
+    size_bytes INTEGER,
+    created_at TIMESTAMP WITHOUT TIME ZONE,
+    CONSTRAINT uq_resume_revision UNIQUE (resume_id, version)
+);
+CREATE INDEX IF NOT EXISTS ix_resume_revisions_id ON resume_revisions (id);
+CREATE INDEX IF NOT EXISTS ix_resume_revisions_resume_id ON resume_revisions (resume_id);
@@ -0,0 +1,3 @@
+-- Outbox lease and the claim index (due QUEUED rows, expired SENDING leases)
+ALTER TABLE emails ADD COLUMN IF NOT EXISTS locked_at TIMESTAMP WITHOUT TIME ZONE;
+CREATE INDEX IF NOT EXISTS ix_emails_status_scheduled_at ON emails (status, scheduled_at);
@@ -0,0 +1,16 @@
+-- IMAP UID of synced messages (bodies are fetched lazily by UID) and the
+-- per-mailbox high-water marks for incremental sync
+ALTER TABLE emails ADD COLUMN IF NOT EXISTS imap_uid BIGINT;
+
+CREATE TABLE IF NOT EXISTS mailbox_states (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    mailbox VARCHAR(255) NOT NULL,
+    uidvalidity BIGINT,
+    last_uid BIGINT,
+    message_count INTEGER,
+    synced_at TIMESTAMP WITHOUT TIME ZONE,
+    updated_at TIMESTAMP WITHOUT TIME ZONE,
+    CONSTRAINT uq_mailbox_state UNIQUE (user_id, mailbox)
+);
+CREATE INDEX IF NOT EXISTS ix_mailbox_states_id ON mailbox_states (id);
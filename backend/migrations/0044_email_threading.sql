@@ -0,0 +1,5 @@
+-- Threading headers (In-Reply-To, References oldest first) and the index
+-- that reads a whole thread in one range scan
+ALTER TABLE emails ADD COLUMN IF NOT EXISTS in_reply_to VARCHAR(255);
+ALTER TABLE emails ADD COLUMN IF NOT EXISTS message_references JSON;
+CREATE INDEX IF NOT EXISTS ix_emails_user_thread ON emails (user_id, thread_id);
@@ -0,0 +1,5 @@
+-- Full-text search over subject, body and sender. Existing rows stay NULL
+-- until EmailSearch.reindex_missing backfills them (on startup or
+-- POST /api/emails/reindex).
+ALTER TABLE emails ADD COLUMN IF NOT EXISTS search_vector TSVECTOR;
+CREATE INDEX IF NOT EXISTS ix_emails_search_vector ON emails USING gin (search_vector);
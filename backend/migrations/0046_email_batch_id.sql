@@ -0,0 +1,3 @@
+-- Mail-merge bulk send each queued email belongs to
+ALTER TABLE emails ADD COLUMN IF NOT EXISTS batch_id VARCHAR(36);
+CREATE INDEX IF NOT EXISTS ix_emails_batch_id ON emails (batch_id);
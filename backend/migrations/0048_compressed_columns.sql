@@ -0,0 +1,22 @@
+-- Email bodies and raw job payloads become bytea behind a one-byte
+-- format header (app.core.compression). Existing values get the raw header
+-- (0x00); column_compression compresses them later without locking.
+-- Rewrites each table under an exclusive lock: run in a quiet window.
+DO $$
+DECLARE
+    target record;
+BEGIN
+    FOR target IN
+        SELECT table_name, column_name
+        FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND (table_name, column_name) IN (('emails', 'body_text'), ('emails', 'body_html'), ('jobs', 'raw_data'))
+          AND data_type <> 'bytea'
+    LOOP
+        EXECUTE format(
+            'ALTER TABLE %I ALTER COLUMN %I TYPE bytea '
+            'USING CASE WHEN %I IS NULL THEN NULL ELSE ''\x00''::bytea || convert_to(%I::text, ''UTF8'') END',
+            target.table_name, target.column_name, target.column_name, target.column_name
+        );
+    END LOOP;
+END $$;
@@ -0,0 +1,76 @@
+"""
+Schema Migrations - Apply pending SQL files in order
+
+Every NNNN_name.sql file next to this script runs once, in its own
+transaction, and is recorded in schema_migrations. Run it against the
+database before deploying code that needs the new schema; the app never
+alters tables on startup. Files are written to be safe on a database
+that already has part of the change (IF NOT EXISTS, type checks), so a
+database created with init_db() can be brought under migrations too.
+
+Usage:
+    python migrations/migrate.py [--dry-run]
+"""
+
+import argparse
+import asyncio
+import glob
+import os
+import sys
+
+MIGRATIONS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(MIGRATIONS), "src"))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.core.database import engine  # noqa: E402
+
+CREATE_LOG = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    name VARCHAR(255) PRIMARY KEY,
+    applied_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
+)
+"""
+
+
+def migration_files():
+    return sorted(glob.glob(os.path.join(MIGRATIONS, "[0-9]*.sql")))
+
+
+async def migrate(dry_run: bool = False) -> list:
+    """Apply every file not yet recorded; returns the names applied"""
+    async with engine.begin() as conn:
+        await conn.execute(text(CREATE_LOG))
+        applied = set((await conn.execute(text("SELECT name FROM schema_migrations"))).scalars())
+
+    done = []
+    for path in migration_files():
+        name = os.path.basename(path)
+        if name in applied:
+            continue
+        print(f"{'Pending' if dry_run else 'Applying'} {name}")
+        if dry_run:
+            continue
+        with open(path, encoding="utf-8") as f:
+            sql = f.read()
+        async with engine.begin() as conn:
+            # Simple-protocol execute: a file may hold several statements and DO blocks
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.execute(sql)
+            await conn.execute(text("INSERT INTO schema_migrations (name) VALUES (:name)"), {"name": name})
+        done.append(name)
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="list pending migrations without applying them")
+    args = parser.parse_args()
+
+    done = asyncio.run(migrate(args.dry_run))
+    if not args.dry_run:
+        print(f"{len(done)} migration(s) applied")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,28 @@ AI Decision Engine - LLM Integration for Job Scoring & Content Generation
 
 import json
 from typing import Dict, List, Any, Optional
+import httpx
 from openai import AsyncOpenAI
 from app.core.config import settings
+from app.core.http_clients import http_clients
 
 
 class AIEngine:
     """AI Decision Engine for intelligent job matching and content generation"""
     
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        self._client: Optional[AsyncOpenAI] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
         self.model = settings.OPENAI_MODEL
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        """OpenAI client on the shared "openai" pool; rebuilt if the pool was reopened"""
+        http_client = http_clients.get("openai")
+        if self._client is None or self._http_client is not http_client:
+            self._client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=http_client)
+            self._http_client = http_client
+        return self._client
     
     async def calculate_job_score(
         self, 
@@ -1,2 +1,2 @@
 """API module exports"""
-from app.api import auth, profiles, jobs, resumes, applications, referrals, emails
+from app.api import auth, profiles, jobs, resumes, applications, referrals, emails, tracking
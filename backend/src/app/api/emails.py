@@ -12,9 +12,21 @@ from app.core.database import get_db
 from app.core.security import get_current_user
 from app.models.user import User
 from app.models.email import Email, EmailType, EmailStatus
+from app.models.resume import Resume
+from app.services.email_outbox import email_outbox
+from app.services.email_linker import email_linker
+from app.services.job_alert_extractor import job_alert_extractor
+from app.services.email_search import email_search, plain_text, search_vector_expr
+from app.services.email_service import attachment_part
+from app.services.imap_sync import imap_sync
+from app.services.mail_merge import bulk_sender
+from app.services.mail_template import MailTemplate, TemplateError, BUILTIN_TEMPLATES
+from app.services.render_cache import render_cache
+from app.services.render_pool import RenderPoolSaturated
 from app.schemas.email import (
     EmailCreate, EmailSend, EmailReply, EmailResponse,
-    EmailThread, EmailStats
+    EmailThread, EmailStats, EmailSearchHit,
+    EmailBulkSend, BulkSendStatus, BulkRecipientResult
 )
 
 
@@ -150,6 +162,222 @@ async def get_sent(
     return [EmailResponse.model_validate(e) for e in emails]
 
 
+@router.get("/search", response_model=List[EmailSearchHit])
+async def search_emails(
+    q: str = Query(..., min_length=1, max_length=200),
+    category: Optional[str] = None,
+    job_id: Optional[int] = None,
+    email_type: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=50),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Full-text search: words, "exact phrases", prefix* and -excluded terms"""
+    hits = await email_search.search(
+        db, current_user.id, q,
+        filters={"category": category, "job_id": job_id, "email_type": email_type},
+        skip=skip, limit=limit,
+    )
+    return [
+        EmailSearchHit(email=EmailResponse.model_validate(email), rank=rank, snippet=snippet)
+        for email, rank, snippet in hits
+    ]
+
+
+def _message_time():
+    return func.coalesce(Email.received_at, Email.sent_at, Email.created_at)
+
+
+def _make_thread(thread_id: str, emails: List[Email]) -> EmailThread:
+    participants = []
+    for email in emails:
+        for address in [email.from_address, *(email.to_addresses or []), *(email.cc_addresses or [])]:
+            if address and address not in participants:
+                participants.append(address)
+    last = emails[-1]
+    return EmailThread(
+        thread_id=thread_id,
+        subject=emails[0].subject,
+        participants=participants,
+        message_count=len(emails),
+        last_message_at=last.received_at or last.sent_at or last.created_at,
+        messages=[EmailResponse.model_validate(e) for e in emails],
+    )
+
+
+@router.get("/threads", response_model=List[EmailThread])
+async def list_threads(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=50),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List conversations, most recently active first"""
+    last_at = func.max(_message_time())
+    result = await db.execute(
+        select(Email.thread_id)
+        .where(Email.user_id == current_user.id, Email.thread_id.isnot(None))
+        .group_by(Email.thread_id)
+        .order_by(last_at.desc())
+        .offset(skip).limit(limit)
+    )
+    thread_ids = result.scalars().all()
+    if not thread_ids:
+        return []
+    
+    # Every message of the page's threads in one query on (user_id, thread_id)
+    result = await db.execute(
+        select(Email)
+        .where(Email.user_id == current_user.id, Email.thread_id.in_(thread_ids))
+        .order_by(_message_time(), Email.id)
+    )
+    by_thread = {}
+    for email in result.scalars().all():
+        by_thread.setdefault(email.thread_id, []).append(email)
+    
+    return [_make_thread(thread_id, by_thread[thread_id]) for thread_id in thread_ids]
+
+
+@router.get("/threads/{thread_id}", response_model=EmailThread)
+async def get_thread(
+    thread_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a whole conversation, oldest message first"""
+    result = await db.execute(
+        select(Email)
+        .where(Email.user_id == current_user.id, Email.thread_id == thread_id)
+        .order_by(_message_time(), Email.id)
+    )
+    emails = result.scalars().all()
+    
+    if not emails:
+        raise HTTPException(status_code=404, detail="Thread not found")
+    
+    return _make_thread(thread_id, emails)
+
+
+def _bulk_status(batch_id: str, rows) -> BulkSendStatus:
+    results = [
+        BulkRecipientResult(
+            email_id=row.id,
+            to_address=(row.to_addresses or [""])[0],
+            status=row.status,
+            error_message=row.error_message,
+            sent_at=row.sent_at,
+        )
+        for row in rows
+    ]
+    sent = sum(1 for r in results if r.status == EmailStatus.SENT.value)
+    failed = sum(1 for r in results if r.status == EmailStatus.FAILED.value)
+    return BulkSendStatus(
+        batch_id=batch_id, total=len(results), sent=sent, failed=failed,
+        pending=len(results) - sent - failed, results=results,
+    )
+
+
+@router.post("/bulk", response_model=BulkSendStatus, status_code=status.HTTP_202_ACCEPTED)
+async def bulk_send(
+    bulk_data: EmailBulkSend,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Mail merge: render a template per recipient and send in the background"""
+    from app.core.config import settings
+    
+    if not bulk_data.recipients:
+        raise HTTPException(status_code=422, detail="No recipients")
+    if len(bulk_data.recipients) > settings.BULK_SEND_MAX_RECIPIENTS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {settings.BULK_SEND_MAX_RECIPIENTS} recipients per bulk send"
+        )
+    
+    category = bulk_data.category
+    is_html = bulk_data.is_html
+    if bulk_data.template:
+        if bulk_data.template not in BUILTIN_TEMPLATES:
+            raise HTTPException(status_code=422, detail=f"Unknown template '{bulk_data.template}'")
+        subject, body = BUILTIN_TEMPLATES[bulk_data.template]
+        is_html = body.html
+        if category == "other":
+            category = bulk_data.template
+    elif bulk_data.subject and bulk_data.body:
+        try:
+            subject = MailTemplate(bulk_data.subject)
+            body = MailTemplate(bulk_data.body, html=is_html)
+        except TemplateError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    else:
+        raise HTTPException(status_code=422, detail="Either template or subject and body are required")
+    
+    # Reject the whole batch up front rather than half-sending it
+    recipients = [r.model_dump() for r in bulk_data.recipients]
+    problems = []
+    for recipient in recipients:
+        variables = {**bulk_data.variables, **recipient["variables"]}
+        missing = sorted(set(subject.missing(variables)) | set(body.missing(variables)))
+        if missing:
+            problems.append({"email": recipient["email"], "missing": missing})
+    if problems:
+        raise HTTPException(status_code=422, detail={"message": "Missing template variables", "recipients": problems})
+    
+    # The shared resume is rendered and encoded once for every message
+    parts, attachments = [], []
+    if bulk_data.resume_id is not None:
+        result = await db.execute(
+            select(Resume)
+            .where(Resume.id == bulk_data.resume_id, Resume.user_id == current_user.id)
+        )
+        resume = result.scalar_one_or_none()
+        if not resume:
+            raise HTTPException(status_code=404, detail="Resume not found")
+        theme_color = getattr(resume, 'theme_color', '#3B82F6') or '#3B82F6'
+        try:
+            pdf = await render_cache.get_or_render_attachment(resume.content, theme_color)
+        except RenderPoolSaturated:
+            raise HTTPException(
+                status_code=503,
+                detail="Renderer busy, please retry",
+                headers={"Retry-After": "2"}
+            )
+        filename = f"{resume.name.replace(' ', '_')}.pdf"
+        parts.append(attachment_part(filename, pdf))
+        attachments.append({"filename": filename, "content_type": "application/pdf", "size": len(pdf)})
+    
+    batch_id = bulk_sender.new_batch_id()
+    merged = bulk_sender.render(subject, body, recipients, bulk_data.variables)
+    await bulk_sender.create_rows(
+        db, current_user.id, batch_id, merged, is_html,
+        category=category, job_id=bulk_data.job_id, attachments=attachments,
+    )
+    await db.commit()
+    
+    background_tasks.add_task(bulk_sender.send, batch_id, merged, is_html, parts)
+    
+    return _bulk_status(batch_id, await bulk_sender.progress(db, current_user.id, batch_id))
+
+
+@router.get("/bulk/{batch_id}", response_model=BulkSendStatus)
+async def get_bulk_send(
+    batch_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Progress and per-recipient results of a bulk send"""
+    if await bulk_sender.expire_stale(db, current_user.id, batch_id):
+        await db.commit()
+    rows = await bulk_sender.progress(db, current_user.id, batch_id)
+    
+    if not rows:
+        raise HTTPException(status_code=404, detail="Bulk send not found")
+    
+    return _bulk_status(batch_id, rows)
+
+
 @router.get("/{email_id}", response_model=EmailResponse)
 async def get_email(
     email_id: int,
@@ -192,12 +420,17 @@ async def send_email(
         job_id=email_data.job_id,
         status=EmailStatus.QUEUED.value,
     )
+    email.search_vector = search_vector_expr(email.subject, plain_text(email.body_text, email.body_html), email.from_address)
     db.add(email)
+    await db.flush()
+    # A new conversation is named after its first email
+    email.thread_id = str(email.id)
     await db.commit()
     await db.refresh(email)
+    email_search.indexed(email)
     
-    # Queue email sending
-    # background_tasks.add_task(email_service.send, email.id)
+    # Queue email sending; the outbox worker picks up QUEUED rows
+    email_outbox.wake()
     
     return EmailResponse.model_validate(email)
 
@@ -223,12 +456,17 @@ async def reply_to_email(
     if not original:
         raise HTTPException(status_code=404, detail="Email not found")
     
-    # Create reply
+    # Create reply; References carries the whole chain so any client can thread it
+    references = list(original.message_references or [])
+    if original.message_id:
+        references.append(original.message_id)
     reply = Email(
         user_id=current_user.id,
         email_type=EmailType.SENT.value,
         thread_id=original.thread_id or str(original.id),
         in_reply_to_id=original.id,
+        in_reply_to=original.message_id,
+        message_references=references,
         from_address=settings.SMTP_USER,
         to_addresses=[original.from_address],
         subject=f"Re: {original.subject}",
@@ -238,6 +476,7 @@ async def reply_to_email(
         job_id=original.job_id,
         status=EmailStatus.QUEUED.value,
     )
+    reply.search_vector = search_vector_expr(reply.subject, plain_text(reply.body_text, reply.body_html), reply.from_address)
     db.add(reply)
     
     # Mark original as replied
@@ -245,9 +484,10 @@ async def reply_to_email(
     
     await db.commit()
     await db.refresh(reply)
+    email_search.indexed(reply)
     
     # Queue sending
-    # background_tasks.add_task(email_service.send, reply.id)
+    email_outbox.wake()
     
     return EmailResponse.model_validate(reply)
 
@@ -259,11 +499,52 @@ async def sync_emails(
     db: AsyncSession = Depends(get_db)
 ):
     """Sync emails from IMAP server"""
-    # background_tasks.add_task(email_service.sync_inbox, current_user.id)
+    if not imap_sync.configured:
+        raise HTTPException(status_code=503, detail="IMAP is not configured")
+    
+    # The mailbox is the server-wide IMAP_USER account; never sync it into someone else's emails
+    if not imap_sync.is_account_of(current_user.email):
+        raise HTTPException(status_code=403, detail="The IMAP mailbox belongs to another account")
+    
+    # Only new headers are fetched; an unchanged mailbox costs one SELECT
+    background_tasks.add_task(imap_sync.sync_user, current_user.id)
     
     return {"message": "Email sync started", "status": "pending"}
 
 
+@router.post("/link")
+async def link_emails(
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user)
+):
+    """Link the whole mailbox to applications and jobs; new mail is linked on sync"""
+    background_tasks.add_task(email_linker.backfill_user, current_user.id)
+    
+    return {"message": "Email linking started", "status": "pending"}
+
+
+@router.post("/extract-jobs")
+async def extract_alert_jobs(
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user)
+):
+    """Extract jobs from every job-alert email; new alerts are extracted on sync"""
+    background_tasks.add_task(job_alert_extractor.backfill_user, current_user.id)
+    
+    return {"message": "Job alert extraction started", "status": "pending"}
+
+
+@router.post("/reindex")
+async def reindex_emails(
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user)
+):
+    """Make emails stored before full-text search existed searchable"""
+    background_tasks.add_task(email_search.run, current_user.id)
+    
+    return {"message": "Email reindex started", "status": "pending"}
+
+
 @router.delete("/{email_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_email(
     email_id: int,
@@ -282,3 +563,4 @@ async def delete_email(
     
     await db.delete(email)
     await db.commit()
+    email_search.removed(email_id)
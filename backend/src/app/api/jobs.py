@@ -5,16 +5,21 @@ Jobs API Routes
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, and_, or_, cast
+from sqlalchemy.dialects.postgresql import JSONB
 
 from app.core.database import get_db
 from app.core.security import get_current_user
 from app.models.user import User
 from app.models.job import Job, JobStatus
+from app.models.discovery import SavedSearch, DiscoveryRun
+from app.services.gazetteer import country_code
 from app.schemas.job import (
     JobCreate, JobUpdate, JobResponse, JobFilter,
-    JobDiscoverRequest, JobDiscoverResponse
+    JobDiscoverRequest, JobDiscoverResponse,
+    SavedSearchCreate, SavedSearchResponse, DiscoveryRunResponse
 )
+from app.services.discovery_scheduler import discovery_scheduler, make_query_key
 
 
 router = APIRouter()
@@ -41,7 +46,12 @@ async def list_jobs(
     if status:
         conditions.append(Job.status == status)
     if country:
-        conditions.append(Job.country.ilike(f"%{country}%"))
+        # Enriched rows store ISO codes; older rows may still hold names
+        code = country_code(country)
+        if code:
+            conditions.append(or_(Job.country == code, Job.country.ilike(f"%{country}%")))
+        else:
+            conditions.append(Job.country.ilike(f"%{country}%"))
     if is_remote is not None:
         conditions.append(Job.is_remote == is_remote)
     if min_score is not None:
@@ -67,6 +77,93 @@ async def list_jobs(
     return [JobResponse.model_validate(job) for job in jobs]
 
 
+@router.get("/searches", response_model=List[SavedSearchResponse])
+async def list_saved_searches(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List the current user's saved searches"""
+    result = await db.execute(
+        select(SavedSearch)
+        .where(SavedSearch.user_id == current_user.id)
+        .order_by(SavedSearch.created_at.desc())
+    )
+    return [SavedSearchResponse.model_validate(s) for s in result.scalars().all()]
+
+
+@router.post("/searches", response_model=SavedSearchResponse, status_code=status.HTTP_201_CREATED)
+async def create_saved_search(
+    search_data: SavedSearchCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Save a search to be crawled on a schedule"""
+    search = SavedSearch(
+        user_id=current_user.id,
+        query_key=make_query_key(search_data.keywords, search_data.countries),
+        **search_data.model_dump(),
+    )
+    db.add(search)
+    await db.commit()
+    await db.refresh(search)
+    
+    return SavedSearchResponse.model_validate(search)
+
+
+@router.delete("/searches/{search_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_saved_search(
+    search_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete a saved search"""
+    result = await db.execute(
+        select(SavedSearch)
+        .where(SavedSearch.id == search_id, SavedSearch.user_id == current_user.id)
+    )
+    search = result.scalar_one_or_none()
+    
+    if not search:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    
+    await db.delete(search)
+    await db.commit()
+
+
+@router.get("/discover/runs", response_model=List[DiscoveryRunResponse])
+async def list_discovery_runs(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Recent discovery runs that served the current user"""
+    result = await db.execute(
+        select(DiscoveryRun)
+        .where(cast(DiscoveryRun.user_ids, JSONB).contains([current_user.id]))
+        .order_by(DiscoveryRun.started_at.desc())
+        .limit(limit)
+    )
+    return [DiscoveryRunResponse.model_validate(r) for r in result.scalars().all()]
+
+
+@router.get("/discover/runs/{run_id}", response_model=DiscoveryRunResponse)
+async def get_discovery_run(
+    run_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Status and counts of one discovery run"""
+    run = await db.get(DiscoveryRun, run_id)
+    
+    if not run or (
+        current_user.id not in (run.user_ids or [])
+        and not discovery_scheduler.serves(run_id, current_user.id)
+    ):
+        raise HTTPException(status_code=404, detail="Discovery run not found")
+    
+    return DiscoveryRunResponse.model_validate(run)
+
+
 @router.get("/{job_id}", response_model=JobResponse)
 async def get_job(
     job_id: int,
@@ -146,17 +243,30 @@ async def discover_jobs(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Trigger job discovery from configured sources"""
-    # This would trigger the job discovery service in the background
-    # For now, return a placeholder response
+    """Start job discovery from configured sources.
     
-    # background_tasks.add_task(job_discovery_service.discover, request, current_user.id)
+    Identical queries already running for other users are joined rather
+    than crawled again, and each source only fetches listings above its
+    stored high-water mark. The crawl runs in the background; poll
+    GET /discover/runs/{run_id} for its counts.
+    """
+    run_id, crawl = await discovery_scheduler.submit_query(
+        keywords=request.keywords,
+        countries=request.countries,
+        sources=request.sources,
+        limit=request.limit,
+        user_ids=[current_user.id],
+        trigger="manual",
+    )
+    if crawl is not None:
+        background_tasks.add_task(crawl)
     
     return JobDiscoverResponse(
         jobs_found=0,
         jobs_new=0,
         jobs_duplicate=0,
-        status="discovery_started"
+        status="pending",
+        run_id=run_id
     )
 
 
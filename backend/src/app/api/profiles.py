@@ -2,12 +2,15 @@
 Profile API Routes
 """
 
+import os
+import tempfile
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.security import get_current_user
 from app.models.user import User
@@ -16,12 +19,21 @@ from app.schemas.profile import (
     ProfileCreate, ProfileUpdate, ProfileResponse,
     SkillCreate, SkillResponse,
     EducationCreate, EducationResponse,
-    ExperienceCreate, ExperienceResponse
+    ExperienceCreate, ExperienceResponse,
+    ResumeImportResponse
 )
+from app.services.resume_import import resume_importer, ResumeImportBusy, ResumeParseError
 
 
 router = APIRouter()
 
+IMPORT_FORMATS = {
+    ".pdf": "pdf",
+    ".docx": "docx",
+    "application/pdf": "pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+}
+
 
 @router.get("/me", response_model=ProfileResponse)
 async def get_my_profile(
@@ -211,3 +223,59 @@ async def delete_experience(
     
     await db.delete(experience)
     await db.commit()
+
+
+# Resume import
+@router.post("/me/import", response_model=ResumeImportResponse, status_code=status.HTTP_201_CREATED)
+async def import_resume(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Fill experience, education and skills from an uploaded PDF/DOCX resume"""
+    fmt = IMPORT_FORMATS.get(os.path.splitext(file.filename or "")[1].lower()) or IMPORT_FORMATS.get(file.content_type)
+    if not fmt:
+        raise HTTPException(status_code=415, detail="Upload a PDF or DOCX resume")
+    
+    result = await db.execute(select(Profile).where(Profile.user_id == current_user.id))
+    profile = result.scalar_one_or_none()
+    
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    # Spool to a real file: the parser runs in another process and only gets the path
+    fd, path = tempfile.mkstemp(suffix=f".{fmt}")
+    try:
+        size = 0
+        with os.fdopen(fd, "wb") as spool:
+            while chunk := await file.read(1024 * 1024):
+                size += len(chunk)
+                if size > settings.RESUME_IMPORT_MAX_BYTES:
+                    raise HTTPException(status_code=413, detail="Resume file too large")
+                spool.write(chunk)
+        
+        parsed = await resume_importer.parse(path, fmt)
+    except ResumeImportBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Importer busy, please retry",
+            headers={"Retry-After": "2"}
+        )
+    except ResumeParseError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    finally:
+        os.unlink(path)
+    
+    # All rows land in one transaction, or none do
+    created = await resume_importer.store(db, profile, parsed)
+    await db.commit()
+    
+    return ResumeImportResponse(
+        pages=parsed["pages"],
+        parse_ms=parsed["parse_ms"],
+        ms_per_page=parsed["ms_per_page"],
+        experience=[ExperienceResponse.model_validate(row) for row in created["experience"]],
+        education=[EducationResponse.model_validate(row) for row in created["education"]],
+        skills=[SkillResponse.model_validate(row) for row in created["skills"]],
+        skipped=created["skipped"],
+    )
@@ -2,25 +2,35 @@
 Resumes API Routes
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Query, Request
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-import io
+from sqlalchemy import select, case
 
 from app.core.database import get_db
 from app.core.security import get_current_user
+from app.core.file_responses import cached_file_response
 from app.models.user import User
 from app.models.resume import Resume
 from app.models.job import Job
+from app.services.ats_analyzer import ats_analyzer
+from app.services.compatibility import compatibility_matrix
+from app.services.render_cache import render_cache, MEDIA_TYPES
+from app.services.render_pool import RenderPoolSaturated
+from app.services.resume_export import stream_resume_zip
+from app.services.resume_history import resume_history
+from app.services.resume_builder import DEFAULT_THEME_COLOR
 from app.schemas.resume import (
-    ResumeCreate, ResumeGenerate, ResumeUpdate, ResumeResponse, ATSAnalysis
+    ResumeCreate, ResumeGenerate, ResumeUpdate, ResumeResponse, ATSAnalysis,
+    CompatibilityResponse, ResumeVersionSummary, ResumeVersionResponse, ResumeDiffResponse
 )
 
 
 router = APIRouter()
 
+MAX_EXPORT_RESUMES = 200
+
 
 @router.get("", response_model=List[ResumeResponse])
 async def list_resumes(
@@ -38,6 +48,79 @@ async def list_resumes(
     return [ResumeResponse.model_validate(r) for r in resumes]
 
 
+@router.get("/export")
+async def export_resumes(
+    ids: str = Query(..., description="Comma-separated resume ids"),
+    format: str = "pdf",
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Download several resumes as a ZIP, streamed as each one is rendered"""
+    try:
+        requested = {int(part) for part in ids.split(",") if part.strip()}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if not requested:
+        raise HTTPException(status_code=400, detail="No resume ids given")
+    if len(requested) > MAX_EXPORT_RESUMES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_EXPORT_RESUMES} resumes per export")
+    
+    result = await db.execute(
+        select(Resume.id)
+        .where(Resume.id.in_(requested), Resume.user_id == current_user.id)
+    )
+    owned = list(result.scalars().all())
+    
+    if not owned:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    
+    fmt = "docx" if format.lower() == "docx" else "pdf"
+    
+    return StreamingResponse(
+        stream_resume_zip(owned, fmt, DEFAULT_THEME_COLOR),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=resumes-{fmt}.zip"}
+    )
+
+
+@router.get("/compatibility", response_model=CompatibilityResponse)
+async def resume_job_compatibility(
+    job_status: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    top: int = Query(100, ge=1, le=10000),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Best-fitting resume for each candidate job, scored in one batch"""
+    result = await db.execute(
+        select(Resume.id, Resume.content)
+        .where(Resume.user_id == current_user.id, Resume.is_archived == False, Resume.is_active == True)
+    )
+    resumes = [(row.id, row.content) for row in result.all()]
+    
+    # Only the columns the keyword index needs; the description only for jobs not yet enriched
+    query = (
+        select(
+            Job.id, Job.updated_at, Job.required_skills, Job.nice_to_have_skills, Job.description_keywords,
+            case((Job.description_keywords.is_(None), Job.description)).label("description"),
+        )
+        .where(Job.is_duplicate == False)
+    )
+    if job_status:
+        query = query.where(Job.status == job_status)
+    result = await db.execute(query.order_by(Job.discovered_at.desc()).limit(limit))
+    jobs = [dict(row._mapping) for row in result.all()]
+    
+    matrix = compatibility_matrix.compute(resumes, jobs)
+    matches = sorted(matrix["best"], key=lambda match: match["score"], reverse=True)[:top]
+    
+    return CompatibilityResponse(
+        resumes_scored=len(resumes),
+        jobs_scored=len(jobs),
+        matches=matches,
+    )
+
+
 @router.get("/{resume_id}", response_model=ResumeResponse)
 async def get_resume(
     resume_id: int,
@@ -71,6 +154,8 @@ async def create_resume(
         content=resume_data.content.model_dump(),
     )
     db.add(resume)
+    await db.flush()
+    await resume_history.record(db, resume)
     await db.commit()
     await db.refresh(resume)
     
@@ -102,6 +187,8 @@ async def generate_resume(
         content={},  # Will be populated by AI service
     )
     db.add(resume)
+    await db.flush()
+    await resume_history.record(db, resume)
     await db.commit()
     await db.refresh(resume)
     
@@ -132,12 +219,19 @@ async def update_resume(
     if 'content' in update_data and update_data['content']:
         update_data['content'] = update_data['content'].model_dump()
     
+    previous_content = resume.content
+    
+    # Cached renders of the old content are stale once the version moves
+    if 'content' in update_data:
+        render_cache.invalidate(resume, getattr(resume, 'theme_color', '#3B82F6') or '#3B82F6')
+    
     for field, value in update_data.items():
         setattr(resume, field, value)
     
-    # Increment version on content changes
+    # Increment version on content changes, keeping the old one as history
     if 'content' in update_data:
         resume.version += 1
+        await resume_history.record(db, resume, previous_content)
     
     await db.commit()
     await db.refresh(resume)
@@ -145,16 +239,77 @@ async def update_resume(
     return ResumeResponse.model_validate(resume)
 
 
+async def _get_owned_resume(db: AsyncSession, resume_id: int, user_id: int) -> Resume:
+    result = await db.execute(
+        select(Resume)
+        .where(Resume.id == resume_id, Resume.user_id == user_id)
+    )
+    resume = result.scalar_one_or_none()
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return resume
+
+
+@router.get("/{resume_id}/versions", response_model=List[ResumeVersionSummary])
+async def list_resume_versions(
+    resume_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List stored versions of a resume, newest first"""
+    await _get_owned_resume(db, resume_id, current_user.id)
+    return await resume_history.list_versions(db, resume_id)
+
+
+@router.get("/{resume_id}/versions/{version}", response_model=ResumeVersionResponse)
+async def get_resume_version(
+    resume_id: int,
+    version: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Resume content as of a past version"""
+    resume = await _get_owned_resume(db, resume_id, current_user.id)
+    
+    if version == resume.version:
+        content = resume.content
+    else:
+        content = await resume_history.get_version(db, resume_id, version)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Version not found")
+    
+    return ResumeVersionResponse(resume_id=resume_id, version=version, content=content)
+
+
+@router.get("/{resume_id}/diff", response_model=ResumeDiffResponse)
+async def diff_resume_versions(
+    resume_id: int,
+    from_version: int,
+    to_version: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """JSON-patch ops that turn one version into another"""
+    await _get_owned_resume(db, resume_id, current_user.id)
+    
+    patch = await resume_history.diff(db, resume_id, from_version, to_version)
+    if patch is None:
+        raise HTTPException(status_code=404, detail="Version not found")
+    
+    return ResumeDiffResponse(
+        resume_id=resume_id, from_version=from_version, to_version=to_version, patch=patch
+    )
+
+
 @router.get("/{resume_id}/download")
 async def download_resume(
     resume_id: int,
+    request: Request,
     format: str = "pdf",
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Download resume as PDF or DOCX"""
-    from app.services.resume_builder import resume_builder
-    
     result = await db.execute(
         select(Resume)
         .where(Resume.id == resume_id, Resume.user_id == current_user.id)
@@ -164,40 +319,33 @@ async def download_resume(
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
     
-    # Get resume content
-    content = resume.content or {}
     theme_color = getattr(resume, 'theme_color', '#3B82F6') or '#3B82F6'
+    fmt = "docx" if format.lower() == "docx" else "pdf"  # Default to PDF
     
-    if format.lower() == "docx":
-        try:
-            file_bytes = resume_builder.generate_docx(content, theme_color)
-            media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-            filename = f"{resume.name}.docx"
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"DOCX generation failed: {str(e)}")
-    else:
-        # Default to PDF
-        try:
-            file_bytes = resume_builder.generate_pdf(content, theme_color)
-            media_type = "application/pdf"
-            filename = f"{resume.name}.pdf"
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(e)}")
+    # Repeat downloads of unchanged content are served from the render cache
+    try:
+        path, cache_key = await render_cache.get_or_render_path(db, resume, fmt, theme_color)
+    except RenderPoolSaturated:
+        raise HTTPException(
+            status_code=503,
+            detail="Renderer busy, please retry",
+            headers={"Retry-After": "2"}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"{fmt.upper()} generation failed: {str(e)}")
     
-    return StreamingResponse(
-        io.BytesIO(file_bytes),
-        media_type=media_type,
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
+    # Sent from the cached file itself; the content hash doubles as the ETag
+    return cached_file_response(request, path, MEDIA_TYPES[fmt], f"{resume.name}.{fmt}", cache_key)
 
 
 @router.post("/{resume_id}/analyze", response_model=ATSAnalysis)
 async def analyze_resume_ats(
     resume_id: int,
+    job_id: Optional[int] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Analyze resume for ATS compatibility"""
+    """Analyze resume for ATS compatibility against a job (default: its target job)"""
     result = await db.execute(
         select(Resume)
         .where(Resume.id == resume_id, Resume.user_id == current_user.id)
@@ -207,16 +355,22 @@ async def analyze_resume_ats(
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
     
-    # This would call the ATS analysis service
-    # analysis = await ats_analyzer.analyze(resume)
+    job = None
+    job_id = job_id or resume.target_job_id
+    if job_id:
+        result = await db.execute(select(Job).where(Job.id == job_id))
+        job = result.scalar_one_or_none()
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
     
-    return ATSAnalysis(
-        score=85,
-        issues=["Consider adding more keywords"],
-        suggestions=["Add quantifiable achievements"],
-        missing_keywords=["kubernetes", "docker"],
-        format_issues=[]
-    )
+    analysis = ats_analyzer.analyze(resume.content or {}, job)
+    
+    resume.ats_score = analysis["score"]
+    resume.ats_feedback = analysis
+    resume.keywords_included = analysis["matched_keywords"]
+    await db.commit()
+    
+    return ATSAnalysis(**analysis)
 
 
 @router.delete("/{resume_id}", status_code=status.HTTP_204_NO_CONTENT)
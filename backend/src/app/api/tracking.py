@@ -0,0 +1,36 @@
+"""
+Email Tracking API Routes
+"""
+
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.responses import RedirectResponse
+
+from app.services.email_tracking import PIXEL_GIF, tracking_buffer, tracking_signer
+
+
+router = APIRouter()
+
+# Every open should reach us, not a cached copy
+NO_CACHE = {"Cache-Control": "no-store, no-cache, must-revalidate, private", "Pragma": "no-cache"}
+
+
+@router.get("/open/{token}.gif")
+async def track_open(token: str):
+    """Open pixel; counted in memory, flushed to the database in batches (or per hit without the buffer)"""
+    email_id = tracking_signer.verify_open(token)
+    if email_id is not None:
+        tracking_buffer.record_open(email_id)
+        await tracking_buffer.write_through()
+    # Always a pixel: a broken image would only show the recipient something is off
+    return Response(content=PIXEL_GIF, media_type="image/gif", headers=NO_CACHE)
+
+
+@router.get("/click/{token}")
+async def track_click(token: str, url: str):
+    """Count a click and redirect to the link the email contained"""
+    email_id = tracking_signer.verify_click(token, url)
+    if email_id is None:
+        raise HTTPException(status_code=404, detail="Link not found")
+    tracking_buffer.record_click(email_id)
+    await tracking_buffer.write_through()
+    return RedirectResponse(url, status_code=302, headers=NO_CACHE)
@@ -0,0 +1,121 @@
+"""
+Column Compression - Transparent zstd/zlib Compression for Large Columns
+"""
+
+import json
+import threading
+import zlib
+from typing import Any, Optional
+
+from sqlalchemy.types import TypeDecorator, LargeBinary
+
+from app.core.config import settings
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# First byte of every stored value: how the rest is encoded
+RAW = 0x00
+ZLIB = 0x01
+ZSTD = 0x02
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# zstandard (de)compressor objects must not be shared between threads
+_local = threading.local()
+
+
+def _zstd_compressor():
+    compressor = getattr(_local, "compressor", None)
+    if compressor is None:
+        compressor = _local.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+    return compressor
+
+
+def _zstd_decompressor():
+    decompressor = getattr(_local, "decompressor", None)
+    if decompressor is None:
+        decompressor = _local.decompressor = zstandard.ZstdDecompressor()
+    return decompressor
+
+
+def default_codec() -> int:
+    return ZSTD if ZSTD_AVAILABLE and settings.COMPRESSION_CODEC == "zstd" else ZLIB
+
+
+def compress(data: bytes, threshold: Optional[int] = None, codec: Optional[int] = None) -> bytes:
+    """Header byte + payload; values under threshold, or that don't shrink, stay raw"""
+    threshold = settings.COMPRESSION_THRESHOLD_BYTES if threshold is None else threshold
+    if len(data) >= threshold:
+        codec = default_codec() if codec is None else codec
+        if codec == ZSTD:
+            packed = _zstd_compressor().compress(data)
+        else:
+            packed = zlib.compress(data, ZLIB_LEVEL)
+        if len(packed) < len(data):
+            return bytes((codec,)) + packed
+    return bytes((RAW,)) + data
+
+
+def decompress(blob: bytes) -> bytes:
+    header = blob[0]
+    if header == RAW:
+        return blob[1:]
+    if header == ZLIB:
+        return zlib.decompress(blob[1:])
+    if header == ZSTD:
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("Value is zstd-compressed but the zstandard package is not installed")
+        return _zstd_decompressor().decompress(blob[1:])
+    raise ValueError(f"Unknown compression header {header:#04x}")
+
+
+class CompressedText(TypeDecorator):
+    """Text stored as bytea behind a one-byte format header.
+
+    Values below the threshold are stored raw, so reading them costs a
+    slice and a UTF-8 decode, never a decompression. The column can't be
+    searched with LIKE or full-text functions in SQL.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, threshold: Optional[int] = None):
+        super().__init__()
+        self.threshold = threshold
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        return compress(self.serialize(value).encode("utf-8"), self.threshold)
+
+    def process_result_value(self, value: Any, dialect) -> Any:
+        if value is None:
+            return None
+        if isinstance(value, str):
+            # Column not converted to bytea yet
+            return self.deserialize(value)
+        return self.deserialize(decompress(bytes(value)).decode("utf-8"))
+
+    def serialize(self, value: Any) -> str:
+        return value
+
+    def deserialize(self, text: str) -> Any:
+        return text
+
+
+class CompressedJSON(CompressedText):
+    """JSON document stored like CompressedText"""
+
+    cache_ok = True
+
+    def serialize(self, value: Any) -> str:
+        return json.dumps(value, separators=(",", ":"), default=str)
+
+    def deserialize(self, text: str) -> Any:
+        return json.loads(text)
@@ -18,6 +18,13 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "postgresql+asyncpg://localhost/jarvis"
+    # Large text/JSON columns (email bodies, raw job payloads) are stored
+    # compressed; "zstd" falls back to zlib when zstandard isn't installed
+    COMPRESSION_CODEC: str = "zstd"
+    COMPRESSION_THRESHOLD_BYTES: int = 1024
+    # Compress rows written before the columns were migrated to bytea, in the
+    # background on startup (the migration itself is migrations/0048_*)
+    COMPRESSION_MIGRATION_ENABLED: bool = False
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
@@ -45,20 +52,84 @@ class Settings(BaseSettings):
     SMTP_PORT: int = 587
     SMTP_USER: str = ""
     SMTP_PASSWORD: str = ""
+    SMTP_START_TLS: bool = True
+    # Persistent SMTP sessions shared across sends
+    SMTP_POOL_SIZE: int = 3
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+    SMTP_NOOP_AFTER_SECONDS: float = 30.0
+    # Outbox worker sending QUEUED emails; needs a long-lived process like the scheduler
+    OUTBOX_ENABLED: bool = False
+    OUTBOX_BATCH_SIZE: int = 50
+    OUTBOX_CONCURRENCY: int = 10
+    OUTBOX_POLL_SECONDS: float = 5.0
+    OUTBOX_LEASE_SECONDS: int = 300
+    OUTBOX_MAX_RETRIES: int = 5
+    OUTBOX_RETRY_BASE_SECONDS: int = 30
+    # Mail-merge bulk sends; providers throttle bursts to one domain
+    BULK_SEND_MAX_RECIPIENTS: int = 200
+    BULK_SEND_CONCURRENCY: int = 5
+    BULK_SEND_DOMAIN_RATE_PER_MINUTE: int = 30
+    # SENDING rows of a bulk send with no write-back for this long are failed
+    BULK_SEND_STALE_SECONDS: int = 600
+    # Open/click tracking: public API origin for pixel and redirect links (empty = off)
+    TRACKING_BASE_URL: str = ""
+    TRACKING_SECRET: str = ""  # defaults to a key derived from JWT_SECRET
+    # Write-behind buffer for opens/clicks; needs a long-lived process like the outbox.
+    # Off (serverless), each hit is written before the response.
+    TRACKING_BUFFER_ENABLED: bool = False
+    TRACKING_FLUSH_SECONDS: float = 10.0
+    TRACKING_MAX_PENDING: int = 5000
     
     # Email (IMAP)
     IMAP_HOST: str = "imap.gmail.com"
     IMAP_PORT: int = 993
     IMAP_USER: str = ""
     IMAP_PASSWORD: str = ""
+    IMAP_MAILBOX: str = "INBOX"
+    # Background sync for IMAP_USER's account; IDLE push when the server supports it
+    IMAP_SYNC_ENABLED: bool = False
+    IMAP_POLL_SECONDS: float = 300.0
+    IMAP_IDLE_SECONDS: float = 29 * 60
+    IMAP_BODY_BATCH_SIZE: int = 50
+    IMAP_BODY_FETCH_LIMIT: int = 500
+    # Turn LinkedIn/Naukri job-alert emails into jobs as their bodies arrive
+    IMAP_EXTRACT_JOB_ALERTS: bool = True
+    # "postgres" (tsvector + GIN) or "memory" for local development
+    EMAIL_SEARCH_BACKEND: str = "postgres"
+    # Fill search_vector on startup for emails stored before it existed
+    EMAIL_SEARCH_REINDEX_ENABLED: bool = True
     
     # LinkedIn OAuth
     LINKEDIN_CLIENT_ID: str = ""
     LINKEDIN_CLIENT_SECRET: str = ""
     LINKEDIN_REDIRECT_URI: str = ""
     
+    # Job Discovery
+    NAUKRI_BASE_URL: str = "https://www.naukri.com"
+    DISCOVERY_SCHEDULER_ENABLED: bool = False
+    DISCOVERY_TICK_SECONDS: int = 60
+    # Warm process pool for large enrichment batches; 0 enriches in a thread,
+    # as serverless hosts need. Set 2+ on a dedicated server
+    JOB_ENRICHMENT_PROCESSES: int = 0
+
+    # Outbound HTTP
+    HTTP_DNS_CACHE_TTL: int = 300
+
+    # Rendered resume cache (DOCX blobs); system temp dir if empty
+    RENDER_CACHE_DIR: str = ""
+    # Resume rendering pool; 0 renders in a thread, which serverless hosts
+    # (no /dev/shm, no long-lived process) need. Set 2+ on a dedicated server
+    RENDER_POOL_PROCESSES: int = 0
+    RENDER_QUEUE_MAX: int = 16
+
+    # Resume import (PDF/DOCX upload parsing); 0 parses in a thread, as on serverless
+    RESUME_IMPORT_PROCESSES: int = 0
+    RESUME_IMPORT_MAX_CONCURRENT: int = 4
+    RESUME_IMPORT_MAX_BYTES: int = 10 * 1024 * 1024
+    
     # Job Matching
     MIN_SKILL_MATCH_THRESHOLD: float = 0.6
+    SKILL_TAXONOMY_PATH: str = ""  # JSON {canonical: [aliases]}; built-in taxonomy if empty
     
     @field_validator("CORS_ORIGINS", mode="before")
     @classmethod
@@ -44,7 +44,7 @@ async def init_db():
     """Initialize database tables"""
     async with engine.begin() as conn:
         # Import all models to register them
-        from app.models import user, profile, job, resume, application, referral, email
+        from app.models import user, profile, job, resume, application, referral, email, audit, discovery
         await conn.run_sync(Base.metadata.create_all)
 
 
@@ -0,0 +1,121 @@
+"""
+File Responses - Conditional and Ranged Serving of Cached Files
+"""
+
+import os
+import re
+from typing import AsyncIterator, Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from fastapi import Request
+from starlette.responses import FileResponse, Response, StreamingResponse
+
+
+CHUNK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) of a single byte range.
+
+    Returns None for headers we don't serve partially (multiple ranges,
+    other units), so the caller falls back to the full file. Raises
+    ValueError for a range that can't be satisfied.
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("range not satisfiable")
+    return start, end
+
+
+def attachment_header(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+async def _iter_file(path: str, start: int, length: int) -> AsyncIterator[bytes]:
+    async with await anyio.open_file(path, "rb") as f:
+        await f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = await f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def cached_file_response(
+    request: Request,
+    path: str,
+    media_type: str,
+    filename: str,
+    etag: str
+) -> Response:
+    """Serve an immutable, content-addressed file straight from disk.
+
+    The file is streamed in chunks (never read whole), with a strong ETag
+    for 304 revalidation and single byte-range support for resumed
+    downloads.
+    """
+    quoted_etag = f'"{etag}"'
+    headers = {
+        "ETag": quoted_etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-cache",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, quoted_etag):
+        return Response(status_code=304, headers=headers)
+
+    stat = os.stat(path)
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range == quoted_etag):
+        try:
+            byte_range = parse_range(range_header, stat.st_size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{stat.st_size}"})
+        if byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            return StreamingResponse(
+                _iter_file(path, start, length),
+                status_code=206,
+                media_type=media_type,
+                headers={
+                    **headers,
+                    "Content-Range": f"bytes {start}-{end}/{stat.st_size}",
+                    "Content-Length": str(length),
+                    "Content-Disposition": attachment_header(filename),
+                },
+            )
+
+    return FileResponse(path, media_type=media_type, filename=filename, headers=headers, stat_result=stat)
@@ -0,0 +1,304 @@
+"""
+Outbound HTTP Client Registry - Shared, Lifecycle-managed Connection Pools
+"""
+
+import asyncio
+import socket
+import time
+import typing
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Tuple
+
+import httpcore
+import httpx
+
+from app.core.config import settings
+
+# HTTP/2 needs the optional h2 package
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+BROWSER_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+
+@dataclass
+class UpstreamConfig:
+    """Pool tuning for one upstream"""
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    timeout: float = 30.0
+    http2: bool = False
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+DEFAULT_UPSTREAMS: Dict[str, UpstreamConfig] = {
+    # Job boards throttle aggressively; few connections, kept warm between pages
+    "naukri": UpstreamConfig(
+        max_connections=8, max_keepalive_connections=4, keepalive_expiry=60.0,
+        http2=True, headers={"User-Agent": BROWSER_USER_AGENT},
+    ),
+    "linkedin": UpstreamConfig(
+        max_connections=4, max_keepalive_connections=2, keepalive_expiry=60.0,
+        http2=True, headers={"User-Agent": BROWSER_USER_AGENT},
+    ),
+    # Detail pages and anything else the scraper follows
+    "scraper": UpstreamConfig(
+        max_connections=20, max_keepalive_connections=10, keepalive_expiry=15.0,
+        headers={"User-Agent": BROWSER_USER_AGENT},
+    ),
+    # Long LLM calls: generous timeout, many concurrent streams over HTTP/2
+    "openai": UpstreamConfig(
+        max_connections=50, max_keepalive_connections=20, keepalive_expiry=120.0,
+        timeout=120.0, http2=True,
+    ),
+}
+
+
+class CachingDNSBackend(httpcore.AsyncNetworkBackend):
+    """Network backend that caches getaddrinfo results for a TTL"""
+
+    def __init__(self, ttl: float = 300.0, backend: Optional[httpcore.AsyncNetworkBackend] = None):
+        self.ttl = ttl
+        self._backend = backend or httpcore.AnyIOBackend()
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def _resolve(self, host: str, port: int) -> List[str]:
+        key = (host, port)
+        cached = self._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self._cache[key] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options: Optional[typing.Iterable[Any]] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        # TLS still uses the origin hostname for SNI and verification;
+        # only the TCP connect goes to the cached address.
+        addresses = await self._resolve(host, port)
+        last_error: Optional[Exception] = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(
+                    address, port, timeout=timeout,
+                    local_address=local_address, socket_options=socket_options,
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                last_error = e
+        # Every cached address failed; the record may be stale
+        self._cache.pop((host, port), None)
+        if last_error:
+            raise last_error
+        raise httpcore.ConnectError(f"No addresses for {host}")
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+@dataclass
+class UpstreamStats:
+    """Connection reuse and pool wait counters for one upstream"""
+    requests: int = 0
+    new_connections: int = 0
+    pool_wait_total: float = 0.0
+    pool_wait_max: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        reused = self.requests - self.new_connections
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reuse_rate": round(reused / self.requests, 4) if self.requests else 0.0,
+            "pool_wait_avg_ms": round(self.pool_wait_total / self.requests * 1000, 3) if self.requests else 0.0,
+            "pool_wait_max_ms": round(self.pool_wait_max * 1000, 3),
+        }
+
+
+@contextmanager
+def _httpx_errors():
+    """Re-raise httpcore errors as their httpx counterparts, which share their names"""
+    try:
+        yield
+    except httpcore.TimeoutException as e:
+        raise getattr(httpx, type(e).__name__, httpx.TimeoutException)(str(e)) from e
+    except (httpcore.NetworkError, httpcore.ProtocolError, httpcore.ProxyError, httpcore.UnsupportedProtocol) as e:
+        raise getattr(httpx, type(e).__name__, httpx.TransportError)(str(e)) from e
+
+
+class _ResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream: typing.AsyncIterable[bytes]):
+        self._stream = stream
+
+    async def __aiter__(self) -> typing.AsyncIterator[bytes]:
+        with _httpx_errors():
+            async for chunk in self._stream:
+                yield chunk
+
+    async def aclose(self) -> None:
+        if hasattr(self._stream, "aclose"):
+            await self._stream.aclose()
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Transport over an httpcore pool that records connection reuse and pool wait per request.
+
+    httpx's own transport has no way to pass a network backend, so the
+    pool is built here with the DNS-caching one. Pool wait is the time from
+    handing the request to the pool until it either starts a new TCP
+    connect or writes headers on a reused connection.
+    """
+
+    def __init__(
+        self,
+        stats: UpstreamStats,
+        network_backend: httpcore.AsyncNetworkBackend,
+        limits: httpx.Limits,
+        http2: bool = False
+    ):
+        self._stats = stats
+        self.pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(http2=http2),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http2=http2,
+            network_backend=network_backend,
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        stats = self._stats
+        started = time.perf_counter()
+        state = {"acquired": False}
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            if state["acquired"]:
+                return
+            if event_name == "connection.connect_tcp.started":
+                stats.new_connections += 1
+            elif not event_name.endswith("send_request_headers.started"):
+                return
+            state["acquired"] = True
+            waited = time.perf_counter() - started
+            stats.pool_wait_total += waited
+            stats.pool_wait_max = max(stats.pool_wait_max, waited)
+
+        previous = request.extensions.get("trace")
+        if previous is None:
+            request.extensions["trace"] = trace
+        else:
+            async def chained(event_name: str, info: Dict[str, Any]) -> None:
+                await trace(event_name, info)
+                await previous(event_name, info)
+            request.extensions["trace"] = chained
+
+        stats.requests += 1
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        with _httpx_errors():
+            response = await self.pool.handle_async_request(core_request)
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_ResponseStream(response.stream),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self.pool.aclose()
+
+
+class HTTPClientRegistry:
+    """App-wide outbound httpx clients, one tuned pool per upstream.
+
+    Opened and closed by the FastAPI lifespan; get() also creates clients
+    lazily so scripts and tests work without the app running.
+    """
+
+    def __init__(self, upstreams: Optional[Dict[str, UpstreamConfig]] = None, dns_ttl: Optional[float] = None):
+        self.upstreams = dict(upstreams or DEFAULT_UPSTREAMS)
+        self.dns = CachingDNSBackend(ttl=dns_ttl if dns_ttl is not None else settings.HTTP_DNS_CACHE_TTL)
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._stats: Dict[str, UpstreamStats] = {}
+
+    def _build(self, name: str) -> httpx.AsyncClient:
+        config = self.upstreams.get(name) or UpstreamConfig()
+        limits = httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        )
+        http2 = config.http2 and HTTP2_AVAILABLE
+        stats = self._stats.setdefault(name, UpstreamStats())
+        transport = InstrumentedTransport(stats, self.dns, limits=limits, http2=http2)
+        return httpx.AsyncClient(
+            transport=transport,
+            timeout=config.timeout,
+            headers=config.headers,
+            limits=limits,
+            http2=http2,
+            follow_redirects=True,
+        )
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Client for an upstream; unknown names get default pool settings"""
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._build(name)
+            self._clients[name] = client
+        return client
+
+    async def start(self) -> None:
+        """Open every configured upstream's pool"""
+        for name in self.upstreams:
+            self.get(name)
+
+    async def aclose(self) -> None:
+        """Close all pools; called from the lifespan on shutdown"""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            try:
+                await client.aclose()
+            except Exception as e:
+                print(f"HTTP client close error: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "upstreams": {name: stats.as_dict() for name, stats in self._stats.items()},
+            "dns_cache": {"hits": self.dns.hits, "misses": self.dns.misses},
+            "http2_available": HTTP2_AVAILABLE,
+        }
+
+
+# Singleton
+http_clients = HTTPClientRegistry()
@@ -2,8 +2,9 @@
 from app.models.user import User
 from app.models.profile import Profile, Skill, Education, Experience
 from app.models.job import Job, JobStatus, JobSource
-from app.models.resume import Resume
+from app.models.resume import Resume, ResumeRevision
 from app.models.application import Application, ApplicationStatus, ApplicationMethod
 from app.models.referral import Referral, Connection, ReferralStatus
-from app.models.email import Email, EmailType, EmailStatus, EmailCategory
+from app.models.email import Email, EmailType, EmailStatus, EmailCategory, MailboxState
 from app.models.audit import AuditLog
+from app.models.discovery import SavedSearch, SourceCursor, DiscoveryRun
@@ -0,0 +1,87 @@
+"""
+Discovery Models - Saved Searches, Source Cursors and Run History
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, UniqueConstraint
+from app.core.database import Base
+
+
+class SavedSearch(Base):
+    """A user's recurring job search"""
+    __tablename__ = "saved_searches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    name = Column(String(255), nullable=False)
+    keywords = Column(JSON, default=list)  # ["python", "backend"]
+    countries = Column(JSON, default=list)  # ["India"]
+    sources = Column(JSON, default=list)  # ["linkedin", "naukri"]
+
+    # Identical keyword/country queries share one crawl
+    query_key = Column(String(40), nullable=False, index=True)
+
+    # Schedule
+    interval_minutes = Column(Integer, default=360)
+    is_active = Column(Boolean, default=True)
+    last_run_at = Column(DateTime, nullable=True)
+    next_run_at = Column(DateTime, nullable=True, index=True)
+    last_run_id = Column(Integer, ForeignKey("discovery_runs.id", ondelete="SET NULL"), nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SavedSearch {self.name}>"
+
+
+class SourceCursor(Base):
+    """High-water mark of the newest listing seen per source and query"""
+    __tablename__ = "source_cursors"
+    __table_args__ = (UniqueConstraint("source", "query_key", name="uq_source_cursor"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String(50), nullable=False)
+    query_key = Column(String(40), nullable=False)
+
+    last_posted_date = Column(DateTime, nullable=True)
+    last_external_id = Column(String(100), nullable=True)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SourceCursor {self.source}:{self.query_key}>"
+
+
+class DiscoveryRun(Base):
+    """One coalesced crawl and the searches it served"""
+    __tablename__ = "discovery_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    query_key = Column(String(40), nullable=False, index=True)
+    keywords = Column(JSON, default=list)
+    countries = Column(JSON, default=list)
+    sources = Column(JSON, default=list)
+
+    # Fan-out: every saved search / user this crawl answered
+    saved_search_ids = Column(JSON, default=list)
+    user_ids = Column(JSON, default=list)
+    trigger = Column(String(20), default="schedule")  # schedule, manual
+
+    # Counts
+    jobs_found = Column(Integer, default=0)
+    jobs_new = Column(Integer, default=0)
+    jobs_updated = Column(Integer, default=0)
+    jobs_duplicate = Column(Integer, default=0)
+    jobs_skipped = Column(Integer, default=0)  # at or below the high-water mark
+
+    # Outcome
+    status = Column(String(20), default="running")  # running, completed, failed
+    error_message = Column(Text, nullable=True)
+    started_at = Column(DateTime, default=datetime.utcnow, index=True)
+    finished_at = Column(DateTime, nullable=True)
+    duration_ms = Column(Integer, nullable=True)
+
+    def __repr__(self):
+        return f"<DiscoveryRun {self.id} {self.status}>"
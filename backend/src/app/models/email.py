@@ -3,9 +3,11 @@ Email Model - Email Intelligence Module
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, Text, ForeignKey, JSON, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 import enum
+from app.core.compression import CompressedText
 from app.core.database import Base
 
 
@@ -19,6 +21,7 @@ class EmailStatus(str, enum.Enum):
     """Email status"""
     DRAFT = "draft"
     QUEUED = "queued"
+    SENDING = "sending"  # claimed by an outbox worker
     SENT = "sent"
     DELIVERED = "delivered"
     OPENED = "opened"
@@ -36,12 +39,20 @@ class EmailCategory(str, enum.Enum):
     INTERVIEW_SCHEDULING = "interview_scheduling"
     OFFER_NEGOTIATION = "offer_negotiation"
     REJECTION = "rejection"
+    JOB_ALERT = "job_alert"  # LinkedIn/Naukri digests; listings extracted into jobs
     OTHER = "other"
 
 
 class Email(Base):
     """Email tracking"""
     __tablename__ = "emails"
+    __table_args__ = (
+        # Outbox claim: due QUEUED rows and expired SENDING leases
+        Index("ix_emails_status_scheduled_at", "status", "scheduled_at"),
+        # A whole thread in one index range scan
+        Index("ix_emails_user_thread", "user_id", "thread_id"),
+        Index("ix_emails_search_vector", "search_vector", postgresql_using="gin"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -49,6 +60,8 @@ class Email(Base):
     # Thread
     thread_id = Column(String(100), nullable=True, index=True)
     in_reply_to_id = Column(Integer, ForeignKey("emails.id", ondelete="SET NULL"), nullable=True)
+    in_reply_to = Column(String(255), nullable=True)  # In-Reply-To header
+    message_references = Column(JSON, default=list)  # References header, oldest first
     
     # Type & Direction
     email_type = Column(String(20), default=EmailType.SENT.value)
@@ -61,11 +74,17 @@ class Email(Base):
     cc_addresses = Column(JSON, default=list)
     bcc_addresses = Column(JSON, default=list)
     reply_to = Column(String(255), nullable=True)
+    imap_uid = Column(BigInteger, nullable=True)  # UID in the synced mailbox; body fetched lazily
+    batch_id = Column(String(36), nullable=True, index=True)  # mail-merge bulk send this email belongs to
     
     # Content
     subject = Column(String(500), nullable=False)
-    body_text = Column(Text, nullable=True)
-    body_html = Column(Text, nullable=True)
+    # Compressed above COMPRESSION_THRESHOLD_BYTES; not searchable in SQL, see search_vector
+    body_text = Column(CompressedText, nullable=True)
+    body_html = Column(CompressedText, nullable=True)
+    # Subject (A), sender (B) and body (C); written by the app, see email_search.
+    # Deferred: only the database reads it.
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
     
     # Attachments
     attachments = Column(JSON, default=list)
@@ -95,6 +114,7 @@ class Email(Base):
     # Error
     error_message = Column(Text, nullable=True)
     retry_count = Column(Integer, default=0)
+    locked_at = Column(DateTime, nullable=True)  # outbox lease; stale SENDING rows are reclaimed
     
     # Timestamps
     scheduled_at = Column(DateTime, nullable=True)
@@ -109,3 +129,23 @@ class Email(Base):
     
     def __repr__(self):
         return f"<Email {self.subject[:50]}>"
+
+
+class MailboxState(Base):
+    """IMAP sync high-water mark: UIDs above last_uid are new while UIDVALIDITY holds"""
+    __tablename__ = "mailbox_states"
+    __table_args__ = (UniqueConstraint("user_id", "mailbox", name="uq_mailbox_state"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    mailbox = Column(String(255), nullable=False, default="INBOX")
+
+    uidvalidity = Column(BigInteger, nullable=True)
+    last_uid = Column(BigInteger, default=0)
+    message_count = Column(Integer, default=0)
+
+    synced_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<MailboxState {self.mailbox} uid>{self.last_uid}>"
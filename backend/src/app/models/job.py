@@ -6,6 +6,7 @@ from datetime import datetime
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Float, JSON, Enum
 from sqlalchemy.orm import relationship
 import enum
+from app.core.compression import CompressedJSON
 from app.core.database import Base
 
 
@@ -72,6 +73,8 @@ class Job(Base):
     # AI Analysis
     required_skills = Column(JSON, default=list)  # Extracted skills
     nice_to_have_skills = Column(JSON, default=list)
+    # Salient description terms for ATS/compatibility scoring; NULL until enriched
+    description_keywords = Column(JSON(none_as_null=True), nullable=True)
     education_requirement = Column(String(255), nullable=True)
     
     # Scoring (AI-computed)
@@ -85,14 +88,18 @@ class Job(Base):
     is_duplicate = Column(Boolean, default=False)
     duplicate_of_id = Column(Integer, nullable=True)
     
+    # Dedup - normalized source URL or title/company/location hash
+    fingerprint = Column(String(40), nullable=True, unique=True, index=True)
+    
     # Dates
     posted_date = Column(DateTime, nullable=True)
     deadline = Column(DateTime, nullable=True)
     discovered_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    enriched_at = Column(DateTime, nullable=True, index=True)  # NULL until the enrichment pipeline has run
     
     # Raw data for debugging
-    raw_data = Column(JSON, nullable=True)
+    raw_data = Column(CompressedJSON, nullable=True)
     
     # Relationships
     applications = relationship("Application", back_populates="job")
@@ -3,8 +3,8 @@ Resume Model - Generated Resume Versions
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, LargeBinary
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, LargeBinary, UniqueConstraint
+from sqlalchemy.orm import relationship, deferred
 from app.core.database import Base
 
 
@@ -38,8 +38,10 @@ class Resume(Base):
     #   "certifications": [...]
     # }
     
-    # Generated PDF
-    pdf_content = Column(LargeBinary, nullable=True)
+    # Generated PDF (render cache; pdf_cache_key identifies what pdf_content holds).
+    # Deferred so listing resumes doesn't pull every PDF.
+    pdf_content = deferred(Column(LargeBinary, nullable=True))
+    pdf_cache_key = Column(String(64), nullable=True)
     pdf_url = Column(String(500), nullable=True)
     
     # AI Generation Details
@@ -65,3 +67,24 @@ class Resume(Base):
     
     def __repr__(self):
         return f"<Resume {self.name} v{self.version}>"
+
+
+class ResumeRevision(Base):
+    """One version of a resume's content: a full snapshot or a JSON-patch delta
+    from the previous version"""
+    __tablename__ = "resume_revisions"
+    __table_args__ = (UniqueConstraint("resume_id", "version", name="uq_resume_revision"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False, index=True)
+    version = Column(Integer, nullable=False)
+    
+    kind = Column(String(10), nullable=False)  # snapshot, delta
+    content = Column(JSON, nullable=True)  # full content (snapshot)
+    patch = Column(JSON, nullable=True)  # RFC 6902 ops from version - 1 (delta)
+    size_bytes = Column(Integer, default=0)  # serialized size of content/patch
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<ResumeRevision {self.resume_id} v{self.version} {self.kind}>"
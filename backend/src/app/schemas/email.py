@@ -84,6 +84,50 @@ class EmailThread(BaseModel):
     messages: List[EmailResponse]
 
 
+class EmailSearchHit(BaseModel):
+    """A search result with its rank and a highlighted snippet"""
+    email: EmailResponse
+    rank: float
+    snippet: str
+
+
+class BulkRecipient(BaseModel):
+    """One recipient of a mail merge and its template variables"""
+    email: EmailStr
+    variables: Dict[str, Any] = {}
+
+
+class EmailBulkSend(BaseModel):
+    """Mail merge: one template rendered for every recipient"""
+    template: Optional[str] = None  # built-in template name, instead of subject/body
+    subject: Optional[str] = None  # {{ name }} placeholders
+    body: Optional[str] = None
+    is_html: bool = False
+    variables: Dict[str, Any] = {}  # shared by all recipients
+    recipients: List[BulkRecipient]
+    resume_id: Optional[int] = None  # attached to every email as a compact PDF
+    category: str = "other"
+    job_id: Optional[int] = None
+
+
+class BulkRecipientResult(BaseModel):
+    email_id: int
+    to_address: str
+    status: str
+    error_message: Optional[str] = None
+    sent_at: Optional[datetime] = None
+
+
+class BulkSendStatus(BaseModel):
+    """Progress of a bulk send"""
+    batch_id: str
+    total: int
+    sent: int
+    failed: int
+    pending: int
+    results: List[BulkRecipientResult]
+
+
 class EmailStats(BaseModel):
     """Email statistics"""
     total_sent: int
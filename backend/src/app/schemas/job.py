@@ -93,3 +93,54 @@ class JobDiscoverResponse(BaseModel):
     jobs_new: int
     jobs_duplicate: int
     status: str
+    run_id: Optional[int] = None
+
+
+class SavedSearchCreate(BaseModel):
+    """A recurring discovery query"""
+    name: str
+    keywords: List[str]
+    countries: List[str] = []
+    sources: List[str] = ["linkedin", "naukri"]
+    interval_minutes: int = Field(default=360, ge=15)
+
+
+class SavedSearchResponse(BaseModel):
+    id: int
+    user_id: int
+    name: str
+    keywords: List[str] = []
+    countries: List[str] = []
+    sources: List[str] = []
+    interval_minutes: int
+    is_active: bool
+    last_run_at: Optional[datetime] = None
+    next_run_at: Optional[datetime] = None
+    last_run_id: Optional[int] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class DiscoveryRunResponse(BaseModel):
+    """Persisted discovery run with counts and timing"""
+    id: int
+    keywords: List[str] = []
+    countries: List[str] = []
+    sources: List[str] = []
+    saved_search_ids: List[int] = []
+    trigger: str
+    jobs_found: int
+    jobs_new: int
+    jobs_updated: int
+    jobs_duplicate: int
+    jobs_skipped: int
+    status: str
+    error_message: Optional[str] = None
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    duration_ms: Optional[int] = None
+    
+    class Config:
+        from_attributes = True
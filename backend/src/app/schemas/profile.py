@@ -141,3 +141,14 @@ class ProfileResponse(ProfileBase):
     
     class Config:
         from_attributes = True
+
+
+class ResumeImportResponse(BaseModel):
+    """Rows created from an uploaded resume"""
+    pages: int
+    parse_ms: float
+    ms_per_page: float
+    experience: List[ExperienceResponse] = []
+    education: List[EducationResponse] = []
+    skills: List[SkillResponse] = []
+    skipped: List[str] = []  # entries that couldn't be stored, with the reason
@@ -61,6 +61,29 @@ class ResumeResponse(BaseModel):
         from_attributes = True
 
 
+class ResumeVersionSummary(BaseModel):
+    """One entry in a resume's history"""
+    version: int
+    kind: str  # snapshot, delta
+    size_bytes: int
+    created_at: datetime
+
+
+class ResumeVersionResponse(BaseModel):
+    """Resume content as of a version"""
+    resume_id: int
+    version: int
+    content: Dict[str, Any]
+
+
+class ResumeDiffResponse(BaseModel):
+    """JSON-patch ops turning one version into another"""
+    resume_id: int
+    from_version: int
+    to_version: int
+    patch: List[Dict[str, Any]]
+
+
 class ATSAnalysis(BaseModel):
     """ATS compatibility analysis"""
     score: int  # 0-100
@@ -68,3 +91,20 @@ class ATSAnalysis(BaseModel):
     suggestions: List[str] = []
     missing_keywords: List[str] = []
     format_issues: List[str] = []
+    matched_keywords: List[str] = []
+    keyword_coverage: Optional[float] = None  # 0-1 against the target job
+    job_id: Optional[int] = None
+
+
+class ResumeJobMatch(BaseModel):
+    """Best resume for one job"""
+    job_id: int
+    resume_id: int
+    score: float  # 0-100 keyword coverage
+
+
+class CompatibilityResponse(BaseModel):
+    """Resume x job compatibility, best resume per job"""
+    resumes_scored: int
+    jobs_scored: int
+    matches: List[ResumeJobMatch]
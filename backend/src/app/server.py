@@ -8,9 +8,20 @@ from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from app.api import auth, jobs, resumes, applications, referrals, emails, profiles
+from app.api import auth, jobs, resumes, applications, referrals, emails, profiles, tracking
 from app.core.config import settings
 from app.core.database import init_db
+from app.core.http_clients import http_clients
+from app.services.column_compression import column_compression
+from app.services.discovery_scheduler import discovery_scheduler
+from app.services.email_outbox import email_outbox
+from app.services.email_search import email_search
+from app.services.email_service import email_service
+from app.services.email_tracking import tracking_buffer
+from app.services.imap_sync import imap_sync
+from app.services.job_enrichment import job_enrichment_pipeline
+from app.services.render_pool import render_pool
+from app.services.resume_import import resume_importer
 
 
 @asynccontextmanager
@@ -24,9 +35,39 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"STARTUP ERROR: {e}")
         app.state.startup_error = str(e)
+    
+    # Shared outbound connection pools
+    await http_clients.start()
+    render_pool.start()
+    resume_importer.start()
+    job_enrichment_pipeline.start()
+
+    # Periodic discovery needs a long-lived process; off on serverless
+    if settings.DISCOVERY_SCHEDULER_ENABLED:
+        discovery_scheduler.start()
+    if settings.OUTBOX_ENABLED:
+        email_outbox.start()
+    if settings.TRACKING_BUFFER_ENABLED:
+        tracking_buffer.start()
+    if settings.IMAP_SYNC_ENABLED and imap_sync.configured:
+        imap_sync.start()
+    if settings.COMPRESSION_MIGRATION_ENABLED:
+        column_compression.start()
+    if settings.EMAIL_SEARCH_REINDEX_ENABLED and email_search.backend == "postgres":
+        email_search.start()
     yield
     # Shutdown
-    pass
+    await discovery_scheduler.stop()
+    await email_outbox.stop()
+    await imap_sync.stop()
+    await tracking_buffer.stop()
+    await column_compression.stop()
+    await email_search.stop()
+    await http_clients.aclose()
+    await email_service.aclose()
+    render_pool.shutdown()
+    resume_importer.shutdown()
+    job_enrichment_pipeline.shutdown()
 
 
 app = FastAPI(
@@ -62,6 +103,7 @@ app.include_router(resumes.router, prefix="/api/resumes", tags=["Resumes"])
 app.include_router(applications.router, prefix="/api/applications", tags=["Applications"])
 app.include_router(referrals.router, prefix="/api/referrals", tags=["Referrals"])
 app.include_router(emails.router, prefix="/api/emails", tags=["Emails"])
+app.include_router(tracking.router, prefix="/api/track", tags=["Tracking"])
 
 
 @app.get("/")
@@ -90,3 +132,9 @@ async def health_check():
             }
         )
     return {"status": "healthy", "backend_version": "4.0-NO-INIT-DB"}
+
+
+@app.get("/health/http")
+async def http_client_stats():
+    """Outbound connection reuse and pool wait per upstream"""
+    return http_clients.stats()
@@ -0,0 +1,281 @@
+"""
+ATS Analyzer - Resume vs Job Keyword Gap Scoring
+"""
+
+import heapq
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import List, Dict, Any, Optional, Iterable, Tuple, FrozenSet
+
+from app.services.resume_builder import resume_builder
+from app.services.skill_extraction import SkillExtractor, skill_extractor, tokenize
+
+
+# Words that carry no signal in a job ad, on top of ordinary English
+STOPWORDS = frozenset("""
+a about across all also an and any are as at be been being but by can could do does etc for from
+has have how if in into is it its may more most must no not of on or other our out over per should
+so such than that the their them there these they this those through to under up us was we were what
+when where which while who will with within would you your
+ability able apply applicants candidate candidates company day description duties environment
+excellent experience good great help ideal including job join knowledge looking new offer
+opportunity plus preferred required requirements responsibilities role skills strong team teams
+understanding using well work working years year yrs
+""".split())
+
+MAX_DESCRIPTION_KEYWORDS = 20
+MAX_MISSING_KEYWORDS = 15
+MAX_CACHED_TERMS = 50000
+
+# Keyword score weights; components a job doesn't have are dropped and the rest renormalized
+WEIGHTS = {"required": 0.6, "nice_to_have": 0.15, "keywords": 0.25}
+KEYWORD_SHARE = 0.7  # vs. the structural (section/format) score
+
+
+def _field(obj: Any, name: str) -> Any:
+    return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+
+def _ngram(term: str) -> str:
+    return " ".join(tokenize(term))
+
+
+def resume_text(content: Dict[str, Any]) -> str:
+    """Flatten the searchable text of a resume's content"""
+    personal = content.get("personalInfo", content.get("personal", {})) or {}
+    parts: List[str] = [personal.get("summary") or "", content.get("summary") or ""]
+
+    for exp in content.get("experiences", content.get("experience", [])) or []:
+        parts += [exp.get("position") or exp.get("title") or "", exp.get("description") or ""]
+        parts += exp.get("highlights", exp.get("achievements", [])) or []
+        parts += exp.get("technologies", []) or []
+    for edu in content.get("education", []) or []:
+        parts += [edu.get("degree") or "", edu.get("field") or ""]
+    for project in content.get("projects", []) or []:
+        if isinstance(project, dict):
+            parts += [project.get("name") or "", project.get("description") or ""]
+            parts += project.get("technologies", []) or []
+        else:
+            parts.append(str(project))
+    parts += [str(c.get("name", "")) if isinstance(c, dict) else str(c) for c in content.get("certifications", []) or []]
+    parts += [str(s) for s in content.get("skills", []) or []]
+
+    return "\n".join(p for p in parts if p)
+
+
+@dataclass(frozen=True)
+class JobKeywords:
+    """Prebuilt keyword index for one job; terms are normalized n-grams"""
+    required: FrozenSet[str]
+    nice_to_have: FrozenSet[str]
+    keywords: FrozenSet[str]
+
+
+@dataclass(frozen=True)
+class ResumeTerms:
+    """Everything a job term can match in one resume"""
+    skills: FrozenSet[str]
+    ngrams: FrozenSet[str]
+
+    def __contains__(self, term: str) -> bool:
+        return term in self.skills or term in self.ngrams
+
+
+class ATSAnalyzer:
+    """Scores resumes against jobs by keyword coverage plus structure.
+
+    Each job's keywords are indexed once (and cached by id/updated_at), and
+    a resume is reduced once to a set of terms, so checking it against a
+    job is a handful of set lookups.
+    """
+
+    def __init__(self, extractor: Optional[SkillExtractor] = None, max_cached_jobs: int = 10000):
+        self.extractor = extractor or skill_extractor
+        self.max_cached_jobs = max_cached_jobs
+        self._job_index: "OrderedDict[Any, Tuple[Any, JobKeywords]]" = OrderedDict()
+        # Raw skill string -> normalized term; job skill lists repeat a small vocabulary
+        self._terms: Dict[str, str] = {}
+
+    # Indexing ------------------------------------------------------------
+
+    def _canonical_terms(self, skills: Optional[Iterable[str]]) -> FrozenSet[str]:
+        terms = set()
+        cache = self._terms
+        for skill in skills or []:
+            if not skill:
+                continue
+            skill = str(skill)
+            term = cache.get(skill)
+            if term is None:
+                term = _ngram(self.extractor.taxonomy.canonical(skill) or skill) if skill.strip() else ""
+                if len(cache) >= MAX_CACHED_TERMS:
+                    cache.clear()
+                cache[skill] = term
+            terms.add(term)
+        terms.discard("")
+        return frozenset(terms)
+
+    def _job_skills(self, job: Any) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+        description = _field(job, "description") or ""
+        required_skills = _field(job, "required_skills")
+        nice_skills = _field(job, "nice_to_have_skills")
+        if not required_skills and not nice_skills and description:
+            extracted = self.extractor.extract(description)
+            required_skills, nice_skills = extracted["required"], extracted["nice_to_have"]
+
+        required = self._canonical_terms(required_skills)
+        return required, self._canonical_terms(nice_skills) - required
+
+    def description_keywords(self, job: Any) -> List[str]:
+        """Salient description words the skill lists don't already cover, most frequent first.
+
+        Stored on the job as description_keywords, so a cold index build
+        skips the description entirely.
+        """
+        required, nice_to_have = self._job_skills(job)
+        return self._salient(_field(job, "description") or "", required | nice_to_have)
+
+    def _salient(self, description: str, skill_terms: FrozenSet[str]) -> List[str]:
+        # Every token is counted first and the distinct ones filtered after,
+        # which keeps ties in first-seen order
+        counts = Counter(tokenize(description))
+        skill_tokens = {token for term in skill_terms for token in term.split()}
+        for token in counts.keys() & (STOPWORDS | skill_tokens):
+            del counts[token]
+        candidates = [item for item in counts.items() if len(item[0]) > 2 and not item[0].isdigit()]
+        return [token for token, _ in heapq.nlargest(MAX_DESCRIPTION_KEYWORDS, candidates, key=itemgetter(1))]
+
+    def build_job_keywords(self, job: Any) -> JobKeywords:
+        required, nice_to_have = self._job_skills(job)
+        stored = _field(job, "description_keywords")
+        if stored is None:
+            stored = self._salient(_field(job, "description") or "", required | nice_to_have)
+        return JobKeywords(required=required, nice_to_have=nice_to_have, keywords=frozenset(stored))
+
+    def job_keywords(self, job: Any) -> JobKeywords:
+        """Cached index for a stored job; rebuilt when the job changes"""
+        job_id = _field(job, "id")
+        if job_id is None:
+            return self.build_job_keywords(job)
+
+        version = _field(job, "updated_at")
+        cached = self._job_index.get(job_id)
+        if cached is not None and cached[0] == version:
+            self._job_index.move_to_end(job_id)
+            return cached[1]
+
+        index = self.build_job_keywords(job)
+        self._job_index[job_id] = (version, index)
+        if len(self._job_index) > self.max_cached_jobs:
+            self._job_index.popitem(last=False)
+        return index
+
+    def resume_terms(self, content: Dict[str, Any]) -> ResumeTerms:
+        text = resume_text(content)
+        tokens = tokenize(text)
+        ngrams = set(tokens)
+        for n in (2, 3):
+            ngrams.update(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        skills = {_ngram(skill) for skill in self.extractor.find_skills(text)}
+        skills |= self._canonical_terms(content.get("skills"))
+        return ResumeTerms(skills=frozenset(skills), ngrams=frozenset(ngrams))
+
+    # Scoring -------------------------------------------------------------
+
+    def keyword_coverage(self, terms: ResumeTerms, keywords: JobKeywords) -> Dict[str, Any]:
+        """Matched/missing terms per component and the weighted 0-100 score.
+
+        A job with no indexable terms covers nothing and scores 0, as in
+        CompatibilityMatrix.
+        """
+        matched: Dict[str, List[str]] = {}
+        missing: Dict[str, List[str]] = {}
+        weighted = 0.0
+        total_weight = 0.0
+        for component in ("required", "nice_to_have", "keywords"):
+            wanted = getattr(keywords, component)
+            hits = sorted(term for term in wanted if term in terms)
+            matched[component] = hits
+            missing[component] = sorted(wanted.difference(hits))
+            if wanted:
+                weighted += WEIGHTS[component] * len(hits) / len(wanted)
+                total_weight += WEIGHTS[component]
+
+        coverage = weighted / total_weight if total_weight else 0.0
+        return {"score": coverage * 100, "coverage": round(coverage, 4), "matched": matched, "missing": missing}
+
+    def format_issues(self, content: Dict[str, Any]) -> List[str]:
+        issues = []
+        personal = content.get("personalInfo", content.get("personal", {})) or {}
+        if not personal.get("email"):
+            issues.append("No email address in contact details")
+        if not personal.get("phone"):
+            issues.append("No phone number in contact details")
+
+        for exp in content.get("experiences", content.get("experience", [])) or []:
+            company = exp.get("company") or "a role"
+            if not (exp.get("startDate") or exp.get("start_date") or exp.get("duration")):
+                issues.append(f"Missing dates for {company}")
+            for bullet in [exp.get("description") or ""] + list(exp.get("highlights", exp.get("achievements", [])) or []):
+                if len(bullet) > 400:
+                    issues.append(f"Very long bullet under {company}; ATS parsers may truncate it")
+                    break
+
+        if len(tokenize(resume_text(content))) < 150:
+            issues.append("Resume text is very short for keyword matching")
+        return issues
+
+    def analyze(self, content: Dict[str, Any], job: Any = None) -> Dict[str, Any]:
+        """Full ATS report for a resume, optionally against a target job"""
+        content = content or {}
+        structure = resume_builder.analyze_ats_compatibility(content)
+        result = {
+            "score": structure["score"],
+            "issues": list(structure["issues"]),
+            "suggestions": list(structure["suggestions"]),
+            "missing_keywords": [],
+            "matched_keywords": [],
+            "format_issues": self.format_issues(content),
+            "keyword_coverage": None,
+            "job_id": _field(job, "id") if job is not None else None,
+        }
+        if job is None:
+            return result
+
+        keywords = self.job_keywords(job)
+        if not (keywords.required or keywords.nice_to_have or keywords.keywords):
+            # Nothing to match against; the structural score stands alone
+            return result
+
+        coverage = self.keyword_coverage(self.resume_terms(content), keywords)
+        result["score"] = max(0, min(100, round(
+            KEYWORD_SHARE * coverage["score"] + (1 - KEYWORD_SHARE) * structure["score"]
+        )))
+        result["keyword_coverage"] = coverage["coverage"]
+        result["matched_keywords"] = [t for part in coverage["matched"].values() for t in part]
+        missing = coverage["missing"]
+        result["missing_keywords"] = (missing["required"] + missing["nice_to_have"] + missing["keywords"])[:MAX_MISSING_KEYWORDS]
+
+        if missing["required"]:
+            result["issues"].append(f"Missing {len(missing['required'])} required skill(s) for this job")
+            result["suggestions"].append(f"Mention where you've used: {', '.join(missing['required'][:5])}")
+        if missing["keywords"]:
+            result["suggestions"].append(
+                f"Mirror the job's wording where it's true of you: {', '.join(missing['keywords'][:5])}"
+            )
+        return result
+
+    def rank_jobs(self, content: Dict[str, Any], jobs: Iterable[Any], limit: Optional[int] = None) -> List[Tuple[Any, float]]:
+        """(job id, keyword score) for many jobs, best first; the resume is tokenized once"""
+        terms = self.resume_terms(content or {})
+        scored = [
+            (_field(job, "id"), round(self.keyword_coverage(terms, self.job_keywords(job))["score"], 1))
+            for job in jobs
+        ]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:limit] if limit else scored
+
+
+# Singleton
+ats_analyzer = ATSAnalyzer()
@@ -0,0 +1,185 @@
+"""
+Column Compression Migration - Converting and Compressing Existing Rows
+"""
+
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+
+from sqlalchemy import select, update, text, func, bindparam, type_coerce, LargeBinary
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.compression import RAW, compress
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.email import Email
+from app.models.job import Job
+
+# Columns declared as CompressedText/CompressedJSON
+COMPRESSED_COLUMNS: List[Tuple[Any, str]] = [
+    (Email, "body_text"),
+    (Email, "body_html"),
+    (Job, "raw_data"),
+]
+
+
+@dataclass
+class ColumnReport:
+    table: str
+    column: str
+    skipped: bool = False  # column not bytea yet; migrations haven't run
+    rows: int = 0  # rows rewritten compressed
+    bytes_before: int = 0
+    bytes_after: int = 0
+    seconds: float = 0.0
+
+    @property
+    def ratio(self) -> float:
+        return self.bytes_after / self.bytes_before if self.bytes_before else 1.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.table}.{self.column}: "
+            f"{self.rows} rows compressed, {self.bytes_before} -> {self.bytes_after} bytes "
+            f"({self.ratio:.0%}) in {self.seconds:.1f}s"
+        )
+
+
+class ColumnCompressionMigration:
+    """Compresses rows stored before the compressed column types existed.
+
+    The column itself is turned into bytea, every value behind the raw
+    header, by migrations/0048_compressed_columns.sql before the code
+    deploys; this job never alters a table. In the background it walks
+    the table in primary-key batches,
+    compresses raw values above the threshold off the event loop, and
+    writes them back with one executemany UPDATE per batch. A row is only
+    replaced if its md5 still matches what was read, so concurrent writes
+    win over the migration.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        batch_size: int = 200,
+        threshold: Optional[int] = None
+    ):
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.batch_size = batch_size
+        self.threshold = settings.COMPRESSION_THRESHOLD_BYTES if threshold is None else threshold
+        self._task: Optional[asyncio.Task] = None
+        self.reports: List[ColumnReport] = []
+
+    # Lifecycle -----------------------------------------------------------
+
+    def start(self) -> None:
+        """Run the migration once on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self) -> List[ColumnReport]:
+        self.reports = []
+        for model, column in COMPRESSED_COLUMNS:
+            report = ColumnReport(model.__tablename__, column)
+            self.reports.append(report)
+            try:
+                async with self.session_factory() as db:
+                    report.skipped = await self.column_type(db, model, column) != "bytea"
+                if report.skipped:
+                    print(f"Column compression: {report.table}.{report.column} is not bytea; "
+                          f"run migrations/migrate.py first")
+                    continue
+                await self.compress_column(model, column, report)
+            except Exception as e:
+                print(f"Column compression error on {report.table}.{report.column}: {e}")
+                continue
+            print(f"Column compression: {report}")
+        return self.reports
+
+    # Steps ---------------------------------------------------------------
+
+    async def column_type(self, db: AsyncSession, model: Any, column: str) -> Optional[str]:
+        result = await db.execute(
+            text(
+                "SELECT data_type FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = :table AND column_name = :column"
+            ),
+            {"table": model.__tablename__, "column": column},
+        )
+        return result.scalar_one_or_none()
+
+    def batch_statement(self, model: Any, column: str, after_id: int):
+        """Next batch of raw values above the threshold, read as plain bytes"""
+        col = model.__table__.c[column]
+        raw = type_coerce(col, LargeBinary)
+        return (
+            select(model.__table__.c.id, raw.label("value"))
+            .where(
+                model.__table__.c.id > after_id,
+                col.isnot(None),
+                func.get_byte(raw, 0) == RAW,
+                func.octet_length(raw) > self.threshold,
+            )
+            .order_by(model.__table__.c.id)
+            .limit(self.batch_size)
+        )
+
+    def update_statement(self, model: Any, column: str):
+        table = model.__table__
+        col = table.c[column]
+        return (
+            update(table)
+            .where(
+                table.c.id == bindparam("b_id"),
+                func.md5(type_coerce(col, LargeBinary)) == bindparam("b_md5"),
+            )
+            .values({col: type_coerce(bindparam("b_value"), LargeBinary)})
+        )
+
+    def compress_rows(self, rows: List[Tuple[int, bytes]]) -> List[Dict[str, Any]]:
+        """Update parameters for the rows that shrink; CPU-bound, runs in a thread"""
+        updates = []
+        for row_id, value in rows:
+            value = bytes(value)
+            packed = compress(value[1:], self.threshold)
+            if packed[0] != RAW:
+                updates.append({"b_id": row_id, "b_md5": hashlib.md5(value).hexdigest(), "b_value": packed})
+        return updates
+
+    async def compress_column(self, model: Any, column: str, report: ColumnReport) -> ColumnReport:
+        started = time.perf_counter()
+        update_stmt = self.update_statement(model, column)
+        after_id = 0
+        while True:
+            async with self.session_factory() as db:
+                rows = (await db.execute(self.batch_statement(model, column, after_id))).all()
+                if not rows:
+                    break
+                after_id = rows[-1].id
+                sizes = {row.id: len(row.value) for row in rows}
+                updates = await asyncio.to_thread(self.compress_rows, [(row.id, row.value) for row in rows])
+                if updates:
+                    await db.execute(update_stmt, updates)
+                    await db.commit()
+                    report.rows += len(updates)
+                    report.bytes_before += sum(sizes[u["b_id"]] for u in updates)
+                    report.bytes_after += sum(len(u["b_value"]) for u in updates)
+            # Yield between batches so request handling isn't starved
+            await asyncio.sleep(0)
+        report.seconds += time.perf_counter() - started
+        return report
+
+
+# Singleton
+column_compression = ColumnCompressionMigration()
@@ -0,0 +1,110 @@
+"""
+Compatibility Matrix - Vectorized Resume x Job Keyword Scoring
+"""
+
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from app.services.ats_analyzer import ATSAnalyzer, ats_analyzer, WEIGHTS
+
+
+class CompatibilityMatrix:
+    """Scores every resume against every job with one sparse product.
+
+    Jobs become rows of weights over a shared term vocabulary, laid out so
+    a row sums to 1 the same way ATSAnalyzer.keyword_coverage weighs
+    required/nice-to-have/description terms. Resumes become 0/1 rows over
+    the same vocabulary, so resumes @ jobs.T is the coverage of each pair.
+    """
+
+    def __init__(self, analyzer: Optional[ATSAnalyzer] = None):
+        self.analyzer = analyzer or ats_analyzer
+
+    def encode_jobs(self, jobs: Iterable[Any]) -> Tuple[List[Any], sparse.csr_matrix, Dict[str, int]]:
+        """(job ids, jobs x vocabulary weight matrix, vocabulary)"""
+        vocabulary: Dict[str, int] = {}
+        job_ids: List[Any] = []
+        rows: List[int] = []
+        cols: List[int] = []
+        data: List[float] = []
+
+        for row, job in enumerate(jobs):
+            job_ids.append(job.get("id") if isinstance(job, dict) else job.id)
+            keywords = self.analyzer.job_keywords(job)
+            components = [
+                (WEIGHTS[name], terms)
+                for name, terms in (
+                    ("required", keywords.required),
+                    ("nice_to_have", keywords.nice_to_have),
+                    ("keywords", keywords.keywords),
+                )
+                if terms
+            ]
+            total = sum(weight for weight, _ in components)
+            for weight, terms in components:
+                rows.extend([row] * len(terms))
+                cols.extend([vocabulary.setdefault(term, len(vocabulary)) for term in terms])
+                data.extend([weight / total / len(terms)] * len(terms))
+
+        matrix = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float32), (rows, cols)),
+            shape=(len(job_ids), len(vocabulary)),
+        )
+        return job_ids, matrix, vocabulary
+
+    def encode_resumes(self, contents: Iterable[Dict[str, Any]], vocabulary: Dict[str, int]) -> sparse.csr_matrix:
+        """resumes x vocabulary 0/1 matrix of the job terms each resume contains"""
+        rows: List[int] = []
+        cols: List[int] = []
+        count = 0
+        for row, content in enumerate(contents):
+            count += 1
+            terms = self.analyzer.resume_terms(content or {})
+            # Walk the resume's terms (hundreds), not the vocabulary (tens of thousands)
+            for term in terms.skills | terms.ngrams:
+                col = vocabulary.get(term)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+
+        return sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(count, len(vocabulary)),
+        )
+
+    def compute(
+        self,
+        resumes: List[Tuple[Any, Dict[str, Any]]],
+        jobs: Iterable[Any]
+    ) -> Dict[str, Any]:
+        """Score matrix (resumes x jobs, 0-100) and the best resume for each job.
+
+        Jobs with no indexable terms score 0 against every resume.
+        """
+        job_ids, job_matrix, vocabulary = self.encode_jobs(jobs)
+        resume_ids = [resume_id for resume_id, _ in resumes]
+        resume_matrix = self.encode_resumes((content for _, content in resumes), vocabulary)
+
+        scores = (resume_matrix @ job_matrix.T).toarray() * 100
+        if scores.size:
+            best_rows = scores.argmax(axis=0)
+            best_scores = scores[best_rows, np.arange(scores.shape[1])]
+        else:
+            best_rows = np.zeros(len(job_ids), dtype=int)
+            best_scores = np.zeros(len(job_ids))
+
+        return {
+            "resume_ids": resume_ids,
+            "job_ids": job_ids,
+            "scores": scores,
+            "best": [
+                {"job_id": job_id, "resume_id": resume_ids[best_rows[i]], "score": round(float(best_scores[i]), 1)}
+                for i, job_id in enumerate(job_ids)
+            ] if resume_ids else [],
+        }
+
+
+# Singleton
+compatibility_matrix = CompatibilityMatrix()
@@ -0,0 +1,375 @@
+"""
+Discovery Scheduler - Periodic, Incremental and Coalesced Job Discovery
+"""
+
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Iterable, Set, Tuple, Callable, Awaitable
+
+from sqlalchemy import select, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.discovery import SavedSearch, SourceCursor, DiscoveryRun
+from app.services.job_discovery import JobDiscoveryService, job_discovery_service
+from app.services.job_enrichment import job_enrichment_pipeline
+from app.services.job_store import job_store
+
+
+def make_query_key(keywords: Iterable[str], countries: Optional[Iterable[str]]) -> str:
+    """Order- and case-insensitive key shared by identical searches"""
+    kw = ",".join(sorted({k.strip().lower() for k in keywords if k and k.strip()}))
+    co = ",".join(sorted({c.strip().lower() for c in (countries or []) if c and c.strip()}))
+    return hashlib.sha1(f"{kw}|{co}".encode("utf-8")).hexdigest()
+
+
+@dataclass
+class _InflightCrawl:
+    """A crawl in progress that later callers can attach to"""
+    opened: asyncio.Future  # resolves to the DiscoveryRun id
+    future: asyncio.Future  # resolves to the finished DiscoveryRun
+    search_ids: Set[int] = field(default_factory=set)
+    user_ids: Set[int] = field(default_factory=set)
+
+
+class DiscoveryScheduler:
+    """Runs saved searches on their interval, one crawl per distinct query"""
+
+    def __init__(
+        self,
+        service: Optional[JobDiscoveryService] = None,
+        session_factory: Optional[async_sessionmaker] = None,
+        tick_seconds: Optional[int] = None
+    ):
+        self.service = service or job_discovery_service
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.tick_seconds = tick_seconds or settings.DISCOVERY_TICK_SECONDS
+        self._inflight: Dict[Tuple[str, Tuple[str, ...]], _InflightCrawl] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    # Lifecycle -----------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the periodic loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        # Jobs stored before enrichment existed, or added by hand, are filled in once per start
+        try:
+            await job_enrichment_pipeline.backfill(self.session_factory)
+        except Exception as e:
+            print(f"Job enrichment backfill error: {e}")
+        while True:
+            try:
+                await self.run_due()
+            except Exception as e:
+                print(f"Discovery scheduler error: {e}")
+            await asyncio.sleep(self.tick_seconds)
+
+    # Scheduling ----------------------------------------------------------
+
+    async def run_due(self) -> List[DiscoveryRun]:
+        """Run every saved search whose next_run_at has passed"""
+        async with self.session_factory() as db:
+            now = datetime.utcnow()
+            result = await db.execute(
+                select(SavedSearch).where(
+                    SavedSearch.is_active == True,
+                    or_(SavedSearch.next_run_at.is_(None), SavedSearch.next_run_at <= now),
+                )
+            )
+            due = result.scalars().all()
+
+        # Identical keyword/country queries become one crawl
+        groups: Dict[str, List[SavedSearch]] = {}
+        for search in due:
+            groups.setdefault(search.query_key, []).append(search)
+
+        runs = []
+        for searches in groups.values():
+            sources = sorted({source for search in searches for source in (search.sources or [])})
+            runs.append(await self.run_query(
+                keywords=searches[0].keywords or [],
+                countries=searches[0].countries or [],
+                sources=sources or ["linkedin", "naukri"],
+                search_ids=[search.id for search in searches],
+                user_ids=[search.user_id for search in searches],
+                trigger="schedule",
+            ))
+        return runs
+
+    async def run_query(
+        self,
+        keywords: List[str],
+        countries: Optional[List[str]],
+        sources: List[str],
+        limit: int = 50,
+        search_ids: Iterable[int] = (),
+        user_ids: Iterable[int] = (),
+        trigger: str = "manual"
+    ) -> DiscoveryRun:
+        """Crawl once for a query; concurrent identical requests share the crawl"""
+        crawl, run = await self._attach(keywords, countries, sources, limit, search_ids, user_ids, trigger)
+        if run is not None:
+            return await run()
+        return await asyncio.shield(crawl.future)
+
+    async def submit_query(
+        self,
+        keywords: List[str],
+        countries: Optional[List[str]],
+        sources: List[str],
+        limit: int = 50,
+        search_ids: Iterable[int] = (),
+        user_ids: Iterable[int] = (),
+        trigger: str = "manual"
+    ) -> Tuple[int, Optional[Callable[[], Awaitable[DiscoveryRun]]]]:
+        """Open the run for a query, or join the identical one in flight.
+
+        Returns the run id and, when this call opened the run, the crawl to
+        await (the API hands it to BackgroundTasks); joiners get None.
+        """
+        crawl, run = await self._attach(keywords, countries, sources, limit, search_ids, user_ids, trigger)
+        return await asyncio.shield(crawl.opened), run
+
+    async def _attach(
+        self,
+        keywords: List[str],
+        countries: Optional[List[str]],
+        sources: List[str],
+        limit: int,
+        search_ids: Iterable[int],
+        user_ids: Iterable[int],
+        trigger: str
+    ) -> Tuple[_InflightCrawl, Optional[Callable[[], Awaitable[DiscoveryRun]]]]:
+        """Join the in-flight crawl for the query, or record a new run and
+        return the coroutine function that crawls it"""
+        query_key = make_query_key(keywords, countries)
+        inflight_key = (query_key, tuple(sorted(sources)))
+
+        crawl = self._inflight.get(inflight_key)
+        if crawl is not None:
+            crawl.search_ids.update(search_ids)
+            crawl.user_ids.update(user_ids)
+            return crawl, None
+
+        loop = asyncio.get_running_loop()
+        crawl = _InflightCrawl(
+            opened=loop.create_future(),
+            future=loop.create_future(),
+            search_ids=set(search_ids),
+            user_ids=set(user_ids),
+        )
+        self._inflight[inflight_key] = crawl
+        try:
+            run_id = await self._open_run(query_key, keywords, countries or [], sources, crawl.user_ids, trigger)
+        except BaseException as e:
+            self._fail(inflight_key, crawl, e)
+            raise
+        crawl.opened.set_result(run_id)
+
+        async def run() -> DiscoveryRun:
+            try:
+                result = await self._crawl(
+                    run_id, query_key, keywords, countries or [], sources, limit, crawl, inflight_key
+                )
+            except BaseException as e:
+                self._fail(inflight_key, crawl, e)
+                raise
+            crawl.future.set_result(result)
+            return result
+
+        return crawl, run
+
+    def serves(self, run_id: int, user_id: int) -> bool:
+        """Whether a user joined the run while it is still crawling (user_ids
+        on the row is only complete once it finishes)"""
+        return any(
+            crawl.opened.done() and not crawl.opened.exception() and crawl.opened.result() == run_id
+            and user_id in crawl.user_ids
+            for crawl in self._inflight.values()
+        )
+
+    def _fail(self, inflight_key: Tuple[str, Tuple[str, ...]], crawl: _InflightCrawl, error: BaseException) -> None:
+        self._inflight.pop(inflight_key, None)
+        for future in (crawl.opened, crawl.future):
+            if not future.done():
+                future.set_exception(error)
+                # Mark retrieved so an unawaited failure isn't logged twice
+                future.exception()
+
+    # Crawl ---------------------------------------------------------------
+
+    async def _load_cursors(
+        self,
+        db: AsyncSession,
+        query_key: str,
+        sources: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        result = await db.execute(
+            select(SourceCursor).where(
+                SourceCursor.query_key == query_key,
+                SourceCursor.source.in_(sources),
+            )
+        )
+        return {
+            cursor.source: {
+                "last_posted_date": cursor.last_posted_date,
+                "last_external_id": cursor.last_external_id,
+            }
+            for cursor in result.scalars().all()
+        }
+
+    async def _save_cursors(
+        self,
+        db: AsyncSession,
+        query_key: str,
+        cursors: Dict[str, Dict[str, Any]]
+    ) -> None:
+        rows = [
+            {
+                "source": source,
+                "query_key": query_key,
+                "last_posted_date": cursor.get("last_posted_date"),
+                "last_external_id": cursor.get("last_external_id"),
+                "updated_at": datetime.utcnow(),
+            }
+            for source, cursor in cursors.items()
+            if cursor
+        ]
+        if not rows:
+            return
+        stmt = pg_insert(SourceCursor).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SourceCursor.source, SourceCursor.query_key],
+            set_={
+                "last_posted_date": stmt.excluded.last_posted_date,
+                "last_external_id": stmt.excluded.last_external_id,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        await db.execute(stmt)
+
+    def _extract_skills(self, jobs: List[Dict[str, Any]]) -> None:
+        for job in jobs:
+            if job.get("description") and not job.get("required_skills"):
+                skills = self.service.extract_skills_from_description(job["description"])
+                job["required_skills"] = skills["required"]
+                job["nice_to_have_skills"] = skills["nice_to_have"]
+
+    async def _prepare(self, jobs: List[Dict[str, Any]]) -> None:
+        """Fill skills, then structured fields and keywords, before ingestion;
+        both are CPU-bound and run off the event loop"""
+        await asyncio.to_thread(self._extract_skills, jobs)
+        enriched = await job_enrichment_pipeline.enrich_batch(jobs)
+        for job, fields in zip(jobs, enriched):
+            job.update(fields)
+
+    async def _open_run(
+        self,
+        query_key: str,
+        keywords: List[str],
+        countries: List[str],
+        sources: List[str],
+        user_ids: Set[int],
+        trigger: str
+    ) -> int:
+        async with self.session_factory() as db:
+            run = DiscoveryRun(
+                query_key=query_key,
+                keywords=keywords,
+                countries=countries,
+                sources=sources,
+                user_ids=sorted(user_ids),
+                trigger=trigger,
+                status="running",
+            )
+            db.add(run)
+            await db.commit()
+            return run.id
+
+    async def _crawl(
+        self,
+        run_id: int,
+        query_key: str,
+        keywords: List[str],
+        countries: List[str],
+        sources: List[str],
+        limit: int,
+        crawl: _InflightCrawl,
+        inflight_key: Tuple[str, Tuple[str, ...]]
+    ) -> DiscoveryRun:
+        started = time.perf_counter()
+        async with self.session_factory() as db:
+            run = await db.get(DiscoveryRun, run_id)
+
+            try:
+                cursors = await self._load_cursors(db, query_key, sources)
+                await job_store.load_known_fingerprints(db)
+
+                result = await self.service.discover_jobs(
+                    sources=sources,
+                    keywords=keywords,
+                    countries=countries,
+                    limit=limit,
+                    fetch_details=True,
+                    cursors=cursors,
+                )
+                jobs = result["jobs"]
+                await self._prepare(jobs)
+                inserted, updated = await job_store.upsert_jobs(db, jobs)
+                await self._save_cursors(db, query_key, result["cursors"])
+
+                run.jobs_found = result["total_found"]
+                run.jobs_new = inserted
+                run.jobs_updated = updated
+                run.jobs_duplicate = result["duplicates"]
+                run.jobs_skipped = result["skipped"]
+                run.status = "completed"
+            except Exception as e:
+                print(f"Discovery run {run_id} failed: {e}")
+                await db.rollback()
+                run.status = "failed"
+                run.error_message = str(e)
+
+            # Stop accepting joiners before the final writes so no caller
+            # attaches after its search ids have been recorded
+            self._inflight.pop(inflight_key, None)
+
+            now = datetime.utcnow()
+            run.saved_search_ids = sorted(crawl.search_ids)
+            run.user_ids = sorted(crawl.user_ids)
+            run.finished_at = now
+            run.duration_ms = int((time.perf_counter() - started) * 1000)
+
+            if crawl.search_ids:
+                result = await db.execute(
+                    select(SavedSearch).where(SavedSearch.id.in_(crawl.search_ids))
+                )
+                for search in result.scalars().all():
+                    search.last_run_at = now
+                    search.last_run_id = run_id
+                    search.next_run_at = now + timedelta(minutes=search.interval_minutes or 360)
+
+            await db.commit()
+            await db.refresh(run)
+            return run
+
+
+# Singleton
+discovery_scheduler = DiscoveryScheduler()
@@ -0,0 +1,404 @@
+"""
+Email Linker - Matching Received Emails to Applications and Jobs
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Dict, Optional, Iterable
+from urllib.parse import urlsplit
+
+from sqlalchemy import select, update, func, bindparam, DateTime
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import AsyncSessionLocal
+
+from app.models.application import Application
+from app.models.email import Email, EmailType, EmailCategory
+from app.models.job import Job
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Legal-form words dropped when comparing company names
+COMPANY_SUFFIXES = frozenset({
+    "inc", "llc", "ltd", "limited", "corp", "corporation", "co", "company", "gmbh", "plc",
+    "ag", "sa", "bv", "pvt", "pte", "llp", "group", "holdings",
+})
+
+# Mailbox providers: the domain says nothing about the employer
+PERSONAL_DOMAINS = frozenset({
+    "gmail.com", "googlemail.com", "yahoo.com", "outlook.com", "hotmail.com", "live.com",
+    "icloud.com", "me.com", "aol.com", "proton.me", "protonmail.com", "zoho.com", "gmx.com",
+})
+
+# Applicant-tracking and job-board senders shared by many employers.
+# The employer is usually a subdomain or local part (acme@hire.lever.co).
+ATS_DOMAINS = frozenset({
+    "greenhouse.io", "greenhouse-mail.io", "lever.co", "myworkdayjobs.com", "myworkday.com",
+    "workday.com", "icims.com", "smartrecruiters.com", "ashbyhq.com", "jobvite.com", "bamboohr.com",
+    "taleo.net", "successfactors.com", "recruitee.com", "workable.com", "breezy.hr", "jazzhr.com",
+    "linkedin.com", "indeed.com", "indeedemail.com", "naukri.com", "glassdoor.com", "wellfound.com",
+})
+
+# Job boards send alert digests and newsletters naming many employers; mail
+# from them is only linked through a confirmation address or a thread.
+JOB_BOARD_DOMAINS = frozenset({
+    "linkedin.com", "indeed.com", "indeedemail.com", "naukri.com", "glassdoor.com", "wellfound.com",
+    "monster.com", "ziprecruiter.com", "foundit.in", "instahyre.com", "iimjobs.com", "hirist.com",
+})
+
+# Second-level labels under country TLDs (acme.co.uk)
+_SECOND_LEVEL = frozenset({"co", "com", "ac", "org", "net", "gov", "edu", "ne", "or"})
+# Local parts that never name an employer
+_GENERIC_LOCAL_PARTS = frozenset({
+    "no-reply", "noreply", "do-not-reply", "donotreply", "notifications", "notification", "jobs",
+    "careers", "recruiting", "talent", "hr", "hiring", "info", "mail", "support", "team", "apply",
+})
+
+# An employer's own domain also sends order mail, account alerts and
+# newsletters (auto-confirm@email.amazon.com, no-reply@accounts.google.com).
+# Matching by sender alone needs one of these recruiting signals:
+# words in the subject...
+RECRUITING_SUBJECT_WORDS = frozenset({
+    "application", "applications", "applying", "applied", "apply", "interview", "interviews",
+    "interviewing", "candidate", "candidacy", "position", "role", "opening", "vacancy", "opportunity",
+    "recruiter", "recruiting", "recruitment", "hiring", "assessment", "screening", "resume", "cv",
+    "shortlisted",
+})
+# ...or a sender that isn't a notification mailbox. Words of the local part
+# (split on punctuation): a recruiting word wins over a notification word.
+_RECRUITING_LOCAL_WORDS = frozenset({
+    "jobs", "job", "careers", "career", "recruiting", "recruitment", "recruiter", "recruiters",
+    "talent", "hr", "hiring", "hire", "apply", "applications", "people", "staffing",
+})
+_NOTIFICATION_LOCAL_WORDS = frozenset({
+    "noreply", "donotreply", "reply", "notifications", "notification", "notify", "alert", "alerts",
+    "news", "newsletter", "newsletters", "update", "updates", "digest", "account", "accounts",
+    "security", "billing", "invoice", "receipt", "receipts", "order", "orders", "shipment", "shipping",
+    "tracking", "confirm", "confirmation", "marketing", "promo", "promotions", "offers", "deals",
+    "messages", "mailer", "bounce", "info", "support", "hello", "team", "mail", "store",
+})
+
+# Subject words too common to be read as a one-word company name
+_SUBJECT_STOPWORDS = frozenset({
+    "re", "fwd", "fw", "your", "you", "the", "for", "and", "with", "from", "to", "at", "of", "on", "in",
+    "application", "applying", "applied", "interview", "role", "job", "position", "update", "thank",
+    "thanks", "next", "steps", "offer", "opportunity", "invitation", "received", "status", "team",
+})
+
+MAX_NAME_WORDS = 4
+
+
+def normalize_company(name: Optional[str]) -> str:
+    """"Acme, Inc." and "ACME inc" both become "acme\""""
+    words = WORD_RE.findall((name or "").lower())
+    while len(words) > 1 and words[-1] in COMPANY_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def registrable_domain(host: Optional[str]) -> Optional[str]:
+    """careers.acme.co.uk -> acme.co.uk; good enough without a public suffix list"""
+    labels = [label for label in (host or "").lower().strip(".").split(".") if label]
+    if len(labels) < 2:
+        return None
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in _SECOND_LEVEL:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def url_domain(url: Optional[str]) -> Optional[str]:
+    if not url:
+        return None
+    return registrable_domain(urlsplit(url if "//" in url else f"//{url}").hostname)
+
+
+def address_parts(address: Optional[str]):
+    """(local part, full host, registrable domain) of an address"""
+    local, _, host = (address or "").strip().lower().rpartition("@")
+    return local, host, registrable_domain(host)
+
+
+@dataclass
+class LinkCandidate:
+    """What a matched email gets linked to"""
+    application_id: Optional[int]
+    job_id: Optional[int]
+    title: str = ""  # normalized job title, for telling applications at one company apart
+    submitted_at: Optional[datetime] = None
+
+
+@dataclass
+class UserLinkIndex:
+    """Per-user hash indexes from email features to applications.
+
+    Built once per run from the user's applications and already-linked
+    emails, so matching an email is a handful of dict lookups instead of
+    a scan over every application.
+    """
+    by_confirmation: Dict[str, List[LinkCandidate]] = field(default_factory=dict)
+    by_domain: Dict[str, List[LinkCandidate]] = field(default_factory=dict)
+    by_company: Dict[str, List[LinkCandidate]] = field(default_factory=dict)
+    by_thread: Dict[str, LinkCandidate] = field(default_factory=dict)
+
+    def add(
+        self,
+        candidate: LinkCandidate,
+        company: Optional[str] = None,
+        urls: Iterable[Optional[str]] = (),
+        confirmation_email: Optional[str] = None
+    ) -> None:
+        if confirmation_email:
+            self.by_confirmation.setdefault(confirmation_email.strip().lower(), []).append(candidate)
+        for domain in {url_domain(url) for url in urls}:
+            if domain and domain not in ATS_DOMAINS and domain not in PERSONAL_DOMAINS:
+                self.by_domain.setdefault(domain, []).append(candidate)
+        name = normalize_company(company)
+        if name:
+            self.by_company.setdefault(name, []).append(candidate)
+            # "acme" also matches mail from acme.com and acme@hire.lever.co
+            compact = name.replace(" ", "")
+            if compact != name:
+                self.by_company.setdefault(compact, []).append(candidate)
+
+    def add_thread(self, thread_id: Optional[str], candidate: LinkCandidate) -> None:
+        if thread_id:
+            self.by_thread.setdefault(thread_id, candidate)
+
+    @staticmethod
+    def _pick(candidates: List[LinkCandidate], subject_text: str, strict: bool = False) -> Optional[LinkCandidate]:
+        """The candidate whose job title the subject mentions, else the latest application.
+
+        strict: give up instead of guessing when the title doesn't decide.
+        """
+        if len(candidates) > 1:
+            titled = [c for c in candidates if c.title and f" {c.title} " in subject_text]
+            if strict and len({c.application_id for c in titled}) != 1:
+                return None
+            candidates = titled or candidates
+        return max(candidates, key=lambda c: (c.submitted_at or datetime.min, c.application_id or 0))
+
+    @staticmethod
+    def _recruiting(
+        local: str,
+        subject_words: List[str],
+        subject_text: str,
+        candidates: List[LinkCandidate]
+    ) -> bool:
+        """Whether mail matched only by its sender looks like recruiting mail"""
+        local_words = set(WORD_RE.findall(local))
+        if not local_words.isdisjoint(_RECRUITING_LOCAL_WORDS) or local_words.isdisjoint(_NOTIFICATION_LOCAL_WORDS):
+            return True
+        if not RECRUITING_SUBJECT_WORDS.isdisjoint(subject_words):
+            return True
+        return any(c.title and f" {c.title} " in subject_text for c in candidates)
+
+    @staticmethod
+    def _sender_keys(local: str, host: str) -> Iterable[str]:
+        # Employer in the sender: acme.com, careers.acme.com, acme@greenhouse.io, acme.wd5.myworkdayjobs.com
+        for label in host.split(".")[:-1]:
+            yield label
+        if local not in _GENERIC_LOCAL_PARTS:
+            yield local.replace(".", "").replace("-", "").replace("_", "")
+
+    @staticmethod
+    def _subject_keys(subject_words: List[str]) -> Iterable[str]:
+        # Company names in the subject: every run of up to MAX_NAME_WORDS words
+        for size in range(MAX_NAME_WORDS, 1, -1):
+            for start in range(len(subject_words) - size + 1):
+                yield " ".join(subject_words[start:start + size])
+        for word in subject_words:
+            if len(word) > 2 and word not in _SUBJECT_STOPWORDS:
+                yield word
+
+    def match(
+        self,
+        from_address: Optional[str],
+        subject: Optional[str],
+        thread_id: Optional[str] = None,
+        reply_to: Optional[str] = None
+    ) -> Optional[LinkCandidate]:
+        """Best candidate for an email, or None; the strongest evidence wins"""
+        if thread_id and thread_id in self.by_thread:
+            return self.by_thread[thread_id]
+
+        subject_words = WORD_RE.findall((subject or "").lower())
+        subject_text = f" {' '.join(subject_words)} "
+        for address in (from_address, reply_to):
+            candidates = self.by_confirmation.get((address or "").strip().lower())
+            # An ATS no-reply address may serve several employers; only trust it when it is unambiguous
+            picked = self._pick(candidates, subject_text, strict=True) if candidates else None
+            if picked:
+                return picked
+            if candidates:
+                # ...or when the subject names one of the employers that used it
+                for key in self._subject_keys(subject_words):
+                    named = [c for c in self.by_company.get(key, ()) if c in candidates]
+                    if named:
+                        return self._pick(named, subject_text)
+
+        local, host, domain = address_parts(from_address)
+        if domain in JOB_BOARD_DOMAINS:
+            return None
+        candidates = self.by_domain.get(domain) if domain else None
+        if candidates and self._recruiting(local, subject_words, subject_text, candidates):
+            return self._pick(candidates, subject_text)
+
+        if domain not in PERSONAL_DOMAINS:
+            # A recruiter writing from gmail says nothing about the employer
+            for key in self._sender_keys(local, host):
+                candidates = self.by_company.get(key)
+                if candidates and self._recruiting(local, subject_words, subject_text, candidates):
+                    return self._pick(candidates, subject_text)
+        # A company named only in the subject could be any newsletter or digest;
+        # the job title applied for has to be there too
+        for key in self._subject_keys(subject_words):
+            titled = [c for c in self.by_company.get(key, ()) if c.title and f" {c.title} " in subject_text]
+            if titled:
+                return self._pick(titled, subject_text)
+        return None
+
+
+@dataclass
+class LinkStats:
+    scanned: int = 0
+    linked: int = 0
+    applications_responded: int = 0
+
+
+class EmailLinker:
+    """Sets job_id/application_id on received emails and records responses"""
+
+    def __init__(self, session_factory: Optional[async_sessionmaker] = None, batch_size: int = 1000):
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.batch_size = batch_size
+
+    async def build_index(self, db: AsyncSession, user_id: int) -> UserLinkIndex:
+        index = UserLinkIndex()
+        result = await db.execute(
+            select(
+                Application.id, Application.job_id, Application.confirmation_email, Application.submitted_at,
+                Application.created_at, Job.title, Job.company, Job.company_url, Job.apply_url, Job.source_url,
+            )
+            .outerjoin(Job, Job.id == Application.job_id)
+            .where(Application.user_id == user_id)
+        )
+        candidates: Dict[int, LinkCandidate] = {}
+        for row in result:
+            candidate = LinkCandidate(
+                application_id=row.id,
+                job_id=row.job_id,
+                title=" ".join(WORD_RE.findall((row.title or "").lower())),
+                submitted_at=row.submitted_at or row.created_at,
+            )
+            candidates[row.id] = candidate
+            index.add(candidate, row.company, (row.company_url, row.apply_url, row.source_url), row.confirmation_email)
+
+        # Replies in a thread already linked (including our own sent application) follow it
+        result = await db.execute(
+            select(Email.thread_id, Email.application_id, Email.job_id)
+            .where(
+                Email.user_id == user_id,
+                Email.thread_id.isnot(None),
+                (Email.application_id.isnot(None)) | (Email.job_id.isnot(None)),
+            )
+            .order_by(Email.id)
+        )
+        for row in result:
+            candidate = candidates.get(row.application_id) or LinkCandidate(row.application_id, row.job_id)
+            index.add_thread(row.thread_id, candidate)
+        return index
+
+    def unlinked_statement(self, user_id: int, after_id: int, since_uid: Optional[int] = None):
+        stmt = (
+            select(Email.id, Email.from_address, Email.reply_to, Email.subject, Email.thread_id, Email.received_at)
+            .where(
+                Email.user_id == user_id,
+                Email.email_type == EmailType.RECEIVED.value,
+                # NULL-safe: rows stored without a category are still linked
+                Email.category.is_distinct_from(EmailCategory.JOB_ALERT.value),
+                Email.application_id.is_(None),
+                Email.job_id.is_(None),
+                Email.id > after_id,
+            )
+            .order_by(Email.id)
+            .limit(self.batch_size)
+        )
+        if since_uid is not None:
+            stmt = stmt.where(Email.imap_uid > since_uid)
+        return stmt
+
+    async def link_user(self, db: AsyncSession, user_id: int, since_uid: Optional[int] = None) -> LinkStats:
+        """Link a user's unlinked received emails; since_uid limits it to a sync's new mail.
+
+        Without since_uid this is the backfill over the whole mailbox, in
+        primary-key batches. The caller commits.
+        """
+        stats = LinkStats()
+        index = await self.build_index(db, user_id)
+        if not (index.by_confirmation or index.by_domain or index.by_company or index.by_thread):
+            return stats
+
+        table = Email.__table__
+        link_stmt = (
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(job_id=bindparam("b_job_id"), application_id=bindparam("b_application_id"))
+        )
+        responses: Dict[int, datetime] = {}
+        after_id = 0
+        while True:
+            rows = (await db.execute(self.unlinked_statement(user_id, after_id, since_uid))).all()
+            if not rows:
+                break
+            after_id = rows[-1].id
+            stats.scanned += len(rows)
+            links = []
+            for row in rows:
+                candidate = index.match(row.from_address, row.subject, row.thread_id, row.reply_to)
+                if candidate is None:
+                    continue
+                links.append({"b_id": row.id, "b_job_id": candidate.job_id, "b_application_id": candidate.application_id})
+                index.add_thread(row.thread_id, candidate)
+                received = row.received_at
+                if candidate.application_id and received and (
+                    candidate.submitted_at is None or received >= candidate.submitted_at
+                ):
+                    earliest = responses.get(candidate.application_id)
+                    responses[candidate.application_id] = min(earliest, received) if earliest else received
+            if links:
+                await db.execute(link_stmt, links)
+                stats.linked += len(links)
+            if len(rows) < self.batch_size:
+                break
+
+        if responses:
+            app_table = Application.__table__
+            response_date = bindparam("b_response_date", type_=DateTime)
+            await db.execute(
+                update(app_table)
+                .where(app_table.c.id == bindparam("b_id"))
+                .values(
+                    response_received=True,
+                    # LEAST skips NULL, so the first response date sticks
+                    response_date=func.least(app_table.c.response_date, response_date),
+                    updated_at=datetime.utcnow(),
+                ),
+                [{"b_id": app_id, "b_response_date": date} for app_id, date in sorted(responses.items())],
+            )
+            stats.applications_responded = len(responses)
+        return stats
+
+
+    async def backfill_user(self, user_id: int) -> LinkStats:
+        """Link a whole mailbox in its own session; run as a background task"""
+        async with self.session_factory() as db:
+            stats = await self.link_user(db, user_id)
+            await db.commit()
+        print(f"Email linking for user {user_id}: {stats.linked}/{stats.scanned} emails linked, "
+              f"{stats.applications_responded} applications with responses")
+        return stats
+
+
+# Singleton
+email_linker = EmailLinker()
@@ -0,0 +1,259 @@
+"""
+Email Outbox - Durable Delivery of Queued Emails
+"""
+
+import asyncio
+import random
+from datetime import datetime, timedelta
+from email.utils import make_msgid
+from typing import List, Dict, Any, Optional
+
+import aiosmtplib
+from sqlalchemy import select, update, or_, and_, bindparam
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.email import Email, EmailStatus
+from app.services.email_service import EmailService, email_service
+from app.services.email_tracking import tracked_html, tracking_signer
+
+# Longest wait between two attempts of the same email
+MAX_RETRY_DELAY_SECONDS = 3600
+
+
+def retry_delay(retry_count: int, base: Optional[int] = None) -> float:
+    """Exponential backoff with jitter for the retry_count-th failure"""
+    base = base or settings.OUTBOX_RETRY_BASE_SECONDS
+    delay = min(base * 2 ** retry_count, MAX_RETRY_DELAY_SECONDS)
+    # Up to 10% jitter so a provider outage doesn't retry everything in lockstep
+    return delay + random.uniform(0, delay / 10)
+
+
+def is_permanent(error: Exception) -> bool:
+    """5xx replies won't succeed on retry; timeouts, 4xx and dropped connections might"""
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return all(refused.code >= 500 for refused in error.recipients)
+    if isinstance(error, aiosmtplib.SMTPResponseException):
+        return error.code >= 500
+    return False
+
+
+class EmailOutbox:
+    """Sends QUEUED emails in batches claimed with SELECT ... FOR UPDATE SKIP LOCKED.
+
+    Claiming flips rows to SENDING with a locked_at lease in the same
+    statement, so any number of workers (processes or hosts) can poll the
+    table without sending a row twice; a worker that dies mid-batch only
+    delays its rows until the lease expires. Each row gets its Message-ID
+    before the first attempt, so a retry after an unacknowledged send can
+    be de-duplicated by the receiving server.
+    """
+
+    def __init__(
+        self,
+        service: Optional[EmailService] = None,
+        session_factory: Optional[async_sessionmaker] = None,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        poll_seconds: Optional[float] = None
+    ):
+        self.service = service or email_service
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.concurrency = concurrency or settings.OUTBOX_CONCURRENCY
+        self.poll_seconds = poll_seconds or settings.OUTBOX_POLL_SECONDS
+        self.lease = timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+        self.max_retries = settings.OUTBOX_MAX_RETRIES
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    # Lifecycle -----------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the polling loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def wake(self) -> None:
+        """Poll now instead of at the next tick; called after queueing an email"""
+        self._wake.set()
+
+    async def _loop(self) -> None:
+        while True:
+            claimed = 0
+            try:
+                claimed = await self.run_once()
+            except Exception as e:
+                print(f"Email outbox error: {e}")
+            if claimed < self.batch_size:
+                # A full batch means more is probably waiting; otherwise idle until woken
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+
+    # Delivery ------------------------------------------------------------
+
+    async def run_once(self) -> int:
+        """Claim, send and record one batch; returns the number of emails claimed"""
+        locked_at = datetime.utcnow()
+        emails, parents = await self.claim(locked_at)
+        if not emails:
+            return 0
+        outcomes = await self.send_batch(emails, parents)
+        await self.record(outcomes, locked_at)
+        return len(emails)
+
+    def claim_statement(self, now: datetime):
+        """UPDATE ... RETURNING over due rows locked with SKIP LOCKED"""
+        due = (
+            select(Email.id)
+            .where(or_(
+                and_(
+                    Email.status == EmailStatus.QUEUED.value,
+                    or_(Email.scheduled_at.is_(None), Email.scheduled_at <= now),
+                ),
+                # A worker died holding these; its lease has run out
+                and_(Email.status == EmailStatus.SENDING.value, Email.locked_at < now - self.lease),
+            ))
+            .order_by(Email.scheduled_at.nulls_first(), Email.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        return (
+            update(Email)
+            .where(Email.id.in_(due.scalar_subquery()))
+            .values(status=EmailStatus.SENDING.value, locked_at=now)
+            .returning(Email)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def claim(self, now: datetime):
+        """Lease a batch of due emails; returns (emails, parent Message-IDs by email id)"""
+        async with self.session_factory() as db:
+            emails = list((await db.scalars(self.claim_statement(now))).all())
+            domain = (self.service.smtp_user or "").rpartition("@")[2] or None
+            for email in emails:
+                if not email.message_id:
+                    email.message_id = make_msgid(domain=domain)
+
+            parent_ids = {email.in_reply_to_id for email in emails if email.in_reply_to_id}
+            parents: Dict[int, str] = {}
+            if parent_ids:
+                rows = await db.execute(
+                    select(Email.id, Email.message_id).where(Email.id.in_(parent_ids))
+                )
+                parents = {row.id: row.message_id for row in rows if row.message_id}
+            await db.commit()
+        return emails, parents
+
+    def build_message(self, email: Email, parents: Dict[int, str]):
+        headers = {"Message-ID": email.message_id}
+        parent = email.in_reply_to or parents.get(email.in_reply_to_id)
+        if parent:
+            headers["In-Reply-To"] = parent
+            headers["References"] = " ".join(email.message_references or [parent])
+        if email.reply_to:
+            headers["Reply-To"] = email.reply_to
+        body = email.body_html or email.body_text or ""
+        if email.body_html and settings.TRACKING_BASE_URL:
+            body = tracked_html(body, email.id, settings.TRACKING_BASE_URL, tracking_signer)
+        return self.service.build_message(
+            to_addresses=email.to_addresses or [],
+            subject=email.subject,
+            body=body,
+            is_html=bool(email.body_html),
+            cc_addresses=email.cc_addresses or None,
+            from_address=email.from_address,
+            headers=headers,
+        )
+
+    async def send_batch(
+        self,
+        emails: List[Email],
+        parents: Optional[Dict[int, str]] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Send claimed emails concurrently; returns row updates grouped by outcome"""
+        parents = parents or {}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        outcomes: Dict[str, List[Dict[str, Any]]] = {"sent": [], "retry": [], "failed": []}
+
+        async def deliver(email: Email):
+            recipients = (email.to_addresses or []) + (email.cc_addresses or []) + (email.bcc_addresses or [])
+            async with semaphore:
+                try:
+                    await self.service.smtp_pool.send(self.build_message(email, parents), recipients=recipients)
+                except Exception as e:
+                    attempts = (email.retry_count or 0) + 1
+                    if is_permanent(e) or attempts > self.max_retries:
+                        outcomes["failed"].append({
+                            "b_id": email.id, "b_retry_count": attempts, "b_error_message": str(e),
+                        })
+                    else:
+                        outcomes["retry"].append({
+                            "b_id": email.id, "b_retry_count": attempts, "b_error_message": str(e),
+                            "b_scheduled_at": datetime.utcnow() + timedelta(seconds=retry_delay(attempts - 1)),
+                        })
+                    return
+            outcomes["sent"].append({"b_id": email.id, "b_sent_at": datetime.utcnow()})
+
+        await asyncio.gather(*(deliver(email) for email in emails))
+        self.sent += len(outcomes["sent"])
+        self.retried += len(outcomes["retry"])
+        self.failed += len(outcomes["failed"])
+        return outcomes
+
+    async def record(self, outcomes: Dict[str, List[Dict[str, Any]]], locked_at: datetime) -> None:
+        """Write outcomes back, only for rows this worker still holds the lease on
+
+        Row keys carry a b_ prefix because bind names may not shadow the
+        columns being SET.
+        """
+        values = {
+            "sent": {"status": EmailStatus.SENT.value, "error_message": None},
+            "retry": {"status": EmailStatus.QUEUED.value},
+            "failed": {"status": EmailStatus.FAILED.value},
+        }
+        table = Email.__table__
+        async with self.session_factory() as db:
+            for outcome, rows in outcomes.items():
+                if not rows:
+                    continue
+                columns = {key[2:]: bindparam(key) for key in rows[0] if key != "b_id"}
+                stmt = (
+                    update(table)
+                    .where(
+                        table.c.id == bindparam("b_id"),
+                        table.c.status == EmailStatus.SENDING.value,
+                        table.c.locked_at == locked_at,
+                    )
+                    .values(locked_at=None, updated_at=datetime.utcnow(), **values[outcome], **columns)
+                )
+                await db.execute(stmt, rows)
+            await db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+
+# Singleton
+email_outbox = EmailOutbox()
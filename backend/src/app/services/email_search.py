@@ -0,0 +1,421 @@
+"""
+Email Search - Full-Text Inbox Search with Ranked Snippets
+"""
+
+import asyncio
+import heapq
+import html
+import math
+import re
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple, Set
+
+from sqlalchemy import select, update, func, cast, literal_column, bindparam, Text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.email import Email
+
+# Typed literal: to_tsvector(unknown, unknown) is ambiguous with the json overloads
+TS_CONFIG = literal_column("'english'::regconfig")
+QUERY_TERM_RE = re.compile(r'(-?)"([^"]*)"|(-?)(\S+)')
+WORD_RE = re.compile(r"\w+")
+TAG_RE = re.compile(r"<[^>]+>")
+
+# ts_rank's default weights for setweight labels A, B and C
+FIELD_WEIGHTS = {"subject": 1.0, "from": 0.4, "body": 0.2}
+
+
+@dataclass
+class QueryTerm:
+    words: List[str]
+    prefix: bool = False
+    negate: bool = False
+
+
+@dataclass
+class ParsedQuery:
+    terms: List[QueryTerm] = field(default_factory=list)
+
+    @property
+    def positive(self) -> List[QueryTerm]:
+        return [term for term in self.terms if not term.negate]
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return WORD_RE.findall(text.lower()) if text else []
+
+
+def parse_query(q: str) -> ParsedQuery:
+    """Words are ANDed; "quoted phrases" match adjacent words, word* is a prefix, -term excludes"""
+    parsed = ParsedQuery()
+    for match in QUERY_TERM_RE.finditer(q or ""):
+        if match.group(2) is not None:
+            words = tokenize(match.group(2))
+            if words:
+                parsed.terms.append(QueryTerm(words=words, negate=bool(match.group(1))))
+            continue
+        raw = match.group(4)
+        words = tokenize(raw)
+        if not words:
+            continue
+        prefix = raw.endswith("*") and len(words) == 1
+        # "job-board" or "c++" tokenize to several words; keep them adjacent
+        parsed.terms.append(QueryTerm(words=words, prefix=prefix, negate=bool(match.group(3))))
+    return parsed
+
+
+def to_tsquery_text(parsed: ParsedQuery) -> str:
+    """The parsed query in to_tsquery syntax; only \\w characters reach Postgres"""
+    parts = []
+    for term in parsed.terms:
+        text = " <-> ".join(term.words)
+        if term.prefix:
+            text += ":*"
+        if len(term.words) > 1:
+            text = f"({text})"
+        parts.append(f"!{text}" if term.negate else text)
+    return " & ".join(parts)
+
+
+def plain_text(body_text: Optional[str], body_html: Optional[str]) -> str:
+    if body_text:
+        return body_text
+    return html.unescape(TAG_RE.sub(" ", body_html or ""))
+
+
+def search_vector_expr(subject: Any, body: Any, from_address: Any):
+    """tsvector with subject weighted A, sender B and body C.
+
+    Arguments may be Python values or column expressions, so the same
+    expression serves ORM inserts, executemany updates and backfills.
+    """
+    def part(value, weight):
+        text = cast(func.coalesce(value, ""), Text)
+        return func.setweight(func.to_tsvector(TS_CONFIG, text), literal_column(f"'{weight}'"))
+
+    return part(subject, "A").op("||")(part(from_address, "B")).op("||")(part(body, "C"))
+
+
+def make_snippet(text: str, parsed: ParsedQuery, width: int = 160) -> str:
+    """A window of text around the first match, HTML-escaped, matches in <b>"""
+    text = " ".join((text or "").split())
+    words = {word for term in parsed.positive for word in term.words}
+    prefixes = tuple(term.words[-1] for term in parsed.positive if term.prefix)
+
+    def is_match(word: str) -> bool:
+        word = word.lower()
+        return word in words or (bool(prefixes) and word.startswith(prefixes))
+
+    matches = [m for m in WORD_RE.finditer(text) if is_match(m.group())]
+    start = max(0, matches[0].start() - width // 3) if matches else 0
+    end = min(len(text), start + width)
+    # Don't cut words at either edge
+    if start:
+        start = text.find(" ", start) + 1 or start
+    cut = text.rfind(" ", start, end) if end < len(text) else -1
+    if cut > start:
+        end = cut
+
+    out, cursor = [], start
+    for match in matches:
+        if match.start() < start or match.end() > end:
+            continue
+        out.append(html.escape(text[cursor:match.start()]))
+        out.append(f"<b>{html.escape(match.group())}</b>")
+        cursor = match.end()
+    out.append(html.escape(text[cursor:end]))
+    return ("… " if start else "") + "".join(out) + (" …" if end < len(text) else "")
+
+
+class InMemoryEmailIndex:
+    """Positional inverted index with the same query semantics as the tsvector path.
+
+    For local development without Postgres full-text search: no stemming
+    or stop words, ranked by field-weighted tf-idf.
+    """
+
+    def __init__(self):
+        # token -> email id -> field -> positions
+        self.postings: Dict[str, Dict[int, Dict[str, List[int]]]] = {}
+        self.docs: Dict[int, Dict[str, Any]] = {}
+        # (field, value) -> email ids, for user_id and the search filters
+        self.facets: Dict[Tuple[str, Any], Set[int]] = {}
+        self._vocabulary: List[str] = []
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add(self, email: Any) -> None:
+        if email.id in self.docs:
+            self.remove(email.id)
+        fields = {
+            "subject": tokenize(email.subject),
+            "from": tokenize(email.from_address),
+            "body": tokenize(plain_text(email.body_text, email.body_html)),
+        }
+        local: Dict[str, Dict[str, List[int]]] = {}
+        for name, tokens in fields.items():
+            for position, token in enumerate(tokens):
+                local.setdefault(token, {}).setdefault(name, []).append(position)
+        for token, positions in local.items():
+            doc_postings = self.postings.get(token)
+            if doc_postings is None:
+                doc_postings = self.postings[token] = {}
+                self._dirty = True
+            doc_postings[email.id] = positions
+        facets = {
+            "user_id": email.user_id,
+            "category": email.category,
+            "job_id": email.job_id,
+            "email_type": email.email_type,
+        }
+        for facet in facets.items():
+            self.facets.setdefault(facet, set()).add(email.id)
+        self.docs[email.id] = {"facets": facets, "tokens": list(local)}
+
+    def remove(self, email_id: int) -> None:
+        doc = self.docs.pop(email_id, None)
+        if doc is None:
+            return
+        for token in doc["tokens"]:
+            self.postings.get(token, {}).pop(email_id, None)
+        for facet in doc["facets"].items():
+            self.facets.get(facet, set()).discard(email_id)
+
+    def _expand(self, prefix: str) -> List[str]:
+        if self._dirty:
+            self._vocabulary = sorted(self.postings)
+            self._dirty = False
+        index = bisect_left(self._vocabulary, prefix)
+        words = []
+        while index < len(self._vocabulary) and self._vocabulary[index].startswith(prefix):
+            words.append(self._vocabulary[index])
+            index += 1
+        return words
+
+    def _term_scores(self, term: QueryTerm, candidates: Optional[Set[int]] = None) -> Dict[int, float]:
+        """email id -> field-weighted term frequency, for emails matching the term"""
+        last_words = self._expand(term.words[-1]) if term.prefix else [term.words[-1]]
+        scores: Dict[int, float] = {}
+        for last in last_words:
+            words = term.words[:-1] + [last]
+            first = self.postings.get(words[0], {})
+            if candidates is not None and len(candidates) < len(first):
+                docs = ((doc_id, first[doc_id]) for doc_id in candidates if doc_id in first)
+            else:
+                docs = first.items()
+            for doc_id, fields in docs:
+                if candidates is not None and doc_id not in candidates:
+                    continue
+                if len(words) == 1:
+                    counts = {name: len(positions) for name, positions in fields.items()}
+                else:
+                    rest = [self.postings.get(word, {}).get(doc_id) for word in words[1:]]
+                    if not all(rest):
+                        continue
+                    counts = {}
+                    for name, positions in fields.items():
+                        following = [set(r.get(name, ())) for r in rest]
+                        count = sum(
+                            1 for position in positions
+                            if all(position + k in f for k, f in enumerate(following, start=1))
+                        )
+                        if count:
+                            counts[name] = count
+                    if not counts:
+                        continue
+                score = sum(FIELD_WEIGHTS[name] * (1 + math.log(count)) for name, count in counts.items())
+                scores[doc_id] = scores.get(doc_id, 0.0) + score
+        return scores
+
+    def search(
+        self,
+        user_id: int,
+        parsed: ParsedQuery,
+        filters: Optional[Dict[str, Any]] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> List[Tuple[int, float]]:
+        """(email id, score) for the best matches, highest score first"""
+        filters = {key: value for key, value in (filters or {}).items() if value is not None}
+        # Rarest term first so later terms only look at its matches
+        positive = sorted(parsed.positive, key=lambda t: len(self.postings.get(t.words[0], ())))
+        if not positive:
+            return []
+
+        # The user's emails narrowed by each filter, smallest set first
+        facet_sets = sorted(
+            (self.facets.get(facet, set()) for facet in [("user_id", user_id), *filters.items()]), key=len
+        )
+        candidates = set(facet_sets[0]).intersection(*facet_sets[1:])
+
+        scores: Optional[Dict[int, float]] = None
+        total = max(len(self.docs), 1)
+        for term in positive:
+            term_scores = self._term_scores(term, candidates if scores is None else set(scores))
+            idf = math.log(1 + total / max(len(self.postings.get(term.words[0], ())), 1))
+            scores = {
+                doc_id: (0.0 if scores is None else scores[doc_id]) + idf * score
+                for doc_id, score in term_scores.items()
+            }
+            if not scores:
+                return []
+
+        for term in parsed.terms:
+            if term.negate:
+                for doc_id in self._term_scores(term, set(scores)):
+                    del scores[doc_id]
+
+        best = heapq.nsmallest(skip + limit, scores.items(), key=lambda item: (-item[1], -item[0]))
+        return best[skip:]
+
+
+class EmailSearch:
+    """Searches a user's emails through the GIN-indexed tsvector, or in memory"""
+
+    def __init__(self, backend: Optional[str] = None, session_factory: Optional[async_sessionmaker] = None):
+        self.backend = backend or settings.EMAIL_SEARCH_BACKEND
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.index = InMemoryEmailIndex()
+        self._loaded: Set[int] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    # Lifecycle -----------------------------------------------------------
+
+    def start(self) -> None:
+        """Backfill search_vector once on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self, user_id: Optional[int] = None) -> int:
+        try:
+            async with self.session_factory() as db:
+                total = await self.reindex_missing(db, user_id=user_id)
+        except Exception as e:
+            print(f"Email search reindex error: {e}")
+            return 0
+        if total:
+            print(f"Email search: indexed {total} emails")
+        return total
+
+    def statement(
+        self,
+        user_id: int,
+        parsed: ParsedQuery,
+        filters: Optional[Dict[str, Any]] = None,
+        skip: int = 0,
+        limit: int = 20
+    ):
+        query = func.to_tsquery(TS_CONFIG, cast(to_tsquery_text(parsed), Text))
+        rank = func.ts_rank_cd(Email.search_vector, query).label("rank")
+        stmt = select(Email, rank).where(Email.user_id == user_id, Email.search_vector.op("@@")(query))
+        for key, value in (filters or {}).items():
+            if value is not None:
+                stmt = stmt.where(getattr(Email, key) == value)
+        return stmt.order_by(rank.desc(), Email.id.desc()).offset(skip).limit(limit)
+
+    async def search(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        q: str,
+        filters: Optional[Dict[str, Any]] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> List[Tuple[Email, float, str]]:
+        """(email, rank, snippet) best first"""
+        parsed = parse_query(q)
+        if not parsed.positive:
+            return []
+
+        if self.backend == "memory":
+            if user_id not in self._loaded:
+                for email in (await db.scalars(select(Email).where(Email.user_id == user_id))).all():
+                    self.index.add(email)
+                self._loaded.add(user_id)
+            hits = self.index.search(user_id, parsed, filters, skip, limit)
+            emails = {
+                email.id: email
+                for email in (await db.scalars(select(Email).where(Email.id.in_([i for i, _ in hits])))).all()
+            } if hits else {}
+            ranked = [(emails[i], score) for i, score in hits if i in emails]
+        else:
+            ranked = [(row.Email, row.rank) for row in await db.execute(self.statement(user_id, parsed, filters, skip, limit))]
+
+        # Snippets for one page are cheap in Python and match both backends
+        return [
+            (email, rank, make_snippet(plain_text(email.body_text, email.body_html) or email.subject, parsed))
+            for email, rank in ranked
+        ]
+
+    def indexed(self, email: Email) -> None:
+        """Keep the in-memory index current after an API write"""
+        if self.backend == "memory" and email.user_id in self._loaded:
+            self.index.add(email)
+
+    def removed(self, email_id: int) -> None:
+        """Drop a deleted email from the in-memory index"""
+        if self.backend == "memory":
+            self.index.remove(email_id)
+
+    def invalidate(self, user_id: int) -> None:
+        """Reload a user's emails on their next search, after writes made in bulk"""
+        if self.backend == "memory" and user_id in self._loaded:
+            for email_id in list(self.index.facets.get(("user_id", user_id), ())):
+                self.index.remove(email_id)
+            self._loaded.discard(user_id)
+
+    async def reindex_missing(self, db: AsyncSession, batch_size: int = 1000, user_id: Optional[int] = None) -> int:
+        """Fill search_vector for rows written before it existed; returns rows updated.
+
+        Bodies are stored compressed, so their text is extracted here and
+        sent back as a parameter rather than read in SQL.
+        """
+        table = Email.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(search_vector=search_vector_expr(
+                bindparam("b_subject"), bindparam("b_search_text"), bindparam("b_from_address")
+            ))
+        )
+        pending = select(Email.id, Email.subject, Email.body_text, Email.body_html, Email.from_address).where(
+            Email.search_vector.is_(None)
+        )
+        if user_id is not None:
+            pending = pending.where(Email.user_id == user_id)
+        total = 0
+        while True:
+            result = await db.execute(pending.limit(batch_size))
+            rows = [
+                {
+                    "b_id": row.id,
+                    "b_subject": row.subject,
+                    "b_search_text": plain_text(row.body_text, row.body_html),
+                    "b_from_address": row.from_address,
+                }
+                for row in result
+            ]
+            if rows:
+                await db.execute(stmt, rows)
+            await db.commit()
+            total += len(rows)
+            if len(rows) < batch_size:
+                return total
+
+
+# Singleton
+email_search = EmailSearch()
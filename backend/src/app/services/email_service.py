@@ -3,22 +3,241 @@ Email Service - SMTP/IMAP Integration
 """
 
 import asyncio
-from typing import List, Optional
+import socket
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Any, AsyncIterator
+from email.message import Message
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
 import aiosmtplib
 from app.core.config import settings
+from app.services.mail_template import APPLICATION_SUBJECT, APPLICATION_BODY, REFERRAL_SUBJECT, REFERRAL_BODY
+from app.services.render_cache import render_cache
+from app.services.resume_builder import DEFAULT_THEME_COLOR
+
+
+# Connection-level failures: the message wasn't accepted, a fresh connection may work
+RECONNECT_ERRORS = (
+    aiosmtplib.SMTPServerDisconnected,
+    aiosmtplib.SMTPConnectError,
+    aiosmtplib.SMTPTimeoutError,
+    ConnectionError,
+    asyncio.TimeoutError,
+)
+
+
+def attachment_part(filename: str, content: bytes, mimetype: str = "application/pdf") -> MIMEApplication:
+    """A base64-encoded attachment part; encoding happens here, once"""
+    part = MIMEApplication(content, Name=filename)
+    part['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return part
+
+
+@dataclass
+class _PooledConnection:
+    client: aiosmtplib.SMTP
+    messages: int = 0
+    last_used: float = 0.0
+
+
+class SMTPConnectionPool:
+    """A few long-lived, authenticated SMTP sessions shared by all sends.
+
+    Connect + EHLO + STARTTLS + AUTH is paid once per connection instead
+    of once per message. Connections idle longer than noop_after are
+    checked with NOOP before reuse, and each one is retired (QUIT) after
+    max_messages so providers' per-session limits are never hit.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        start_tls: Optional[bool] = True,
+        size: Optional[int] = None,
+        max_messages: Optional[int] = None,
+        noop_after: Optional[float] = None,
+        timeout: float = 30.0
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username or None
+        self.password = password or None
+        self.start_tls = start_tls
+        self.size = size or settings.SMTP_POOL_SIZE
+        self.max_messages = max_messages or settings.SMTP_MAX_MESSAGES_PER_CONNECTION
+        self.noop_after = settings.SMTP_NOOP_AFTER_SECONDS if noop_after is None else noop_after
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(self.size)
+        self._idle: List[_PooledConnection] = []
+        self._local_hostname: Optional[str] = None
+        self.connections_opened = 0
+        self.messages_sent = 0
+        self.reconnects = 0
+        self.noop_checks = 0
+
+    async def _connect(self) -> _PooledConnection:
+        if self._local_hostname is None:
+            # aiosmtplib would call getfqdn() on the event loop for every connect
+            self._local_hostname = await asyncio.to_thread(socket.getfqdn)
+        client = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            start_tls=self.start_tls,
+            local_hostname=self._local_hostname,
+            timeout=self.timeout,
+        )
+        await client.connect()
+        self.connections_opened += 1
+        return _PooledConnection(client=client, last_used=time.monotonic())
+
+    async def _healthy(self, conn: _PooledConnection) -> bool:
+        if not conn.client.is_connected:
+            return False
+        if time.monotonic() - conn.last_used < self.noop_after:
+            return True
+        self.noop_checks += 1
+        try:
+            await conn.client.noop()
+            return True
+        except Exception:
+            return False
+
+    async def _discard(self, conn: _PooledConnection, quit: bool = False) -> None:
+        try:
+            if quit and conn.client.is_connected:
+                await conn.client.quit()
+            else:
+                conn.client.close()
+        except Exception:
+            conn.client.close()
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[_PooledConnection]:
+        """A healthy connection, returned to the pool (or retired) afterwards"""
+        async with self._slots:
+            conn = None
+            while self._idle and conn is None:
+                # LIFO: the most recently used connection is the least likely to be stale
+                candidate = self._idle.pop()
+                if await self._healthy(candidate):
+                    conn = candidate
+                else:
+                    await self._discard(candidate)
+            if conn is None:
+                conn = await self._connect()
+
+            try:
+                yield conn
+            except (aiosmtplib.SMTPResponseException, aiosmtplib.SMTPRecipientsRefused):
+                # The server refused this message; aiosmtplib has already
+                # RSET the envelope, so the session itself is still good
+                if conn.client.is_connected:
+                    self._idle.append(conn)
+                raise
+            except BaseException:
+                # Dropped connection, cancellation mid-command: state unknown
+                await self._discard(conn)
+                raise
+            else:
+                conn.messages += 1
+                conn.last_used = time.monotonic()
+                if conn.messages >= self.max_messages:
+                    await self._discard(conn, quit=True)
+                else:
+                    self._idle.append(conn)
+
+    async def send(self, message: Message, recipients: Optional[List[str]] = None) -> None:
+        """Send one message, retrying once on a fresh connection if the old one died"""
+        for attempt in range(2):
+            try:
+                async with self.connection() as conn:
+                    await conn.client.send_message(message, recipients=recipients)
+                self.messages_sent += 1
+                return
+            except RECONNECT_ERRORS:
+                if attempt:
+                    raise
+                self.reconnects += 1
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            await self._discard(conn, quit=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "connections_opened": self.connections_opened,
+            "messages_sent": self.messages_sent,
+            "reconnects": self.reconnects,
+            "noop_checks": self.noop_checks,
+        }
 
 
 class EmailService:
     """Service for sending and receiving emails"""
     
-    def __init__(self):
+    def __init__(self, smtp_pool: Optional[SMTPConnectionPool] = None):
         self.smtp_host = settings.SMTP_HOST
         self.smtp_port = settings.SMTP_PORT
         self.smtp_user = settings.SMTP_USER
         self.smtp_password = settings.SMTP_PASSWORD
+        self.smtp_pool = smtp_pool or SMTPConnectionPool(
+            hostname=self.smtp_host,
+            port=self.smtp_port,
+            username=self.smtp_user,
+            password=self.smtp_password,
+            start_tls=settings.SMTP_START_TLS,
+        )
+    
+    def build_message(
+        self,
+        to_addresses: List[str],
+        subject: str,
+        body: str,
+        is_html: bool = False,
+        cc_addresses: Optional[List[str]] = None,
+        attachments: Optional[List[tuple]] = None,  # [(filename, content, mimetype)]
+        from_address: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        parts: Optional[List[Message]] = None
+    ) -> Message:
+        """Assemble the MIME message send_email delivers.
+
+        `parts` are prebuilt attachment parts (see attachment_part), attached
+        as they are so a bulk send encodes a shared file only once.
+        """
+        parts = [attachment_part(*attachment) for attachment in attachments or []] + list(parts or [])
+        if parts:
+            message = MIMEMultipart()
+            if is_html:
+                message.attach(MIMEText(body, 'html'))
+            else:
+                message.attach(MIMEText(body, 'plain'))
+            
+            for part in parts:
+                message.attach(part)
+        else:
+            message = MIMEText(body, 'html' if is_html else 'plain')
+        
+        message['From'] = from_address or self.smtp_user
+        message['To'] = ', '.join(to_addresses)
+        message['Subject'] = subject
+        
+        if cc_addresses:
+            message['Cc'] = ', '.join(cc_addresses)
+        for name, value in (headers or {}).items():
+            message[name] = value
+        return message
     
     async def send_email(
         self,
@@ -29,47 +248,20 @@ class EmailService:
         cc_addresses: Optional[List[str]] = None,
         attachments: Optional[List[tuple]] = None  # [(filename, content, mimetype)]
     ) -> bool:
-        """Send an email via SMTP"""
+        """Send an email via SMTP over a pooled connection"""
         try:
-            # Create message
-            if attachments:
-                message = MIMEMultipart()
-                if is_html:
-                    message.attach(MIMEText(body, 'html'))
-                else:
-                    message.attach(MIMEText(body, 'plain'))
-                
-                for filename, content, mimetype in attachments:
-                    part = MIMEApplication(content, Name=filename)
-                    part['Content-Disposition'] = f'attachment; filename="{filename}"'
-                    message.attach(part)
-            else:
-                message = MIMEText(body, 'html' if is_html else 'plain')
-            
-            message['From'] = self.smtp_user
-            message['To'] = ', '.join(to_addresses)
-            message['Subject'] = subject
-            
-            if cc_addresses:
-                message['Cc'] = ', '.join(cc_addresses)
-            
-            # Send
+            message = self.build_message(to_addresses, subject, body, is_html, cc_addresses, attachments)
             all_recipients = to_addresses + (cc_addresses or [])
-            
-            await aiosmtplib.send(
-                message,
-                hostname=self.smtp_host,
-                port=self.smtp_port,
-                username=self.smtp_user,
-                password=self.smtp_password,
-                start_tls=True,
-            )
-            
+            await self.smtp_pool.send(message, recipients=all_recipients)
             return True
         except Exception as e:
             print(f"Email send error: {e}")
             return False
     
+    async def aclose(self) -> None:
+        """QUIT pooled SMTP connections; called from the lifespan on shutdown"""
+        await self.smtp_pool.close()
+    
     async def send_job_application_email(
         self,
         to_address: str,
@@ -77,25 +269,21 @@ class EmailService:
         company: str,
         candidate_name: str,
         cover_letter: str,
-        resume_pdf: bytes
+        resume_pdf: Optional[bytes] = None,
+        resume_content: Optional[Dict[str, Any]] = None,
+        theme_color: str = DEFAULT_THEME_COLOR
     ) -> bool:
-        """Send a job application email with resume attachment"""
-        subject = f"Application for {job_title} - {candidate_name}"
-        
-        body = f"""
-        <html>
-        <body>
-        <p>Dear Hiring Manager,</p>
-        
-        <p>{cover_letter.replace(chr(10), '<br>')}</p>
-        
-        <p>I have attached my resume for your review.</p>
-        
-        <p>Best regards,<br>
-        {candidate_name}</p>
-        </body>
-        </html>
+        """Send a job application email with resume attachment.
+
+        Pass resume_content instead of resume_pdf to attach the compact PDF
+        rendering, which keeps the MIME payload small.
         """
+        if resume_pdf is None:
+            resume_pdf = await render_cache.get_or_render_attachment(resume_content, theme_color)
+        
+        variables = {"job_title": job_title, "candidate_name": candidate_name, "cover_letter": cover_letter}
+        subject = APPLICATION_SUBJECT.render(variables)
+        body = APPLICATION_BODY.render(variables)
         
         return await self.send_email(
             to_addresses=[to_address],
@@ -115,22 +303,9 @@ class EmailService:
         candidate_name: str
     ) -> bool:
         """Send a referral request email"""
-        subject = f"Referral Request from {candidate_name}"
-        
-        body = f"""
-        <html>
-        <body>
-        <p>Hi {connection_name},</p>
-        
-        <p>{message.replace(chr(10), '<br>')}</p>
-        
-        <p>Thank you for considering my request.</p>
-        
-        <p>Best regards,<br>
-        {candidate_name}</p>
-        </body>
-        </html>
-        """
+        variables = {"connection_name": connection_name, "message": message, "candidate_name": candidate_name}
+        subject = REFERRAL_SUBJECT.render(variables)
+        body = REFERRAL_BODY.render(variables)
         
         return await self.send_email(
             to_addresses=[to_address],
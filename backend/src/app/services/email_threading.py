@@ -0,0 +1,218 @@
+"""
+Email Threading - JWZ Conversation Threading over Message-ID Headers
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Dict, Optional, Iterable
+
+from sqlalchemy import select, update, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.email import Email
+
+MSGID_RE = re.compile(r"<[^<>\s]+>")
+SUBJECT_PREFIX_RE = re.compile(r"^\s*((re|fwd?|aw|wg|sv)(\[\d+\])?\s*:\s*)+", re.IGNORECASE)
+
+
+def parse_message_ids(value: Optional[str]) -> List[str]:
+    """Message-IDs in a References or In-Reply-To header, in order"""
+    return MSGID_RE.findall(value) if value else []
+
+
+def normalize_subject(subject: Optional[str]) -> str:
+    """Subject without Re:/Fwd: prefixes, for grouping threads that lost their headers"""
+    return " ".join(SUBJECT_PREFIX_RE.sub("", subject or "").split()).lower()
+
+
+@dataclass
+class ThreadMessage:
+    """The header fields threading needs, detached from the ORM row"""
+    id: int
+    message_id: Optional[str]
+    subject: str = ""
+    date: Optional[datetime] = None
+    in_reply_to: Optional[str] = None
+    references: List[str] = field(default_factory=list)
+    in_reply_to_id: Optional[int] = None  # local replies queued before they had headers
+
+
+class _Container:
+    __slots__ = ("message", "parent", "children")
+
+    def __init__(self, message: Optional[ThreadMessage] = None):
+        self.message = message
+        self.parent: Optional["_Container"] = None
+        self.children: List["_Container"] = []
+
+    def is_ancestor_of(self, other: "_Container") -> bool:
+        node = other
+        while node is not None:
+            if node is self:
+                return True
+            node = node.parent
+        return False
+
+    def adopt(self, child: "_Container") -> None:
+        if child.parent is not None:
+            child.parent.children.remove(child)
+        child.parent = self
+        self.children.append(child)
+
+
+def _prune(containers: List[_Container]) -> List[_Container]:
+    """Drop empty containers, promoting their children (JWZ step 4)"""
+    kept = []
+    for container in containers:
+        container.children = _prune(container.children)
+        if container.message is not None:
+            kept.append(container)
+        elif not container.children:
+            continue
+        elif container.parent is not None or len(container.children) == 1:
+            for child in container.children:
+                child.parent = container.parent
+            kept.extend(container.children)
+        else:
+            # A missing root with several replies still holds them together
+            kept.append(container)
+    return kept
+
+
+def _is_reply(container: _Container) -> bool:
+    return container.message is not None and bool(SUBJECT_PREFIX_RE.match(container.message.subject or ""))
+
+
+def build_threads(messages: Iterable[ThreadMessage]) -> List[List[ThreadMessage]]:
+    """Group messages into conversations, each sorted oldest first.
+
+    Jamie Zawinski's algorithm: every Message-ID seen (including ones only
+    referenced) gets a container in a dict, References chains link
+    containers parent to child, and empty containers for messages never
+    received are pruned. A "Re:" root that lost its headers joins the
+    root with the same normalized subject. Each message is touched a constant number of times apart from
+    the ancestor walk that prevents loops, so this is linear in practice.
+    """
+    messages = list(messages)
+    table: Dict[str, _Container] = {}
+    keys: Dict[int, str] = {}
+    for message in messages:
+        key = message.message_id or f"<local-{message.id}>"
+        if key in table and table[key].message is not None:
+            # Duplicate Message-ID: keep both, thread the copy separately
+            key = f"{key}#{message.id}"
+        keys[message.id] = key
+        table.setdefault(key, _Container()).message = message
+
+    for message in messages:
+        container = table[keys[message.id]]
+        refs = list(message.references)
+        if message.in_reply_to and (not refs or refs[-1] != message.in_reply_to):
+            refs.append(message.in_reply_to)
+        if not refs and message.in_reply_to_id in keys:
+            refs.append(keys[message.in_reply_to_id])
+
+        prev: Optional[_Container] = None
+        for ref in refs:
+            ref_container = table.setdefault(ref, _Container())
+            if prev is not None and ref_container.parent is None and not ref_container.is_ancestor_of(prev):
+                prev.adopt(ref_container)
+            prev = ref_container
+        # The last reference is the parent, overriding a guess from an earlier chain
+        if prev is not None and prev is not container and not container.is_ancestor_of(prev):
+            prev.adopt(container)
+        elif container.parent is not None and not refs:
+            container.parent.children.remove(container)
+            container.parent = None
+
+    roots = _prune([container for container in table.values() if container.parent is None])
+
+    # JWZ step 5: a "Re:" root whose headers were lost joins the root with
+    # its subject. Unlike JWZ, two non-replies are never merged: identical
+    # auto-replies ("Thank you for applying") come from different threads.
+    merged: List[_Container] = []
+    slots: Dict[str, int] = {}
+    for root in roots:
+        message = root.message or root.children[0].message
+        subject = normalize_subject(message.subject if message else "")
+        if not subject:
+            merged.append(root)
+            continue
+        if subject not in slots:
+            slots[subject] = len(merged)
+            merged.append(root)
+            continue
+        other = merged[slots[subject]]
+        if _is_reply(root):
+            other.adopt(root)
+        elif _is_reply(other):
+            root.adopt(other)
+            merged[slots[subject]] = root
+        else:
+            merged.append(root)
+
+    threads = []
+    for root in merged:
+        thread, stack = [], [root]
+        while stack:
+            node = stack.pop()
+            if node.message is not None:
+                thread.append(node.message)
+            stack.extend(node.children)
+        thread.sort(key=lambda m: (m.date or datetime.min, m.id))
+        threads.append(thread)
+    return threads
+
+
+def assign_thread_ids(messages: Iterable[ThreadMessage]) -> Dict[int, str]:
+    """email id -> thread_id; a thread is named after its oldest email, as replies already are"""
+    thread_ids = {}
+    for thread in build_threads(messages):
+        thread_id = str(thread[0].id)
+        for message in thread:
+            thread_ids[message.id] = thread_id
+    return thread_ids
+
+
+class EmailThreader:
+    """Recomputes and persists thread_id for a user's emails"""
+
+    async def thread_user(self, db: AsyncSession, user_id: int) -> int:
+        """Thread every email of a user; returns how many thread_ids changed"""
+        result = await db.execute(
+            select(
+                Email.id, Email.message_id, Email.subject, Email.in_reply_to, Email.message_references,
+                Email.in_reply_to_id, Email.received_at, Email.sent_at, Email.created_at, Email.thread_id,
+            ).where(Email.user_id == user_id)
+        )
+        rows = result.all()
+        current = {row.id: row.thread_id for row in rows}
+        thread_ids = assign_thread_ids(
+            ThreadMessage(
+                id=row.id,
+                message_id=row.message_id,
+                subject=row.subject,
+                date=row.received_at or row.sent_at or row.created_at,
+                in_reply_to=row.in_reply_to,
+                references=row.message_references or [],
+                in_reply_to_id=row.in_reply_to_id,
+            )
+            for row in rows
+        )
+        changes = [
+            {"b_id": email_id, "b_thread_id": thread_id}
+            for email_id, thread_id in thread_ids.items()
+            if current.get(email_id) != thread_id
+        ]
+        if changes:
+            table = Email.__table__
+            await db.execute(
+                update(table).where(table.c.id == bindparam("b_id")).values(thread_id=bindparam("b_thread_id")),
+                changes,
+            )
+        return len(changes)
+
+
+# Singleton
+email_threader = EmailThreader()
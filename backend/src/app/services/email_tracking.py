@@ -0,0 +1,256 @@
+"""
+Email Tracking - Signed Open/Click Links with Write-Behind Counters
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import re
+import time
+from datetime import datetime
+from html import unescape
+from typing import List, Dict, Any, Optional
+from urllib.parse import quote
+
+from sqlalchemy import update, bindparam, func, case, Integer, DateTime
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.email import Email, EmailStatus
+
+# 1x1 transparent GIF
+PIXEL_GIF = base64.b64decode("R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7")
+
+HREF_RE = re.compile(r"""(<a\b[^>]*?\bhref\s*=\s*)(["'])(https?://[^"']+)\2""", re.IGNORECASE)
+
+# Only outgoing mail that hasn't been opened yet moves to OPENED
+OPENABLE_STATUSES = [EmailStatus.SENT.value, EmailStatus.DELIVERED.value]
+
+
+class TrackingSigner:
+    """HMAC tokens for tracking URLs, so ids can't be enumerated or forged.
+
+    A click token also covers the target URL, which keeps the redirect
+    endpoint from being usable as an open redirect.
+    """
+
+    def __init__(self, secret: Optional[str] = None):
+        self.key = hashlib.sha256(("tracking:" + (secret or settings.JWT_SECRET)).encode()).digest()
+
+    def _sign(self, payload: str) -> str:
+        digest = hmac.new(self.key, payload.encode(), hashlib.sha256).digest()[:12]
+        return base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+    def open_token(self, email_id: int) -> str:
+        return f"{email_id}.{self._sign(f'o:{email_id}')}"
+
+    def click_token(self, email_id: int, url: str) -> str:
+        return f"{email_id}.{self._sign(f'c:{email_id}:{url}')}"
+
+    def _verify(self, token: str, payload_prefix: str, suffix: str = "") -> Optional[int]:
+        email_id, _, signature = token.partition(".")
+        if not email_id.isdigit() or not signature:
+            return None
+        expected = self._sign(f"{payload_prefix}:{email_id}{suffix}")
+        return int(email_id) if hmac.compare_digest(signature, expected) else None
+
+    def verify_open(self, token: str) -> Optional[int]:
+        """email id for a valid open token, else None"""
+        return self._verify(token, "o")
+
+    def verify_click(self, token: str, url: str) -> Optional[int]:
+        return self._verify(token, "c", f":{url}")
+
+
+def open_url(signer: TrackingSigner, base_url: str, email_id: int) -> str:
+    return f"{base_url.rstrip('/')}/api/track/open/{signer.open_token(email_id)}.gif"
+
+
+def click_url(signer: TrackingSigner, base_url: str, email_id: int, url: str) -> str:
+    return f"{base_url.rstrip('/')}/api/track/click/{signer.click_token(email_id, url)}?url={quote(url, safe='')}"
+
+
+def tracked_html(html: str, email_id: int, base_url: str, signer: TrackingSigner) -> str:
+    """HTML body with links routed through the click redirect and an open pixel appended"""
+    # The captured href is attribute text ("?id=1&amp;ref=mail"); sign and redirect to the URL it encodes
+    html = HREF_RE.sub(
+        lambda m: f"{m.group(1)}{m.group(2)}{click_url(signer, base_url, email_id, unescape(m.group(3)))}{m.group(2)}",
+        html,
+    )
+    pixel = f'<img src="{open_url(signer, base_url, email_id)}" width="1" height="1" alt="" style="display:none">'
+    closing = html.lower().rfind("</body>")
+    if closing == -1:
+        return html + pixel
+    return html[:closing] + pixel + html[closing:]
+
+
+class TrackingBuffer:
+    """Accumulates open/click increments in memory and flushes them in batches.
+
+    Recording is a dict update, so tracking endpoints never wait on the
+    database. A flush writes each touched email once with a single
+    executemany UPDATE, in id order so concurrent flushers from other
+    processes lock rows in the same order. However many times a popular
+    email is opened, its row is locked once per flush interval. Counts
+    are additive, so each process can buffer and flush independently.
+
+    Without the flush loop (serverless, where the process is frozen
+    between requests) write_through flushes each hit before responding.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        flush_seconds: Optional[float] = None,
+        max_pending: Optional[int] = None
+    ):
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.flush_seconds = flush_seconds or settings.TRACKING_FLUSH_SECONDS
+        self.max_pending = max_pending or settings.TRACKING_MAX_PENDING
+        # email id -> [opens, clicks, first open, first click]
+        self._pending: Dict[int, List[Any]] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.flushed_rows = 0
+
+    # Recording -----------------------------------------------------------
+
+    def _entry(self, email_id: int) -> List[Any]:
+        entry = self._pending.get(email_id)
+        if entry is None:
+            entry = self._pending[email_id] = [0, 0, None, None]
+            if len(self._pending) >= self.max_pending:
+                self._wake.set()
+        return entry
+
+    def record_open(self, email_id: int) -> None:
+        entry = self._entry(email_id)
+        entry[0] += 1
+        if entry[2] is None:
+            entry[2] = datetime.utcnow()
+
+    def record_click(self, email_id: int) -> None:
+        entry = self._entry(email_id)
+        entry[1] += 1
+        if entry[3] is None:
+            entry[3] = datetime.utcnow()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    # Flushing ------------------------------------------------------------
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Take everything buffered as update rows, ordered by email id"""
+        pending, self._pending = self._pending, {}
+        return [
+            {"b_id": email_id, "b_opens": opens, "b_clicks": clicks, "b_opened_at": opened_at, "b_clicked_at": clicked_at}
+            for email_id, (opens, clicks, opened_at, clicked_at) in sorted(pending.items())
+        ]
+
+    def restore(self, rows: List[Dict[str, Any]]) -> None:
+        """Put drained rows back after a failed flush, merging with newer hits"""
+        for row in rows:
+            entry = self._entry(row["b_id"])
+            entry[0] += row["b_opens"]
+            entry[1] += row["b_clicks"]
+            entry[2] = min(filter(None, (entry[2], row["b_opened_at"])), default=None)
+            entry[3] = min(filter(None, (entry[3], row["b_clicked_at"])), default=None)
+
+    def update_statement(self):
+        table = Email.__table__
+        opens = bindparam("b_opens", type_=Integer)
+        return (
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(
+                open_count=func.coalesce(table.c.open_count, 0) + opens,
+                opened_at=func.coalesce(table.c.opened_at, bindparam("b_opened_at", type_=DateTime)),
+                click_count=func.coalesce(table.c.click_count, 0) + bindparam("b_clicks", type_=Integer),
+                clicked_at=func.coalesce(table.c.clicked_at, bindparam("b_clicked_at", type_=DateTime)),
+                status=case(
+                    ((opens > 0) & table.c.status.in_(OPENABLE_STATUSES), EmailStatus.OPENED.value),
+                    else_=table.c.status,
+                ),
+            )
+        )
+
+    async def flush(self) -> int:
+        """Write buffered counts; returns the number of emails updated"""
+        rows = self.drain()
+        if not rows:
+            return 0
+        try:
+            async with self.session_factory() as db:
+                await db.execute(self.update_statement(), rows)
+                await db.commit()
+        except Exception:
+            self.restore(rows)
+            raise
+        self.flushed_rows += len(rows)
+        return len(rows)
+
+    async def write_through(self) -> None:
+        """Flush now unless the periodic flush is running"""
+        if self.running:
+            return
+        try:
+            await self.flush()
+        except Exception as e:
+            # Counts stay buffered and go out with the next hit's flush
+            print(f"Tracking flush error: {e}")
+
+    # Lifecycle -----------------------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the periodic flush on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Stop flushing; whatever is still buffered is written first"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"Tracking flush error: {e}")
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            started = time.perf_counter()
+            try:
+                count = await self.flush()
+            except Exception as e:
+                print(f"Tracking flush error: {e}")
+                continue
+            if count and settings.DEBUG:
+                print(f"Tracking: flushed {count} emails in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "pending": len(self._pending),
+            "flushed_rows": self.flushed_rows,
+        }
+
+
+# Singleton
+tracking_signer = TrackingSigner(settings.TRACKING_SECRET or None)
+tracking_buffer = TrackingBuffer()
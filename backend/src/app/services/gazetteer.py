@@ -0,0 +1,138 @@
+"""
+Gazetteer - Bundled City/Country Reference Data for Location Normalization
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+# ISO 3166-1 alpha-2 -> accepted spellings
+COUNTRIES: Dict[str, List[str]] = {
+    "IN": ["india", "bharat"],
+    "US": ["united states", "united states of america", "usa", "us", "america"],
+    "GB": ["united kingdom", "uk", "great britain", "england", "scotland", "wales"],
+    "CA": ["canada"],
+    "AU": ["australia"],
+    "NZ": ["new zealand"],
+    "DE": ["germany", "deutschland"],
+    "FR": ["france"],
+    "NL": ["netherlands", "holland", "the netherlands"],
+    "IE": ["ireland"],
+    "ES": ["spain"],
+    "IT": ["italy"],
+    "PT": ["portugal"],
+    "PL": ["poland"],
+    "SE": ["sweden"],
+    "CH": ["switzerland"],
+    "SG": ["singapore"],
+    "AE": ["united arab emirates", "uae"],
+    "SA": ["saudi arabia", "ksa"],
+    "QA": ["qatar"],
+    "JP": ["japan"],
+    "CN": ["china"],
+    "HK": ["hong kong"],
+    "MY": ["malaysia"],
+    "ID": ["indonesia"],
+    "PH": ["philippines"],
+    "VN": ["vietnam"],
+    "BR": ["brazil"],
+    "MX": ["mexico"],
+    "ZA": ["south africa"],
+    "IL": ["israel"],
+}
+
+# City spelling -> (canonical city, ISO country)
+CITIES: Dict[str, Tuple[str, str]] = {}
+
+_CITY_DATA: Dict[str, Dict[str, List[str]]] = {
+    "IN": {
+        "Bengaluru": ["bangalore", "bengaluru", "bangalore urban"],
+        "Mumbai": ["mumbai", "bombay", "navi mumbai", "thane"],
+        "Delhi": ["delhi", "new delhi", "delhi ncr", "ncr"],
+        "Gurugram": ["gurgaon", "gurugram"],
+        "Noida": ["noida", "greater noida"],
+        "Hyderabad": ["hyderabad", "secunderabad"],
+        "Chennai": ["chennai", "madras"],
+        "Pune": ["pune"],
+        "Kolkata": ["kolkata", "calcutta"],
+        "Ahmedabad": ["ahmedabad"],
+        "Kochi": ["kochi", "cochin"],
+        "Jaipur": ["jaipur"],
+        "Chandigarh": ["chandigarh", "mohali"],
+        "Indore": ["indore"],
+        "Coimbatore": ["coimbatore"],
+        "Thiruvananthapuram": ["thiruvananthapuram", "trivandrum"],
+    },
+    "US": {
+        "New York": ["new york", "new york city", "nyc"],
+        "San Francisco": ["san francisco", "sf", "bay area"],
+        "San Jose": ["san jose"],
+        "Seattle": ["seattle"],
+        "Austin": ["austin"],
+        "Boston": ["boston"],
+        "Chicago": ["chicago"],
+        "Los Angeles": ["los angeles", "la"],
+        "Denver": ["denver"],
+        "Atlanta": ["atlanta"],
+    },
+    "GB": {
+        "London": ["london"],
+        "Manchester": ["manchester"],
+        "Edinburgh": ["edinburgh"],
+        "Cambridge": ["cambridge"],
+    },
+    "CA": {"Toronto": ["toronto"], "Vancouver": ["vancouver"], "Montreal": ["montreal"]},
+    "AU": {"Sydney": ["sydney"], "Melbourne": ["melbourne"]},
+    "DE": {"Berlin": ["berlin"], "Munich": ["munich", "münchen"], "Hamburg": ["hamburg"]},
+    "FR": {"Paris": ["paris"]},
+    "NL": {"Amsterdam": ["amsterdam"], "Rotterdam": ["rotterdam"]},
+    "IE": {"Dublin": ["dublin"]},
+    "SG": {"Singapore": ["singapore"]},
+    "AE": {"Dubai": ["dubai"], "Abu Dhabi": ["abu dhabi"]},
+    "JP": {"Tokyo": ["tokyo"]},
+}
+
+for _code, _cities in _CITY_DATA.items():
+    for _canonical, _spellings in _cities.items():
+        for _spelling in _spellings:
+            CITIES[_spelling] = (_canonical, _code)
+
+_COUNTRY_LOOKUP: Dict[str, str] = {
+    spelling: code for code, spellings in COUNTRIES.items() for spelling in spellings
+}
+_COUNTRY_LOOKUP.update({code.lower(): code for code in COUNTRIES})
+
+_SPLIT_RE = re.compile(r"\s*(?:[,/|;()]|\s-\s)\s*")
+
+
+def country_code(name: Optional[str]) -> Optional[str]:
+    """Resolve a country name, alias or ISO code to its ISO alpha-2 code"""
+    if not name:
+        return None
+    return _COUNTRY_LOOKUP.get(" ".join(name.lower().split()))
+
+
+def lookup_location(text: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Return (canonical city, ISO country) for a free-text location.
+
+    The first recognised city wins; a country mentioned without a known
+    city still resolves the country, and an explicit country that
+    contradicts the city ("London, Ontario, Canada") drops the city.
+    """
+    if not text:
+        return None, None
+
+    city = city_country = explicit_country = None
+    for part in _SPLIT_RE.split(text.lower()):
+        part = " ".join(part.split())
+        if not part:
+            continue
+        if city is None and part in CITIES:
+            city, city_country = CITIES[part]
+        elif explicit_country is None and part in _COUNTRY_LOOKUP:
+            explicit_country = _COUNTRY_LOOKUP[part]
+
+    # An explicit country beats the one implied by an ambiguous city name
+    if explicit_country and city_country and explicit_country != city_country:
+        city = None
+    return city, explicit_country or city_country
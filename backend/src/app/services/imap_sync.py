@@ -0,0 +1,453 @@
+"""
+IMAP Sync - Incremental Inbox Sync with UID High-Water Marks
+"""
+
+import asyncio
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email import policy
+from email.parser import BytesHeaderParser, BytesParser
+from email.utils import getaddresses, parsedate_to_datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+import aioimaplib
+from sqlalchemy import select, update, func, bindparam, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.email import Email, EmailType, EmailStatus, MailboxState
+from app.models.user import User
+from app.services.email_linker import email_linker
+from app.services.email_search import email_search, plain_text, search_vector_expr
+from app.services.email_threading import email_threader, parse_message_ids
+from app.services.job_alert_extractor import job_alert_extractor
+
+HEADER_FIELDS = "MESSAGE-ID FROM TO CC REPLY-TO SUBJECT DATE IN-REPLY-TO REFERENCES"
+HEADER_PARTS = f"(UID INTERNALDATE BODY.PEEK[HEADER.FIELDS ({HEADER_FIELDS})])"
+BODY_PARTS = "(UID BODY.PEEK[])"
+
+FETCH_START_RE = re.compile(rb"^\d+ FETCH \(")
+UID_RE = re.compile(rb"\bUID (\d+)")
+INTERNALDATE_RE = re.compile(rb'INTERNALDATE "([^"]+)"')
+SELECT_CODE_RE = re.compile(rb"\[(UIDVALIDITY|UIDNEXT) (\d+)\]")
+EXISTS_RE = re.compile(rb"^(\d+) EXISTS")
+
+
+class ImapSyncError(Exception):
+    """The IMAP server refused a command"""
+
+
+@dataclass
+class SelectInfo:
+    uidvalidity: Optional[int] = None
+    uidnext: Optional[int] = None
+    exists: int = 0
+
+
+def parse_select(lines: List[Any]) -> SelectInfo:
+    """UIDVALIDITY, UIDNEXT and EXISTS from a SELECT response"""
+    info = SelectInfo()
+    for line in lines:
+        if not isinstance(line, bytes):
+            continue
+        for code, value in SELECT_CODE_RE.findall(line):
+            setattr(info, code.decode().lower(), int(value))
+        match = EXISTS_RE.match(line)
+        if match:
+            info.exists = int(match.group(1))
+    return info
+
+
+def parse_fetch(lines: List[Any]) -> List[Dict[str, Any]]:
+    """Split a FETCH response into {"uid", "internaldate", "literal"} per message.
+
+    aioimaplib returns the untagged lines as bytes with each literal as a
+    bytearray right after the line announcing it; attributes may come
+    before or after the literal.
+    """
+    items: List[Dict[str, Any]] = []
+    current: Optional[Dict[str, Any]] = None
+    for line in lines:
+        if isinstance(line, bytearray):
+            if current is not None and current["literal"] is None:
+                current["literal"] = bytes(line)
+            continue
+        if FETCH_START_RE.match(line):
+            current = {"uid": None, "internaldate": None, "literal": None}
+            items.append(current)
+        if current is None:
+            continue
+        uid = UID_RE.search(line)
+        if uid:
+            current["uid"] = int(uid.group(1))
+        internaldate = INTERNALDATE_RE.search(line)
+        if internaldate:
+            current["internaldate"] = internaldate.group(1).decode()
+    return [item for item in items if item["uid"] is not None]
+
+
+def uid_set(uids: List[int]) -> str:
+    """Compact IMAP sequence set: [1, 2, 3, 7] -> "1:3,7" """
+    ranges = []
+    for uid in sorted(uids):
+        if ranges and uid == ranges[-1][1] + 1:
+            ranges[-1][1] = uid
+        else:
+            ranges.append([uid, uid])
+    return ",".join(str(a) if a == b else f"{a}:{b}" for a, b in ranges)
+
+
+def _addresses(value: Optional[str]) -> List[str]:
+    return [addr for _, addr in getaddresses([value]) if addr] if value else []
+
+
+def _utc(value: Optional[str], internaldate: Optional[str]) -> datetime:
+    # INTERNALDATE is "17-Jul-1996 02:44:25 -0700"; RFC 2822 wants spaces in the date
+    for raw in (value, internaldate.replace("-", " ", 2) if internaldate else None):
+        if not raw:
+            continue
+        try:
+            parsed = parsedate_to_datetime(raw)
+        except (TypeError, ValueError):
+            continue
+        if parsed.tzinfo:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+    return datetime.utcnow()
+
+
+def header_row(user_id: int, item: Dict[str, Any], fallback_id: str) -> Dict[str, Any]:
+    """An emails row from a header-only FETCH item; the body comes later"""
+    headers = BytesHeaderParser(policy=policy.compat32).parsebytes(item["literal"] or b"")
+    from_addresses = _addresses(headers.get("From"))
+    subject = headers.get("Subject") or ""
+    try:
+        subject = str(policy.default.header_factory("Subject", subject))
+    except Exception:
+        pass
+    return {
+        "user_id": user_id,
+        "email_type": EmailType.RECEIVED.value,
+        "status": EmailStatus.DELIVERED.value,
+        "message_id": (headers.get("Message-ID") or fallback_id).strip()[:255],
+        "from_address": (from_addresses[0] if from_addresses else "")[:255],
+        "to_addresses": _addresses(headers.get("To")),
+        "cc_addresses": _addresses(headers.get("Cc")),
+        "reply_to": (_addresses(headers.get("Reply-To")) or [None])[0],
+        "in_reply_to": (parse_message_ids(headers.get("In-Reply-To")) or [None])[-1],
+        "message_references": parse_message_ids(headers.get("References")),
+        "subject": " ".join(subject.split())[:500],
+        "received_at": _utc(headers.get("Date"), item["internaldate"]),
+        "imap_uid": item["uid"],
+        "created_at": datetime.utcnow(),
+    }
+
+
+def body_fields(raw: bytes) -> Dict[str, Any]:
+    """Text and HTML parts plus attachment metadata from a full RFC 822 message"""
+    message = BytesParser(policy=policy.default).parsebytes(raw)
+    fields: Dict[str, Any] = {"body_text": "", "body_html": None, "attachments": []}
+    for kind, key in (("plain", "body_text"), ("html", "body_html")):
+        part = message.get_body(preferencelist=(kind,))
+        if part is not None:
+            try:
+                fields[key] = part.get_content()
+            except (LookupError, UnicodeError):
+                fields[key] = part.get_payload(decode=True).decode("utf-8", "replace")
+    for part in message.iter_attachments():
+        payload = part.get_payload(decode=True) or b""
+        fields["attachments"].append({
+            "filename": part.get_filename() or "attachment",
+            "content_type": part.get_content_type(),
+            "size": len(payload),
+        })
+    return fields
+
+
+class ImapSync:
+    """Syncs one IMAP mailbox into emails, fetching only what changed.
+
+    MailboxState keeps UIDVALIDITY and the highest UID stored. A sync
+    SELECTs the mailbox and compares UIDNEXT with that mark, so an
+    unchanged mailbox costs one round trip however many messages it
+    holds. New messages are stored from a header-only UID FETCH; bodies
+    are fetched afterwards, a UID set per FETCH, newest first.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        mailbox: Optional[str] = None,
+        body_batch_size: Optional[int] = None,
+        body_fetch_limit: Optional[int] = None
+    ):
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.host = host or settings.IMAP_HOST
+        self.port = port or settings.IMAP_PORT
+        self.username = username or settings.IMAP_USER
+        self.password = password or settings.IMAP_PASSWORD
+        self.mailbox = mailbox or settings.IMAP_MAILBOX
+        self.body_batch_size = body_batch_size or settings.IMAP_BODY_BATCH_SIZE
+        self.body_fetch_limit = body_fetch_limit or settings.IMAP_BODY_FETCH_LIMIT
+        self.poll_seconds = settings.IMAP_POLL_SECONDS
+        self.idle_seconds = settings.IMAP_IDLE_SECONDS
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.username and self.password)
+
+    def is_account_of(self, email: Optional[str]) -> bool:
+        """True if email is the user the configured mailbox belongs to, as _loop resolves it"""
+        return self.configured and (email or "").lower() == self.username.lower()
+
+    # IMAP ----------------------------------------------------------------
+
+    async def connect(self) -> aioimaplib.IMAP4_SSL:
+        client = aioimaplib.IMAP4_SSL(host=self.host, port=self.port, timeout=30)
+        await client.wait_hello_from_server()
+        response = await client.login(self.username, self.password)
+        if response.result != "OK":
+            raise ImapSyncError(f"IMAP login failed: {response.lines[-1:]}")
+        return client
+
+    async def _command(self, call) -> List[Any]:
+        response = await call
+        if response.result != "OK":
+            raise ImapSyncError(f"IMAP command failed: {response.lines[-1:]}")
+        return response.lines
+
+    async def fetch_new(
+        self,
+        client,
+        uidvalidity: Optional[int],
+        last_uid: int
+    ) -> Tuple[SelectInfo, List[Dict[str, Any]]]:
+        """SELECT, then header-FETCH UIDs above last_uid if UIDNEXT says there are any"""
+        info = parse_select(await self._command(client.select(self.mailbox)))
+        if info.uidvalidity != uidvalidity:
+            # UIDs from the old validity epoch mean nothing now; start over
+            last_uid = 0
+        elif info.uidnext is not None and info.uidnext <= last_uid + 1:
+            return info, []
+        if not info.exists:
+            return info, []
+        lines = await self._command(client.uid("fetch", f"{last_uid + 1}:*", HEADER_PARTS))
+        # "n:*" always matches the newest message, even when it is below n
+        return info, [item for item in parse_fetch(lines) if item["uid"] > last_uid]
+
+    async def _fetch_bodies(self, client, uids: List[int]) -> Dict[int, bytes]:
+        lines = await self._command(client.uid("fetch", uid_set(uids), BODY_PARTS))
+        return {item["uid"]: item["literal"] for item in parse_fetch(lines) if item["literal"] is not None}
+
+    # Database ------------------------------------------------------------
+
+    async def store_headers(self, db: AsyncSession, rows: List[Dict[str, Any]], batch_size: int = 500) -> int:
+        """Upsert header rows on message_id; returns how many were new"""
+        # Postgres rejects a statement that touches the same conflict key twice
+        unique = [
+            # Subject and sender are searchable right away; store_bodies adds the body
+            {**row, "search_vector": search_vector_expr(row["subject"], None, row["from_address"])}
+            for row in {row["message_id"]: row for row in rows}.values()
+        ]
+        inserted = 0
+        for start in range(0, len(unique), batch_size):
+            stmt = pg_insert(Email).values(unique[start:start + batch_size])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Email.message_id],
+                set_={"imap_uid": stmt.excluded.imap_uid},
+                # A message_id another user already stored stays theirs
+                where=Email.user_id == stmt.excluded.user_id,
+            ).returning(literal_column("(xmax = 0)").label("inserted"))
+            result = await db.execute(stmt)
+            inserted += sum(1 for (was_inserted,) in result.all() if was_inserted)
+        return inserted
+
+    async def store_bodies(self, db: AsyncSession, ids_by_uid: Dict[int, int], bodies: Dict[int, bytes]) -> int:
+        """Fill bodies by primary key; UIDs the server no longer has stop being fetched"""
+        rows = []
+        for uid, email_id in ids_by_uid.items():
+            if uid in bodies:
+                fields = body_fields(bodies[uid])
+                fields["search_text"] = plain_text(fields["body_text"], fields["body_html"])
+                rows.append({"b_id": email_id, "b_uid": uid, **{f"b_{key}": value for key, value in fields.items()}})
+            else:
+                rows.append({"b_id": email_id, "b_uid": None, "b_body_text": "", "b_body_html": None,
+                             "b_attachments": [], "b_search_text": ""})
+        table = Email.__table__
+        await db.execute(
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(
+                imap_uid=bindparam("b_uid"),
+                body_text=bindparam("b_body_text"),
+                body_html=bindparam("b_body_html"),
+                attachments=bindparam("b_attachments"),
+                search_vector=search_vector_expr(table.c.subject, bindparam("b_search_text"), table.c.from_address),
+                updated_at=datetime.utcnow(),
+            ),
+            rows,
+        )
+        return sum(1 for uid in ids_by_uid if uid in bodies)
+
+    # Sync ----------------------------------------------------------------
+
+    async def sync_user(self, user_id: int, client=None) -> Dict[str, Any]:
+        """Bring emails up to date with the mailbox; reuses client if given"""
+        async with self._lock:
+            owned = client is None
+            if owned:
+                client = await self.connect()
+            try:
+                return await self._sync(user_id, client)
+            finally:
+                if owned:
+                    try:
+                        await client.logout()
+                    except Exception:
+                        pass
+
+    async def _sync(self, user_id: int, client) -> Dict[str, Any]:
+        async with self.session_factory() as db:
+            state = await db.scalar(
+                select(MailboxState).where(MailboxState.user_id == user_id, MailboxState.mailbox == self.mailbox)
+            )
+            if state is None:
+                state = MailboxState(user_id=user_id, mailbox=self.mailbox, last_uid=0)
+                db.add(state)
+
+            info, items = await self.fetch_new(client, state.uidvalidity, state.last_uid or 0)
+            if state.uidvalidity is not None and info.uidvalidity != state.uidvalidity:
+                await db.execute(
+                    update(Email).where(Email.user_id == user_id, Email.imap_uid.isnot(None)).values(imap_uid=None)
+                )
+                state.last_uid = 0
+            state.uidvalidity = info.uidvalidity
+
+            rows = [header_row(user_id, item, f"<imap-{info.uidvalidity}-{item['uid']}@{self.host}>")
+                    for item in items]
+            new = await self.store_headers(db, rows) if rows else 0
+            if new:
+                await email_threader.thread_user(db, user_id)
+                await email_linker.link_user(db, user_id, since_uid=state.last_uid or 0)
+            if items:
+                state.last_uid = max(item["uid"] for item in items)
+            state.message_count = info.exists
+            state.synced_at = datetime.utcnow()
+            await db.commit()
+
+            bodies_since = datetime.utcnow()
+            bodies = await self._sync_bodies(db, user_id, client)
+            alert_jobs = 0
+            if bodies and settings.IMAP_EXTRACT_JOB_ALERTS:
+                alert_jobs = (await job_alert_extractor.extract_user(db, user_id, since=bodies_since)).listings
+        if new or bodies:
+            email_search.invalidate(user_id)
+        return {
+            "new": new,
+            "headers_fetched": len(items),
+            "bodies_fetched": bodies,
+            "alert_jobs": alert_jobs,
+            "uidvalidity": info.uidvalidity,
+            "last_uid": state.last_uid,
+        }
+
+    async def _sync_bodies(self, db: AsyncSession, user_id: int, client) -> int:
+        result = await db.execute(
+            select(Email.imap_uid, Email.id)
+            .where(
+                Email.user_id == user_id,
+                Email.imap_uid.isnot(None),
+                Email.body_text.is_(None),
+                Email.body_html.is_(None),
+            )
+            .order_by(Email.imap_uid.desc())
+            .limit(self.body_fetch_limit)
+        )
+        pending = dict(result.all())
+        uids = list(pending)
+        batches = [uids[i:i + self.body_batch_size] for i in range(0, len(uids), self.body_batch_size)]
+
+        fetched = 0
+        next_fetch = asyncio.ensure_future(self._fetch_bodies(client, batches[0])) if batches else None
+        try:
+            for index, batch in enumerate(batches):
+                bodies = await next_fetch
+                # Keep the connection busy with the next batch while this one is parsed and stored
+                if index + 1 < len(batches):
+                    next_fetch = asyncio.ensure_future(self._fetch_bodies(client, batches[index + 1]))
+                fetched += await self.store_bodies(db, {uid: pending[uid] for uid in batch}, bodies)
+                await db.commit()
+        finally:
+            if next_fetch is not None and not next_fetch.done():
+                next_fetch.cancel()
+        return fetched
+
+    # Push ----------------------------------------------------------------
+
+    async def wait_for_new_mail(self, client) -> None:
+        """IDLE until the server announces EXISTS or the IDLE timeout ends"""
+        idle = await client.idle_start(timeout=self.idle_seconds)
+        try:
+            while True:
+                push = await client.wait_server_push(timeout=self.idle_seconds + 60)
+                if push == aioimaplib.STOP_WAIT_SERVER_PUSH:
+                    return
+                if any(isinstance(line, bytes) and EXISTS_RE.match(line) for line in push):
+                    return
+        finally:
+            client.idle_done()
+            await asyncio.wait_for(idle, timeout=30)
+
+    def start(self) -> None:
+        """Start the background sync loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            client = None
+            try:
+                async with self.session_factory() as db:
+                    user_id = await db.scalar(
+                        select(User.id).where(func.lower(User.email) == self.username.lower())
+                    )
+                if user_id is None:
+                    raise ImapSyncError(f"no user for IMAP account {self.username}")
+                client = await self.connect()
+                while True:
+                    await self.sync_user(user_id, client)
+                    if client.has_capability("IDLE"):
+                        await self.wait_for_new_mail(client)
+                    else:
+                        await asyncio.sleep(self.poll_seconds)
+            except Exception as e:
+                print(f"IMAP sync error: {e}")
+            finally:
+                if client is not None:
+                    try:
+                        await client.logout()
+                    except Exception:
+                        pass
+            await asyncio.sleep(self.poll_seconds)
+
+
+# Singleton
+imap_sync = ImapSync()
@@ -0,0 +1,342 @@
+"""
+Job Alert Extractor - Jobs from LinkedIn/Naukri Alert Emails
+"""
+
+import asyncio
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit, parse_qsl, unquote
+
+from lxml import etree, html as lxml_html
+from sqlalchemy import select, update, or_, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import AsyncSessionLocal
+from app.models.email import Email, EmailType, EmailCategory
+from app.models.job import JobSource
+from app.services.email_search import plain_text
+from app.services.job_enrichment import job_enrichment_pipeline
+from app.services.job_store import job_store, compute_fingerprint
+
+FORWARD_SUBJECT_RE = re.compile(r"^\s*(?:fwd?|fw)\s*:", re.IGNORECASE)
+# First "From:" line of the forwarded block; Outlook bolds the label
+FORWARDED_FROM_RE = re.compile(r"^[>\s]*\*?From:\*?\s*(.+)$", re.IGNORECASE | re.MULTILINE)
+ADDRESS_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+# Link wrappers that hide the listing URL in a query parameter
+WRAPPED_URL_PARAMS = ("url", "u", "q", "target")
+WRAPPER_HOSTS_RE = re.compile(r"(?:safelinks\.protection\.outlook\.com|urldefense\.com|google\.com)$")
+
+EXPERIENCE_RE = re.compile(r"\d\s*(?:\+|-|–|to)?\s*\d*\s*(?:yrs?|years?)\b|\bfresher", re.IGNORECASE)
+SALARY_RE = re.compile(
+    r"[₹$€£]|\b(?:lpa|lacs?|lakhs?|not\s+disclosed|per\s+(?:annum|year|month|hour))\b|/\s*(?:yr|year|hr|hour)\b",
+    re.IGNORECASE,
+)
+UNDISCLOSED_RE = re.compile(r"not\s+disclosed", re.IGNORECASE)
+
+
+def unwrap_href(href: str) -> str:
+    """The listing URL behind an Outlook Safe Links or similar redirect"""
+    parts = urlsplit(href)
+    if parts.hostname and WRAPPER_HOSTS_RE.search(parts.hostname):
+        for key, value in parse_qsl(parts.query):
+            if key in WRAPPED_URL_PARAMS and "://" in value:
+                return unquote(value)
+    return href
+
+
+def _text(element) -> str:
+    return " ".join(element.text_content().split())
+
+
+class AlertParser(ABC):
+    """Turns one alert email's HTML into job dicts.
+
+    A subclass declares which senders it handles and how to find listing
+    links; every pattern is compiled once, on the class. A listing block
+    is the title link plus the elements after it in the same container.
+    """
+
+    name = ""
+    sender_re: re.Pattern = re.compile(r"(?!)")
+    # Cheap SQL prefilter on from_address, see JobAlertExtractor
+    sender_domains: Tuple[str, ...] = ()
+    links: etree.XPath = etree.XPath("/..")
+    id_re: re.Pattern = re.compile(r"(?!)")
+
+    def matches(self, address: str) -> bool:
+        return bool(self.sender_re.search(address.lower()))
+
+    @abstractmethod
+    def canonical_url(self, job_id: str, href: str) -> str:
+        """The listing URL stored on the job, stripped of alert tracking"""
+
+    @abstractmethod
+    def parse_lines(self, lines: List[str]) -> Dict[str, str]:
+        """company/location/experience_required/salary_text from the block's lines"""
+
+    def parse(self, body_html: str) -> List[Dict[str, Any]]:
+        try:
+            root = lxml_html.fromstring(body_html)
+        except (ValueError, etree.ParserError):
+            # Unicode input with an XML encoding declaration, or an empty document
+            try:
+                root = lxml_html.fromstring(body_html.encode("utf-8"))
+            except (ValueError, etree.ParserError):
+                return []
+
+        listings: Dict[str, Dict[str, Any]] = {}
+        for anchor in self.links(root):
+            href = unwrap_href(anchor.get("href", ""))
+            match = self.id_re.search(href)
+            if match is None:
+                continue
+            job_id = match.group(1)
+            title = _text(anchor)
+            # Logo and "Apply" links repeat the listing; the first text link is the title
+            if job_id in listings or not title or title.lower() in ("apply", "view job", "apply now"):
+                continue
+            lines = [line for line in (_text(sibling) for sibling in anchor.itersiblings()) if line]
+            listings[job_id] = {
+                "title": title,
+                **self.parse_lines(lines),
+                "source_url": self.canonical_url(job_id, href),
+                "external_id": job_id,
+            }
+        return list(listings.values())
+
+    @staticmethod
+    def split_details(parts: List[str]) -> Dict[str, str]:
+        """Tell experience, salary and location apart in "3-6 Yrs | 10-15 Lacs PA | Pune" """
+        details = {"location": "", "experience_required": "", "salary_text": ""}
+        for part in (part.strip() for part in parts):
+            if not part:
+                continue
+            if not details["experience_required"] and EXPERIENCE_RE.search(part):
+                details["experience_required"] = part
+            elif SALARY_RE.search(part):
+                if not details["salary_text"] and not UNDISCLOSED_RE.search(part):
+                    details["salary_text"] = part
+            elif not details["location"]:
+                details["location"] = part
+        return details
+
+
+class LinkedInAlertParser(AlertParser):
+    """LinkedIn "Your job alert for ..." digests"""
+
+    name = "linkedin"
+    sender_re = re.compile(r"^(?:jobalerts-noreply|jobs-listings|jobs-noreply)@linkedin\.com$")
+    sender_domains = ("linkedin.com",)
+    links = etree.XPath("//a[contains(@href, '/jobs/view/')]")
+    id_re = re.compile(r"linkedin\.com/(?:comm/)?jobs/view/(?:[^/?#]*-)?(\d+)")
+    company_sep_re = re.compile(r"\s+[·•]\s+")
+
+    def canonical_url(self, job_id: str, href: str) -> str:
+        # Alert links go through /comm/ with tracking ids; the public URL is keyed by id alone
+        return f"https://www.linkedin.com/jobs/view/{job_id}/"
+
+    def parse_lines(self, lines: List[str]) -> Dict[str, str]:
+        # "Acme Corp · Bengaluru, Karnataka, India (Hybrid)", then salary/insight lines
+        parts = self.company_sep_re.split(lines[0], maxsplit=1) if lines else []
+        company = parts[0] if parts else ""
+        location = parts[1] if len(parts) > 1 else ""
+        details = self.split_details(lines[1:])
+        details["location"] = location
+        return {"company": company or "Unknown", **details}
+
+
+class NaukriAlertParser(AlertParser):
+    """Naukri job alert and recommended-jobs mails"""
+
+    name = "naukri"
+    sender_re = re.compile(r"^(?:jobalert|jobalerts|naukrialerts|recommendedjobs|info)@(?:[\w-]+\.)?naukri\.com$")
+    sender_domains = ("naukri.com",)
+    links = etree.XPath("//a[contains(@href, 'job-listings-')]")
+    id_re = re.compile(r"naukri\.com/job-listings-[\w-]*?-(\d{9,})(?:[?#/]|$)")
+    detail_sep_re = re.compile(r"\s*\|\s*")
+
+    def canonical_url(self, job_id: str, href: str) -> str:
+        # Same slugged URL the search-page scraper stores, minus the alert's query string
+        parts = urlsplit(href)
+        return f"https://www.naukri.com{parts.path}"
+
+    def parse_lines(self, lines: List[str]) -> Dict[str, str]:
+        # Company, then "3-6 Yrs | 10-15 Lacs PA | Bengaluru"
+        company = lines[0] if lines else ""
+        parts = [part for line in lines[1:2] for part in self.detail_sep_re.split(line)]
+        return {"company": company or "Unknown", **self.split_details(parts)}
+
+
+DEFAULT_PARSERS: List[AlertParser] = [LinkedInAlertParser(), NaukriAlertParser()]
+
+
+@dataclass
+class AlertStats:
+    scanned: int = 0
+    alerts: int = 0  # emails from an alert sender, with or without listings
+    listings: int = 0
+    inserted: int = 0
+    updated: int = 0
+    by_parser: Dict[str, int] = field(default_factory=Counter)
+
+
+class JobAlertExtractor:
+    """Turns synced job-alert emails into Job rows.
+
+    Emails are streamed in primary-key batches, narrowed in SQL to alert
+    sender domains and forwarded mail. Forwarded alerts are attributed to
+    the original sender from the quoted "From:" line. Listings go through
+    the scraper's enrichment and fingerprint upsert, one bulk insert per
+    batch. Every alert is marked as a job alert, including one with no
+    listings left to parse, so it isn't read again.
+    """
+
+    def __init__(
+        self,
+        parsers: Optional[List[AlertParser]] = None,
+        session_factory: Optional[async_sessionmaker] = None,
+        batch_size: int = 200
+    ):
+        self.parsers = parsers or DEFAULT_PARSERS
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.batch_size = batch_size
+
+    def parser_for(
+        self,
+        from_address: str,
+        subject: str,
+        body_text: Optional[str],
+        body_html: Optional[str]
+    ) -> Optional[AlertParser]:
+        addresses = [from_address or ""]
+        if FORWARD_SUBJECT_RE.match(subject or ""):
+            quoted = FORWARDED_FROM_RE.search(body_text or plain_text(None, body_html))
+            if quoted:
+                addresses = ADDRESS_RE.findall(quoted.group(1))[:1] + addresses
+        for address in addresses:
+            for parser in self.parsers:
+                if parser.matches(address):
+                    return parser
+        return None
+
+    def extract(
+        self,
+        email_id: int,
+        from_address: str,
+        subject: str,
+        body_text: Optional[str],
+        body_html: Optional[str],
+        received_at: Optional[datetime] = None
+    ) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """(parser name, job dicts) for one email; (None, []) if it isn't an alert"""
+        if not body_html:
+            return None, []
+        parser = self.parser_for(from_address, subject, body_text, body_html)
+        if parser is None:
+            return None, []
+        now = datetime.utcnow().isoformat()
+        jobs = []
+        for listing in parser.parse(body_html):
+            job = {
+                **listing,
+                "source": JobSource.EMAIL.value,
+                "alert": parser.name,
+                "alert_email_id": email_id,
+                # The alert is the latest the listing can have been posted
+                "posted_date": received_at,
+                "discovered_at": now,
+            }
+            job["fingerprint"] = compute_fingerprint(job)
+            job.update(job_enrichment_pipeline.enrich_job(job))
+            jobs.append(job)
+        return parser.name, jobs
+
+    def extract_batch(self, rows: List[Any]) -> List[Tuple[int, Optional[str], List[Dict[str, Any]]]]:
+        """CPU-bound HTML parsing for a batch; runs in a thread"""
+        return [
+            (row.id, *self.extract(row.id, row.from_address, row.subject, row.body_text, row.body_html, row.received_at))
+            for row in rows
+        ]
+
+    def candidates_statement(self, user_id: int, after_id: int, since: Optional[datetime] = None):
+        sender_filters = [
+            Email.from_address.ilike(f"%{domain}")
+            for parser in self.parsers
+            for domain in parser.sender_domains
+        ]
+        stmt = (
+            select(Email.id, Email.from_address, Email.subject, Email.body_text, Email.body_html, Email.received_at)
+            .where(
+                Email.user_id == user_id,
+                Email.email_type == EmailType.RECEIVED.value,
+                # NULL-safe: rows stored without a category are still scanned
+                Email.category.is_distinct_from(EmailCategory.JOB_ALERT.value),
+                Email.body_html.isnot(None),
+                Email.id > after_id,
+                or_(*sender_filters, Email.subject.ilike("fw%")),
+            )
+            .order_by(Email.id)
+            .limit(self.batch_size)
+        )
+        if since is not None:
+            stmt = stmt.where(Email.updated_at >= since)
+        return stmt
+
+    async def extract_user(self, db: AsyncSession, user_id: int, since: Optional[datetime] = None) -> AlertStats:
+        """Extract jobs from a user's alert emails; since limits it to rows a sync just filled.
+
+        Each batch is committed, by the job upsert when it has listings.
+        """
+        stats = AlertStats()
+        table = Email.__table__
+        mark_stmt = (
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(category=EmailCategory.JOB_ALERT.value)
+        )
+        after_id = 0
+        while True:
+            rows = (await db.execute(self.candidates_statement(user_id, after_id, since))).all()
+            if not rows:
+                break
+            after_id = rows[-1].id
+            stats.scanned += len(rows)
+            jobs: List[Dict[str, Any]] = []
+            alert_ids = []
+            for email_id, parser_name, email_jobs in await asyncio.to_thread(self.extract_batch, rows):
+                if parser_name is None:
+                    continue
+                alert_ids.append({"b_id": email_id})
+                if email_jobs:
+                    stats.by_parser[parser_name] += len(email_jobs)
+                    jobs.extend(email_jobs)
+            if alert_ids:
+                await db.execute(mark_stmt, alert_ids)
+                stats.alerts += len(alert_ids)
+            if jobs:
+                inserted, updated = await job_store.upsert_jobs(db, jobs)
+                stats.listings += len(jobs)
+                stats.inserted += inserted
+                stats.updated += updated
+            elif alert_ids:
+                await db.commit()
+            if len(rows) < self.batch_size:
+                break
+        return stats
+
+    async def backfill_user(self, user_id: int) -> AlertStats:
+        """Extract from a whole mailbox in its own session; run as a background task"""
+        async with self.session_factory() as db:
+            stats = await self.extract_user(db, user_id)
+            await db.commit()
+        print(f"Job alert extraction for user {user_id}: {stats.listings} listings from "
+              f"{stats.alerts}/{stats.scanned} emails, {stats.inserted} new jobs")
+        return stats
+
+
+# Singleton
+job_alert_extractor = JobAlertExtractor()
@@ -2,57 +2,182 @@
 Job Discovery Service - Scraping and Parsing Jobs
 """
 
+import re
 from typing import List, Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
+from urllib.parse import urljoin
 import httpx
 from bs4 import BeautifulSoup
 from app.core.config import settings
+from app.core.http_clients import http_clients
+from app.services.job_store import job_store, compute_fingerprint, title_company_key
+from app.services.skill_extraction import skill_extractor
+
+
+_POSTED_AGO_RE = re.compile(r"(\d+)\+?\s*(minute|min|hour|hr|day|week|month)s?", re.IGNORECASE)
+_POSTED_UNITS = {
+    "minute": timedelta(minutes=1), "min": timedelta(minutes=1),
+    "hour": timedelta(hours=1), "hr": timedelta(hours=1),
+    "day": timedelta(days=1), "week": timedelta(weeks=1), "month": timedelta(days=30),
+}
+
+
+def parse_posted_date(text: Optional[str], now: Optional[datetime] = None) -> Optional[datetime]:
+    """Turn "Just Now", "Today", "3 Days Ago" into an absolute timestamp"""
+    if not text:
+        return None
+    now = now or datetime.utcnow()
+    lowered = text.lower()
+    if "just now" in lowered or "few hours" in lowered or "today" in lowered:
+        return now
+    if "yesterday" in lowered:
+        return now - timedelta(days=1)
+    match = _POSTED_AGO_RE.search(lowered)
+    if match:
+        return now - int(match.group(1)) * _POSTED_UNITS[match.group(2)]
+    return None
+
+
+def is_newer_than_cursor(job: Dict[str, Any], cursor: Optional[Dict[str, Any]]) -> bool:
+    """True if a listing is above a source's high-water mark.
+
+    Numeric listing IDs are compared when both sides have one; otherwise the
+    posted date is compared at day granularity, since sources only publish
+    relative "N days ago" stamps. Same-day repeats are filtered later by
+    fingerprint.
+    """
+    if not cursor:
+        return True
+
+    job_id, last_id = job.get("external_id"), cursor.get("last_external_id")
+    if job_id and last_id and str(job_id).isdigit() and str(last_id).isdigit():
+        return int(job_id) > int(last_id)
+
+    posted, last_posted = job.get("posted_date"), cursor.get("last_posted_date")
+    if posted and last_posted:
+        return posted.date() >= last_posted.date()
+
+    return True
 
 
 class JobDiscoveryService:
     """Service for discovering jobs from various sources"""
     
-    def __init__(self):
-        self.http_client = httpx.AsyncClient(
-            timeout=30.0,
-            headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-        )
+    def __init__(
+        self,
+        base_urls: Optional[Dict[str, str]] = None,
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
+        self.base_urls = {
+            "naukri": settings.NAUKRI_BASE_URL,
+            **(base_urls or {}),
+        }
+        # Pooled clients come from the app-wide registry unless one is injected
+        self._http_client = http_client
+
+    def _client(self, upstream: str) -> httpx.AsyncClient:
+        return self._http_client or http_clients.get(upstream)
     
     async def discover_jobs(
         self,
         sources: List[str],
         keywords: List[str],
         countries: Optional[List[str]] = None,
-        limit: int = 50
+        limit: int = 50,
+        fetch_details: bool = False,
+        cursors: Optional[Dict[str, Dict[str, Any]]] = None
     ) -> Dict[str, Any]:
-        """Discover jobs from multiple sources"""
+        """Discover jobs from multiple sources.
+        
+        ``cursors`` maps a source to its high-water mark
+        ({"last_posted_date", "last_external_id"}); only listings above it
+        are returned, and the advanced marks come back under "cursors".
+        """
+        cursors = cursors or {}
         all_jobs = []
+        skipped = 0
+        new_cursors: Dict[str, Dict[str, Any]] = {}
         
         for source in sources:
+            cursor = cursors.get(source)
             try:
                 if source == "linkedin":
                     jobs = await self._scrape_linkedin(keywords, countries, limit)
                 elif source == "naukri":
-                    jobs = await self._scrape_naukri(keywords, countries, limit)
+                    jobs = await self._scrape_naukri(keywords, countries, limit, cursor)
                 else:
                     continue
                 
-                all_jobs.extend(jobs)
+                fresh = [job for job in jobs if is_newer_than_cursor(job, cursor)]
+                skipped += len(jobs) - len(fresh)
+                new_cursors[source] = self._advance_cursor(cursor, fresh)
+                all_jobs.extend(fresh)
             except Exception as e:
                 print(f"Error scraping {source}: {e}")
         
         # Deduplicate
         unique_jobs, duplicates = self._deduplicate_jobs(all_jobs)
         
+        # Only pay for detail pages of listings we have not ingested before
+        previously_seen = 0
+        if fetch_details:
+            previously_seen = await self._fetch_details(unique_jobs)
+        
         return {
             "jobs": unique_jobs,
             "total_found": len(all_jobs),
             "unique": len(unique_jobs),
-            "duplicates": duplicates
+            "duplicates": duplicates,
+            "previously_seen": previously_seen,
+            "skipped": skipped,
+            "cursors": new_cursors
         }
     
+    def _advance_cursor(
+        self,
+        cursor: Optional[Dict[str, Any]],
+        jobs: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Move a high-water mark up to the newest listing in jobs"""
+        cursor = dict(cursor or {})
+        for job in jobs:
+            posted = job.get("posted_date")
+            if posted and (not cursor.get("last_posted_date") or posted > cursor["last_posted_date"]):
+                cursor["last_posted_date"] = posted
+            
+            job_id = str(job.get("external_id") or "")
+            last_id = str(cursor.get("last_external_id") or "")
+            if job_id.isdigit() and (not last_id.isdigit() or int(job_id) > int(last_id)):
+                cursor["last_external_id"] = job_id
+        return cursor
+    
+    async def _fetch_details(self, jobs: List[Dict[str, Any]]) -> int:
+        """Fetch detail pages for new listings, skipping known fingerprints"""
+        skipped = 0
+        for job in jobs:
+            if job_store.is_known(job["fingerprint"]):
+                skipped += 1
+                continue
+            
+            url = job.get("source_url")
+            if not url or not url.startswith("http"):
+                continue
+            
+            try:
+                response = await self._client("scraper").get(url)
+                if response.status_code != 200:
+                    continue
+                soup = BeautifulSoup(response.text, 'lxml')
+                description_elem = soup.select_one(
+                    '.job-desc, .dang-inner-html, .description__text, [class*="job-description"]'
+                )
+                if description_elem:
+                    job["description"] = description_elem.get_text("\n", strip=True)
+            except Exception as e:
+                print(f"Detail fetch error for {url}: {e}")
+        
+        return skipped
+    
     async def _scrape_linkedin(
         self,
         keywords: List[str],
@@ -77,45 +202,70 @@ class JobDiscoveryService:
         self,
         keywords: List[str],
         countries: Optional[List[str]],
-        limit: int
+        limit: int,
+        cursor: Optional[Dict[str, Any]] = None,
+        max_pages: int = 5
     ) -> List[Dict[str, Any]]:
-        """Scrape Naukri job listings"""
+        """Scrape Naukri job listings, newest first.
+        
+        Pages are walked until ``limit`` listings are collected or a page
+        reaches the cursor, so incremental runs usually cost a single
+        request.
+        """
         jobs = []
         
         # Build search URL
         search_query = "-".join(keywords)
-        url = f"https://www.naukri.com/{search_query}-jobs"
+        base_url = self.base_urls["naukri"].rstrip("/")
         
         try:
-            response = await self.http_client.get(url)
-            if response.status_code != 200:
-                return jobs
-            
-            soup = BeautifulSoup(response.text, 'lxml')
-            
-            # Parse job cards (structure may change)
-            job_cards = soup.select('.jobTuple, .cust-job-tuple')
-            
-            for card in job_cards[:limit]:
-                try:
-                    job = self._parse_naukri_card(card)
-                    if job:
-                        jobs.append(job)
-                except Exception:
-                    continue
+            for page in range(1, max_pages + 1):
+                url = f"{base_url}/{search_query}-jobs"
+                if page > 1:
+                    url = f"{url}-{page}"
+                
+                response = await self._client("naukri").get(url, params={"sort": "date"})
+                if response.status_code != 200:
+                    break
+                
+                soup = BeautifulSoup(response.text, 'lxml')
+                
+                # Parse job cards (structure may change)
+                job_cards = soup.select('.jobTuple, .cust-job-tuple')
+                if not job_cards:
+                    break
+                
+                page_jobs = []
+                for card in job_cards:
+                    try:
+                        job = self._parse_naukri_card(card, base_url)
+                        if job:
+                            page_jobs.append(job)
+                    except Exception:
+                        continue
+                
+                jobs.extend(page_jobs)
+                if len(jobs) >= limit:
+                    break
+                # Results are newest first: once the mark shows up, older pages
+                # can only hold listings we already have
+                if cursor and not all(is_newer_than_cursor(job, cursor) for job in page_jobs):
+                    break
             
         except Exception as e:
             print(f"Naukri scraping error: {e}")
         
-        return jobs
+        return jobs[:limit]
     
-    def _parse_naukri_card(self, card) -> Optional[Dict[str, Any]]:
+    def _parse_naukri_card(self, card, base_url: str = "") -> Optional[Dict[str, Any]]:
         """Parse a Naukri job card"""
         try:
             title_elem = card.select_one('.title, .jobTitle')
             company_elem = card.select_one('.companyInfo, .comp-name')
             location_elem = card.select_one('.location, .loc')
             experience_elem = card.select_one('.experience, .exp')
+            salary_elem = card.select_one('.salary, .sal')
+            posted_elem = card.select_one('.job-post-day, .postedDate')
             
             if not title_elem:
                 return None
@@ -125,8 +275,11 @@ class JobDiscoveryService:
                 "company": company_elem.get_text(strip=True) if company_elem else "Unknown",
                 "location": location_elem.get_text(strip=True) if location_elem else "",
                 "experience_required": experience_elem.get_text(strip=True) if experience_elem else "",
+                "salary_text": salary_elem.get_text(strip=True) if salary_elem else "",
                 "source": "naukri",
-                "source_url": title_elem.get('href', ''),
+                "source_url": urljoin(f"{base_url}/", title_elem.get('href', '')) if title_elem.get('href') else '',
+                "external_id": card.get('data-job-id'),
+                "posted_date": parse_posted_date(posted_elem.get_text(strip=True) if posted_elem else None),
                 "discovered_at": datetime.utcnow().isoformat(),
             }
         except Exception:
@@ -142,11 +295,15 @@ class JobDiscoveryService:
         duplicates = 0
         
         for job in jobs:
-            # Create a signature for deduplication
-            signature = f"{job['title'].lower()}|{job['company'].lower()}"
+            # Same fingerprint that backs the unique index on jobs
+            signature = job.setdefault("fingerprint", compute_fingerprint(job))
+            # URL fingerprints differ per board; title/company catches cross-posted listings
+            listing = title_company_key(job)
             
-            if signature not in seen:
+            if signature not in seen and listing not in seen:
                 seen.add(signature)
+                if listing:
+                    seen.add(listing)
                 unique.append(job)
             else:
                 duplicates += 1
@@ -154,34 +311,12 @@ class JobDiscoveryService:
         return unique, duplicates
     
     def extract_skills_from_description(self, description: str) -> Dict[str, List[str]]:
-        """Extract skills from job description using NLP"""
-        # Common tech skills to look for
-        common_skills = [
-            "python", "javascript", "typescript", "java", "c++", "c#", "go", "rust",
-            "react", "angular", "vue", "node.js", "django", "flask", "fastapi",
-            "aws", "azure", "gcp", "docker", "kubernetes", "terraform",
-            "sql", "postgresql", "mysql", "mongodb", "redis",
-            "git", "ci/cd", "jenkins", "github actions",
-            "machine learning", "deep learning", "nlp", "computer vision",
-            "agile", "scrum", "jira"
-        ]
-        
-        description_lower = description.lower()
-        required = []
-        nice_to_have = []
-        
-        for skill in common_skills:
-            if skill in description_lower:
-                # Check if it's in a "nice to have" context
-                if any(phrase in description_lower for phrase in ["nice to have", "preferred", "bonus"]):
-                    nice_to_have.append(skill)
-                else:
-                    required.append(skill)
-        
-        return {
-            "required": required,
-            "nice_to_have": nice_to_have
-        }
+        """Extract skills from job description using the skill taxonomy"""
+        return skill_extractor.extract(description)
+    
+    def extract_skills_batch(self, descriptions: List[str], processes: Optional[int] = None) -> List[Dict[str, List[str]]]:
+        """Extract skills from many job descriptions in one pass"""
+        return skill_extractor.extract_batch(descriptions, processes=processes)
 
 
 # Singleton
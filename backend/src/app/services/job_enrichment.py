@@ -0,0 +1,335 @@
+"""
+Job Enrichment Service - Structured Fields from Free-text Job Listings
+"""
+
+import asyncio
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple, Callable
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.job import Job
+from app.services.ats_analyzer import ats_analyzer
+from app.services.gazetteer import lookup_location, country_code
+
+
+_NUMBER = r"(\d+(?:\.\d+)?)"
+_EXPERIENCE_RANGE_RE = re.compile(
+    rf"{_NUMBER}\s*(?:-|–|to)\s*{_NUMBER}\s*(?:\+\s*)?(?:yrs?|years?)?", re.IGNORECASE
+)
+_EXPERIENCE_MIN_RE = re.compile(
+    rf"(?:(?:min(?:imum)?|at\s+least|over)\s+{_NUMBER}|{_NUMBER}\s*\+)\s*(?:yrs?|years?)?", re.IGNORECASE
+)
+_EXPERIENCE_SINGLE_RE = re.compile(rf"{_NUMBER}\s*(?:yrs?|years?)", re.IGNORECASE)
+_FRESHER_RE = re.compile(r"\b(?:fresher|freshers|entry[\s-]level|no experience)\b", re.IGNORECASE)
+
+_CURRENCY_SYMBOLS = {"₹": "INR", "$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY"}
+_SALARY_AMOUNT = r"(\d[\d,.]*)\s*(k|l|lac|lacs|lakh|lakhs|lpa|cr|crore|m|mn)?"
+_SALARY_RE = re.compile(
+    rf"(?P<cur>[₹$€£¥]|\b(?:inr|usd|eur|gbp|cad|aud|sgd|aed|jpy|rs\.?)\b)?\s*"
+    rf"{_SALARY_AMOUNT}\s*(?:-|–|to)\s*(?P<cur2>[₹$€£¥])?\s*{_SALARY_AMOUNT}"
+    rf"(?:\s*(?P<period>lpa|p\.?a\.?|per\s+(?:annum|year|month|hour)|/\s*(?:yr|year|month|mo|hr|hour)|a\s+year))?",
+    re.IGNORECASE,
+)
+_UNIT_MULTIPLIERS = {
+    "k": 1_000, "l": 100_000, "lac": 100_000, "lacs": 100_000, "lakh": 100_000,
+    "lakhs": 100_000, "lpa": 100_000, "cr": 10_000_000, "crore": 10_000_000,
+    "m": 1_000_000, "mn": 1_000_000,
+}
+_DOT_THOUSANDS_RE = re.compile(r"\d{1,3}(?:\.\d{3})+")
+_PERIOD_MULTIPLIERS = {"month": 12, "mo": 12, "hour": 2080, "hr": 2080}
+
+_REMOTE_RE = re.compile(r"\b(?:remote|work\s+from\s+home|wfh|anywhere|distributed\s+team)\b", re.IGNORECASE)
+_HYBRID_RE = re.compile(r"\bhybrid\b", re.IGNORECASE)
+_ONSITE_RE = re.compile(r"\b(?:on[\s-]?site|in[\s-]office|work\s+from\s+office|wfo)\b", re.IGNORECASE)
+
+
+def parse_experience(text: Optional[str]) -> Tuple[Optional[float], Optional[float]]:
+    """Parse "3-5 Yrs", "5+ years", "Fresher" into (min, max) years"""
+    if not text:
+        return None, None
+
+    match = _EXPERIENCE_RANGE_RE.search(text)
+    if match:
+        low, high = float(match.group(1)), float(match.group(2))
+        return min(low, high), max(low, high)
+
+    match = _EXPERIENCE_MIN_RE.search(text)
+    if match:
+        return float(match.group(1) or match.group(2)), None
+
+    match = _EXPERIENCE_SINGLE_RE.search(text)
+    if match:
+        years = float(match.group(1))
+        return years, years
+
+    if _FRESHER_RE.search(text):
+        return 0.0, 1.0
+
+    return None, None
+
+
+def _salary_amount(number: str, unit: Optional[str]) -> Optional[float]:
+    number = number.rstrip(".,")
+    # "1,20,000", "120,000" and "50.000" use separators; "12.5" is a decimal
+    if "," in number:
+        number = number.replace(",", "")
+    elif _DOT_THOUSANDS_RE.fullmatch(number):
+        number = number.replace(".", "")
+    try:
+        value = float(number)
+    except ValueError:
+        return None
+    return value * _UNIT_MULTIPLIERS.get((unit or "").lower(), 1)
+
+
+def parse_salary(text: Optional[str]) -> Tuple[Optional[int], Optional[int], Optional[str]]:
+    """Parse "₹10-15 LPA" or "$120k - $150k" into annual (min, max, currency)"""
+    if not text:
+        return None, None, None
+
+    match = _SALARY_RE.search(text)
+    if not match:
+        return None, None, None
+
+    low_number, low_unit, high_number, high_unit = match.group(2, 3, 5, 6)
+    # "10-15 LPA": the unit written once applies to both ends
+    low_unit = low_unit or high_unit
+    period = (match.group("period") or "").lower()
+    if period == "lpa":
+        low_unit = low_unit or "lpa"
+        high_unit = high_unit or "lpa"
+
+    low = _salary_amount(low_number, low_unit)
+    high = _salary_amount(high_number, high_unit)
+    if low is None or high is None:
+        return None, None, None
+
+    for key, multiplier in _PERIOD_MULTIPLIERS.items():
+        if key in period:
+            low, high = low * multiplier, high * multiplier
+            break
+
+    symbol = match.group("cur") or match.group("cur2")
+    currency = None
+    if symbol:
+        currency = _CURRENCY_SYMBOLS.get(symbol) or symbol.upper().rstrip(".")
+        if currency == "RS":
+            currency = "INR"
+    elif any(unit and unit.lower() in _UNIT_MULTIPLIERS and unit.lower() not in ("k", "m", "mn")
+             for unit in (low_unit, high_unit)):
+        # Lakh/crore units only appear on Indian listings
+        currency = "INR"
+
+    return int(min(low, high)), int(max(low, high)), currency
+
+
+def parse_work_type(*texts: Optional[str]) -> Optional[str]:
+    """Detect remote/hybrid/onsite markers; hybrid beats remote beats onsite"""
+    text = " ".join(t for t in texts if t)
+    if not text:
+        return None
+    if _HYBRID_RE.search(text):
+        return "hybrid"
+    if _REMOTE_RE.search(text):
+        return "remote"
+    if _ONSITE_RE.search(text):
+        return "onsite"
+    return None
+
+
+# Stages ------------------------------------------------------------------
+# Each stage reads a job dict and returns the fields it could derive.
+
+def experience_stage(job: Dict[str, Any]) -> Dict[str, Any]:
+    low, high = parse_experience(job.get("experience_required"))
+    return {"experience_min_years": low, "experience_max_years": high}
+
+
+def salary_stage(job: Dict[str, Any]) -> Dict[str, Any]:
+    raw = job.get("raw_data") or {}
+    low, high, currency = parse_salary(job.get("salary_text") or raw.get("salary_text") or raw.get("salary"))
+    return {"salary_min": low, "salary_max": high, "salary_currency": currency}
+
+
+def work_type_stage(job: Dict[str, Any]) -> Dict[str, Any]:
+    # Title and location carry the marker far more reliably than the body
+    work_type = parse_work_type(job.get("location"), job.get("title"))
+    if work_type is None:
+        work_type = parse_work_type((job.get("description") or "")[:2000])
+    if work_type is None:
+        return {}
+    return {"work_type": work_type, "is_remote": work_type == "remote"}
+
+
+def location_stage(job: Dict[str, Any]) -> Dict[str, Any]:
+    city, country = lookup_location(job.get("location"))
+    if country is None:
+        country = country_code(job.get("country"))
+    return {"city": city, "country": country}
+
+
+def keywords_stage(job: Dict[str, Any]) -> Dict[str, Any]:
+    # Stored so scoring never has to re-read the description
+    return {"description_keywords": ats_analyzer.description_keywords(job)}
+
+
+DEFAULT_STAGES: List[Callable[[Dict[str, Any]], Dict[str, Any]]] = [
+    experience_stage,
+    salary_stage,
+    work_type_stage,
+    location_stage,
+    keywords_stage,
+]
+
+# Fields stages may overwrite even if already set (normalization, not discovery)
+_NORMALIZED_FIELDS = {"country"}
+
+
+class JobEnrichmentPipeline:
+    """Runs enrichment stages over job dicts and writes results back in bulk.
+
+    Async callers go through enrich_batch, which keeps the stages off the
+    event loop: large batches fan out to a warm process pool
+    (JOB_ENRICHMENT_PROCESSES), everything else runs in a thread.
+    """
+
+    def __init__(
+        self,
+        stages: Optional[List[Callable[[Dict[str, Any]], Dict[str, Any]]]] = None,
+        processes: Optional[int] = None
+    ):
+        self.stages = stages or DEFAULT_STAGES
+        self.processes = settings.JOB_ENRICHMENT_PROCESSES if processes is None else processes
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> None:
+        """Spawn the worker pool; a no-op unless processes is 2 or more"""
+        if self.processes > 1 and self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                initializer=_init_worker,
+                initargs=(self.stages,),
+            )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def enrich_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Fields to set on one job; existing values are left alone.
+
+        enriched_at is always set, so a job nothing can be derived from is
+        not picked up again by the backfill.
+        """
+        updates: Dict[str, Any] = {}
+        for stage in self.stages:
+            try:
+                derived = stage(job)
+            except Exception as e:
+                print(f"Enrichment stage {stage.__name__} failed: {e}")
+                continue
+            for field, value in derived.items():
+                if value is None or field in updates:
+                    continue
+                current = job.get(field)
+                if current in (None, "") or (field in _NORMALIZED_FIELDS and current != value):
+                    updates[field] = value
+        updates["enriched_at"] = datetime.utcnow()
+        return updates
+
+    def enrich_many(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Enrich a batch in the calling thread"""
+        return [self.enrich_job(job) for job in jobs]
+
+    async def enrich_batch(self, jobs: List[Dict[str, Any]], min_parallel: int = 500) -> List[Dict[str, Any]]:
+        """enrich_many off the event loop; batches of min_parallel or more
+        are split across the process pool"""
+        if self.processes > 1 and len(jobs) >= min_parallel:
+            self.start()
+            loop = asyncio.get_running_loop()
+            size = -(-len(jobs) // self.processes)
+            chunks = await asyncio.gather(*(
+                loop.run_in_executor(self._executor, _enrich_in_worker, jobs[i:i + size])
+                for i in range(0, len(jobs), size)
+            ))
+            return [fields for chunk in chunks for fields in chunk]
+        return await asyncio.to_thread(self.enrich_many, jobs)
+
+    async def apply_updates(self, db: AsyncSession, updates: List[Dict[str, Any]]) -> int:
+        """Write {"id": ..., field: value} rows back with bulk UPDATEs by primary key"""
+        rows = [row for row in updates if len(row) > 1]
+        if not rows:
+            return 0
+
+        # executemany needs a uniform parameter set per statement
+        by_shape: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_shape.setdefault(tuple(sorted(row)), []).append(row)
+        for group in by_shape.values():
+            await db.execute(update(Job), group)
+
+        await db.commit()
+        return len(rows)
+
+    async def enrich_pending(self, db: AsyncSession, batch_size: int = 1000) -> int:
+        """Enrich stored jobs that have not been through the pipeline yet"""
+        columns = [
+            Job.id, Job.title, Job.location, Job.country, Job.city, Job.description,
+            Job.experience_required, Job.experience_min_years, Job.experience_max_years,
+            Job.salary_min, Job.salary_max, Job.work_type, Job.raw_data,
+            Job.required_skills, Job.nice_to_have_skills, Job.description_keywords,
+        ]
+        # Not "fields still missing": a job whose work type or country can't
+        # be derived would be re-read on every backfill
+        pending = Job.enriched_at.is_(None)
+
+        total = 0
+        last_id = 0
+        while True:
+            result = await db.execute(
+                select(*columns)
+                .where(pending, Job.id > last_id)
+                .order_by(Job.id)
+                .limit(batch_size)
+            )
+            jobs = [dict(row._mapping) for row in result.all()]
+            if not jobs:
+                break
+            last_id = jobs[-1]["id"]
+
+            enriched = await self.enrich_batch(jobs)
+            total += await self.apply_updates(
+                db, [{"id": job["id"], **fields} for job, fields in zip(jobs, enriched)]
+            )
+
+        return total
+
+    async def backfill(self, session_factory: Optional[async_sessionmaker] = None) -> int:
+        """enrich_pending in its own session; run as a background task"""
+        async with (session_factory or AsyncSessionLocal)() as db:
+            total = await self.enrich_pending(db)
+        print(f"Job enrichment backfill: {total} jobs updated")
+        return total
+
+
+_worker_pipeline: Optional[JobEnrichmentPipeline] = None
+
+
+def _init_worker(stages: List[Callable[[Dict[str, Any]], Dict[str, Any]]]) -> None:
+    global _worker_pipeline
+    _worker_pipeline = JobEnrichmentPipeline(stages, processes=0)
+
+
+def _enrich_in_worker(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return _worker_pipeline.enrich_many(jobs)
+
+
+# Singleton
+job_enrichment_pipeline = JobEnrichmentPipeline()
@@ -0,0 +1,232 @@
+"""
+Job Store Service - Fingerprinting and Bulk Ingestion of Discovered Jobs
+"""
+
+import hashlib
+import json
+import math
+import re
+from datetime import datetime
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from sqlalchemy import select, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.job import Job
+
+
+# Query parameters that only carry tracking state and never identify a listing
+TRACKING_PARAMS = {
+    "utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content",
+    "ref", "refid", "trk", "trackingid", "src", "sid", "xid", "position", "pagenum",
+}
+
+# Columns the scraper is allowed to populate on insert
+INSERTABLE_COLUMNS = {
+    "title", "company", "description", "requirements", "location", "country", "city",
+    "is_remote", "work_type", "salary_min", "salary_max", "salary_currency",
+    "employment_type", "experience_required", "experience_min_years", "experience_max_years",
+    "source", "source_url", "apply_url", "company_url", "required_skills",
+    "nice_to_have_skills", "description_keywords", "education_requirement", "posted_date", "deadline",
+    "enriched_at",
+}
+
+# Non-null defaults for columns a scraper may omit; a multi-VALUES insert
+# would otherwise fill the gaps with NULL instead of the model default.
+ROW_DEFAULTS = {
+    "is_remote": False,
+    "salary_currency": "USD",
+    "source": "other",
+    "required_skills": [],
+    "nice_to_have_skills": [],
+}
+
+
+def _normalize_text(value: Optional[str]) -> str:
+    """Lowercase, strip punctuation and collapse whitespace"""
+    value = (value or "").lower()
+    value = re.sub(r"[^\w\s]", " ", value)
+    return " ".join(value.split())
+
+
+def normalize_url(url: Optional[str]) -> str:
+    """Normalize a listing URL so the same posting always maps to the same string"""
+    if not url:
+        return ""
+    url = url.strip()
+    if "://" not in url:
+        url = f"https://{url.lstrip('/')}"
+
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = re.sub(r"/+", "/", parts.path).rstrip("/")
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query)
+        if key.lower() not in TRACKING_PARAMS
+    ))
+    # Scheme and fragment never identify a listing
+    return urlunsplit(("", host, path, query, ""))
+
+
+def compute_fingerprint(job: Dict[str, Any]) -> str:
+    """Stable fingerprint for a job listing.
+
+    Uses the normalized source URL when the scraper captured one, otherwise
+    falls back to title/company/location.
+    """
+    url = normalize_url(job.get("source_url"))
+    if url:
+        basis = f"url|{url}"
+    else:
+        basis = "|".join([
+            "tcl",
+            _normalize_text(job.get("title")),
+            _normalize_text(job.get("company")),
+            _normalize_text(job.get("location")),
+        ])
+    return hashlib.sha1(basis.encode("utf-8")).hexdigest()
+
+
+def title_company_key(job: Dict[str, Any]) -> Optional[str]:
+    """Cross-source listing key: one posting on LinkedIn and Naukri has two URLs but one title/company"""
+    company = _normalize_text(job.get("company"))
+    if not company or company == "unknown":
+        return None
+    return f"tc|{_normalize_text(job.get('title'))}|{company}"
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over fingerprint strings.
+
+    Used to cheaply answer "have we probably seen this listing before?"
+    without a database round trip. False positives are possible, false
+    negatives are not.
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # Kirsch-Mitzenmacher double hashing from a single digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def update(self, items: Iterable[str]) -> None:
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class JobStore:
+    """Persists discovered jobs keyed by fingerprint"""
+
+    def __init__(self, bloom_capacity: int = 200_000):
+        self.bloom_capacity = bloom_capacity
+        self.known = BloomFilter(capacity=bloom_capacity)
+        self._loaded = False
+
+    async def load_known_fingerprints(self, db: AsyncSession, force: bool = False) -> int:
+        """Warm the Bloom filter with every fingerprint already stored"""
+        if self._loaded and not force:
+            return len(self.known)
+
+        known = BloomFilter(capacity=self.bloom_capacity)
+        result = await db.stream_scalars(
+            select(Job.fingerprint).where(Job.fingerprint.is_not(None))
+        )
+        async for fingerprint in result:
+            known.add(fingerprint)
+
+        self.known = known
+        self._loaded = True
+        return len(known)
+
+    def is_known(self, fingerprint: str) -> bool:
+        """True if the listing was probably ingested before"""
+        return fingerprint in self.known
+
+    def _to_row(self, job: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        row = dict(ROW_DEFAULTS)
+        row.update((key, value) for key, value in job.items() if key in INSERTABLE_COLUMNS)
+        row["title"] = (row.get("title") or "")[:255]
+        row["company"] = (row.get("company") or "Unknown")[:255]
+        row["fingerprint"] = job.get("fingerprint") or compute_fingerprint(job)
+        row["raw_data"] = json.loads(json.dumps(job.get("raw_data", job), default=str))
+        row["discovered_at"] = now
+        row["updated_at"] = now
+        return row
+
+    async def upsert_jobs(
+        self,
+        db: AsyncSession,
+        jobs: List[Dict[str, Any]],
+        batch_size: int = 500
+    ) -> Tuple[int, int]:
+        """Bulk insert jobs, refreshing updated_at/raw_data on fingerprint conflicts.
+
+        Returns (inserted, updated).
+        """
+        if not jobs:
+            return 0, 0
+
+        now = datetime.utcnow()
+        # Collapse in-batch duplicates; Postgres rejects a statement that
+        # touches the same conflict key twice.
+        rows: Dict[str, Dict[str, Any]] = {}
+        for job in jobs:
+            row = self._to_row(job, now)
+            rows[row["fingerprint"]] = row
+
+        # Every row must carry the same key set for a multi-VALUES insert
+        columns = set().union(*(row.keys() for row in rows.values()))
+        ordered = [{col: row.get(col) for col in columns} for row in rows.values()]
+
+        inserted = updated = 0
+        for start in range(0, len(ordered), batch_size):
+            chunk = ordered[start:start + batch_size]
+            stmt = pg_insert(Job).values(chunk)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Job.fingerprint],
+                set_={
+                    "updated_at": stmt.excluded.updated_at,
+                    "raw_data": stmt.excluded.raw_data,
+                },
+            ).returning(literal_column("(xmax = 0)").label("inserted"))
+
+            result = await db.execute(stmt)
+            for (was_inserted,) in result.all():
+                if was_inserted:
+                    inserted += 1
+                else:
+                    updated += 1
+
+        await db.commit()
+        self.known.update(rows.keys())
+        return inserted, updated
+
+
+# Singleton
+job_store = JobStore()
@@ -0,0 +1,300 @@
+"""
+Mail Merge - Bulk Sending of Templated Emails
+"""
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from email.message import Message
+from email.utils import make_msgid
+from typing import List, Dict, Any, Optional, Callable
+
+from sqlalchemy import select, insert, update, cast, String, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.email import Email, EmailType, EmailStatus
+from app.services.email_search import email_search, plain_text, search_vector_expr
+from app.services.email_service import EmailService, email_service
+from app.services.email_tracking import tracked_html, tracking_signer
+from app.services.mail_template import MailTemplate
+
+
+def recipient_domain(address: str) -> str:
+    return address.rpartition("@")[2].lower()
+
+
+class DomainRateLimiter:
+    """Spaces sends to the same recipient domain evenly, per_minute at most.
+
+    Each caller reserves the next free slot for its domain before sleeping,
+    so waiters are served in arrival order without a lock and sends to
+    other domains are never held up.
+    """
+
+    def __init__(self, per_minute: int, clock: Callable[[], float] = time.monotonic):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self.clock = clock
+        self._next: Dict[str, float] = {}
+
+    def reserve(self, domain: str) -> float:
+        """Claim the next slot for domain; returns seconds until it opens"""
+        now = self.clock()
+        start = max(now, self._next.get(domain, now))
+        self._next[domain] = start + self.interval
+        return start - now
+
+    async def wait(self, domain: str) -> None:
+        delay = self.reserve(domain)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+@dataclass
+class MergedEmail:
+    """One rendered recipient of a bulk send"""
+    to_address: str
+    subject: str
+    body: str
+    message_id: str
+    email_id: Optional[int] = None
+
+
+class BulkSender:
+    """Renders a template per recipient and sends the batch over the SMTP pool.
+
+    Templates are compiled once per batch and a shared attachment is
+    encoded once and attached to every message. Rows for the whole batch
+    go in with one INSERT as SENDING; outcomes are written back in
+    executemany batches while the send runs, so progress can be polled.
+    The rows carry no outbox lease, so the outbox never picks them up;
+    instead each write-back touches the batch's remaining rows, and rows
+    left untouched for stale_after (the sending process died, or a
+    serverless instance was frozen) are failed when progress is read.
+    """
+
+    def __init__(
+        self,
+        service: Optional[EmailService] = None,
+        session_factory: Optional[async_sessionmaker] = None,
+        concurrency: Optional[int] = None,
+        per_domain_per_minute: Optional[int] = None,
+        flush_every: int = 20,
+        stale_after: Optional[int] = None
+    ):
+        self.service = service or email_service
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.concurrency = concurrency or settings.BULK_SEND_CONCURRENCY
+        # Shared by every batch, so concurrent sends to one domain add up to the limit
+        self.limiter = DomainRateLimiter(
+            settings.BULK_SEND_DOMAIN_RATE_PER_MINUTE if per_domain_per_minute is None else per_domain_per_minute
+        )
+        self.flush_every = flush_every
+        self.stale_after = timedelta(
+            seconds=settings.BULK_SEND_STALE_SECONDS if stale_after is None else stale_after
+        )
+
+    def render(
+        self,
+        subject: MailTemplate,
+        body: MailTemplate,
+        recipients: List[Dict[str, Any]],
+        shared: Optional[Dict[str, Any]] = None
+    ) -> List[MergedEmail]:
+        """Render every recipient; per-recipient variables override shared ones"""
+        domain = (self.service.smtp_user or "").rpartition("@")[2] or None
+        merged = []
+        for recipient in recipients:
+            variables = {**(shared or {}), **recipient["variables"]}
+            merged.append(MergedEmail(
+                to_address=recipient["email"],
+                subject=subject.render(variables),
+                body=body.render(variables),
+                message_id=make_msgid(domain=domain),
+            ))
+        return merged
+
+    async def create_rows(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        batch_id: str,
+        merged: List[MergedEmail],
+        is_html: bool,
+        category: str = "other",
+        job_id: Optional[int] = None,
+        attachments: Optional[List[Dict[str, Any]]] = None
+    ) -> List[int]:
+        """Insert one SENDING row per recipient in a single statement; sets email_id"""
+        from_address = self.service.smtp_user
+        table = Email.__table__
+        now = datetime.utcnow()
+        rows = [
+            {
+                "user_id": user_id,
+                "batch_id": batch_id,
+                "email_type": EmailType.SENT.value,
+                "category": category,
+                "job_id": job_id,
+                "message_id": item.message_id,
+                "from_address": from_address,
+                "to_addresses": [item.to_address],
+                "cc_addresses": [],
+                "bcc_addresses": [],
+                "message_references": [],
+                "subject": item.subject,
+                "body_text": None if is_html else item.body,
+                "body_html": item.body if is_html else None,
+                "attachments": attachments or [],
+                "status": EmailStatus.SENDING.value,
+                "created_at": now,
+                "updated_at": now,
+                "b_subject": item.subject,
+                "b_from_address": from_address,
+                "b_search_text": plain_text(None if is_html else item.body, item.body if is_html else None),
+            }
+            for item in merged
+        ]
+        stmt = (
+            insert(table)
+            .values(search_vector=search_vector_expr(
+                bindparam("b_subject"), bindparam("b_search_text"), bindparam("b_from_address")
+            ))
+            .returning(table.c.id, sort_by_parameter_order=True)
+        )
+        ids = list((await db.execute(stmt, rows)).scalars().all())
+        # Every recipient starts a conversation of its own
+        await db.execute(
+            update(table).where(table.c.batch_id == batch_id).values(thread_id=cast(table.c.id, String))
+        )
+        for item, email_id in zip(merged, ids):
+            item.email_id = email_id
+        email_search.invalidate(user_id)
+        return ids
+
+    def build_message(self, item: MergedEmail, is_html: bool, parts: Optional[List[Message]] = None) -> Message:
+        body = item.body
+        if is_html and settings.TRACKING_BASE_URL:
+            body = tracked_html(body, item.email_id, settings.TRACKING_BASE_URL, tracking_signer)
+        return self.service.build_message(
+            to_addresses=[item.to_address],
+            subject=item.subject,
+            body=body,
+            is_html=is_html,
+            headers={"Message-ID": item.message_id},
+            parts=parts,
+        )
+
+    async def send(
+        self,
+        batch_id: str,
+        merged: List[MergedEmail],
+        is_html: bool,
+        parts: Optional[List[Message]] = None
+    ) -> Dict[str, int]:
+        """Deliver a created batch; returns sent/failed counts.
+
+        Runs as a background task after the request has returned.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pending: List[Dict[str, Any]] = []
+        counts = {"sent": 0, "failed": 0}
+
+        async def deliver(item: MergedEmail):
+            # Wait for the domain's slot before taking a connection slot
+            await self.limiter.wait(recipient_domain(item.to_address))
+            async with semaphore:
+                try:
+                    await self.service.smtp_pool.send(
+                        self.build_message(item, is_html, parts), recipients=[item.to_address]
+                    )
+                    outcome = {"b_id": item.email_id, "b_status": EmailStatus.SENT.value,
+                               "b_sent_at": datetime.utcnow(), "b_error_message": None}
+                except Exception as e:
+                    outcome = {"b_id": item.email_id, "b_status": EmailStatus.FAILED.value,
+                               "b_sent_at": None, "b_error_message": str(e)}
+            counts["sent" if outcome["b_status"] == EmailStatus.SENT.value else "failed"] += 1
+            pending.append(outcome)
+            if len(pending) >= self.flush_every:
+                rows = pending[:]
+                del pending[:]
+                await self.record(batch_id, rows)
+
+        await asyncio.gather(*(deliver(item) for item in merged))
+        if pending:
+            await self.record(batch_id, pending)
+        if settings.DEBUG:
+            print(f"Bulk send {batch_id}: {counts['sent']} sent, {counts['failed']} failed")
+        return counts
+
+    async def record(self, batch_id: str, rows: List[Dict[str, Any]]) -> None:
+        """Write outcomes for rows of this batch that are still SENDING.
+
+        The rest of the batch is touched too, so a running send never looks stale.
+        """
+        table = Email.__table__
+        now = datetime.utcnow()
+        stmt = (
+            update(table)
+            .where(
+                table.c.id == bindparam("b_id"),
+                table.c.batch_id == batch_id,
+                table.c.status == EmailStatus.SENDING.value,
+            )
+            .values(
+                status=bindparam("b_status"),
+                sent_at=bindparam("b_sent_at"),
+                error_message=bindparam("b_error_message"),
+                updated_at=now,
+            )
+        )
+        try:
+            async with self.session_factory() as db:
+                await db.execute(stmt, rows)
+                await db.execute(
+                    update(table)
+                    .where(table.c.batch_id == batch_id, table.c.status == EmailStatus.SENDING.value)
+                    .values(updated_at=now)
+                )
+                await db.commit()
+        except Exception as e:
+            print(f"Bulk send {batch_id}: recording progress failed: {e}")
+
+    async def expire_stale(self, db: AsyncSession, user_id: int, batch_id: str) -> int:
+        """Fail SENDING rows of a batch whose sender stopped writing back; returns rows failed"""
+        now = datetime.utcnow()
+        result = await db.execute(
+            update(Email.__table__)
+            .where(
+                Email.user_id == user_id,
+                Email.batch_id == batch_id,
+                Email.status == EmailStatus.SENDING.value,
+                Email.updated_at < now - self.stale_after,
+            )
+            .values(
+                status=EmailStatus.FAILED.value,
+                error_message="Bulk send was interrupted before this email was sent",
+                updated_at=now,
+            )
+        )
+        return result.rowcount
+
+    async def progress(self, db: AsyncSession, user_id: int, batch_id: str) -> List[Any]:
+        """Per-recipient rows of a batch, in send order"""
+        result = await db.execute(
+            select(Email.id, Email.to_addresses, Email.status, Email.error_message, Email.sent_at)
+            .where(Email.user_id == user_id, Email.batch_id == batch_id)
+            .order_by(Email.id)
+        )
+        return result.all()
+
+    @staticmethod
+    def new_batch_id() -> str:
+        return uuid.uuid4().hex
+
+
+# Singleton
+bulk_sender = BulkSender()
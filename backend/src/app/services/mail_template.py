@@ -0,0 +1,106 @@
+"""
+Mail Templates - Precompiled Placeholder Templates for Outgoing Email
+"""
+
+import html
+import re
+from typing import List, Dict, Any, Optional, Tuple, Callable
+
+PLACEHOLDER_RE = re.compile(r"\{\{\s*([A-Za-z_]\w*)\s*(?:\|\s*(\w+)\s*)?\}\}")
+
+# Applied to the raw value, then escaped: "AT&T" | title renders "At&amp;T"
+TEXT_FILTERS: Dict[str, Callable[[str], str]] = {
+    "upper": str.upper,
+    "title": str.title,
+}
+# Applied after HTML escaping, so they may emit markup
+MARKUP_FILTERS: Dict[str, Callable[[str], str]] = {
+    "br": lambda value: value.replace("\n", "<br>"),
+}
+
+
+class TemplateError(ValueError):
+    """Unknown filter, or variables missing for a render"""
+
+
+class MailTemplate:
+    """A {{ name }} / {{ name | filter }} template parsed once, rendered many times.
+
+    Parsing happens in the constructor, so rendering is a single join over
+    literal and variable segments. HTML templates escape every value.
+    """
+
+    def __init__(self, source: str, html: bool = False):
+        self.source = source
+        self.html = html
+        # (literal, variable, text filter, markup filter)
+        self.segments: List[Tuple[str, str, Optional[Callable[[str], str]], Optional[Callable[[str], str]]]] = []
+        position = 0
+        for match in PLACEHOLDER_RE.finditer(source):
+            name, filter_name = match.group(1), match.group(2)
+            if filter_name and filter_name not in TEXT_FILTERS and filter_name not in MARKUP_FILTERS:
+                raise TemplateError(f"Unknown filter '{filter_name}' in {match.group(0)}")
+            self.segments.append((
+                source[position:match.start()], name, TEXT_FILTERS.get(filter_name), MARKUP_FILTERS.get(filter_name)
+            ))
+            position = match.end()
+        self.tail = source[position:]
+        self.variables = {name for _, name, _, _ in self.segments}
+
+    def missing(self, variables: Dict[str, Any]) -> List[str]:
+        return sorted(name for name in self.variables if variables.get(name) is None)
+
+    def render(self, variables: Dict[str, Any]) -> str:
+        missing = self.missing(variables)
+        if missing:
+            raise TemplateError(f"Missing variables: {', '.join(missing)}")
+        out = []
+        for literal, name, text_filter, markup_filter in self.segments:
+            value = str(variables[name])
+            if text_filter:
+                value = text_filter(value)
+            if self.html:
+                value = html.escape(value)
+            out.append(literal)
+            out.append(markup_filter(value) if markup_filter else value)
+        out.append(self.tail)
+        return "".join(out)
+
+
+# Built-in templates; EmailService and bulk sends share them
+APPLICATION_SUBJECT = MailTemplate("Application for {{ job_title }} - {{ candidate_name }}")
+APPLICATION_BODY = MailTemplate("""
+        <html>
+        <body>
+        <p>Dear Hiring Manager,</p>
+
+        <p>{{ cover_letter | br }}</p>
+
+        <p>I have attached my resume for your review.</p>
+
+        <p>Best regards,<br>
+        {{ candidate_name }}</p>
+        </body>
+        </html>
+        """, html=True)
+
+REFERRAL_SUBJECT = MailTemplate("Referral Request from {{ candidate_name }}")
+REFERRAL_BODY = MailTemplate("""
+        <html>
+        <body>
+        <p>Hi {{ connection_name }},</p>
+
+        <p>{{ message | br }}</p>
+
+        <p>Thank you for considering my request.</p>
+
+        <p>Best regards,<br>
+        {{ candidate_name }}</p>
+        </body>
+        </html>
+        """, html=True)
+
+BUILTIN_TEMPLATES = {
+    "job_application": (APPLICATION_SUBJECT, APPLICATION_BODY),
+    "referral_request": (REFERRAL_SUBJECT, REFERRAL_BODY),
+}
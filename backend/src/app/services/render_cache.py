@@ -0,0 +1,232 @@
+"""
+Render Cache - Content-addressed Cache for Rendered Resumes
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from collections import deque
+from typing import Dict, Any, Optional, Tuple, List, AsyncIterator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.resume import Resume
+from app.services.render_pool import RenderPool, RenderPoolSaturated, render_pool
+from app.services.resume_builder import RENDERER_VERSION
+
+
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+def render_cache_key(content: Optional[Dict[str, Any]], theme_color: str, fmt: str, compact: bool = False) -> str:
+    """Hash of everything that affects the rendered bytes"""
+    payload = json.dumps(content or {}, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha256()
+    # The compact attachment PDF is its own variant
+    for part in (RENDERER_VERSION, f"{fmt}+compact" if compact else fmt, theme_color.lower(), payload):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """Write-through cache of rendered resumes.
+
+    Every render is kept as a file in a local blob directory named by cache
+    key, which downloads serve directly. PDFs are also written through to
+    the resume row (pdf_content / pdf_cache_key) so they survive stateless
+    deploys with an empty disk.
+    """
+
+    def __init__(self, blob_dir: Optional[str] = None, pool: Optional[RenderPool] = None):
+        self.pool = pool or render_pool
+        self.blob_dir = blob_dir or settings.RENDER_CACHE_DIR or os.path.join(tempfile.gettempdir(), "jarvis-renders")
+        self.hits = 0
+        self.misses = 0
+
+    def blob_path(self, key: str, fmt: str) -> str:
+        return os.path.join(self.blob_dir, f"{key}.{fmt}")
+
+    def _write_blob(self, path: str, data: bytes) -> None:
+        os.makedirs(self.blob_dir, exist_ok=True)
+        # Write then rename so a concurrent reader never sees a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.blob_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    async def _load_pdf(self, db: AsyncSession, resume: Resume, key: str) -> Optional[bytes]:
+        if resume.pdf_cache_key != key:
+            return None
+        result = await db.execute(
+            select(Resume.pdf_content).where(Resume.id == resume.id, Resume.pdf_cache_key == key)
+        )
+        data = result.scalar_one_or_none()
+        return bytes(data) if data else None
+
+    async def _save_pdf(self, db: AsyncSession, resume: Resume, key: str, data: bytes) -> None:
+        resume.pdf_content = data
+        resume.pdf_cache_key = key
+        await db.commit()
+        # Don't keep the bytes pinned on the session's copy of the row
+        db.expire(resume, ["pdf_content"])
+
+    async def lookup(self, db: AsyncSession, resume: Resume, key: str, fmt: str) -> Optional[bytes]:
+        try:
+            with open(self.blob_path(key, fmt), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            pass
+        if fmt == "pdf":
+            return await self._load_pdf(db, resume, key)
+        return None
+
+    async def store(self, db: AsyncSession, resume: Resume, key: str, fmt: str, data: bytes) -> None:
+        self._write_blob(self.blob_path(key, fmt), data)
+        if fmt == "pdf":
+            await self._save_pdf(db, resume, key, data)
+
+    def invalidate(self, resume: Resume, theme_color: str) -> None:
+        """Drop cached renders of the resume's current content"""
+        resume.pdf_content = None
+        resume.pdf_cache_key = None
+        paths = [self.blob_path(render_cache_key(resume.content, theme_color, fmt), fmt) for fmt in MEDIA_TYPES]
+        paths.append(self.blob_path(render_cache_key(resume.content, theme_color, "pdf", compact=True), "pdf"))
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    async def get_or_render(
+        self,
+        db: AsyncSession,
+        resume: Resume,
+        fmt: str,
+        theme_color: str
+    ) -> Tuple[bytes, str]:
+        """Rendered bytes and cache key; renders and stores on a miss"""
+        key = render_cache_key(resume.content, theme_color, fmt)
+        data = await self.lookup(db, resume, key, fmt)
+        if data is not None:
+            self.hits += 1
+            return data, key
+
+        self.misses += 1
+        data = await self.pool.render(resume.content or {}, fmt, theme_color)
+        await self.store(db, resume, key, fmt, data)
+        return data, key
+
+    async def get_or_render_attachment(self, content: Optional[Dict[str, Any]], theme_color: str) -> bytes:
+        """Compact PDF for email attachments; renders and stores on a miss.
+
+        Kept as a blob only: the resume row's single PDF slot holds the
+        download rendering, and attachments would keep evicting it.
+        """
+        path = self.blob_path(render_cache_key(content, theme_color, "pdf", compact=True), "pdf")
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            self.hits += 1
+            return data
+        except FileNotFoundError:
+            pass
+
+        self.misses += 1
+        data = await self.pool.render(content or {}, "pdf", theme_color, compact=True)
+        self._write_blob(path, data)
+        return data
+
+    async def get_or_render_path(
+        self,
+        db: AsyncSession,
+        resume: Resume,
+        fmt: str,
+        theme_color: str
+    ) -> Tuple[str, str]:
+        """Path of the cached file and its key; renders straight to disk on a miss"""
+        key = render_cache_key(resume.content, theme_color, fmt)
+        path = self.blob_path(key, fmt)
+        if os.path.exists(path):
+            self.hits += 1
+            return path, key
+
+        if fmt == "pdf":
+            # Disk was wiped (new instance) but the row still has the render
+            data = await self._load_pdf(db, resume, key)
+            if data is not None:
+                self.hits += 1
+                self._write_blob(path, data)
+                return path, key
+
+        self.misses += 1
+        await self.pool.render_to_file(resume.content or {}, fmt, theme_color, path)
+        if fmt == "pdf":
+            with open(path, "rb") as f:
+                await self._save_pdf(db, resume, key, f.read())
+        return path, key
+
+    async def iter_rendered(
+        self,
+        db: AsyncSession,
+        resumes: List[Resume],
+        fmt: str,
+        theme_color: str,
+        concurrency: Optional[int] = None
+    ) -> AsyncIterator[Tuple[Resume, bytes]]:
+        """Yield (resume, bytes) as each render finishes.
+
+        Misses render in parallel, but at most `concurrency` at a time, so
+        memory stays bounded however many resumes are requested. Cache
+        hits are yielded while the misses render.
+        """
+        limit = concurrency or max(1, self.pool.processes)
+        waiting = deque()
+        running = set()
+
+        async def render(resume: Resume, key: str) -> Tuple[Resume, str, bytes]:
+            while True:
+                try:
+                    return resume, key, await self.pool.render(resume.content or {}, fmt, theme_color)
+                except RenderPoolSaturated:
+                    # The response is already streaming; wait for room
+                    await asyncio.sleep(0.5)
+
+        def fill() -> None:
+            while waiting and len(running) < limit:
+                running.add(asyncio.create_task(render(*waiting.popleft())))
+
+        try:
+            for resume in resumes:
+                key = render_cache_key(resume.content, theme_color, fmt)
+                data = await self.lookup(db, resume, key, fmt)
+                if data is None:
+                    self.misses += 1
+                    waiting.append((resume, key))
+                    fill()
+                else:
+                    self.hits += 1
+                    yield resume, data
+
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    running.discard(task)
+                    resume, key, data = task.result()
+                    await self.store(db, resume, key, fmt, data)
+                    fill()
+                    yield resume, data
+        finally:
+            for task in running:
+                task.cancel()
+
+
+# Singleton
+render_cache = RenderCache()
@@ -0,0 +1,118 @@
+"""
+Render Pool - CPU-bound Resume Rendering off the Event Loop
+"""
+
+import asyncio
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional, Callable
+
+from app.core.config import settings
+from app.services.resume_builder import resume_builder, theme_stylesheet, DEFAULT_THEME_COLOR
+
+
+class RenderPoolSaturated(Exception):
+    """Raised when the render queue is full; the API maps it to 503"""
+
+
+class RenderPool:
+    """Warm process pool for ReportLab/python-docx builds.
+
+    At most max_pending renders are queued or running at once; callers past
+    that get RenderPoolSaturated instead of waiting behind the backlog.
+    With processes=0 renders run in a thread, for hosts without fork.
+    """
+
+    def __init__(self, processes: Optional[int] = None, max_pending: Optional[int] = None):
+        self.processes = settings.RENDER_POOL_PROCESSES if processes is None else processes
+        self.max_pending = max_pending or settings.RENDER_QUEUE_MAX
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self.rendered = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        """Spawn and warm the workers"""
+        if self.processes > 0 and self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker)
+            # Workers spawn on demand; one no-op each brings them all up now
+            for _ in range(self.processes):
+                self._executor.submit(_noop)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def render(self, content: Dict[str, Any], fmt: str, theme_color: str, compact: bool = False) -> bytes:
+        """Rendered document bytes; compact=True gives the smaller attachment PDF"""
+        return await self._submit(_render, content, fmt, theme_color, compact)
+
+    async def render_to_file(self, content: Dict[str, Any], fmt: str, theme_color: str, path: str) -> int:
+        """Render straight into `path` (atomically); returns the file size.
+
+        Only the path crosses the process boundary, never the document.
+        """
+        return await self._submit(_render_to_file, content, fmt, theme_color, path)
+
+    async def _submit(self, fn: Callable, *args: Any) -> Any:
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise RenderPoolSaturated(f"{self._pending} renders already queued")
+
+        self._pending += 1
+        try:
+            if self.processes > 0:
+                self.start()
+                result = await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+            else:
+                result = await asyncio.to_thread(fn, *args)
+        finally:
+            self._pending -= 1
+        self.rendered += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "processes": self.processes,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "rendered": self.rendered,
+            "rejected": self.rejected,
+        }
+
+
+def _init_worker() -> None:
+    # Pay ReportLab's font/stylesheet setup once per worker, not per request
+    theme_stylesheet(DEFAULT_THEME_COLOR)
+
+
+def _noop() -> None:
+    pass
+
+
+def _render(content: Dict[str, Any], fmt: str, theme_color: str, compact: bool = False) -> bytes:
+    if fmt == "docx":
+        return resume_builder.generate_docx(content, theme_color)
+    return resume_builder.generate_pdf(content, theme_color, compact=compact)
+
+
+def _render_to_file(content: Dict[str, Any], fmt: str, theme_color: str, path: str) -> int:
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    # Render beside the target, then rename, so readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write = resume_builder.write_docx if fmt == "docx" else resume_builder.write_pdf
+            write(content, theme_color, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return os.path.getsize(path)
+
+
+# Singleton
+render_pool = RenderPool()
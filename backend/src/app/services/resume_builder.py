@@ -3,11 +3,14 @@ Resume Builder Service - PDF and DOCX Generation
 """
 
 import io
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, Optional, BinaryIO
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
 from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfdoc
+from reportlab.pdfgen.canvas import Canvas
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, HRFlowable
 
 # DOCX imports - optional, fallback to PDF only if not available
@@ -20,55 +23,115 @@ try:
 except ImportError:
     DOCX_AVAILABLE = False
 
+# Bump whenever layout or styling changes so cached renders are rebuilt
+RENDERER_VERSION = "1"
+
+DEFAULT_THEME_COLOR = '#3B82F6'
+
+
+@lru_cache(maxsize=64)
+def _theme_stylesheet(theme_color: str) -> StyleSheet1:
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(
+        name='Name',
+        fontSize=18,
+        fontName='Helvetica-Bold',
+        spaceAfter=6,
+        textColor=colors.HexColor('#1a1a1a')
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='SectionHeader',
+        fontSize=12,
+        fontName='Helvetica-Bold',
+        spaceBefore=12,
+        spaceAfter=6,
+        textColor=colors.HexColor(theme_color)
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='JobTitle',
+        fontSize=11,
+        fontName='Helvetica-Bold',
+        spaceBefore=6,
+        spaceAfter=2
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='Company',
+        fontSize=10,
+        fontName='Helvetica-Oblique',
+        textColor=colors.HexColor('#4b5563')
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='BulletPoint',
+        fontSize=10,
+        fontName='Helvetica',
+        leftIndent=20,
+        spaceBefore=2
+    ))
+
+    return styles
+
+
+def theme_stylesheet(theme_color: str = DEFAULT_THEME_COLOR) -> StyleSheet1:
+    """Stylesheet with section headers in the theme colour.
+
+    Cached per process and shared between renders, so callers must treat
+    it as read-only.
+    """
+    return _theme_stylesheet(theme_color.upper())
+
+
+class _BareInfo(pdfdoc.PDFInfo):
+    """Document info dict with nothing in it (no producer, dates or placeholders)"""
+
+    def format(self, document):
+        return pdfdoc.PDFDictionary({}).format(document)
+
+
+class CompactCanvas(Canvas):
+    """Canvas for size-sensitive PDFs such as email attachments.
+
+    Page streams are Flate-compressed without the ASCII85 wrapper (which
+    adds 25%), the info dict and timestamps are dropped, and pages share
+    one resources dict instead of repeating it. Resumes only use the
+    base-14 Helvetica faces, so no font program is ever embedded.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs['pageCompression'] = 1
+        kwargs['invariant'] = 1
+        super().__init__(*args, **kwargs)
+        self._doc.info = _BareInfo()
+        self._shared_resources = None
+
+    def showPage(self):
+        super().showPage()
+        page = self._doc.Pages.pages[-1]
+
+        contents = pdfdoc.PDFStream()
+        contents.filters = [pdfdoc.PDFZCompress]
+        contents.content = page.stream
+        page.Contents = contents
+        # Defaults every viewer assumes anyway
+        page.Rotate = None
+        page.Trans = None
+
+        if not (page.XObjects or page.ExtGState or page._colorsUsed or page._shadingUsed):
+            if self._shared_resources is None:
+                resources = pdfdoc.PDFResourceDictionary()
+                resources.basicFonts()
+                self._shared_resources = self._doc.Reference(resources)
+            page.Resources = self._shared_resources
+
 
 class ResumeBuilder:
     """Service for generating ATS-friendly PDF and DOCX resumes"""
     
     def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
-    
-    def _setup_custom_styles(self):
-        """Setup custom paragraph styles"""
-        self.styles.add(ParagraphStyle(
-            name='Name',
-            fontSize=18,
-            fontName='Helvetica-Bold',
-            spaceAfter=6,
-            textColor=colors.HexColor('#1a1a1a')
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='SectionHeader',
-            fontSize=12,
-            fontName='Helvetica-Bold',
-            spaceBefore=12,
-            spaceAfter=6,
-            textColor=colors.HexColor('#2563eb')
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='JobTitle',
-            fontSize=11,
-            fontName='Helvetica-Bold',
-            spaceBefore=6,
-            spaceAfter=2
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='Company',
-            fontSize=10,
-            fontName='Helvetica-Oblique',
-            textColor=colors.HexColor('#4b5563')
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='BulletPoint',
-            fontSize=10,
-            fontName='Helvetica',
-            leftIndent=20,
-            spaceBefore=2
-        ))
+        self.styles = theme_stylesheet(DEFAULT_THEME_COLOR)
     
     def _hex_to_rgb(self, hex_color: str) -> tuple:
         """Convert hex color to RGB tuple"""
@@ -86,11 +149,19 @@ class ResumeBuilder:
         except:
             return date_str
     
-    def generate_pdf(self, resume_content: Dict[str, Any], theme_color: str = '#3B82F6') -> bytes:
+    def generate_pdf(self, resume_content: Dict[str, Any], theme_color: str = '#3B82F6', compact: bool = False) -> bytes:
         """Generate PDF from resume content (new format)"""
         buffer = io.BytesIO()
+        self.write_pdf(resume_content, theme_color, buffer, compact=compact)
+        return buffer.getvalue()
+    
+    def write_pdf(self, resume_content: Dict[str, Any], theme_color: str, output: BinaryIO, compact: bool = False) -> None:
+        """Render the PDF straight into a binary file object.
+
+        compact=True renders through CompactCanvas for smaller attachments.
+        """
         doc = SimpleDocTemplate(
-            buffer,
+            output,
             pagesize=letter,
             rightMargin=0.5*inch,
             leftMargin=0.5*inch,
@@ -98,8 +169,8 @@ class ResumeBuilder:
             bottomMargin=0.5*inch
         )
         
-        # Update section header color based on theme
-        self.styles['SectionHeader'].textColor = colors.HexColor(theme_color)
+        # Section header color comes from the theme's own stylesheet
+        styles = theme_stylesheet(theme_color)
         
         story = []
         
@@ -109,7 +180,7 @@ class ResumeBuilder:
         # Personal Info - Header
         name = personal.get('fullName') or f"{personal.get('first_name', '')} {personal.get('last_name', '')}".strip()
         if name:
-            story.append(Paragraph(name, self.styles['Name']))
+            story.append(Paragraph(name, styles['Name']))
         
         # Contact line
         contact_parts = []
@@ -123,48 +194,48 @@ class ResumeBuilder:
             contact_parts.append(personal.get('linkedin') or 'LinkedIn')
         
         if contact_parts:
-            story.append(Paragraph(' | '.join(contact_parts), self.styles['Normal']))
+            story.append(Paragraph(' | '.join(contact_parts), styles['Normal']))
         
         story.append(Spacer(1, 12))
         
         # Summary
         summary = personal.get('summary') or resume_content.get('summary')
         if summary:
-            story.append(Paragraph('PROFESSIONAL SUMMARY', self.styles['SectionHeader']))
-            story.append(Paragraph(summary, self.styles['Normal']))
+            story.append(Paragraph('PROFESSIONAL SUMMARY', styles['SectionHeader']))
+            story.append(Paragraph(summary, styles['Normal']))
         
         # Experience
         experiences = resume_content.get('experiences', resume_content.get('experience', []))
         if experiences:
-            story.append(Paragraph('EXPERIENCE', self.styles['SectionHeader']))
+            story.append(Paragraph('EXPERIENCE', styles['SectionHeader']))
             for exp in experiences[:5]:
                 # Handle both old and new formats
                 position = exp.get('position') or exp.get('title', '')
                 company = exp.get('company', '')
                 
                 title_company = f"<b>{position}</b> at {company}"
-                story.append(Paragraph(title_company, self.styles['JobTitle']))
+                story.append(Paragraph(title_company, styles['JobTitle']))
                 
                 # Date range
                 start = self._format_date(exp.get('startDate', '')) or exp.get('start_date', '')
                 end = 'Present' if exp.get('current') else (self._format_date(exp.get('endDate', '')) or exp.get('end_date', ''))
                 duration = f"{start} - {end}" if start else exp.get('duration', '')
                 if duration:
-                    story.append(Paragraph(duration, self.styles['Company']))
+                    story.append(Paragraph(duration, styles['Company']))
                 
                 # Description/Achievements
                 description = exp.get('description', '')
                 if description:
-                    story.append(Paragraph(f"• {description}", self.styles['BulletPoint']))
+                    story.append(Paragraph(f"• {description}", styles['BulletPoint']))
                 
                 achievements = exp.get('highlights', exp.get('achievements', []))
                 for achievement in achievements[:3]:
-                    story.append(Paragraph(f"• {achievement}", self.styles['BulletPoint']))
+                    story.append(Paragraph(f"• {achievement}", styles['BulletPoint']))
         
         # Education
         education = resume_content.get('education', [])
         if education:
-            story.append(Paragraph('EDUCATION', self.styles['SectionHeader']))
+            story.append(Paragraph('EDUCATION', styles['SectionHeader']))
             for edu in education[:3]:
                 institution = edu.get('institution', '')
                 degree = edu.get('degree', '')
@@ -176,28 +247,46 @@ class ResumeBuilder:
                 if institution:
                     edu_text += f" - {institution}"
                 
-                story.append(Paragraph(edu_text, self.styles['Normal']))
+                story.append(Paragraph(edu_text, styles['Normal']))
                 
                 # Date range
                 start = self._format_date(edu.get('startDate', ''))
                 end = self._format_date(edu.get('endDate', ''))
                 if start or end:
-                    story.append(Paragraph(f"{start} - {end}", self.styles['Company']))
+                    story.append(Paragraph(f"{start} - {end}", styles['Company']))
         
         # Skills
         skills = resume_content.get('skills', [])
         if skills:
-            story.append(Paragraph('SKILLS', self.styles['SectionHeader']))
+            story.append(Paragraph('SKILLS', styles['SectionHeader']))
             skills_text = ' • '.join(skills[:20])
-            story.append(Paragraph(skills_text, self.styles['Normal']))
+            story.append(Paragraph(skills_text, styles['Normal']))
         
         # Build PDF
-        doc.build(story)
-        buffer.seek(0)
-        return buffer.read()
+        if compact:
+            doc.build(story, canvasmaker=CompactCanvas)
+        else:
+            doc.build(story)
+    
+    def pdf_size_report(self, resume_content: Dict[str, Any], theme_color: str = '#3B82F6') -> Dict[str, Any]:
+        """Standard vs compact PDF size for one resume"""
+        standard = len(self.generate_pdf(resume_content, theme_color))
+        compact = len(self.generate_pdf(resume_content, theme_color, compact=True))
+        return {
+            "standard_bytes": standard,
+            "compact_bytes": compact,
+            "saved_bytes": standard - compact,
+            "saved_pct": round((standard - compact) / standard * 100, 1) if standard else 0.0,
+        }
     
     def generate_docx(self, resume_content: Dict[str, Any], theme_color: str = '#3B82F6') -> bytes:
         """Generate DOCX from resume content"""
+        buffer = io.BytesIO()
+        self.write_docx(resume_content, theme_color, buffer)
+        return buffer.getvalue()
+    
+    def write_docx(self, resume_content: Dict[str, Any], theme_color: str, output: BinaryIO) -> None:
+        """Render the DOCX straight into a binary file object"""
         if not DOCX_AVAILABLE:
             raise Exception("python-docx not installed. Cannot generate DOCX.")
         
@@ -328,11 +417,7 @@ class ResumeBuilder:
             for run in skills_para.runs:
                 run.font.size = Pt(10)
         
-        # Save to buffer
-        buffer = io.BytesIO()
-        document.save(buffer)
-        buffer.seek(0)
-        return buffer.read()
+        document.save(output)
     
     def analyze_ats_compatibility(self, resume_content: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze resume for ATS compatibility"""
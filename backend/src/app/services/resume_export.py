@@ -0,0 +1,90 @@
+"""
+Resume Export Service - Streamed ZIP of Rendered Resumes
+"""
+
+import re
+import zipfile
+from typing import List, AsyncIterator, Tuple
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.models.resume import Resume
+from app.services.render_cache import render_cache
+
+
+CHUNK_SIZE = 64 * 1024
+
+_UNSAFE_FILENAME_RE = re.compile(r"[^\w\-. ]+")
+
+
+class _ZipSink:
+    """Write-only stream that buffers what zipfile writes until drained"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> List[bytes]:
+        chunks, self._chunks = self._chunks, []
+        return chunks
+
+
+def _archive_name(name: str, fmt: str, used: set) -> str:
+    base = _UNSAFE_FILENAME_RE.sub("_", name or "resume").strip() or "resume"
+    candidate, n = f"{base}.{fmt}", 1
+    while candidate in used:
+        n += 1
+        candidate = f"{base} ({n}).{fmt}"
+    used.add(candidate)
+    return candidate
+
+
+async def zip_stream(files: AsyncIterator[Tuple[str, bytes]]) -> AsyncIterator[bytes]:
+    """ZIP archive bytes for (name, data) pairs, produced as each pair arrives.
+
+    zipfile writes to a non-seekable sink using data descriptors, so only
+    the file currently being added is ever buffered.
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        async for name, data in files:
+            archive.writestr(name, data)
+            del data
+            for chunk in sink.drain():
+                for start in range(0, len(chunk), CHUNK_SIZE):
+                    yield chunk[start:start + CHUNK_SIZE]
+
+    # Central directory, written on close
+    for chunk in sink.drain():
+        yield chunk
+
+
+async def stream_resume_zip(
+    resume_ids: List[int],
+    fmt: str,
+    theme_color: str
+) -> AsyncIterator[bytes]:
+    """Render resumes in parallel and stream them back as one ZIP.
+
+    Runs on its own session because the request's session is closed once
+    the response starts streaming.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Resume).where(Resume.id.in_(resume_ids)).order_by(Resume.id))
+        resumes = result.scalars().all()
+
+        used_names: set = set()
+
+        async def files() -> AsyncIterator[Tuple[str, bytes]]:
+            async for resume, data in render_cache.iter_rendered(db, resumes, fmt, theme_color):
+                yield _archive_name(resume.name, fmt, used_names), data
+
+        async for chunk in zip_stream(files()):
+            yield chunk
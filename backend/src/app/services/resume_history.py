@@ -0,0 +1,230 @@
+"""
+Resume History Service - Versioned Content as JSON-patch Deltas
+"""
+
+import copy
+import json
+from typing import List, Dict, Any, Optional, Sequence
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.resume import Resume, ResumeRevision
+
+
+# A full snapshot every N versions bounds reconstruction to N - 1 patches
+SNAPSHOT_EVERY = 10
+
+
+# JSON patch (RFC 6902, add/remove/replace) ---------------------------------
+
+def _escape(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def make_patch(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """Ops that turn `old` into `new`.
+
+    Dicts are diffed key by key. Lists keep their common prefix/suffix and
+    only the changed middle is emitted, so editing one bullet or appending
+    a skill is a single op rather than a rewrite of the list.
+    """
+    if old == new:
+        return []
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(str(key))}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(str(key))}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(make_patch(old[key], value, child))
+        return ops
+
+    if isinstance(old, list) and isinstance(new, list):
+        prefix = 0
+        while prefix < min(len(old), len(new)) and old[prefix] == new[prefix]:
+            prefix += 1
+        suffix = 0
+        while (suffix < min(len(old), len(new)) - prefix
+               and old[len(old) - 1 - suffix] == new[len(new) - 1 - suffix]):
+            suffix += 1
+
+        old_mid = old[prefix:len(old) - suffix]
+        new_mid = new[prefix:len(new) - suffix]
+        ops = []
+        # Same-length stretches are edited in place (recursively)
+        for i in range(min(len(old_mid), len(new_mid))):
+            ops.extend(make_patch(old_mid[i], new_mid[i], f"{path}/{prefix + i}"))
+        # Remove from the end backwards so indices stay valid
+        for i in reversed(range(len(new_mid), len(old_mid))):
+            ops.append({"op": "remove", "path": f"{path}/{prefix + i}"})
+        for i in range(len(old_mid), len(new_mid)):
+            ops.append({"op": "add", "path": f"{path}/{prefix + i}", "value": new_mid[i]})
+        return ops
+
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+def apply_patch(doc: Any, ops: Sequence[Dict[str, Any]]) -> Any:
+    """Apply ops to a deep copy of doc"""
+    doc = copy.deepcopy(doc)
+    for op in ops:
+        tokens = [_unescape(t) for t in op["path"].split("/")[1:]]
+        if not tokens:
+            doc = copy.deepcopy(op.get("value"))
+            continue
+
+        parent = doc
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+
+        if isinstance(parent, list):
+            index = len(parent) if last == "-" else int(last)
+            if op["op"] == "add":
+                parent.insert(index, copy.deepcopy(op["value"]))
+            elif op["op"] == "remove":
+                del parent[index]
+            else:
+                parent[index] = copy.deepcopy(op["value"])
+        else:
+            if op["op"] == "remove":
+                del parent[last]
+            else:
+                parent[last] = copy.deepcopy(op["value"])
+    return doc
+
+
+def reconstruct(revisions: Sequence[ResumeRevision], version: int) -> Optional[Dict[str, Any]]:
+    """Content at `version` from revisions ordered by version, starting at a snapshot"""
+    content = None
+    for revision in revisions:
+        if revision.version > version:
+            break
+        if revision.kind == "snapshot":
+            content = copy.deepcopy(revision.content)
+        elif content is not None:
+            content = apply_patch(content, revision.patch or [])
+    return content
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, separators=(",", ":"), default=str))
+
+
+# Store ---------------------------------------------------------------------
+
+class ResumeHistory:
+    """Stores each resume version as a delta, with periodic full snapshots"""
+
+    def __init__(self, snapshot_every: int = SNAPSHOT_EVERY):
+        self.snapshot_every = snapshot_every
+
+    def build_revision(
+        self,
+        resume_id: int,
+        version: int,
+        previous: Optional[Dict[str, Any]],
+        content: Dict[str, Any]
+    ) -> ResumeRevision:
+        content = content or {}
+        if previous is not None and (version - 1) % self.snapshot_every:
+            patch = make_patch(previous, content)
+            patch_size = _size(patch)
+            # A rewrite can make the patch bigger than the document itself
+            if patch_size < _size(content):
+                return ResumeRevision(
+                    resume_id=resume_id, version=version, kind="delta", patch=patch, size_bytes=patch_size
+                )
+        return ResumeRevision(
+            resume_id=resume_id, version=version, kind="snapshot", content=content, size_bytes=_size(content)
+        )
+
+    async def record(
+        self,
+        db: AsyncSession,
+        resume: Resume,
+        previous_content: Optional[Dict[str, Any]] = None
+    ) -> ResumeRevision:
+        """Add the revision for resume.version (call after bumping it).
+
+        Resumes that predate history get their previous content recorded as
+        a snapshot first, so the delta has a base to apply to.
+        """
+        version = resume.version or 1
+        if previous_content is not None and version > 1:
+            result = await db.execute(
+                select(func.count(ResumeRevision.id)).where(ResumeRevision.resume_id == resume.id)
+            )
+            if not result.scalar():
+                db.add(self.build_revision(resume.id, version - 1, None, previous_content))
+
+        revision = self.build_revision(resume.id, version, previous_content, resume.content)
+        db.add(revision)
+        return revision
+
+    async def _revisions_for(self, db: AsyncSession, resume_id: int, version: int) -> List[ResumeRevision]:
+        # Nearest snapshot at or below the version, then the deltas after it
+        base = (
+            select(func.max(ResumeRevision.version))
+            .where(
+                ResumeRevision.resume_id == resume_id,
+                ResumeRevision.kind == "snapshot",
+                ResumeRevision.version <= version,
+            )
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            select(ResumeRevision)
+            .where(
+                ResumeRevision.resume_id == resume_id,
+                ResumeRevision.version >= base,
+                ResumeRevision.version <= version,
+            )
+            .order_by(ResumeRevision.version)
+        )
+        return list(result.scalars().all())
+
+    async def get_version(self, db: AsyncSession, resume_id: int, version: int) -> Optional[Dict[str, Any]]:
+        revisions = await self._revisions_for(db, resume_id, version)
+        if not revisions or revisions[-1].version != version:
+            return None
+        return reconstruct(revisions, version)
+
+    async def list_versions(self, db: AsyncSession, resume_id: int) -> List[Dict[str, Any]]:
+        """Version metadata, newest first; content/patches aren't loaded"""
+        result = await db.execute(
+            select(
+                ResumeRevision.version, ResumeRevision.kind,
+                ResumeRevision.size_bytes, ResumeRevision.created_at,
+            )
+            .where(ResumeRevision.resume_id == resume_id)
+            .order_by(ResumeRevision.version.desc())
+        )
+        return [dict(row._mapping) for row in result.all()]
+
+    async def diff(
+        self,
+        db: AsyncSession,
+        resume_id: int,
+        from_version: int,
+        to_version: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        old = await self.get_version(db, resume_id, from_version)
+        new = await self.get_version(db, resume_id, to_version)
+        if old is None or new is None:
+            return None
+        return make_patch(old, new)
+
+
+# Singleton
+resume_history = ResumeHistory()
@@ -0,0 +1,355 @@
+"""
+Resume Import Service - Uploaded PDF/DOCX into Profile Experience, Education and Skills
+"""
+
+import asyncio
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.profile import Profile, Skill, Education, Experience
+from app.services.skill_extraction import skill_extractor
+
+# Parsers are optional; an upload in a missing format is rejected up front
+try:
+    from PyPDF2 import PdfReader
+    PDF_AVAILABLE = True
+except ImportError:
+    PDF_AVAILABLE = False
+
+try:
+    from docx import Document
+    DOCX_AVAILABLE = True
+except ImportError:
+    DOCX_AVAILABLE = False
+
+
+class ResumeImportBusy(Exception):
+    """Raised when max_concurrent parses are already running; the API maps it to 503"""
+
+
+class ResumeParseError(Exception):
+    """The file couldn't be read as a resume; the API maps it to 422"""
+
+
+# Section segmentation -------------------------------------------------------
+
+SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "objective", "about me"),
+    "experience": ("experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history"),
+    "education": ("education", "academic background", "academics", "qualifications"),
+    "skills": ("skills", "technical skills", "core skills", "key skills", "core competencies", "technologies"),
+    "projects": ("projects", "personal projects", "key projects"),
+    "certifications": ("certifications", "certificates", "licenses"),
+}
+_HEADING_LOOKUP = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+
+_MONTHS = {m: i for i, m in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1
+)}
+_DATE = r"(?:(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?,?\s+\d{4}|\d{1,2}/\d{4}|\d{4}-\d{2}|\d{4})"
+_RANGE_RE = re.compile(
+    rf"(?P<start>{_DATE})\s*(?:-|–|—|to)\s*(?P<end>{_DATE}|present|current|now|till date|today)",
+    re.IGNORECASE,
+)
+# PyPDF2 reads ReportLab's WinAnsi bullet back as \x7f
+_BULLET_RE = re.compile(r"^\s*[•\x7f\-\*▪◦·]\s*")
+_DEGREE_RE = re.compile(
+    r"\b(?:b\.?\s?tech|m\.?\s?tech|b\.?\s?e\.?|m\.?\s?e\.?|b\.?\s?sc|m\.?\s?sc|b\.?\s?a\.?|m\.?\s?a\.?|b\.?\s?com|"
+    r"mba|bba|bca|mca|ph\.?\s?d|bachelor(?:'s)?|master(?:'s)?|associate|diploma|doctorate)\b",
+    re.IGNORECASE,
+)
+_TITLE_COMPANY_RE = re.compile(r"\s+(?:at|@)\s+|\s+[|–—]\s+|\s+-\s+|,\s+")
+
+
+def _heading(line: str) -> Optional[str]:
+    text = line.strip().strip(":").lower()
+    return _HEADING_LOOKUP.get(text) if len(text) < 40 else None
+
+
+def split_sections(text: str) -> Dict[str, List[str]]:
+    """Non-empty lines grouped by resume section; text before any heading is 'header'"""
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        section = _heading(line)
+        if section:
+            current = section
+            sections.setdefault(current, [])
+            continue
+        sections[current].append(line)
+    return sections
+
+
+def parse_date(value: str) -> Optional[datetime]:
+    value = value.strip().lower().rstrip(".,")
+    if value in ("present", "current", "now", "till date", "today"):
+        return None
+    match = re.match(r"([a-z]+)\.?,?\s+(\d{4})$", value)
+    if match and match.group(1)[:3] in _MONTHS:
+        return datetime(int(match.group(2)), _MONTHS[match.group(1)[:3]], 1)
+    match = re.match(r"(\d{1,2})/(\d{4})$", value) or re.match(r"(\d{4})-(\d{2})$", value)
+    if match:
+        a, b = match.groups()
+        year, month = (int(b), int(a)) if len(a) <= 2 else (int(a), int(b))
+        return datetime(year, month, 1) if 1 <= month <= 12 else None
+    if re.match(r"\d{4}$", value):
+        return datetime(int(value), 1, 1)
+    return None
+
+
+def _date_range(line: str) -> Optional[Tuple[re.Match, Optional[datetime], Optional[datetime], bool]]:
+    match = _RANGE_RE.search(line)
+    if not match:
+        return None
+    end_text = match.group("end")
+    is_current = parse_date(end_text) is None and not re.match(_DATE, end_text, re.IGNORECASE)
+    return match, parse_date(match.group("start")), parse_date(end_text), is_current
+
+
+def _strip_bullet(line: str) -> str:
+    return _BULLET_RE.sub("", line).strip()
+
+
+def parse_experience(lines: List[str]) -> List[Dict[str, Any]]:
+    """Entries anchored on their date-range line; the header is that line or the one above"""
+    anchors = []
+    for i, line in enumerate(lines):
+        found = _date_range(line)
+        if found:
+            match = found[0]
+            residual = (line[:match.start()] + line[match.end():]).strip(" |,–—-()")
+            header = i if residual else i - 1
+            if header >= 0 and (not anchors or header > anchors[-1][0]) and not _BULLET_RE.match(lines[header]):
+                anchors.append((i, header, residual, found))
+
+    entries = []
+    for k, (i, header, residual, (_, start, end, is_current)) in enumerate(anchors):
+        header_text = residual if header == i else lines[header]
+        parts = _TITLE_COMPANY_RE.split(header_text, maxsplit=1)
+        title, company = (parts[0], parts[1]) if len(parts) == 2 else (header_text, "")
+
+        stop = anchors[k + 1][1] if k + 1 < len(anchors) else len(lines)
+        bullets: List[str] = []
+        for line in lines[i + 1:stop]:
+            # PDF text comes back wrapped mid-sentence; rejoin those lines
+            if bullets and not _BULLET_RE.match(line) and not bullets[-1].endswith((".", "!", "?", ")")):
+                bullets[-1] = f"{bullets[-1]} {line}"
+            else:
+                bullets.append(_strip_bullet(line))
+        description = "\n".join(b for b in bullets if b)
+        entries.append({
+            "title": title.strip()[:100],
+            "company": company.strip()[:255] or "Unknown",
+            "start_date": start,
+            "end_date": end,
+            "is_current": is_current,
+            "description": description or None,
+            "technologies": list(dict.fromkeys(skill_extractor.find_skills(f"{header_text}\n{description}"))),
+        })
+    return entries
+
+
+def parse_education(lines: List[str]) -> List[Dict[str, Any]]:
+    entries: List[Dict[str, Any]] = []
+    for line in lines:
+        found = _date_range(line)
+        degree_match = _DEGREE_RE.search(line)
+        if degree_match and (not found or found[0].start() > degree_match.start()):
+            text = line[:found[0].start()] if found else line
+            # "BSc in Mathematics - University of London" / "B.Tech, IIT Delhi"
+            separator = re.search(r"\s+[-–—|]\s+|,\s+", text)
+            degree_part, institution = (
+                (text[:separator.start()], text[separator.end():]) if separator else (text, "")
+            )
+            degree, _, field = degree_part.partition(" in ")
+            entries.append({
+                "degree": degree.strip()[:100],
+                "field_of_study": field.strip()[:100] or None,
+                "institution": institution.strip()[:255] or "Unknown",
+                "start_date": found[1] if found else None,
+                "end_date": found[2] if found else None,
+                "is_current": found[3] if found else False,
+            })
+        elif found and entries and entries[-1]["start_date"] is None:
+            _, start, end, is_current = found
+            entries[-1].update(start_date=start, end_date=end, is_current=is_current)
+    return entries
+
+
+def parse_skills(sections: Dict[str, List[str]], text: str) -> List[str]:
+    """Skills listed in the skills section, then taxonomy skills found anywhere"""
+    names: Dict[str, str] = {}
+    for line in sections.get("skills", []):
+        for item in re.split(r"[•\x7f,|;·]|\s{2,}", _strip_bullet(line)):
+            item = item.split(":", 1)[-1].strip(" .")
+            if item and len(item) <= 40:
+                names.setdefault(item.lower(), item)
+    for skill in skill_extractor.find_skills(text):
+        canonical = skill_extractor.taxonomy.canonical(skill) or skill
+        if not any((skill_extractor.taxonomy.canonical(n) or n) == canonical for n in names):
+            names[canonical] = canonical
+    return list(names.values())
+
+
+# Text extraction (runs in the worker process) --------------------------------
+
+def extract_text(path: str, fmt: str) -> Tuple[str, int]:
+    """(text, page count) of a PDF or DOCX file"""
+    if fmt == "pdf":
+        if not PDF_AVAILABLE:
+            raise ResumeParseError("PyPDF2 not installed. Cannot import PDF.")
+        reader = PdfReader(path)
+        return "\n".join(page.extract_text() or "" for page in reader.pages), len(reader.pages)
+
+    if not DOCX_AVAILABLE:
+        raise ResumeParseError("python-docx not installed. Cannot import DOCX.")
+    document = Document(path)
+    lines = [p.text for p in document.paragraphs]
+    for table in document.tables:
+        for row in table.rows:
+            lines.append("  ".join(cell.text for cell in row.cells))
+    # Word records where it last broke pages; close enough for a per-page figure
+    breaks = len(document.element.body.xpath(".//w:lastRenderedPageBreak"))
+    return "\n".join(lines), breaks + 1
+
+
+def parse_resume_file(path: str, fmt: str) -> Dict[str, Any]:
+    """Everything the importer stores, parsed from one uploaded file"""
+    started = time.perf_counter()
+    try:
+        text, pages = extract_text(path, fmt)
+    except ResumeParseError:
+        raise
+    except Exception as e:
+        raise ResumeParseError(f"Could not read {fmt.upper()}: {e}")
+    if not text.strip():
+        raise ResumeParseError("No text found; scanned resumes aren't supported")
+
+    sections = split_sections(text)
+    summary = " ".join(sections.get("summary", [])) or None
+    result = {
+        "pages": pages,
+        "summary": summary,
+        "experience": parse_experience(sections.get("experience", [])),
+        "education": parse_education(sections.get("education", [])),
+        "skills": parse_skills(sections, text),
+    }
+    elapsed = time.perf_counter() - started
+    result["parse_ms"] = round(elapsed * 1000, 2)
+    result["ms_per_page"] = round(elapsed * 1000 / max(pages, 1), 2)
+    return result
+
+
+# Importer ---------------------------------------------------------------------
+
+class ResumeImporter:
+    """Parses uploads in a process pool and stores the result on a profile.
+
+    PyPDF2 text extraction is pure Python and CPU-bound, so it runs off the
+    event loop. At most max_concurrent parses run at once; uploads past
+    that get ResumeImportBusy rather than queueing. With processes=0
+    parses run in a thread.
+    """
+
+    def __init__(self, processes: Optional[int] = None, max_concurrent: Optional[int] = None):
+        self.processes = settings.RESUME_IMPORT_PROCESSES if processes is None else processes
+        self.max_concurrent = max_concurrent or settings.RESUME_IMPORT_MAX_CONCURRENT
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._active = 0
+        self.parsed = 0
+        self.rejected = 0
+        self.pages = 0
+        self.parse_seconds = 0.0
+
+    def start(self) -> None:
+        if self.processes > 0 and self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.processes)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def parse(self, path: str, fmt: str) -> Dict[str, Any]:
+        if self._active >= self.max_concurrent:
+            self.rejected += 1
+            raise ResumeImportBusy(f"{self._active} imports already running")
+
+        self._active += 1
+        try:
+            if self.processes > 0:
+                self.start()
+                result = await asyncio.get_running_loop().run_in_executor(self._executor, parse_resume_file, path, fmt)
+            else:
+                result = await asyncio.to_thread(parse_resume_file, path, fmt)
+        finally:
+            self._active -= 1
+
+        self.parsed += 1
+        self.pages += result["pages"]
+        self.parse_seconds += result["parse_ms"] / 1000
+        return result
+
+    async def store(self, db: AsyncSession, profile: Profile, parsed: Dict[str, Any]) -> Dict[str, Any]:
+        """Bulk-insert the parsed rows; the caller commits, so it's all or nothing.
+
+        Experience without a readable start date can't be stored (the
+        column is required) and is reported back as skipped; skills the
+        profile already has are not duplicated.
+        """
+        experience_rows = [
+            {"profile_id": profile.id, **entry} for entry in parsed["experience"] if entry["start_date"]
+        ]
+        skipped = [
+            f"{entry['title']} at {entry['company']}: no start date"
+            for entry in parsed["experience"] if not entry["start_date"]
+        ]
+        education_rows = [{"profile_id": profile.id, **entry} for entry in parsed["education"]]
+
+        existing = await db.execute(select(Skill.name).where(Skill.profile_id == profile.id))
+        known = {name.lower() for name in existing.scalars().all()}
+        skill_rows = [
+            {"profile_id": profile.id, "name": name[:100]}
+            for name in parsed["skills"] if name.lower() not in known
+        ]
+
+        created: Dict[str, List[Any]] = {"experience": [], "education": [], "skills": []}
+        for key, model, rows in (
+            ("experience", Experience, experience_rows),
+            ("education", Education, education_rows),
+            ("skills", Skill, skill_rows),
+        ):
+            if rows:
+                # One multi-row INSERT ... RETURNING per table
+                result = await db.scalars(insert(model).returning(model), rows)
+                created[key] = list(result.all())
+
+        if parsed.get("summary") and not profile.summary:
+            profile.summary = parsed["summary"]
+        created["skipped"] = skipped
+        return created
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "processes": self.processes,
+            "active": self._active,
+            "max_concurrent": self.max_concurrent,
+            "parsed": self.parsed,
+            "rejected": self.rejected,
+            "ms_per_page": round(self.parse_seconds * 1000 / self.pages, 2) if self.pages else 0.0,
+        }
+
+
+# Singleton
+resume_importer = ResumeImporter()
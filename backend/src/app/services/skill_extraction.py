@@ -0,0 +1,382 @@
+"""
+Skill Extraction Service - Taxonomy-driven Skill Matching for Job Descriptions
+"""
+
+import json
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Set, Tuple, Iterable
+
+from app.core.config import settings
+
+
+# Canonical skill -> aliases. Canonical names are what gets stored on Job rows.
+DEFAULT_TAXONOMY: Dict[str, List[str]] = {
+    # Languages
+    "python": ["python3"],
+    "javascript": ["js", "ecmascript"],
+    "typescript": [],
+    "java": [],
+    "c++": ["cpp"],
+    "c#": ["csharp", "c sharp"],
+    "go": ["golang"],
+    "rust": [],
+    # Frameworks
+    "react": ["react.js", "reactjs"],
+    "angular": ["angularjs", "angular.js"],
+    "vue": ["vue.js", "vuejs"],
+    "node.js": ["nodejs"],
+    "django": [],
+    "flask": [],
+    "fastapi": [],
+    # Cloud & infra
+    "aws": ["amazon web services"],
+    "azure": ["microsoft azure"],
+    "gcp": ["google cloud", "google cloud platform"],
+    "docker": [],
+    "kubernetes": ["k8s"],
+    "terraform": [],
+    # Data
+    "sql": [],
+    "postgresql": ["postgres", "psql"],
+    "mysql": [],
+    "mongodb": ["mongo"],
+    "redis": [],
+    # Tooling
+    "git": [],
+    "ci/cd": ["ci cd", "continuous integration", "continuous delivery"],
+    "jenkins": [],
+    "github actions": [],
+    # ML
+    "machine learning": ["ml"],
+    "deep learning": [],
+    "nlp": ["natural language processing"],
+    "computer vision": [],
+    # Process
+    "agile": [],
+    "scrum": [],
+    "jira": [],
+}
+
+# Headings (or "Heading:" prefixes) that open a nice-to-have / required section
+NICE_TO_HAVE_HEADINGS = (
+    r"nice[\s-]to[\s-]haves?|good[\s-]to[\s-]haves?|preferred(?:\s+(?:qualifications|skills|experience))?"
+    r"|bonus(?:\s+points)?|pluses|desirable|optional"
+)
+REQUIRED_HEADINGS = (
+    r"requirements|required(?:\s+(?:skills|qualifications|experience))?|must[\s-]haves?"
+    r"|(?:minimum|basic)\s+qualifications|what\s+you(?:'ll|\s+will)?\s+need|qualifications"
+    r"|responsibilities|skills"
+)
+
+# A heading is a line of its own: "Requirements", "## Nice to have", "Preferred
+# qualifications:" or a short lead-in ending in a colon. Bullets never are, even
+# when they mention a section word ("- Bonus points for Go").
+_HEADING_RE = re.compile(
+    rf"^(?![ \t]*(?:[-•·▪+]|\*(?!\*)|\d+[.)])[ \t])[ \t#*>]*"
+    rf"(?:(?P<nice>{NICE_TO_HAVE_HEADINGS})|(?P<required>{REQUIRED_HEADINGS}))\b"
+    rf"(?:(?:[^\S\n]+(?:skills|qualifications|experience|requirements))?[ \t*]*(?::|$)"
+    rf"|[^\n.!?:]{{0,40}}:[ \t*]*$)",
+    re.IGNORECASE | re.MULTILINE,
+)
+# Inline markers that change the kind of a single sentence or bullet; a
+# nice-to-have marker wins. Matched against lowercased text.
+_INLINE_NICE_RE = re.compile(r"\b(?:a\s+plus|preferred|nice\s+to\s+have|bonus|desirable)\b")
+_INLINE_REQUIRED_RE = re.compile(r"\b(?:must|required|mandatory|essential)\b")
+# Tokens those markers contain; the regexes only run when one is present
+_MARKER_TOKENS = frozenset({"plus", "preferred", "nice", "bonus", "desirable", "must", "required", "mandatory", "essential"})
+# Where a sentence or bullet ends; "node.js" and "e.g." don't end one
+_SEGMENT_END_RE = re.compile(r"\n|[.!?;](?=\s)")
+
+
+# Aliases that are also everyday words ("you will go far"). They only count
+# when written as a name ("Go") or listed next to another skill ("python, go").
+CONTEXT_REQUIRED_ALIASES = frozenset({"go"})
+# Words that may separate two skills in a list
+_LIST_CONNECTORS = frozenset({"and", "or"})
+
+# "+" and "#" are part of skill names ("c++", "c#"); "node.js" and "ci/cd"
+# become multi-token patterns
+_TOKEN_RE = re.compile(r"[\w+#]+")
+# Same tokens for ASCII text, split in C: every other ASCII character is a separator
+_ASCII_SEPARATORS = str.maketrans({
+    chr(i): " " for i in range(128) if not (chr(i).isalnum() or chr(i) in "_+#")
+})
+
+
+def _split_tokens(text: str) -> List[str]:
+    if text.isascii():
+        return text.translate(_ASCII_SEPARATORS).split()
+    return _TOKEN_RE.findall(text)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens. Matching whole tokens is what gives the
+    word-boundary guarantee: "go" never matches inside "good"."""
+    return _split_tokens(text.lower())
+
+
+class SkillTaxonomy:
+    """Canonical skills and the aliases that map onto them"""
+
+    def __init__(self, skills: Dict[str, List[str]]):
+        self.aliases: Dict[str, str] = {}
+        for canonical, aliases in skills.items():
+            canonical = canonical.strip().lower()
+            self.aliases[canonical] = canonical
+            for alias in aliases or []:
+                self.aliases[alias.strip().lower()] = canonical
+
+    @classmethod
+    def from_file(cls, path: str) -> "SkillTaxonomy":
+        """Load a taxonomy from a JSON object of {canonical: [aliases]}"""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @property
+    def skills(self) -> List[str]:
+        return sorted(set(self.aliases.values()))
+
+    def canonical(self, term: str) -> Optional[str]:
+        """Map any known spelling to its canonical skill name"""
+        return self.aliases.get(term.strip().lower())
+
+
+class AhoCorasick:
+    """Single-pass multi-pattern matcher over a token sequence"""
+
+    def __init__(self, patterns: Iterable[Tuple[str, ...]]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[int]] = [[]]
+        self.patterns: List[Tuple[str, ...]] = []
+
+        for pattern in patterns:
+            self._add(pattern)
+        self._build()
+        # Symbols outside every pattern always lead back to the root
+        self.alphabet = frozenset(symbol for pattern in self.patterns for symbol in pattern)
+        self.lengths = [len(pattern) for pattern in self.patterns]
+
+    def _add(self, pattern: Tuple[str, ...]) -> None:
+        node = 0
+        for symbol in pattern:
+            nxt = self.goto[node].get(symbol)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][symbol] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            node = nxt
+        self.output[node].append(len(self.patterns))
+        self.patterns.append(pattern)
+
+    def _build(self) -> None:
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for symbol, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and symbol not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.goto[state].get(symbol, 0)
+                if self.fail[child] == child:
+                    self.fail[child] = 0
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def matches(self, symbols: List[str]) -> List[Tuple[int, int, int]]:
+        """(start, end, pattern index) of every occurrence, end exclusive.
+
+        Only symbols in the alphabet are stepped through; any other symbol
+        would reset the automaton, so a gap in their positions does that.
+        """
+        goto, fail, output, lengths, alphabet = self.goto, self.fail, self.output, self.lengths, self.alphabet
+        found = []
+        node = 0
+        previous = -2
+        for i in [i for i, symbol in enumerate(symbols) if symbol in alphabet]:
+            if i != previous + 1:
+                node = 0
+            previous = i
+            symbol = symbols[i]
+            while node and symbol not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(symbol, 0)
+            for idx in output[node]:
+                found.append((i + 1 - lengths[idx], i + 1, idx))
+        return found
+
+
+class SkillExtractor:
+    """Extracts canonical skills from free text and classifies them by section"""
+
+    def __init__(self, taxonomy: Optional[SkillTaxonomy] = None):
+        self.taxonomy = taxonomy or SkillTaxonomy(DEFAULT_TAXONOMY)
+        patterns = []
+        self._canonical: List[str] = []
+        self._needs_context: Set[int] = set()
+        for alias, canonical in self.taxonomy.aliases.items():
+            tokens = tuple(tokenize(alias))
+            if tokens:
+                if alias in CONTEXT_REQUIRED_ALIASES:
+                    self._needs_context.add(len(patterns))
+                patterns.append(tokens)
+                self._canonical.append(canonical)
+        self.automaton = AhoCorasick(patterns)
+        self._vocabulary = self.automaton.alphabet
+
+    def _match(self, tokens: List[str], original: Optional[str] = None) -> List[int]:
+        """Pattern index of each leftmost-longest match, in order.
+
+        original is the text the lowercased tokens came from; without it an
+        alias in CONTEXT_REQUIRED_ALIASES only counts next to another skill.
+        """
+        found = self.automaton.matches(tokens)
+        if len(found) > 1:
+            # Leftmost-longest: "google cloud platform" wins over "google cloud"
+            selected = []
+            last_end = -1
+            for start, neg_end, idx in sorted((start, -end, idx) for start, end, idx in found):
+                if start >= last_end:
+                    last_end = -neg_end
+                    selected.append((start, last_end, idx))
+            found = selected
+        if self._needs_context and any(idx in self._needs_context for _, _, idx in found):
+            found = self._in_context(found, tokens, original)
+        return [idx for _, _, idx in found]
+
+    def _in_context(
+        self,
+        found: List[Tuple[int, int, int]],
+        tokens: List[str],
+        original: Optional[str]
+    ) -> List[Tuple[int, int, int]]:
+        cased = _split_tokens(original) if original is not None else None
+        if cased is not None and len(cased) != len(tokens):
+            cased = None  # lowercasing changed the tokens; no case to go by
+
+        def listed(end: int, start: int) -> bool:
+            return all(token in _LIST_CONNECTORS for token in tokens[end:start])
+
+        kept = []
+        for n, (start, end, idx) in enumerate(found):
+            if (
+                idx not in self._needs_context
+                or (cased is not None and cased[start] != tokens[start])
+                or (n > 0 and listed(found[n - 1][1], start))
+                or (n + 1 < len(found) and listed(end, found[n + 1][0]))
+            ):
+                kept.append((start, end, idx))
+        return kept
+
+    def find_skills(self, text: str) -> List[str]:
+        """Canonical skills mentioned in text, in order of appearance"""
+        canonical = self._canonical
+        return [canonical[idx] for idx in self._match(tokenize(text), text)]
+
+    def _add_matches(self, tokens: List[str], target: Dict[str, None], original: Optional[str]) -> None:
+        canonical = self._canonical
+        for idx in self._match(tokens, original):
+            target[canonical[idx]] = None
+
+    def extract(self, description: str) -> Dict[str, List[str]]:
+        """Split a description's skills into required and nice-to-have.
+
+        The text is cut at headings, and a section's skills take its
+        heading's kind. Only sections containing an inline marker ("Go is a
+        plus", "Docker required") are cut further into sentences and
+        bullets, each classified on its own.
+        """
+        required: Dict[str, None] = {}
+        nice_to_have: Dict[str, None] = {}
+        if not description:
+            return {"required": [], "nice_to_have": []}
+
+        lowered = description.lower()
+        # Offsets into lowered line up with description unless lowercasing
+        # changed its length; without them matches lose their case
+        cased = description if len(description) == len(lowered) else None
+        sections = [(0, False)]
+        sections += [(m.start(), m.group("nice") is not None) for m in _HEADING_RE.finditer(lowered)]
+        for index, ((start, in_nice_section), (end, _)) in enumerate(zip(sections, sections[1:] + [(len(lowered), False)])):
+            text = lowered[start:end]
+            original = cased[start:end] if cased is not None else None
+            if index:
+                # The heading line itself ("Nice to have: Go") is no inline marker
+                heading, _, text = text.partition("\n")
+                if original is not None:
+                    original_heading, _, original = original.partition("\n")
+                else:
+                    original_heading = None
+                self._add_matches(
+                    _split_tokens(heading), nice_to_have if in_nice_section else required, original_heading
+                )
+            tokens = _split_tokens(text)
+            if self._vocabulary.isdisjoint(tokens):
+                continue
+            if _MARKER_TOKENS.isdisjoint(tokens):
+                self._add_matches(tokens, nice_to_have if in_nice_section else required, original)
+                continue
+            segments = _SEGMENT_END_RE.split(text)
+            # The split only looks at punctuation and newlines, so it cuts the
+            # original text at the same places
+            originals = _SEGMENT_END_RE.split(original) if original is not None else [None] * len(segments)
+            for segment, original_segment in zip(segments, originals):
+                if _INLINE_NICE_RE.search(segment):
+                    is_nice = True
+                elif _INLINE_REQUIRED_RE.search(segment):
+                    is_nice = False
+                else:
+                    is_nice = in_nice_section
+                self._add_matches(_split_tokens(segment), nice_to_have if is_nice else required, original_segment)
+
+        # A skill that is required anywhere is required
+        return {
+            "required": list(required),
+            "nice_to_have": [skill for skill in nice_to_have if skill not in required],
+        }
+
+    def extract_batch(
+        self,
+        descriptions: List[str],
+        processes: Optional[int] = None,
+        chunksize: int = 256
+    ) -> List[Dict[str, List[str]]]:
+        """Extract skills from many descriptions, optionally across a process pool"""
+        if not processes or processes <= 1 or len(descriptions) < chunksize:
+            return [self.extract(description) for description in descriptions]
+
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_worker,
+            initargs=(self,),
+        ) as pool:
+            return list(pool.map(_extract_in_worker, descriptions, chunksize=chunksize))
+
+
+_worker_extractor: Optional[SkillExtractor] = None
+
+
+def _init_worker(extractor: SkillExtractor) -> None:
+    global _worker_extractor
+    _worker_extractor = extractor
+
+
+def _extract_in_worker(description: str) -> Dict[str, List[str]]:
+    return _worker_extractor.extract(description)
+
+
+def _load_default_extractor() -> SkillExtractor:
+    if settings.SKILL_TAXONOMY_PATH:
+        try:
+            return SkillExtractor(SkillTaxonomy.from_file(settings.SKILL_TAXONOMY_PATH))
+        except Exception as e:
+            print(f"Skill taxonomy load error, using default: {e}")
+    return SkillExtractor()
+
+
+# Singleton
+skill_extractor = _load_default_extractor()
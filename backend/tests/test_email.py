@@ -0,0 +1,846 @@
+"""
+Tests for email sending, the SMTP pool and the outbox
+"""
+
+import pytest
+
+
+@pytest.fixture
+def smtp_server():
+    """Local aiosmtpd stand-in recording each message and each session"""
+    import socket
+    from aiosmtpd.controller import Controller
+
+    class Handler:
+        def __init__(self):
+            self.messages = []
+            self.sessions = set()
+            self.rcpt_replies = {}  # address -> reply, to simulate refusals
+
+        async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+            if address in self.rcpt_replies:
+                return self.rcpt_replies[address]
+            envelope.rcpt_tos.append(address)
+            return "250 OK"
+
+        async def handle_DATA(self, server, session, envelope):
+            self.messages.append(envelope)
+            self.sessions.add(session.peer)
+            return "250 OK"
+
+    # Controller's readiness probe can't use port 0, so pick a free port first
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    handler = Handler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+def make_pool(controller, **kwargs):
+    from app.services.email_service import SMTPConnectionPool
+
+    return SMTPConnectionPool(
+        hostname=controller.hostname, port=controller.port, start_tls=False, **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_smtp_pool_reuses_connections(smtp_server):
+    """Sends share one session until max_messages retires it"""
+    from app.services.email_service import EmailService
+
+    controller, handler = smtp_server
+    pool = make_pool(controller, size=1, max_messages=3)
+    service = EmailService(smtp_pool=pool)
+    service.smtp_user = "me@example.com"
+    try:
+        for i in range(5):
+            assert await service.send_email(["to@example.com"], f"Hello {i}", "Body")
+    finally:
+        await service.aclose()
+
+    assert len(handler.messages) == 5
+    assert handler.messages[0].rcpt_tos == ["to@example.com"]
+    assert pool.stats()["connections_opened"] == 2
+    assert len(handler.sessions) == 2
+
+
+@pytest.mark.asyncio
+async def test_smtp_pool_reconnects_after_server_drop(smtp_server):
+    """A connection the server closed is replaced transparently"""
+    from email.mime.text import MIMEText
+
+    controller, handler = smtp_server
+    pool = make_pool(controller, size=1, noop_after=0)
+    message = MIMEText("Body")
+    message["From"] = "me@example.com"
+    message["Subject"] = "Hi"
+
+    await pool.send(message, recipients=["to@example.com"])
+    # Kill the idle session behind the pool's back; the NOOP check notices
+    pool._idle[0].client.transport.close()
+    await pool.send(message, recipients=["to@example.com"])
+    await pool.close()
+
+    assert len(handler.messages) == 2
+    assert pool.stats()["connections_opened"] == 2
+
+
+def make_outbox_email(i, to, **kwargs):
+    from app.models.email import Email, EmailStatus
+
+    kwargs.setdefault("retry_count", 0)
+    return Email(
+        id=i, user_id=1, message_id=f"<outbox-{i}@example.com>", from_address="me@example.com",
+        to_addresses=[to], cc_addresses=[], bcc_addresses=[], subject=f"Hello {i}",
+        body_text="Body", status=EmailStatus.SENDING.value, **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_outbox_send_batch_outcomes(smtp_server):
+    """Every claimed email is sent once; 4xx refusals retry, 5xx fail"""
+    from app.services.email_outbox import EmailOutbox
+    from app.services.email_service import EmailService
+
+    controller, handler = smtp_server
+    handler.rcpt_replies = {
+        "busy@example.com": "451 Try again later",
+        "gone@example.com": "550 No such user",
+    }
+    service = EmailService(smtp_pool=make_pool(controller, size=2))
+    outbox = EmailOutbox(service=service, concurrency=5)
+    emails = [make_outbox_email(i, f"to{i}@example.com") for i in range(1, 21)]
+    emails.append(make_outbox_email(21, "busy@example.com", retry_count=1))
+    emails.append(make_outbox_email(22, "gone@example.com"))
+    emails.append(make_outbox_email(23, "reply@example.com", in_reply_to_id=1))
+    try:
+        outcomes = await outbox.send_batch(emails, parents={1: "<outbox-1@example.com>"})
+    finally:
+        await service.aclose()
+
+    assert sorted(row["b_id"] for row in outcomes["sent"]) == list(range(1, 21)) + [23]
+    assert [row["b_id"] for row in outcomes["retry"]] == [21]
+    assert outcomes["retry"][0]["b_retry_count"] == 2
+    assert [row["b_id"] for row in outcomes["failed"]] == [22]
+
+    # Exactly once per email, carrying the Message-ID stored on the row
+    ids = [envelope.content.decode().split("Message-ID: ")[1].split()[0] for envelope in handler.messages]
+    assert len(ids) == len(set(ids)) == 21
+    reply = next(e for e in handler.messages if e.rcpt_tos == ["reply@example.com"])
+    assert b"In-Reply-To: <outbox-1@example.com>" in reply.content
+
+
+def test_outbox_retry_backoff_and_claim_sql():
+    """Backoff doubles up to the cap, and claiming skips rows other workers hold"""
+    from datetime import datetime
+    from sqlalchemy.dialects import postgresql
+    from app.services.email_outbox import EmailOutbox, MAX_RETRY_DELAY_SECONDS, retry_delay
+
+    assert 30 <= retry_delay(0, base=30) <= 33
+    assert 120 <= retry_delay(2, base=30) <= 132
+    assert retry_delay(20, base=30) <= MAX_RETRY_DELAY_SECONDS * 1.1
+
+    sql = str(EmailOutbox().claim_statement(datetime.utcnow()).compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert sql.startswith("UPDATE emails SET status=") and "RETURNING" in sql
+
+
+class FakeImap:
+    """In-memory mailbox answering like aioimaplib; counts commands (round trips)"""
+
+    def __init__(self, count, uidvalidity=7):
+        self.uidvalidity = uidvalidity
+        self.commands = []
+        self.messages = {
+            uid: (f"Message-ID: <m{uid}@example.com>\nFrom: Recruiter <hr@acme.example>\n"
+                  f"To: me@example.com\nSubject: Interview {uid}\nDate: Tue, 06 Oct 2026 10:00:00 +0200\n"
+                  f"Content-Type: text/plain\n\nBody {uid}\n").encode()
+            for uid in range(1, count + 1)
+        }
+
+    async def select(self, mailbox):
+        from aioimaplib import Response
+
+        self.commands.append("SELECT")
+        return Response("OK", [
+            f"{len(self.messages)} EXISTS".encode(),
+            f"OK [UIDVALIDITY {self.uidvalidity}] UIDs valid".encode(),
+            f"OK [UIDNEXT {max(self.messages, default=0) + 1}] Predicted next UID".encode(),
+            b"[READ-WRITE] Select completed.",
+        ])
+
+    async def uid(self, command, message_set, parts):
+        from aioimaplib import Response
+
+        self.commands.append(f"UID FETCH {message_set}")
+        uids = set()
+        for piece in message_set.split(","):
+            low, _, high = piece.partition(":")
+            high = max(self.messages) if high == "*" else int(high or low)
+            uids.update(range(min(int(low), high), max(int(low), high) + 1))
+        lines = []
+        for seq, uid in enumerate(sorted(self.messages), start=1):
+            if uid not in uids:
+                continue
+            raw = self.messages[uid]
+            if "HEADER.FIELDS" in parts:
+                raw = raw.split(b"\n\n")[0] + b"\n\n"
+            lines += [f'{seq} FETCH (UID {uid} INTERNALDATE "06-Oct-2026 08:00:00 +0000" BODY[] {{{len(raw)}}}'.encode(),
+                      bytearray(raw), b")"]
+        return Response("OK", lines + [b"Fetch completed."])
+
+
+@pytest.mark.asyncio
+async def test_imap_resync_of_unchanged_mailbox_is_one_round_trip():
+    """Headers are fetched once; afterwards only UIDs above the high-water mark"""
+    from datetime import datetime
+    from app.services.imap_sync import ImapSync, header_row
+
+    client = FakeImap(10_000)
+    sync = ImapSync(host="imap.example.com", username="me@example.com", password="x")
+
+    info, items = await sync.fetch_new(client, None, 0)
+    assert (info.uidvalidity, info.exists, len(items)) == (7, 10_000, 10_000)
+    row = header_row(1, items[41], "<fallback@example.com>")
+    assert row["message_id"] == "<m42@example.com>" and row["imap_uid"] == 42
+    assert row["from_address"] == "hr@acme.example" and row["to_addresses"] == ["me@example.com"]
+    assert row["subject"] == "Interview 42" and row["received_at"] == datetime(2026, 10, 6, 8, 0)
+
+    client.commands.clear()
+    info, items = await sync.fetch_new(client, 7, 10_000)
+    assert items == [] and client.commands == ["SELECT"]
+
+    client.messages[10_001] = client.messages[1].replace(b"<m1@", b"<m10001@")
+    client.commands.clear()
+    info, items = await sync.fetch_new(client, 7, 10_000)
+    assert [item["uid"] for item in items] == [10_001]
+    assert client.commands == ["SELECT", "UID FETCH 10001:*"]
+
+    # A new UIDVALIDITY invalidates the mark; everything is listed again
+    client.uidvalidity = 8
+    info, items = await sync.fetch_new(client, 7, 10_001)
+    assert len(items) == 10_001
+
+
+@pytest.mark.asyncio
+async def test_imap_bodies_fetched_in_batches():
+    """Bodies come from one UID FETCH per batch and parse into text and attachments"""
+    from email.message import EmailMessage
+    from app.services.imap_sync import ImapSync, body_fields, uid_set
+
+    client = FakeImap(5)
+    message = EmailMessage()
+    message["Subject"] = "Offer"
+    message.set_content("Plain offer")
+    message.add_alternative("<p>HTML offer</p>", subtype="html")
+    message.add_attachment(b"%PDF-1.4 offer", maintype="application", subtype="pdf", filename="offer.pdf")
+    client.messages[3] = bytes(message)
+
+    sync = ImapSync(host="imap.example.com", username="me@example.com", password="x")
+    bodies = await sync._fetch_bodies(client, [5, 1, 2, 3])
+    assert client.commands == ["UID FETCH 1:3,5"] and sorted(bodies) == [1, 2, 3, 5]
+    assert uid_set([9, 4]) == "4,9"
+
+    fields = body_fields(bodies[3])
+    assert fields["body_text"].strip() == "Plain offer"
+    assert fields["body_html"].strip() == "<p>HTML offer</p>"
+    assert fields["attachments"] == [{"filename": "offer.pdf", "content_type": "application/pdf", "size": 14}]
+    assert body_fields(bodies[1])["body_text"].strip() == "Body 1"
+
+
+def test_jwz_threading_links_references_and_subjects():
+    """References, In-Reply-To, local replies and lost headers all land in the right thread"""
+    from datetime import datetime, timedelta
+    from app.services.email_threading import ThreadMessage, assign_thread_ids, build_threads
+
+    t0 = datetime(2026, 10, 1)
+
+    def msg(i, subject, message_id=None, in_reply_to=None, references=(), in_reply_to_id=None):
+        return ThreadMessage(id=i, message_id=message_id, subject=subject, date=t0 + timedelta(hours=i),
+                             in_reply_to=in_reply_to, references=list(references), in_reply_to_id=in_reply_to_id)
+
+    messages = [
+        # Application, recruiter reply, our answer (queued locally, no headers yet)
+        msg(1, "Application: Backend Engineer", "<a1@me>"),
+        msg(2, "Re: Application: Backend Engineer", "<b1@acme>", "<a1@me>", ["<a1@me>"]),
+        msg(3, "Re: Application: Backend Engineer", in_reply_to_id=2),
+        # Two replies to a message we never received share a thread
+        msg(4, "Re: Interview slots", "<c2@globex>", references=["<c0@globex>", "<c1@globex>"]),
+        msg(5, "Re: Interview slots", "<c3@globex>", "<c1@globex>", ["<c0@globex>", "<c1@globex>"]),
+        # A reply whose client dropped the headers joins by subject
+        msg(6, "Offer letter", "<d1@initech>"),
+        msg(7, "RE: Fwd: Offer letter", "<d2@initech>"),
+        # Identical auto-replies from different companies stay apart
+        msg(8, "Thank you for applying", "<e1@acme>"),
+        msg(9, "Thank you for applying", "<e1@hooli>"),
+        # A References loop must not hang or drop messages
+        msg(10, "Loop", "<f1@x>", references=["<f2@x>"]),
+        msg(11, "Loop", "<f2@x>", references=["<f1@x>"]),
+    ]
+    thread_ids = assign_thread_ids(messages)
+
+    assert thread_ids[1] == thread_ids[2] == thread_ids[3] == "1"
+    assert thread_ids[4] == thread_ids[5] == "4"
+    assert thread_ids[6] == thread_ids[7] == "6"
+    assert thread_ids[8] != thread_ids[9]
+    assert thread_ids[10] == thread_ids[11]
+    assert sorted(m.id for thread in build_threads(messages) for m in thread) == list(range(1, 12))
+
+
+def test_email_search_memory_index_and_tsquery():
+    """Phrases, prefixes, exclusions and filters behave alike in memory and as a tsquery"""
+    from types import SimpleNamespace
+    from app.services.email_search import InMemoryEmailIndex, make_snippet, parse_query, to_tsquery_text
+
+    def email(i, subject, body, category="other", user_id=1, job_id=None):
+        return SimpleNamespace(id=i, user_id=user_id, subject=subject, body_text=body, body_html=None,
+                               from_address=f"hr{i}@acme.example", category=category, job_id=job_id,
+                               email_type="received")
+
+    index = InMemoryEmailIndex()
+    for item in [
+        email(1, "Interview invitation", "We'd like to schedule an interview for the Backend Engineer role.",
+              "interview_scheduling", job_id=7),
+        email(2, "Application update", "The engineer backend team reviewed your application.", "rejection"),
+        email(3, "Backend Engineer offer", "Congratulations! Python & Postgres <team> awaits.", "offer_negotiation"),
+        email(4, "Newsletter", "Top backend engineer jobs this week. Unsubscribe any time.", "other"),
+        email(5, "Interview invitation", "Backend Engineer interview", user_id=2),
+    ]:
+        index.add(item)
+
+    def ids(q, **filters):
+        return [i for i, _ in index.search(1, parse_query(q), filters)]
+
+    assert ids('"backend engineer"') == [3, 4, 1]  # subject match ranks first; 2 has the words reversed
+    assert ids("backend engineer") == [3, 4, 2, 1]  # body-only ties: newest first
+    assert ids('"backend engineer" -unsubscribe') == [3, 1]
+    assert ids("interv*") == [1]
+    assert ids("backend", category="interview_scheduling") == [1]
+    assert ids("backend", job_id=7) == [1] and ids("pyth* postgres") == [3]
+    assert ids("-backend") == [] and ids("nothing") == []
+
+    parsed = parse_query('"Backend Engineer" pyth* -spam c++ ;DROP')
+    assert to_tsquery_text(parsed) == "(backend <-> engineer) & pyth:* & !spam & c & drop"
+    snippet = make_snippet("Congratulations! Python & Postgres <team> awaits.", parse_query("pyth*"))
+    assert snippet == "Congratulations! <b>Python</b> &amp; Postgres &lt;team&gt; awaits."
+    long_text = "intro " * 50 + "the backend role " + "outro " * 50
+    snippet = make_snippet(long_text, parse_query("backend"), width=60)
+    assert snippet.startswith("… ") and snippet.endswith(" …") and "<b>backend</b>" in snippet
+
+
+def test_email_search_backfills_vectors_and_refreshes_the_memory_index():
+    """Rows without a search_vector are filled per user; bulk writes and deletes reach the memory index"""
+    import asyncio
+    from types import SimpleNamespace
+    from app.services.email_search import EmailSearch, parse_query
+
+    pending = [SimpleNamespace(id=i, subject=f"Offer {i}", body_text=None, body_html="<p>Welcome</p>",
+                               from_address="hr@acme.example") for i in range(1, 4)]
+
+    class FakeSession:
+        def __init__(self):
+            self.selects, self.updates = [], []
+
+        async def execute(self, stmt, params=None):
+            if params is not None:
+                self.updates.append(params)
+                return None
+            self.selects.append(str(stmt.compile(compile_kwargs={"literal_binds": True})))
+            batch, pending[:] = pending[:2], pending[2:]
+            return batch
+
+        async def commit(self):
+            pass
+
+    db = FakeSession()
+    assert asyncio.run(EmailSearch("postgres").reindex_missing(db, batch_size=2, user_id=7)) == 3
+    assert "search_vector IS NULL" in db.selects[0] and "user_id = 7" in db.selects[0]
+    assert [[row["b_id"] for row in batch] for batch in db.updates] == [[1, 2], [3]]
+    assert db.updates[0][0]["b_search_text"].strip() == "Welcome"
+
+    search = EmailSearch("memory")
+    for i, user_id in [(1, 1), (2, 1), (3, 2)]:
+        search.index.add(SimpleNamespace(id=i, user_id=user_id, subject="Interview", body_text="", body_html=None,
+                                         from_address="hr@acme.example", category="other", job_id=None,
+                                         email_type="received"))
+    search._loaded.update({1, 2})
+    search.removed(2)
+    assert [i for i, _ in search.index.search(1, parse_query("interview"))] == [1]
+    search.invalidate(1)
+    assert 1 not in search._loaded and search.index.search(1, parse_query("interview")) == []
+    assert [i for i, _ in search.index.search(2, parse_query("interview"))] == [3]
+
+
+def test_mail_template_render_and_escaping():
+    """Templates compile once; HTML templates escape values after text filters, before markup ones"""
+    from app.services.mail_template import MailTemplate, TemplateError, REFERRAL_BODY
+
+    subject = MailTemplate("Hi {{name}}, re: {{ role | upper }}")
+    assert subject.variables == {"name", "role"}
+    assert subject.render({"name": "Ada", "role": "sre"}) == "Hi Ada, re: SRE"
+    assert subject.missing({"name": "Ada"}) == ["role"]
+    with pytest.raises(TemplateError):
+        subject.render({"name": "Ada"})
+    with pytest.raises(TemplateError):
+        MailTemplate("{{ name | shout }}")
+
+    body = REFERRAL_BODY.render({"connection_name": "Bob <b>", "message": "line 1\nline 2", "candidate_name": "Ada"})
+    assert "Hi Bob &lt;b&gt;," in body
+    assert "line 1<br>line 2" in body
+    assert MailTemplate("<p>{{ company | title }}</p>", html=True).render({"company": "AT&T"}) == "<p>At&amp;T</p>"
+
+
+@pytest.mark.asyncio
+async def test_bulk_send_shares_attachment_and_records_results(smtp_server):
+    """One encoded attachment serves every message; refusals are per recipient"""
+    import email
+    from app.services.email_service import EmailService, attachment_part
+    from app.services.mail_merge import BulkSender
+    from app.services.mail_template import MailTemplate
+
+    class RecordingSender(BulkSender):
+        async def record(self, batch_id, rows):
+            recorded.append(rows)
+
+    controller, handler = smtp_server
+    handler.rcpt_replies = {"gone@b.example": "550 No such user"}
+    recorded = []
+    service = EmailService(smtp_pool=make_pool(controller, size=2))
+    service.smtp_user = "me@example.com"
+    sender = RecordingSender(service=service, concurrency=3, per_domain_per_minute=0, flush_every=2)
+
+    recipients = [{"email": f"hr{i}@a.example", "variables": {"name": f"Person {i}"}} for i in range(4)]
+    recipients.append({"email": "gone@b.example", "variables": {"name": "Gone"}})
+    merged = sender.render(MailTemplate("Referral for {{ role }}"), MailTemplate("Hi {{ name }}"),
+                           recipients, shared={"role": "SRE"})
+    for i, item in enumerate(merged, start=1):
+        item.email_id = i
+    part = attachment_part("resume.pdf", b"%PDF-1.4 shared")
+    try:
+        counts = await sender.send("batch", merged, False, [part])
+    finally:
+        await service.aclose()
+
+    assert counts == {"sent": 4, "failed": 1}
+    assert [len(rows) for rows in recorded] == [2, 2, 1]
+    results = {row["b_id"]: row for rows in recorded for row in rows}
+    assert results[5]["b_status"] == "failed" and "No such user" in results[5]["b_error_message"]
+    assert all(results[i]["b_status"] == "sent" and results[i]["b_sent_at"] for i in range(1, 5))
+
+    messages = [email.message_from_bytes(envelope.content) for envelope in handler.messages]
+    assert sorted(m["To"] for m in messages) == [f"hr{i}@a.example" for i in range(4)]
+    assert {m["Subject"] for m in messages} == {"Referral for SRE"}
+    payloads = {m.get_payload()[1].get_payload(decode=True) for m in messages}
+    assert payloads == {b"%PDF-1.4 shared"}
+    assert sorted(m.get_payload()[0].get_payload() for m in messages) == [f"Hi Person {i}" for i in range(4)]
+
+
+def test_bulk_send_heartbeats_and_fails_stale_rows():
+    """Write-backs touch the rest of the batch; rows nobody touched are failed when read"""
+    import asyncio
+    from app.services.mail_merge import BulkSender
+
+    class FakeSession:
+        def __init__(self):
+            self.statements = []
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            pass
+
+        async def execute(self, stmt, params=None):
+            self.statements.append((str(stmt.compile(compile_kwargs={"literal_binds": True}))
+                                    if params is None else str(stmt), params))
+            return type("Result", (), {"rowcount": 2})()
+
+        async def commit(self):
+            pass
+
+    db = FakeSession()
+    sender = BulkSender(session_factory=lambda: db, stale_after=60)
+    asyncio.run(sender.record("batch", [{"b_id": 1, "b_status": "sent", "b_sent_at": None, "b_error_message": None}]))
+    (outcomes, params), (heartbeat, _) = db.statements
+    assert params[0]["b_id"] == 1 and "status=:b_status" in outcomes
+    assert "SET updated_at" in heartbeat and "status = 'sending'" in heartbeat and "'batch'" in heartbeat
+
+    db.statements.clear()
+    assert asyncio.run(sender.expire_stale(db, 7, "batch")) == 2
+    (sweep, _), = db.statements
+    assert "status='failed'" in sweep.replace(" ", "") and "updated_at <" in sweep and "user_id = 7" in sweep
+
+
+def test_domain_rate_limiter_spaces_each_domain():
+    """Slots per domain are 60/per_minute seconds apart; other domains aren't held up"""
+    from app.services.mail_merge import DomainRateLimiter
+
+    now = [100.0]
+    limiter = DomainRateLimiter(30, clock=lambda: now[0])
+    assert [limiter.reserve("a.example") for _ in range(3)] == [0.0, 2.0, 4.0]
+    assert limiter.reserve("b.example") == 0.0
+    now[0] += 10
+    assert limiter.reserve("a.example") == 0.0
+    assert DomainRateLimiter(0).reserve("a.example") == 0.0
+
+
+def test_tracking_links_are_signed_and_rewritten():
+    """Tokens verify only for their email (and URL); HTML gets click links and a pixel"""
+    from urllib.parse import unquote
+    from app.services.email_tracking import TrackingSigner, tracked_html
+
+    signer = TrackingSigner("secret")
+    token = signer.open_token(42)
+    assert signer.verify_open(token) == 42
+    assert signer.verify_open(token.replace("42.", "43.")) is None
+    assert signer.verify_open("42") is None and signer.verify_open("x.y") is None
+    assert TrackingSigner("other").verify_open(token) is None
+
+    click = signer.click_token(42, "https://jobs.example/a")
+    assert signer.verify_click(click, "https://jobs.example/a") == 42
+    assert signer.verify_click(click, "https://evil.example/") is None
+    assert signer.verify_open(click) is None
+
+    html = tracked_html('<html><body><a href="https://jobs.example/a">Job</a></body></html>', 42,
+                        "https://api.example/", signer)
+    assert f'href="https://api.example/api/track/click/{click}?url=' in html
+    assert unquote(html.split("?url=")[1].split('"')[0]) == "https://jobs.example/a"
+    assert html.endswith(f'<img src="https://api.example/api/track/open/{token}.gif" width="1" height="1" '
+                         'alt="" style="display:none"></body></html>')
+
+    # Escaped ampersands in the href are HTML, not part of the URL
+    html = tracked_html('<a href="https://jobs.example/view?id=1&amp;ref=mail">Job</a>', 42, "https://api.example", signer)
+    target = unquote(html.split("?url=")[1].split('"')[0])
+    assert target == "https://jobs.example/view?id=1&ref=mail"
+    assert f"/api/track/click/{signer.click_token(42, target)}?" in html
+
+
+def test_tracking_endpoints_buffer_counts_without_the_database(monkeypatch):
+    """Hits only touch the buffer; one flush row per email, in id order"""
+    import asyncio
+    import time
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy.dialects import postgresql
+    from app.api import tracking
+    from app.services.email_tracking import PIXEL_GIF, TrackingBuffer, tracking_buffer, tracking_signer
+
+    # As with TRACKING_BUFFER_ENABLED: the periodic flush does the writing
+    monkeypatch.setattr(TrackingBuffer, "running", True)
+    app = FastAPI()
+    app.include_router(tracking.router, prefix="/api/track")
+    client = TestClient(app)
+    tracking_buffer.drain()
+
+    for _ in range(3):
+        response = client.get(f"/api/track/open/{tracking_signer.open_token(7)}.gif")
+        assert response.status_code == 200 and response.content == PIXEL_GIF
+        assert "no-store" in response.headers["cache-control"]
+    client.get(f"/api/track/open/{tracking_signer.open_token(5)}.gif")
+    # A forged token still gets a pixel, but isn't counted
+    assert client.get("/api/track/open/9.forged.gif").content == PIXEL_GIF
+
+    url = "https://jobs.example/apply?id=1"
+    redirect = client.get(f"/api/track/click/{tracking_signer.click_token(7, url)}", params={"url": url},
+                          follow_redirects=False)
+    assert redirect.status_code == 302 and redirect.headers["location"] == url
+    bad = client.get(f"/api/track/click/{tracking_signer.click_token(7, url)}", params={"url": "https://evil.example"},
+                     follow_redirects=False)
+    assert bad.status_code == 404
+
+    rows = tracking_buffer.drain()
+    assert [(r["b_id"], r["b_opens"], r["b_clicks"]) for r in rows] == [(5, 1, 0), (7, 3, 1)]
+    assert rows[1]["b_opened_at"] and rows[1]["b_clicked_at"] and rows[0]["b_clicked_at"] is None
+
+    # A failed flush keeps the counts
+    tracking_buffer.record_open(7)
+    tracking_buffer.restore(rows)
+    assert [(r["b_id"], r["b_opens"]) for r in tracking_buffer.drain()] == [(5, 1), (7, 4)]
+
+    sql = str(tracking_buffer.update_statement().compile(dialect=postgresql.dialect()))
+    assert "open_count=(coalesce(emails.open_count, %(coalesce_1)s) + %(b_opens)s)" in sql
+    assert "WHERE emails.id = %(b_id)s" in sql
+
+    # The pixel handler itself stays well under a millisecond
+    token = tracking_signer.open_token(11)
+    loop = asyncio.new_event_loop()
+    try:
+        start = time.perf_counter()
+        for _ in range(1000):
+            loop.run_until_complete(tracking.track_open(token))
+        per_hit = (time.perf_counter() - start) / 1000
+    finally:
+        loop.close()
+    assert per_hit < 0.001
+    assert tracking_buffer.drain()[0]["b_opens"] == 1000
+
+
+def test_tracking_endpoints_write_through_without_the_flush_loop():
+    """With the buffer off (serverless) each hit is written before the response"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.api import tracking
+    from app.services.email_tracking import tracking_buffer, tracking_signer
+
+    executed = []
+
+    class FakeSession:
+        fail = False
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, statement, rows):
+            if FakeSession.fail:
+                raise ConnectionError("database unavailable")
+            executed.append([(r["b_id"], r["b_opens"], r["b_clicks"]) for r in rows])
+
+        async def commit(self):
+            pass
+
+    app = FastAPI()
+    app.include_router(tracking.router, prefix="/api/track")
+    client = TestClient(app)
+    tracking_buffer.drain()
+    original_factory = tracking_buffer.session_factory
+    tracking_buffer.session_factory = FakeSession
+    try:
+        assert not tracking_buffer.running
+        client.get(f"/api/track/open/{tracking_signer.open_token(7)}.gif")
+        url = "https://jobs.example/apply?id=1"
+        client.get(f"/api/track/click/{tracking_signer.click_token(7, url)}", params={"url": url},
+                   follow_redirects=False)
+        assert executed == [[(7, 1, 0)], [(7, 0, 1)]]
+        assert len(tracking_buffer) == 0
+
+        # A failed write still answers with the pixel and keeps the count for the next hit
+        FakeSession.fail = True
+        assert client.get(f"/api/track/open/{tracking_signer.open_token(5)}.gif").status_code == 200
+        assert len(tracking_buffer) == 1
+        FakeSession.fail = False
+        client.get(f"/api/track/open/{tracking_signer.open_token(7)}.gif")
+        assert executed[-1] == [(5, 1, 0), (7, 1, 0)]
+    finally:
+        tracking_buffer.session_factory = original_factory
+        tracking_buffer.drain()
+
+
+def test_compressed_columns_round_trip_and_migration_batches():
+    """Large values are compressed behind a header, small ones stored raw"""
+    import json
+    import os
+    from sqlalchemy.dialects import postgresql
+    from app.core.compression import RAW, ZLIB, CompressedText, CompressedJSON, compress, decompress
+    from app.models.email import Email
+    from app.services.column_compression import COMPRESSED_COLUMNS, ColumnCompressionMigration
+
+    html = ("<p>Thanks for applying to the Backend Engineer role at Acme.</p>" * 400).encode()
+    packed = compress(html, threshold=1024, codec=ZLIB)
+    assert packed[0] == ZLIB and len(packed) < len(html) // 10
+    assert decompress(packed) == html
+    assert compress(b"short", threshold=1024) == bytes((RAW,)) + b"short"
+    incompressible = os.urandom(2048)
+    assert compress(incompressible, threshold=16)[0] == RAW  # didn't shrink
+    with pytest.raises(ValueError):
+        decompress(b"\x7fdata")
+
+    dialect = postgresql.asyncpg.dialect()
+    column = CompressedText(threshold=64)
+    for value in ["Hi Ada", "Long body " * 100, None]:
+        assert column.process_result_value(column.process_bind_param(value, dialect), dialect) == value
+    assert column.process_bind_param("Hi Ada", dialect) == b"\x00Hi Ada"
+    assert column.process_result_value("not migrated yet", dialect) == "not migrated yet"
+    document = {"html": "<div>" * 500, "salary": [100, 200]}
+    json_column = CompressedJSON(threshold=64)
+    assert json_column.process_result_value(json_column.process_bind_param(document, dialect), dialect) == document
+    assert json_column.process_result_value(json.dumps(document), dialect) == document
+    assert isinstance(Email.__table__.c.body_html.type, CompressedText)
+
+    migration = ColumnCompressionMigration(threshold=1024)
+    rows = [(1, bytes((RAW,)) + html), (2, bytes((RAW,)) + b"x" * 2000), (3, bytes((RAW,)) + incompressible)]
+    updates = migration.compress_rows(rows)
+    assert [u["b_id"] for u in updates] == [1, 2]
+    assert decompress(updates[0]["b_value"]) == html
+    # The ALTER ships as a migration covering every compressed column, never as a startup step
+    path = os.path.join(os.path.dirname(__file__), "..", "migrations", "0048_compressed_columns.sql")
+    with open(path) as f:
+        ddl = f.read()
+    assert all(f"('{model.__tablename__}', '{column}')" in ddl for model, column in COMPRESSED_COLUMNS)
+    assert "''\\x00''::bytea || convert_to(%I::text, ''UTF8'')" in ddl
+    batch = str(migration.batch_statement(Email, "body_html", 100).compile(dialect=dialect))
+    assert "get_byte(emails.body_html, $" in batch and "emails.id > $" in batch
+    update_sql = str(migration.update_statement(Email, "body_html").compile(dialect=dialect))
+    assert "SET body_html=$1::BYTEA" in update_sql and "md5(emails.body_html) = $" in update_sql
+
+
+def test_email_linker_index_matches_by_strongest_evidence():
+    """Thread, confirmation address, employer domain, then company name"""
+    from datetime import datetime
+    from app.services.email_linker import LinkCandidate, UserLinkIndex, normalize_company, registrable_domain
+
+    assert normalize_company("Acme, Inc.") == normalize_company("ACME inc") == "acme"
+    assert registrable_domain("careers.acme.co.uk") == "acme.co.uk"
+    assert registrable_domain("mail.globex.com") == "globex.com"
+
+    index = UserLinkIndex()
+    acme_backend = LinkCandidate(1, 10, "backend engineer", datetime(2024, 5, 1))
+    acme_data = LinkCandidate(2, 11, "data scientist", datetime(2024, 5, 3))
+    initech = LinkCandidate(3, 12, "sre", datetime(2024, 5, 2))
+    stark = LinkCandidate(4, 13, "ml engineer", datetime(2024, 5, 4))
+    index.add(acme_backend, "Acme, Inc.", ["https://careers.acme.com/jobs/1"])
+    index.add(acme_data, "Acme, Inc.", ["https://careers.acme.com/jobs/2"])
+    index.add(initech, "Initech", ["https://boards.greenhouse.io/initech/1"], "no-reply@greenhouse.io")
+    index.add(stark, "Stark Industries", ["https://jobs.lever.co/stark/1"], "no-reply@greenhouse.io")
+    index.add_thread("77", initech)
+
+    def match(sender, subject, thread_id=None):
+        candidate = index.match(sender, subject, thread_id)
+        return candidate.application_id if candidate else None
+
+    assert match("anyone@example.org", "Re: catching up", thread_id="77") == 3
+    # Shared ATS no-reply: only the job title in the subject can decide
+    assert match("no-reply@greenhouse.io", "Your SRE application") == 3
+    assert match("no-reply@greenhouse.io", "Thanks for applying to Stark Industries") == 4
+    # Employer domain; several applications there: title first, else the latest
+    assert match("jane@acme.com", "Backend Engineer interview") == 1
+    assert match("jane@mail.acme.com", "Following up") == 2
+    # ATS senders and personal mailboxes: the company name in the sender or subject
+    assert match("starkindustries@hire.lever.co", "Next steps") == 4
+    assert match("recruiter.jane@gmail.com", "SRE opportunity at Initech") == 3
+    assert match("newsletter@jobs.example", "Top jobs this week") is None
+    # Stripping "gmail" from a personal address keeps it from matching a company named Gmail
+    assert match("initech.fan@gmail.com", "hello") is None
+
+
+def test_email_linker_ignores_digests_and_subject_only_company_mentions():
+    """Job alerts and newsletters naming an employer don't count as responses"""
+    from datetime import datetime
+    from sqlalchemy.dialects import postgresql
+    from app.services.email_linker import EmailLinker, LinkCandidate, UserLinkIndex
+
+    index = UserLinkIndex()
+    amazon = LinkCandidate(1, 10, "software engineer", datetime(2024, 5, 1))
+    apple = LinkCandidate(2, 11, "hardware engineer", datetime(2024, 5, 2))
+    index.add(amazon, "Amazon", ["https://amazon.jobs/en/jobs/1"])
+    index.add(apple, "Apple", ["https://jobs.apple.com/details/2"])
+    index.add(LinkCandidate(3, 12, "data engineer"), "Flipkart", [], "alerts@naukri.com")
+
+    assert index.match("jobalerts-noreply@linkedin.com", "Software Engineer at Amazon and 10 more jobs") is None
+    assert index.match("alerts@naukri.com", "New jobs at Amazon, Flipkart") is not None  # confirmation address
+    assert index.match("jobalert@naukri.com", "New jobs at Amazon, Flipkart") is None
+    assert index.match("newsletter@medium.com", "How Apple designs chips") is None
+    assert index.match("noreply@substack.com", "Amazon layoffs: what now") is None
+    # The sender or the applied-for title still settles it
+    assert index.match("recruiting@amazon.jobs", "Checking in") is amazon
+    assert index.match("apple@hire.lever.co", "Next steps") is apple
+    assert index.match("friend@gmail.com", "Fwd: Apple hardware engineer referral") is apple
+
+    # The employer's consumer mail needs a recruiting signal to count
+    google = LinkCandidate(4, 13, "site reliability engineer", datetime(2024, 5, 3))
+    index.add(google, "Google", ["https://careers.google.com/jobs/4"])
+    assert index.match("auto-confirm@email.amazon.com", "Your Amazon.com order has shipped") is None
+    assert index.match("store-news@amazon.com", "Deals picked for you") is None
+    assert index.match("no-reply@accounts.google.com", "Security alert") is None
+    assert index.match("no-reply@accounts.google.com", "Your application to Google") is google
+    assert index.match("no-reply@email.amazon.com", "Software Engineer: next steps") is amazon
+    assert index.match("jane.doe@google.com", "Quick chat?") is google
+
+    sql = str(EmailLinker().unlinked_statement(1, 0).compile(dialect=postgresql.dialect()))
+    assert "emails.category IS DISTINCT FROM" in sql
+
+
+@pytest.mark.asyncio
+async def test_email_linker_backfill_links_and_records_responses():
+    """Batches of unlinked emails become executemany UPDATEs of emails and applications"""
+    from datetime import datetime
+    from types import SimpleNamespace
+    from app.services.email_linker import EmailLinker, LinkCandidate, UserLinkIndex
+
+    index = UserLinkIndex()
+    acme = LinkCandidate(1, 10, "backend engineer", datetime(2024, 5, 3))
+    index.add(acme, "Acme", ["https://acme.com/careers"])
+
+    def email(i, sender, thread_id, day):
+        return SimpleNamespace(id=i, from_address=sender, reply_to=None, subject="Hello",
+                               thread_id=thread_id, received_at=datetime(2024, 5, day))
+
+    batches = [
+        [email(1, "hr@acme.com", "t1", 4), email(2, "spam@example.org", "t2", 4)],
+        [email(3, "someone@example.org", "t1", 5), email(4, "hr@acme.com", "t4", 2)],
+    ]
+    executed = []
+
+    class Result:
+        def __init__(self, rows):
+            self.rows = rows
+
+        def all(self):
+            return self.rows
+
+    class FakeSession:
+        async def execute(self, stmt, params=None):
+            if params is not None:
+                executed.append((str(stmt), params))
+                return None
+            return Result(batches.pop(0) if batches else [])
+
+    linker = EmailLinker(batch_size=2)
+
+    async def build_index(db, user_id):
+        return index
+
+    linker.build_index = build_index
+    stats = await linker.link_user(FakeSession(), user_id=1)
+
+    assert (stats.scanned, stats.linked, stats.applications_responded) == (4, 3, 1)
+    email_updates = [params for sql, params in executed if sql.startswith("UPDATE emails")]
+    assert [[row["b_id"] for row in params] for params in email_updates] == [[1], [3, 4]]
+    assert all(row["b_application_id"] == 1 and row["b_job_id"] == 10 for row in email_updates[1])
+    sql, params = next((sql, params) for sql, params in executed if sql.startswith("UPDATE applications"))
+    assert "least(applications.response_date" in sql
+    # Email 4 predates the application, so it isn't a response
+    assert params == [{"b_id": 1, "b_response_date": datetime(2024, 5, 4)}]
+
+
+def test_imap_sync_endpoint_only_syncs_the_mailbox_owner(monkeypatch):
+    """The server-wide IMAP account is never pulled into another user's emails"""
+    from types import SimpleNamespace
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.api import emails
+    from app.core.database import get_db
+    from app.core.security import get_current_user
+    from app.services.imap_sync import imap_sync
+
+    synced = []
+
+    async def sync_user(user_id):
+        synced.append(user_id)
+
+    async def no_db():
+        yield None
+
+    monkeypatch.setattr(imap_sync, "username", "Owner@Example.com")
+    monkeypatch.setattr(imap_sync, "password", "secret")
+    monkeypatch.setattr(imap_sync, "sync_user", sync_user)
+    app = FastAPI()
+    app.include_router(emails.router, prefix="/api/emails")
+    app.dependency_overrides[get_db] = no_db
+    client = TestClient(app)
+
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=2, email="someone@example.com")
+    assert client.post("/api/emails/sync").status_code == 403
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1, email="owner@example.com")
+    assert client.post("/api/emails/sync").status_code == 200
+    assert synced == [1]
+
+    monkeypatch.setattr(imap_sync, "password", "")
+    assert client.post("/api/emails/sync").status_code == 503
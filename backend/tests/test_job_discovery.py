@@ -0,0 +1,561 @@
+"""
+Tests for job discovery, dedup and ingestion helpers
+"""
+
+import pytest
+
+
+def test_fingerprint_ignores_tracking_params():
+    """Same listing URL with different tracking params maps to one fingerprint"""
+    from app.services.job_store import compute_fingerprint
+
+    a = compute_fingerprint({"source_url": "https://www.naukri.com/job-123?utm_source=mail&src=jobsearch"})
+    b = compute_fingerprint({"source_url": "http://naukri.com/job-123/"})
+    assert a == b
+
+
+def test_fingerprint_falls_back_to_title_company_location():
+    """Without a URL the fingerprint is built from normalized text fields"""
+    from app.services.job_store import compute_fingerprint
+
+    a = compute_fingerprint({"title": "Backend Engineer", "company": "Acme, Inc.", "location": "Pune"})
+    b = compute_fingerprint({"title": "backend  engineer", "company": "ACME Inc", "location": "pune"})
+    c = compute_fingerprint({"title": "Backend Engineer", "company": "Acme, Inc.", "location": "Delhi"})
+    assert a == b
+    assert a != c
+
+
+def test_bloom_filter_membership():
+    """Bloom filter never forgets an added item"""
+    from app.services.job_store import BloomFilter
+
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [f"fp-{i}" for i in range(1000)]
+    bloom.update(items)
+
+    assert all(item in bloom for item in items)
+    false_positives = sum(f"other-{i}" in bloom for i in range(1000))
+    assert false_positives < 50
+
+
+def test_deduplicate_jobs_uses_fingerprint():
+    """In-run dedup collapses listings sharing a fingerprint"""
+    from app.services.job_discovery import JobDiscoveryService
+
+    service = JobDiscoveryService()
+    jobs = [
+        {"title": "SRE", "company": "Acme", "source_url": "https://acme.com/jobs/1?ref=feed"},
+        {"title": "SRE", "company": "Acme", "source_url": "https://acme.com/jobs/1"},
+        {"title": "Senior SRE", "company": "Acme", "source_url": "https://acme.com/jobs/2"},
+    ]
+    unique, duplicates = service._deduplicate_jobs(jobs)
+
+    assert len(unique) == 2
+    assert duplicates == 1
+    assert all("fingerprint" in job for job in unique)
+
+
+def test_deduplicate_jobs_collapses_cross_posted_listings():
+    """One posting scraped from LinkedIn and Naukri has two URLs but is one job"""
+    from app.services.job_discovery import JobDiscoveryService
+
+    jobs = [
+        {"title": "Backend Engineer", "company": "Acme, Inc.", "source": "linkedin",
+         "source_url": "https://www.linkedin.com/jobs/view/123/"},
+        {"title": "backend engineer", "company": "ACME Inc", "source": "naukri",
+         "source_url": "https://www.naukri.com/job-listings-backend-engineer-acme-150424500123"},
+        # Missing company names don't merge unrelated listings
+        {"title": "Backend Engineer", "company": "Unknown", "source_url": "https://jobs.example/1"},
+        {"title": "Backend Engineer", "company": "Unknown", "source_url": "https://jobs.example/2"},
+    ]
+    unique, duplicates = JobDiscoveryService()._deduplicate_jobs(jobs)
+
+    assert [job["source"] for job in unique[:1]] == ["linkedin"]
+    assert len(unique) == 3 and duplicates == 1
+
+
+def test_skill_extraction_word_boundaries_and_aliases():
+    """Aliases map to canonical skills and substrings inside words don't match"""
+    from app.services.skill_extraction import SkillExtractor
+
+    extractor = SkillExtractor()
+    found = extractor.find_skills("Good knowledge of K8s, Postgres and Node.js; javascript a must")
+
+    assert "go" not in found
+    assert "java" not in found
+    assert {"kubernetes", "postgresql", "node.js", "javascript"} <= set(found)
+
+
+def test_skill_extraction_everyday_words_need_context():
+    """"node" is no alias and "go" only counts as a name or in a list of skills"""
+    from app.services.skill_extraction import SkillExtractor
+
+    extractor = SkillExtractor()
+    assert extractor.find_skills("Each node in the cluster must be healthy. You will go far here.") == []
+    assert extractor.find_skills("Experience with Go and Kubernetes") == ["go", "kubernetes"]
+    assert extractor.find_skills("we use python, go or rust") == ["python", "go", "rust"]
+    assert extractor.find_skills("python services; go to market fast") == ["python"]
+    assert extractor.extract("Requirements:\n- Python\n- ready to go the extra mile\nNice to have: GO") == {
+        "required": ["python"], "nice_to_have": ["go"]
+    }
+
+
+def test_skill_extraction_ascii_tokens_match_regex_tokens():
+    """The split fast path for ASCII text yields the same tokens as the regex"""
+    from app.services.skill_extraction import SkillExtractor, _TOKEN_RE, tokenize
+
+    for text in ("C++/C#, node.js & CI/CD (k8s)!\tgo_lang", "Café: Python’s “asyncio”"):
+        assert tokenize(text) == _TOKEN_RE.findall(text.lower())
+
+    # Non-pattern tokens between the words of a multi-token alias break the match
+    extractor = SkillExtractor()
+    assert extractor.find_skills("Google Cloud Platform, then google the cloud") == ["gcp"]
+
+
+def test_skill_extraction_section_classification():
+    """Skills under a nice-to-have heading are classified separately"""
+    from app.services.job_discovery import JobDiscoveryService
+
+    description = (
+        "Requirements:\n"
+        "- 3+ years of Python and Django\n"
+        "Nice to have:\n"
+        "- Terraform\n"
+        "- Python scripting\n"
+    )
+    skills = JobDiscoveryService().extract_skills_from_description(description)
+
+    assert skills["required"] == ["python", "django"]
+    assert skills["nice_to_have"] == ["terraform"]
+
+
+def test_skill_extraction_markers_apply_per_bullet_and_sentence():
+    """A bullet or sentence mentioning "bonus" or "preferred" only demotes itself"""
+    from app.services.skill_extraction import SkillExtractor
+
+    extractor = SkillExtractor()
+    skills = extractor.extract("Requirements:\n- Python\n- Bonus points for Go\n- Docker\n- Kubernetes")
+    assert skills == {"required": ["python", "docker", "kubernetes"], "nice_to_have": ["go"]}
+
+    skills = extractor.extract("Must know Python. Java is preferred. Docker required")
+    assert skills == {"required": ["python", "docker"], "nice_to_have": ["java"]}
+
+    # Headings are lines of their own, with or without a colon or markdown
+    skills = extractor.extract("## Preferred qualifications\n* Rust\n* AWS is a must\n**Requirements**\n1. SQL")
+    assert skills == {"required": ["aws", "sql"], "nice_to_have": ["rust"]}
+
+
+def test_enrichment_parses_structured_fields():
+    """Free-text experience, salary, remote and location become columns"""
+    from app.services.job_enrichment import JobEnrichmentPipeline
+
+    fields = JobEnrichmentPipeline().enrich_job({
+        "title": "Backend Engineer (Remote)",
+        "location": "Bengaluru/Bangalore",
+        "experience_required": "3-5 Yrs",
+        "salary_text": "10-15 Lacs PA",
+    })
+
+    assert fields["experience_min_years"] == 3.0
+    assert fields["experience_max_years"] == 5.0
+    assert (fields["salary_min"], fields["salary_max"], fields["salary_currency"]) == (1000000, 1500000, "INR")
+    assert fields["is_remote"] is True
+    assert (fields["city"], fields["country"]) == ("Bengaluru", "IN")
+
+
+def test_enrichment_keeps_existing_values():
+    """Enrichment fills gaps but never overwrites curated fields"""
+    from app.services.job_enrichment import JobEnrichmentPipeline
+
+    fields = JobEnrichmentPipeline().enrich_job({
+        "location": "London, United Kingdom",
+        "city": "Greater London",
+        "country": "United Kingdom",
+        "experience_required": "5+ years",
+        "experience_min_years": 4.0,
+    })
+
+    assert "city" not in fields
+    assert "experience_min_years" not in fields
+    assert fields["country"] == "GB"
+
+
+@pytest.mark.asyncio
+async def test_enrich_pending_writes_back_grouped_bulk_updates():
+    """Stored jobs are enriched in keyset batches; each field set is one executemany UPDATE.
+    Every job read is marked enriched, even when nothing could be derived."""
+    from app.services.job_enrichment import JobEnrichmentPipeline
+
+    pending = [
+        {"id": 1, "location": "Pune, India", "experience_required": "3-5 Yrs", "raw_data": {}},
+        {"id": 2, "location": "Berlin", "experience_required": None, "raw_data": {}},
+        {"id": 3, "location": None, "experience_required": None, "raw_data": {}, "description_keywords": []},
+    ]
+    executed, commits = [], []
+
+    class Row:
+        def __init__(self, mapping):
+            self._mapping = mapping
+
+    class Result:
+        def __init__(self, rows):
+            self.rows = rows
+
+        def all(self):
+            return self.rows
+
+    class FakeSession:
+        def __init__(self):
+            self.batches = [[Row(job) for job in pending]]
+
+        async def execute(self, stmt, params=None):
+            if params is not None:
+                executed.append(params)
+                return None
+            return Result(self.batches.pop(0) if self.batches else [])
+
+        async def commit(self):
+            commits.append(True)
+
+    total = await JobEnrichmentPipeline().enrich_pending(FakeSession())
+
+    assert total == 3 and len(commits) == 1
+    rows = {row["id"]: row for group in executed for row in group}
+    assert set(rows) == {1, 2, 3}
+    # Job 3 has nothing to derive; it is only marked, so the next backfill skips it
+    assert set(rows[3]) == {"id", "enriched_at"}
+    assert all(row["enriched_at"] is not None for row in rows.values())
+    assert rows[1]["city"] == "Pune" and rows[1]["country"] == "IN"
+    assert (rows[1]["experience_min_years"], rows[1]["experience_max_years"]) == (3.0, 5.0)
+    assert rows[2]["country"] == "DE" and "experience_min_years" not in rows[2]
+    # Rows with different field sets never share an executemany
+    assert all(len({tuple(sorted(row)) for row in group}) == 1 for group in executed)
+
+
+@pytest.mark.asyncio
+async def test_enrich_batch_reuses_one_pool():
+    """Large batches fan out to a pool kept across batches; results keep job order"""
+    from app.services.job_enrichment import JobEnrichmentPipeline
+
+    jobs = [{"id": i, "location": "Pune, India" if i % 2 else "Berlin"} for i in range(6)]
+    pipeline = JobEnrichmentPipeline(processes=2)
+    try:
+        first = await pipeline.enrich_batch(jobs, min_parallel=4)
+        executor = pipeline._executor
+        second = await pipeline.enrich_batch(jobs, min_parallel=4)
+        assert executor is not None and pipeline._executor is executor
+    finally:
+        pipeline.shutdown()
+
+    assert [fields["country"] for fields in first] == ["DE", "IN"] * 3
+    assert [fields["country"] for fields in second] == ["DE", "IN"] * 3
+    # Small batches run in a thread and never start the pool
+    small = JobEnrichmentPipeline(processes=2)
+    assert (await small.enrich_batch(jobs[:2]))[1]["country"] == "IN" and small._executor is None
+
+
+def _naukri_page(ids):
+    cards = "".join(
+        f'<article class="jobTuple" data-job-id="{job_id}">'
+        f'<a class="title" href="/job-listings-{job_id}">Python Developer {job_id}</a>'
+        f'<a class="comp-name">Company {job_id}</a>'
+        f'<span class="loc">Pune</span><span class="exp">2-4 Yrs</span>'
+        f'<span class="job-post-day">1 Day Ago</span></article>'
+        for job_id in ids
+    )
+    return f"<html><body>{cards}</body></html>"
+
+
+@pytest.fixture
+def naukri_fixture_server():
+    """Local stand-in for the Naukri search pages"""
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    pages = {
+        "/python-jobs": _naukri_page([103, 102, 101]),
+        "/python-jobs-2": _naukri_page([100, 99]),
+    }
+    requested = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            requested.append(path)
+            body = pages.get(path, "<html></html>").encode()
+            self.send_response(200 if path in pages else 404)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", requested
+    server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_discovery_high_water_mark(naukri_fixture_server):
+    """A cursor limits the crawl to listings above the high-water mark"""
+    from app.services.job_discovery import JobDiscoveryService
+
+    base_url, requested = naukri_fixture_server
+    service = JobDiscoveryService(base_urls={"naukri": base_url})
+
+    first = await service.discover_jobs(sources=["naukri"], keywords=["python"])
+    assert [job["external_id"] for job in first["jobs"]] == ["103", "102", "101", "100", "99"]
+    assert first["cursors"]["naukri"]["last_external_id"] == "103"
+    assert first["jobs"][0]["source_url"] == f"{base_url}/job-listings-103"
+
+    requested.clear()
+    second = await service.discover_jobs(
+        sources=["naukri"],
+        keywords=["python"],
+        cursors={"naukri": {"last_external_id": "101"}},
+    )
+    assert [job["external_id"] for job in second["jobs"]] == ["103", "102"]
+    assert second["skipped"] == 1
+    # Page 1 already reaches the mark, so page 2 is never fetched
+    assert requested == ["/python-jobs"]
+
+
+def test_query_key_coalesces_identical_searches():
+    """Keyword/country order and case don't split a crawl"""
+    from app.services.discovery_scheduler import make_query_key
+
+    assert make_query_key(["Python", "Backend"], ["India"]) == make_query_key(["backend", "python "], ["india"])
+    assert make_query_key(["python"], ["India"]) != make_query_key(["python"], ["USA"])
+
+
+@pytest.mark.asyncio
+async def test_discovery_submit_returns_run_id_before_crawling(monkeypatch):
+    """The API gets the run id at once; an identical request joins the same run"""
+    from app.services import discovery_scheduler as module
+    from app.services.discovery_scheduler import DiscoveryScheduler
+
+    runs, crawled = {}, []
+
+    class Result:
+        def scalars(self):
+            return self
+
+        def all(self):
+            return []
+
+    class FakeSession:
+        def __init__(self):
+            self.added = []
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        def add(self, obj):
+            self.added.append(obj)
+
+        async def commit(self):
+            for obj in self.added:
+                obj.id = len(runs) + 1
+                runs[obj.id] = obj
+            self.added.clear()
+
+        async def get(self, model, key):
+            return runs.get(key)
+
+        async def execute(self, stmt, params=None):
+            return Result()
+
+        async def refresh(self, obj):
+            pass
+
+    class Service:
+        async def discover_jobs(self, **kwargs):
+            crawled.append(kwargs["keywords"])
+            return {"jobs": [], "total_found": 3, "duplicates": 0, "skipped": 1, "cursors": {}}
+
+    async def load_known_fingerprints(db, force=False):
+        return 0
+
+    async def upsert_jobs(db, jobs):
+        return 2, 1
+
+    monkeypatch.setattr(module.job_store, "load_known_fingerprints", load_known_fingerprints)
+    monkeypatch.setattr(module.job_store, "upsert_jobs", upsert_jobs)
+
+    scheduler = DiscoveryScheduler(service=Service(), session_factory=FakeSession)
+    run_id, crawl = await scheduler.submit_query(["Python"], ["India"], ["naukri"], user_ids=[1])
+    joined_id, joined = await scheduler.submit_query(["python"], ["india"], ["naukri"], user_ids=[2])
+
+    assert joined_id == run_id and joined is None
+    assert runs[run_id].status == "running" and not crawled
+    assert scheduler.serves(run_id, 2) and not scheduler.serves(run_id, 3)
+
+    run = await crawl()
+    assert crawled == [["Python"]]
+    assert run.status == "completed"
+    assert (run.jobs_found, run.jobs_new, run.jobs_updated, run.jobs_skipped) == (3, 2, 1, 1)
+    assert run.user_ids == [1, 2] and not scheduler.serves(run_id, 2)
+
+
+@pytest.mark.asyncio
+async def test_http_client_registry_tracks_connection_reuse(naukri_fixture_server):
+    """Keep-alive requests on a shared pool reuse one connection and one DNS lookup"""
+    from app.core.http_clients import HTTPClientRegistry
+    from app.services.job_discovery import JobDiscoveryService
+
+    base_url, _ = naukri_fixture_server
+    registry = HTTPClientRegistry(dns_ttl=60)
+    await registry.start()
+    try:
+        service = JobDiscoveryService(base_urls={"naukri": base_url}, http_client=registry.get("naukri"))
+        result = await service.discover_jobs(sources=["naukri"], keywords=["python"])
+        assert len(result["jobs"]) == 5
+    finally:
+        await registry.aclose()
+
+    stats = registry.stats()
+    naukri = stats["upstreams"]["naukri"]
+    # Pages 1-3 (the last one empty) over a single connection
+    assert naukri["requests"] == 3
+    assert naukri["new_connections"] == 1
+    assert naukri["reuse_rate"] == round(2 / 3, 4)
+    assert stats["dns_cache"] == {"hits": 0, "misses": 1}
+
+
+@pytest.mark.asyncio
+async def test_http_client_registry_raises_httpx_errors():
+    """Failures inside the httpcore pool surface as the matching httpx exceptions"""
+    import httpx
+    from app.core.http_clients import HTTPClientRegistry
+
+    registry = HTTPClientRegistry(dns_ttl=60)
+    try:
+        with pytest.raises(httpx.ConnectError):
+            await registry.get("scraper").get("http://127.0.0.1:1/")
+    finally:
+        await registry.aclose()
+
+
+def _alert_email(name):
+    """(from, subject, body_text, body_html, received_at) of a saved alert email"""
+    import os
+    from app.services.imap_sync import body_fields, header_row
+
+    path = os.path.join(os.path.dirname(__file__), "fixtures", "job_alerts", f"{name}.eml")
+    with open(path, "rb") as f:
+        raw = f.read()
+    headers = header_row(1, {"uid": 1, "internaldate": None, "literal": raw}, "<fixture>")
+    body = body_fields(raw)
+    return headers["from_address"], headers["subject"], body["body_text"], body["body_html"], headers["received_at"]
+
+
+def test_job_alert_parsers_extract_listings_from_saved_emails():
+    """LinkedIn and Naukri digests, direct or forwarded, become enriched job dicts"""
+    from app.services.job_alert_extractor import AlertParser, JobAlertExtractor
+    from app.services.job_store import compute_fingerprint
+
+    with pytest.raises(TypeError):
+        AlertParser()  # parsers must supply canonical_url and parse_lines
+    extractor = JobAlertExtractor()
+
+    name, jobs = extractor.extract(1, *_alert_email("linkedin_alert"))
+    assert name == "linkedin"
+    assert len(jobs) == 6
+    first = jobs[0]
+    assert (first["title"], first["company"], first["location"]) == (
+        "Senior Backend Engineer", "Acme Corp", "Bengaluru, Karnataka, India")
+    # Tracking redirect collapses to the public listing URL, so scrapes of it dedup
+    assert first["source_url"] == "https://www.linkedin.com/jobs/view/3901234567/"
+    assert first["fingerprint"] == compute_fingerprint({"source_url": "https://linkedin.com/jobs/view/3901234567"})
+    assert (first["salary_min"], first["salary_max"], first["salary_currency"]) == (3_000_000, 4_500_000, "INR")
+    assert first["source"] == "email" and first["alert_email_id"] == 1
+    assert jobs[1]["work_type"] == "hybrid"
+
+    # Forwarded from a personal address: the quoted From line picks the parser
+    name, forwarded = extractor.extract(2, *_alert_email("forwarded_linkedin_alert"))
+    assert name == "linkedin"
+    assert [job["fingerprint"] for job in forwarded] == [job["fingerprint"] for job in jobs]
+
+    name, jobs = extractor.extract(3, *_alert_email("naukri_alert"))
+    assert name == "naukri"
+    assert len(jobs) == 8  # the "Apply" button repeats each listing link
+    infosys, tcs = jobs[0], jobs[1]
+    assert infosys["source_url"].endswith("-3-to-6-years-150424500123")
+    assert "?" not in infosys["source_url"]
+    assert (infosys["company"], infosys["experience_required"], infosys["location"]) == ("Infosys", "3-6 Yrs", "Bengaluru")
+    assert (infosys["experience_min_years"], infosys["salary_min"]) == (3.0, 1_000_000)
+    assert tcs["salary_text"] == "" and tcs["location"] == "Pune, Hyderabad"
+
+    # Recruiter mail from the same domain isn't an alert
+    sender, subject, text, html, received = _alert_email("linkedin_alert")
+    assert extractor.extract(4, "jane@linkedin.com", subject, text, html, received) == (None, [])
+
+    # Emails stored without a category are still candidates
+    from sqlalchemy.dialects import postgresql
+    sql = str(extractor.candidates_statement(1, 0).compile(dialect=postgresql.dialect()))
+    assert "emails.category IS DISTINCT FROM" in sql
+
+
+@pytest.mark.asyncio
+async def test_job_alert_extraction_streams_batches_into_bulk_upserts(monkeypatch):
+    """Each batch marks its alert emails and upserts all its listings in one call"""
+    from types import SimpleNamespace
+    from app.services import job_alert_extractor as module
+    from app.services.job_alert_extractor import JobAlertExtractor
+
+    def row(i, name):
+        sender, subject, text, html, received = _alert_email(name)
+        return SimpleNamespace(id=i, from_address=sender, subject=subject, body_text=text,
+                               body_html=html, received_at=received)
+
+    newsletter = SimpleNamespace(id=2, from_address="news@naukri.com", subject="Career tips",
+                                 body_text="", body_html="<p>Tips</p>", received_at=None)
+    # An alert whose listings have all expired is still marked, so it isn't parsed again
+    no_listings = SimpleNamespace(id=5, from_address="jobalerts-noreply@linkedin.com", subject="Your job alert",
+                                  body_text="", body_html="<p>No new jobs match your alert.</p>", received_at=None)
+    batches = [[row(1, "linkedin_alert"), newsletter], [row(3, "naukri_alert"), row(4, "forwarded_linkedin_alert")],
+               [no_listings]]
+    marked, upserts, stored, commits = [], [], set(), []
+
+    class Result:
+        def __init__(self, rows):
+            self.rows = rows
+
+        def all(self):
+            return self.rows
+
+    class FakeSession:
+        async def execute(self, stmt, params=None):
+            if params is not None:
+                marked.append([p["b_id"] for p in params])
+                return None
+            return Result(batches.pop(0) if batches else [])
+
+        async def commit(self):
+            commits.append(True)
+
+    async def upsert_jobs(db, jobs):
+        upserts.append(jobs)
+        fingerprints = {job["fingerprint"] for job in jobs}
+        new = fingerprints - stored
+        stored.update(fingerprints)
+        return len(new), len(fingerprints) - len(new)
+
+    monkeypatch.setattr(module.job_store, "upsert_jobs", upsert_jobs)
+    stats = await JobAlertExtractor(batch_size=2).extract_user(FakeSession(), user_id=1)
+
+    assert marked == [[1], [3, 4], [5]]
+    assert [len(jobs) for jobs in upserts] == [6, 14] and len(commits) == 1
+    assert (stats.scanned, stats.alerts, stats.listings) == (5, 4, 20)
+    assert dict(stats.by_parser) == {"linkedin": 12, "naukri": 8}
+    # The forwarded copy lands on the same fingerprints as the direct alert
+    assert (stats.inserted, stats.updated) == (6 + 8, 6)
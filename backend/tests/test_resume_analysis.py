@@ -0,0 +1,105 @@
+"""
+Tests for resume/job keyword analysis
+"""
+
+RESUME = {
+    "personalInfo": {"fullName": "Grace Hopper", "email": "grace@example.com", "phone": "555-0100",
+                     "summary": "Backend engineer building data pipelines with Python and PostgreSQL."},
+    "experiences": [{
+        "position": "Senior Engineer", "company": "Navy", "startDate": "2019-01",
+        "highlights": ["Built Django services on AWS", "Ran Kafka streaming for billing"],
+    }],
+    "skills": ["Python", "Postgres", "Docker"],
+}
+
+
+def test_ats_analysis_reports_keyword_gaps():
+    """Required skills missing from the resume drive the score and missing keywords"""
+    from app.services.ats_analyzer import ATSAnalyzer
+
+    job = {
+        "id": 7,
+        "required_skills": ["Python", "PostgreSQL", "Kubernetes"],
+        "nice_to_have_skills": ["Kafka"],
+        "description": "Billing platform team. You will own billing pipelines and streaming ingestion.",
+    }
+    analysis = ATSAnalyzer().analyze(RESUME, job)
+
+    assert analysis["job_id"] == 7
+    assert analysis["missing_keywords"][0] == "kubernetes"
+    assert {"python", "postgresql", "kafka", "billing"} <= set(analysis["matched_keywords"])
+    assert 0 < analysis["keyword_coverage"] < 1
+    assert any("kubernetes" in s for s in analysis["suggestions"])
+    assert "Resume text is very short for keyword matching" in analysis["format_issues"]
+
+
+def test_ats_job_without_terms_scores_no_keyword_coverage():
+    """A job with nothing to match scores 0 when ranked and leaves analyze() to the structure score"""
+    from app.services.ats_analyzer import ATSAnalyzer
+
+    analyzer = ATSAnalyzer()
+    empty = {"id": 9, "required_skills": [], "description": ""}
+    assert analyzer.rank_jobs(RESUME, [empty]) == [(9, 0.0)]
+
+    analysis = analyzer.analyze(RESUME, empty)
+    assert analysis["keyword_coverage"] is None and analysis["missing_keywords"] == []
+    assert analysis["score"] == analyzer.analyze(RESUME)["score"]
+
+
+def test_ats_rank_jobs_uses_cached_job_index():
+    """Ranking reuses each job's index until the job changes"""
+    from app.services.ats_analyzer import ATSAnalyzer
+
+    analyzer = ATSAnalyzer()
+    jobs = [
+        {"id": 1, "updated_at": 1, "required_skills": ["Java", "Spring"], "description": ""},
+        {"id": 2, "updated_at": 1, "required_skills": ["Python", "Django", "AWS"], "description": ""},
+    ]
+    assert [job_id for job_id, _ in analyzer.rank_jobs(RESUME, jobs)] == [2, 1]
+
+    first = analyzer.job_keywords(jobs[1])
+    assert analyzer.job_keywords(jobs[1]) is first
+    assert analyzer.job_keywords({**jobs[1], "updated_at": 2}) is not first
+
+
+def test_stored_description_keywords_replace_the_description():
+    """Enrichment stores the description terms; an index built from them matches one built from the text"""
+    from app.services.ats_analyzer import ATSAnalyzer
+    from app.services.job_enrichment import JobEnrichmentPipeline
+
+    analyzer = ATSAnalyzer()
+    job = {"required_skills": ["Python"], "description": "Python payments ledger; ledger reconciliation at scale"}
+    stored = JobEnrichmentPipeline().enrich_job(job)["description_keywords"]
+    assert stored[0] == "ledger" and "python" not in stored
+
+    from_text = analyzer.build_job_keywords(job)
+    from_row = analyzer.build_job_keywords({"required_skills": ["Python"], "description": None,
+                                            "description_keywords": stored})
+    assert from_row == from_text
+
+
+def test_compatibility_matrix_matches_pairwise_coverage():
+    """The sparse product gives the same coverage as scoring each pair"""
+    from app.services.ats_analyzer import ATSAnalyzer
+    from app.services.compatibility import CompatibilityMatrix
+
+    analyzer = ATSAnalyzer()
+    java_resume = {"skills": ["Java", "Spring", "Kafka"], "personalInfo": {"summary": "Payments backend"}}
+    resumes = [(10, RESUME), (11, java_resume)]
+    jobs = [
+        {"id": 1, "required_skills": ["Java", "Spring"], "nice_to_have_skills": ["Kafka"],
+         "description": "Payments backend services"},
+        {"id": 2, "required_skills": ["Python", "Django", "AWS"], "description": "Billing pipelines"},
+        {"id": 3, "required_skills": [], "description": ""},
+    ]
+    result = CompatibilityMatrix(analyzer).compute(resumes, jobs)
+
+    for i, (_, content) in enumerate(resumes):
+        terms = analyzer.resume_terms(content)
+        for j, job in enumerate(jobs[:2]):
+            expected = analyzer.keyword_coverage(terms, analyzer.job_keywords(job))["score"]
+            assert abs(result["scores"][i, j] - expected) < 1e-3
+
+    best = {match["job_id"]: match["resume_id"] for match in result["best"]}
+    assert best[1] == 11 and best[2] == 10
+    assert result["scores"][:, 2].tolist() == [0.0, 0.0]
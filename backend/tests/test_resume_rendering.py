@@ -0,0 +1,288 @@
+"""
+Tests for resume rendering and the render cache
+"""
+
+import pytest
+
+
+SAMPLE_RESUME = {
+    "personalInfo": {"fullName": "Ada Lovelace", "email": "ada@example.com", "summary": "Analyst."},
+    "experiences": [{"position": "Engineer", "company": "Analytical Engines", "highlights": ["Wrote notes"]}],
+    "education": [{"degree": "BSc", "field": "Mathematics", "institution": "London"}],
+    "skills": ["Python", "Mathematics"],
+}
+
+
+def test_render_cache_key_is_content_addressed():
+    """Key ignores dict order but changes with content, theme, format and renderer version"""
+    from app.services import render_cache as rc
+
+    key = rc.render_cache_key(SAMPLE_RESUME, "#3B82F6", "pdf")
+    reordered = dict(reversed(list(SAMPLE_RESUME.items())))
+    assert rc.render_cache_key(reordered, "#3b82f6", "pdf") == key
+    assert rc.render_cache_key({**SAMPLE_RESUME, "skills": ["Go"]}, "#3B82F6", "pdf") != key
+    assert rc.render_cache_key(SAMPLE_RESUME, "#000000", "pdf") != key
+    assert rc.render_cache_key(SAMPLE_RESUME, "#3B82F6", "docx") != key
+
+
+@pytest.mark.asyncio
+async def test_render_cache_serves_repeat_docx_from_blob(tmp_path):
+    """Second download is a blob read; invalidation drops it"""
+    from types import SimpleNamespace
+    from app.services.render_cache import RenderCache
+    from app.services.render_pool import RenderPool
+
+    cache = RenderCache(blob_dir=str(tmp_path), pool=RenderPool(processes=0))
+    resume = SimpleNamespace(id=1, content=SAMPLE_RESUME, pdf_content=None, pdf_cache_key=None)
+
+    first, key = await cache.get_or_render(None, resume, "docx", "#3B82F6")
+    second, same_key = await cache.get_or_render(None, resume, "docx", "#3B82F6")
+    assert first == second and key == same_key
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.invalidate(resume, "#3B82F6")
+    assert not (tmp_path / f"{key}.docx").exists()
+
+
+@pytest.mark.asyncio
+async def test_render_cache_keeps_compact_attachments_apart(tmp_path):
+    """Compact attachment PDFs get their own key and blob, and never touch the row's PDF slot"""
+    from types import SimpleNamespace
+    from app.services.render_cache import RenderCache, render_cache_key
+    from app.services.render_pool import RenderPool
+
+    cache = RenderCache(blob_dir=str(tmp_path), pool=RenderPool(processes=0))
+    resume = SimpleNamespace(id=1, content=SAMPLE_RESUME, pdf_content=None, pdf_cache_key=None)
+    key = render_cache_key(SAMPLE_RESUME, "#3B82F6", "pdf", compact=True)
+    assert key != render_cache_key(SAMPLE_RESUME, "#3B82F6", "pdf")
+
+    first = await cache.get_or_render_attachment(SAMPLE_RESUME, "#3B82F6")
+    second = await cache.get_or_render_attachment(SAMPLE_RESUME, "#3B82F6")
+    assert first == second and first.startswith(b"%PDF")
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert (tmp_path / f"{key}.pdf").exists() and resume.pdf_cache_key is None
+
+    cache.invalidate(resume, "#3B82F6")
+    assert not (tmp_path / f"{key}.pdf").exists()
+
+
+def test_theme_stylesheets_are_independent():
+    """Rendering one theme must not recolour another's headers"""
+    from app.services.resume_builder import theme_stylesheet, resume_builder
+
+    red = theme_stylesheet("#ff0000")
+    resume_builder.generate_pdf(SAMPLE_RESUME, "#00ff00")
+    assert red["SectionHeader"].textColor.hexval() == "0xff0000"
+    assert theme_stylesheet("#FF0000") is red
+
+
+def test_compact_pdf_is_smaller_and_readable():
+    """Compact mode drops metadata and ASCII85 but keeps the same text"""
+    import io
+    from PyPDF2 import PdfReader
+    from app.services.resume_builder import resume_builder
+
+    standard = resume_builder.generate_pdf(SAMPLE_RESUME)
+    compact = resume_builder.generate_pdf(SAMPLE_RESUME, compact=True)
+    assert len(compact) < len(standard)
+    assert b"/Producer" not in compact and b"ASCII85Decode" not in compact
+    # Invariant output: identical content gives identical bytes
+    assert resume_builder.generate_pdf(SAMPLE_RESUME, compact=True) == compact
+
+    text = lambda pdf: "".join(page.extract_text() for page in PdfReader(io.BytesIO(pdf)).pages)
+    assert text(compact) == text(standard)
+
+
+@pytest.mark.asyncio
+async def test_render_pool_rejects_when_saturated():
+    """Past max_pending, callers get RenderPoolSaturated instead of queueing"""
+    import asyncio
+    from app.services.render_pool import RenderPool, RenderPoolSaturated
+
+    pool = RenderPool(processes=0, max_pending=1)
+    results = await asyncio.gather(
+        pool.render(SAMPLE_RESUME, "pdf", "#3B82F6"),
+        pool.render(SAMPLE_RESUME, "pdf", "#3B82F6"),
+        return_exceptions=True,
+    )
+    assert results[0][:4] == b"%PDF"
+    assert isinstance(results[1], RenderPoolSaturated)
+    assert pool.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_render_pool_process_workers():
+    """Renders round-trip through worker processes"""
+    from app.services.render_pool import RenderPool
+
+    pool = RenderPool(processes=1, max_pending=4)
+    try:
+        data = await pool.render(SAMPLE_RESUME, "pdf", "#3B82F6")
+    finally:
+        pool.shutdown()
+    assert data[:4] == b"%PDF"
+
+
+@pytest.mark.asyncio
+async def test_export_streams_valid_zip(tmp_path):
+    """Rendered files stream into a readable archive with unique names"""
+    import io
+    import zipfile
+    from types import SimpleNamespace
+    from app.services.render_cache import RenderCache
+    from app.services.render_pool import RenderPool
+    from app.services.resume_export import zip_stream, _archive_name
+
+    cache = RenderCache(blob_dir=str(tmp_path), pool=RenderPool(processes=0))
+    resumes = [
+        SimpleNamespace(id=i, name="Tailored / Google", content={**SAMPLE_RESUME, "skills": [f"S{i}"]},
+                        pdf_content=None, pdf_cache_key=None)
+        for i in range(3)
+    ]
+    used = set()
+
+    async def files():
+        async for resume, data in cache.iter_rendered(None, resumes, "docx", "#3B82F6", concurrency=2):
+            yield _archive_name(resume.name, "docx", used), data
+
+    chunks = [chunk async for chunk in zip_stream(files())]
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.testzip() is None
+        assert sorted(archive.namelist()) == [
+            "Tailored _ Google (2).docx", "Tailored _ Google (3).docx", "Tailored _ Google.docx",
+        ]
+
+
+def test_cached_file_response_etag_and_range(tmp_path):
+    """Cached files revalidate with 304 and serve single byte ranges"""
+    from fastapi import FastAPI, Request
+    from fastapi.testclient import TestClient
+    from app.core.file_responses import cached_file_response
+
+    path = tmp_path / "abc.pdf"
+    path.write_bytes(bytes(range(256)) * 4)
+    app = FastAPI()
+
+    @app.get("/file")
+    async def serve(request: Request):
+        return cached_file_response(request, str(path), "application/pdf", "CV.pdf", "abc")
+
+    client = TestClient(app)
+    full = client.get("/file")
+    assert full.status_code == 200
+    assert full.headers["etag"] == '"abc"'
+    assert full.headers["content-length"] == "1024"
+    assert full.content == path.read_bytes()
+
+    assert client.get("/file", headers={"If-None-Match": '"abc"'}).status_code == 304
+
+    partial = client.get("/file", headers={"Range": "bytes=1000-"})
+    assert partial.status_code == 206
+    assert partial.headers["content-range"] == "bytes 1000-1023/1024"
+    assert partial.content == path.read_bytes()[1000:]
+
+    assert client.get("/file", headers={"Range": "bytes=-10"}).content == path.read_bytes()[-10:]
+    assert client.get("/file", headers={"Range": "bytes=5000-"}).status_code == 416
+    # A stale If-Range means the client's partial copy is outdated: send it all
+    assert client.get("/file", headers={"Range": "bytes=0-9", "If-Range": '"old"'}).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_render_cache_renders_straight_to_blob_file(tmp_path):
+    """A miss renders into the blob file; the next download is a hit on that path"""
+    from types import SimpleNamespace
+    from app.services.render_cache import RenderCache
+    from app.services.render_pool import RenderPool
+
+    cache = RenderCache(blob_dir=str(tmp_path), pool=RenderPool(processes=0))
+    resume = SimpleNamespace(id=1, content=SAMPLE_RESUME, pdf_content=None, pdf_cache_key=None)
+
+    path, key = await cache.get_or_render_path(None, resume, "docx", "#3B82F6")
+    assert path == str(tmp_path / f"{key}.docx")
+    assert (tmp_path / f"{key}.docx").read_bytes()[:2] == b"PK"
+    assert await cache.get_or_render_path(None, resume, "docx", "#3B82F6") == (path, key)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_resume_history_patch_round_trip():
+    """Deltas rebuild every version exactly, with periodic snapshots"""
+    import copy
+    from app.services.resume_history import ResumeHistory, make_patch, apply_patch, reconstruct
+
+    history = ResumeHistory(snapshot_every=3)
+    versions = [copy.deepcopy(SAMPLE_RESUME)]
+    edits = [
+        lambda c: c["skills"].append("Rust"),
+        lambda c: c["experiences"][0]["highlights"].insert(0, "Designed the first program"),
+        lambda c: c["personalInfo"].update(summary="Analyst / programmer ~ pioneer"),
+        lambda c: c.pop("education"),
+        lambda c: c["skills"].remove("Python"),
+    ]
+    for edit in edits:
+        content = copy.deepcopy(versions[-1])
+        edit(content)
+        versions.append(content)
+
+    revisions = [history.build_revision(1, 1, None, versions[0])]
+    for version in range(2, len(versions) + 1):
+        revisions.append(history.build_revision(1, version, versions[version - 2], versions[version - 1]))
+
+    assert [r.kind for r in revisions] == ["snapshot", "delta", "delta", "snapshot", "delta", "delta"]
+    for version, expected in enumerate(versions, start=1):
+        assert reconstruct(revisions, version) == expected
+
+    # Appending one skill is one small op, not a copy of the list
+    assert make_patch(versions[0], versions[1]) == [{"op": "add", "path": "/skills/2", "value": "Rust"}]
+    assert apply_patch(versions[2], make_patch(versions[2], versions[0])) == versions[0]
+
+
+@pytest.mark.parametrize("fmt", ["pdf", "docx"])
+def test_resume_import_round_trip(tmp_path, fmt):
+    """A resume we rendered parses back into experience, education and skills"""
+    from app.services.resume_builder import resume_builder
+    from app.services.resume_import import parse_resume_file
+
+    content = {
+        **SAMPLE_RESUME,
+        "experiences": [
+            {"position": "Backend Engineer", "company": "Acme", "startDate": "2019-03", "endDate": "2021-06",
+             "highlights": ["Moved billing onto PostgreSQL and Kubernetes."]},
+            {"position": "Intern", "company": "Initech", "startDate": "2018-06", "endDate": "2018-09",
+             "description": "Wrote Python tooling."},
+        ],
+    }
+    path = tmp_path / f"resume.{fmt}"
+    path.write_bytes(resume_builder.generate_pdf(content) if fmt == "pdf" else resume_builder.generate_docx(content))
+
+    parsed = parse_resume_file(str(path), fmt)
+
+    assert parsed["pages"] == 1 and parsed["ms_per_page"] > 0
+    first, second = parsed["experience"]
+    assert (first["title"], first["company"]) == ("Backend Engineer", "Acme")
+    assert (first["start_date"].year, first["start_date"].month, first["end_date"].month) == (2019, 3, 6)
+    assert first["technologies"] == ["postgresql", "kubernetes"]
+    assert (second["company"], second["description"]) == ("Initech", "Wrote Python tooling.")
+    assert parsed["education"][0]["field_of_study"] == "Mathematics"
+    # Listed skills as written, plus taxonomy skills found in the bullets
+    assert parsed["skills"] == ["Python", "Mathematics", "postgresql", "kubernetes"]
+
+
+@pytest.mark.asyncio
+async def test_resume_importer_caps_concurrent_parses(tmp_path):
+    """Past max_concurrent, uploads get ResumeImportBusy instead of queueing"""
+    import asyncio
+    from app.services.resume_builder import resume_builder
+    from app.services.resume_import import ResumeImporter, ResumeImportBusy
+
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(resume_builder.generate_pdf(SAMPLE_RESUME))
+    importer = ResumeImporter(processes=0, max_concurrent=1)
+    results = await asyncio.gather(
+        importer.parse(str(path), "pdf"),
+        importer.parse(str(path), "pdf"),
+        return_exceptions=True,
+    )
+    assert results[0]["pages"] == 1
+    assert isinstance(results[1], ResumeImportBusy)
+    assert importer.stats()["rejected"] == 1